@@ -0,0 +1,5 @@
+"""
+Client-side benchmarks of the main workflows, run against the in-process FakeGeoServer
+
+Run ``python -m benchmarks --help`` for the options.
+"""
@@ -0,0 +1,341 @@
+import json
+import math
+import sys
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Any, NamedTuple
+
+from benchmarks.scenarios import SCENARIOS, Recorder, reference
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None  # type: ignore[assignment]
+
+BASELINE = Path(__file__).with_name("baseline.json")
+DEFAULT_TOLERANCE = 0.5
+DEFAULT_REPEAT = 3
+# Absolute slack added to the tolerance of the latency metrics, in milliseconds: sub-millisecond
+# latencies of the fake GeoServer vary with the load of the machine
+LATENCY_SLACK = 0.5
+# Metrics compared with the baseline, and whether higher values are better. The baseline holds
+# them relative to the reference throughput of the machine, see relative_metrics
+METRICS: dict[str, bool] = {
+    "requests_per_second": True,
+    "p50": False,
+    "p95": False,
+    "peak_rss": False,
+}
+
+
+class Result(NamedTuple):
+    """
+    Measurements of a benchmark scenario
+
+    Attributes
+    ----------
+    scenario : str
+        name of the scenario
+    requests : int
+        number of HTTP requests, or of parses for the capabilities scenarios
+    duration : float
+        wall-clock time of the measured part of the scenario, in seconds
+    requests_per_second : float
+        throughput
+    p50 : float
+        median latency in milliseconds
+    p95 : float
+        95th percentile of the latency in milliseconds
+    peak_rss : float
+        peak resident set size in MiB of the process running the scenario. Run with
+        :py:func:`run_isolated` to measure the peak of the scenario alone.
+    """
+
+    scenario: str
+    requests: int
+    duration: float
+    requests_per_second: float
+    p50: float
+    p95: float
+    peak_rss: float
+
+
+def run_scenario(
+    name: str, scale: float = 1.0, max_workers: int = 1, latency: float = 0.0
+) -> Result:
+    recorder = Recorder()
+    SCENARIOS[name](recorder, scale, max_workers, latency)
+    latencies = sorted(recorder.latencies)
+    return Result(
+        scenario=name,
+        requests=len(latencies),
+        duration=round(recorder.duration, 4),
+        requests_per_second=round(len(latencies) / recorder.duration, 1),
+        p50=round(percentile(latencies, 50) * 1000, 3),
+        p95=round(percentile(latencies, 95) * 1000, 3),
+        peak_rss=round(peak_rss(), 1),
+    )
+
+
+def run_isolated(
+    name: str, scale: float = 1.0, max_workers: int = 1, latency: float = 0.0
+) -> Result:
+    """
+    Run a scenario in a new process, so that its peak RSS does not include the memory used by
+    the scenarios run before
+    """
+    with ProcessPoolExecutor(
+        max_workers=1, mp_context=get_context("spawn")
+    ) as executor:
+        return executor.submit(run_scenario, name, scale, max_workers, latency).result()
+
+
+def measure_reference(
+    scale: float = 1.0, latency: float = 0.0, repeat: int = 1
+) -> float:
+    """
+    Reference throughput of the machine, in plain requests per second to the fake GeoServer,
+    best of repeated runs
+    """
+    best = 0.0
+    for _ in range(max(repeat, 1)):
+        recorder = Recorder()
+        reference(recorder, scale, 1, latency)
+        best = max(best, len(recorder.latencies) / recorder.duration)
+    return round(best, 1)
+
+
+def relative_metrics(result: Result, reference: float) -> dict[str, float]:
+    """
+    Metrics of a result which do not depend on the speed of the machine: the throughput as a
+    multiple of the reference throughput and the latencies as multiples of the reference
+    latency (the time of one plain request). The peak RSS is kept in MiB.
+    """
+    reference_latency = 1000 / reference
+    return {
+        "requests_per_second": round(result.requests_per_second / reference, 4),
+        "p50": round(result.p50 / reference_latency, 4),
+        "p95": round(result.p95 / reference_latency, 4),
+        "peak_rss": result.peak_rss,
+    }
+
+
+def best_of(results: list[Result]) -> Result:
+    """
+    Combine the results of repeated runs of a scenario, keeping the best value of each metric
+    to filter out the noise of other processes
+    """
+    best = results[0]._asdict()
+    for result in results[1:]:
+        for metric, higher_is_better in METRICS.items():
+            value = getattr(result, metric)
+            best[metric] = (
+                max(best[metric], value)
+                if higher_is_better
+                else min(best[metric], value)
+            )
+    return Result(**best)
+
+
+def percentile(sorted_values: list[float], percent: float) -> float:
+    """
+    Nearest-rank percentile of sorted values, 0 if there are none
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(percent / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+def peak_rss() -> float:
+    """
+    Peak resident set size of the process in MiB, 0 if it cannot be measured
+    """
+    if resource is None:
+        return 0.0
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Bytes on macOS, KiB on Linux
+    return max_rss / 1024**2 if sys.platform == "darwin" else max_rss / 1024
+
+
+def compare(
+    results: list[Result],
+    baseline: dict[str, dict[str, Any]],
+    reference: float,
+    tolerance: float = DEFAULT_TOLERANCE,
+) -> list[str]:
+    """
+    Compare results with a baseline of relative metrics, given the reference throughput of the
+    machine (see :py:func:`relative_metrics`), and describe the regressions beyond the
+    tolerance, e.g. 0.5 for 50%. Scenarios and metrics missing from the baseline are ignored.
+    """
+    regressions: list[str] = []
+    for result in results:
+        expected_metrics = baseline.get(result.scenario)
+        if not expected_metrics:
+            continue
+        metrics = relative_metrics(result, reference)
+        for metric, higher_is_better in METRICS.items():
+            expected = expected_metrics.get(metric)
+            if not expected:
+                continue
+            value = metrics[metric]
+            if higher_is_better:
+                regressed = value < expected * (1 - tolerance)
+            else:
+                slack = (
+                    LATENCY_SLACK * reference / 1000
+                    if metric in ("p50", "p95")
+                    else 0.0
+                )
+                regressed = value > expected * (1 + tolerance) + slack
+            if regressed:
+                regressions.append(
+                    f"{result.scenario}: {metric} {value} vs baseline {expected}"
+                )
+    return regressions
+
+
+def load_baseline(path: Path) -> dict[str, Any]:
+    with open(path) as file:
+        return json.load(file)
+
+
+def save_baseline(
+    path: Path, results: list[Result], settings: dict[str, Any], reference: float
+) -> None:
+    content = {
+        "settings": settings,
+        # For information only, the metrics of the scenarios are relative to it
+        "reference": reference,
+        "scenarios": {
+            result.scenario: relative_metrics(result, reference) for result in results
+        },
+    }
+    with open(path, "w") as file:
+        json.dump(content, file, indent=2)
+        file.write("\n")
+
+
+def format_table(results: list[Result]) -> str:
+    lines = [
+        f"{'scenario':<18} {'requests':>9} {'req/s':>10} {'p50 ms':>9} {'p95 ms':>9} "
+        f"{'peak RSS MiB':>13}"
+    ]
+    for result in results:
+        lines.append(
+            f"{result.scenario:<18} {result.requests:>9} "
+            f"{result.requests_per_second:>10.1f} {result.p50:>9.3f} {result.p95:>9.3f} "
+            f"{result.peak_rss:>13.1f}"
+        )
+    return "\n".join(lines)
+
+
+def parse_args(args: list[str] | None = None):
+    parser = ArgumentParser(description="""
+        Benchmark the client against an in-process fake GeoServer and compare the results
+        with a baseline.
+        """)
+    parser.add_argument(
+        "--scenario",
+        action="append",
+        choices=list(SCENARIOS),
+        help="Scenario to run, can be repeated (default: all)",
+    )
+    parser.add_argument(
+        "--scale",
+        type=float,
+        default=1.0,
+        help="Factor applied to the number of resources of each scenario",
+    )
+    parser.add_argument(
+        "--max_workers",
+        type=int,
+        default=1,
+        help="Maximum number of requests in flight",
+    )
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=0.0,
+        help="Latency injected in each request of the fake GeoServer, in seconds",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=DEFAULT_REPEAT,
+        help="Number of runs of each scenario, the best value of each metric is kept",
+    )
+    parser.add_argument(
+        "--baseline",
+        type=Path,
+        default=BASELINE,
+        help="Baseline JSON file the results are compared with",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=DEFAULT_TOLERANCE,
+        help="Relative degradation tolerated before reporting a regression",
+    )
+    parser.add_argument(
+        "--save_baseline",
+        action="store_true",
+        help="Write the results to the baseline file instead of comparing them",
+    )
+    parser.add_argument("--output", type=Path, help="Write the results to a JSON file")
+    return parser.parse_args(args)
+
+
+def main(args: list[str] | None = None) -> int:
+    options = parse_args(args)
+    reference = measure_reference(options.scale, options.latency, options.repeat)
+    print(f"Reference: {reference} plain requests per second", flush=True)
+    results: list[Result] = []
+    for name in options.scenario or list(SCENARIOS):
+        runs = [
+            run_isolated(name, options.scale, options.max_workers, options.latency)
+            for _ in range(max(options.repeat, 1))
+        ]
+        results.append(best_of(runs))
+        print(format_table(results[-1:]).splitlines()[-1], flush=True)
+    print()
+    print(format_table(results))
+    settings = {
+        "scale": options.scale,
+        "max_workers": options.max_workers,
+        "latency": options.latency,
+        "repeat": options.repeat,
+    }
+    if options.output:
+        with open(options.output, "w") as file:
+            json.dump(
+                {
+                    "settings": settings,
+                    "reference": reference,
+                    "results": [r._asdict() for r in results],
+                },
+                file,
+                indent=2,
+            )
+    if options.save_baseline:
+        save_baseline(options.baseline, results, settings, reference)
+        print(f"Baseline written to {options.baseline}")
+        return 0
+    if not options.baseline.exists():
+        return 0
+    baseline = load_baseline(options.baseline)
+    baseline_settings = {
+        key: value for key, value in baseline["settings"].items() if key != "repeat"
+    }
+    if any(settings[key] != value for key, value in baseline_settings.items()):
+        print(
+            f"Not compared with {options.baseline}, measured with {baseline_settings}"
+        )
+        return 0
+    regressions = compare(results, baseline["scenarios"], reference, options.tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    return 1 if regressions else 0
@@ -0,0 +1,311 @@
+import threading
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from functools import partial
+from io import BytesIO
+from time import perf_counter
+from typing import Any
+
+import requests
+
+from geoservercloud import GeoServerCloud
+from geoservercloud.fakegeoserver import FakeGeoServer
+from geoservercloud.geoservercloudsync import GeoServerCloudSync
+from geoservercloud.parallel import map_concurrently
+from geoservercloud.services.capabilities import read_wms_layers
+from geoservercloud.services.restclient import RestClient
+
+WORKSPACE = "bench"
+DATASTORE = "store"
+SLD = b"""<?xml version="1.0" encoding="UTF-8"?>
+<StyledLayerDescriptor version="1.0.0" xmlns="http://www.opengis.net/sld">
+  <NamedLayer><Name>layer</Name><UserStyle><FeatureTypeStyle><Rule>
+    <PointSymbolizer><Graphic><ExternalGraphic>
+      <OnlineResource xmlns:xlink="http://www.w3.org/1999/xlink" xlink:href="icon.png"/>
+      <Format>image/png</Format>
+    </ExternalGraphic></Graphic></PointSymbolizer>
+  </Rule></FeatureTypeStyle></UserStyle></NamedLayer>
+</StyledLayerDescriptor>
+"""
+# Stand-in for a small style image
+IMAGE = b"\x89PNG\r\n\x1a\n" + bytes(4096)
+CAPABILITIES_REPEAT = 5
+
+
+class Recorder:
+    """
+    Collect the latency of the operations (HTTP requests or parses) of a benchmark scenario
+
+    Attributes
+    ----------
+    latencies : list[float]
+        latency of each operation in seconds, i.e. until the response headers for HTTP requests
+    duration : float
+        wall-clock time spent in the measured blocks, in seconds
+    """
+
+    def __init__(self) -> None:
+        self.latencies: list[float] = []
+        self.duration: float = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, elapsed: float) -> None:
+        with self._lock:
+            self.latencies.append(elapsed)
+
+    def on_response(self, response: requests.Response, *args: Any, **kwargs: Any):
+        self.record(response.elapsed.total_seconds())
+
+    @contextmanager
+    def measure(self, *clients: RestClient) -> Iterator[None]:
+        """
+        Measure a block, recording the requests sent by the given clients while it runs
+        """
+        for client in clients:
+            client.session.hooks["response"].append(self.on_response)
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.duration += perf_counter() - start
+            for client in clients:
+                client.session.hooks["response"].remove(self.on_response)
+
+    @contextmanager
+    def operation(self) -> Iterator[None]:
+        """
+        Record the latency of an operation which is not an HTTP request
+        """
+        start = perf_counter()
+        yield
+        self.record(perf_counter() - start)
+
+
+def sized(count: int, scale: float) -> int:
+    return max(1, round(count * scale))
+
+
+def populate(
+    geoserver: GeoServerCloud,
+    feature_types: int,
+    styles: int = 0,
+    layer_groups: int = 0,
+) -> None:
+    geoserver.create_workspace(WORKSPACE)
+    geoserver.create_pg_datastore(
+        WORKSPACE, DATASTORE, "localhost", 5432, "db", "user", "password"
+    )
+    geoserver.create_feature_types(
+        {
+            "layer_name": f"layer{i}",
+            "workspace_name": WORKSPACE,
+            "datastore_name": DATASTORE,
+        }
+        for i in range(feature_types)
+    )
+    for i in range(styles):
+        create_style(geoserver, f"style{i}")
+    layers = [f"layer{i}" for i in range(min(feature_types, 20))]
+    for i in range(layer_groups):
+        geoserver.create_layer_group(f"group{i}", WORKSPACE, layers=layers)
+
+
+def create_style(geoserver: GeoServerCloud, style_name: str) -> tuple[str, int]:
+    content, status_code = geoserver.create_style_definition(
+        style_name, f"{style_name}.sld", WORKSPACE
+    )
+    if status_code >= 400:
+        return content, status_code
+    content, status_code = geoserver.rest_service.create_style(
+        style_name, SLD, WORKSPACE
+    )
+    if status_code >= 400:
+        return content, status_code
+    return geoserver.rest_service.put_resource(
+        "styles", f"{style_name}.png", "image/png", IMAGE, WORKSPACE
+    )
+
+
+def run_all(func: Callable[[Any], Any], items: list[Any], max_workers: int) -> None:
+    for item, (content, status_code) in map_concurrently(func, items, max_workers):
+        if status_code >= 400:
+            raise RuntimeError(f"{item}: ({status_code}) {content}")
+
+
+def workspaces(
+    recorder: Recorder, scale: float, max_workers: int, latency: float
+) -> None:
+    """Create N workspaces"""
+    names = [f"workspace{i}" for i in range(sized(200, scale))]
+    with FakeGeoServer(latency) as server:
+        geoserver = GeoServerCloud(server.url, pool_maxsize=max_workers)
+        with recorder.measure(geoserver.rest_client):
+            run_all(geoserver.create_workspace, names, max_workers)
+
+
+def feature_types(
+    recorder: Recorder, scale: float, max_workers: int, latency: float
+) -> None:
+    """Create N×M feature types: M feature types in each of N workspaces"""
+    workspace_names = [f"workspace{i}" for i in range(5)]
+    specs = [
+        {
+            "layer_name": f"layer{i}",
+            "workspace_name": workspace_name,
+            "datastore_name": DATASTORE,
+        }
+        for workspace_name in workspace_names
+        for i in range(sized(100, scale))
+    ]
+    with FakeGeoServer(latency) as server:
+        geoserver = GeoServerCloud(server.url, pool_maxsize=max_workers)
+        for workspace_name in workspace_names:
+            geoserver.create_workspace(workspace_name)
+            geoserver.create_pg_datastore(
+                workspace_name, DATASTORE, "localhost", 5432, "db", "user", "pass"
+            )
+        with recorder.measure(geoserver.rest_client):
+            results = geoserver.create_feature_types(specs, max_workers)
+        failed = [result for result in results if result[1] >= 400]
+        if failed:
+            raise RuntimeError(f"{len(failed)} feature types failed: {failed[0]}")
+
+
+def layer_groups(
+    recorder: Recorder, scale: float, max_workers: int, latency: float
+) -> None:
+    """Create layer groups of 20 layers each"""
+    layers = [f"layer{i}" for i in range(20)]
+    names = [f"group{i}" for i in range(sized(100, scale))]
+    with FakeGeoServer(latency) as server:
+        geoserver = GeoServerCloud(server.url, pool_maxsize=max_workers)
+        populate(geoserver, feature_types=len(layers))
+        with recorder.measure(geoserver.rest_client):
+            run_all(
+                lambda name: geoserver.create_layer_group(
+                    name, WORKSPACE, layers=layers
+                ),
+                names,
+                max_workers,
+            )
+
+
+def styles(recorder: Recorder, scale: float, max_workers: int, latency: float) -> None:
+    """Create styles, each with its SLD file and an image"""
+    names = [f"style{i}" for i in range(sized(50, scale))]
+    with FakeGeoServer(latency) as server:
+        geoserver = GeoServerCloud(server.url, pool_maxsize=max_workers)
+        geoserver.create_workspace(WORKSPACE)
+        with recorder.measure(geoserver.rest_client):
+            run_all(partial(create_style, geoserver), names, max_workers)
+
+
+def copy_workspace(
+    recorder: Recorder, scale: float, max_workers: int, latency: float
+) -> None:
+    """Deep copy of a workspace with GeoServerCloudSync.copy_workspace"""
+    with FakeGeoServer(latency) as source, FakeGeoServer(latency) as destination:
+        populate(
+            GeoServerCloud(source.url),
+            feature_types=sized(100, scale),
+            styles=sized(20, scale),
+            layer_groups=sized(10, scale),
+        )
+        sync = GeoServerCloudSync(
+            source.url,
+            "admin",
+            "geoserver",
+            destination.url,
+            "admin",
+            "geoserver",
+            max_workers=max_workers,
+        )
+        with recorder.measure(
+            sync.src_instance.rest_client, sync.dst_instance.rest_client
+        ):
+            content, status_code = sync.copy_workspace(WORKSPACE, deep_copy=True)
+        if status_code >= 400:
+            raise RuntimeError(f"({status_code}) {content}")
+
+
+def capabilities(
+    recorder: Recorder, scale: float, max_workers: int, latency: float, layers: int
+) -> None:
+    """Parse a WMS capabilities document of a given number of layers"""
+    document = wms_capabilities(layers)
+    with recorder.measure():
+        for _ in range(CAPABILITIES_REPEAT):
+            with recorder.operation():
+                count = sum(1 for _ in read_wms_layers(BytesIO(document)))
+            if count != layers:
+                raise RuntimeError(f"{count} layers read out of {layers}")
+
+
+def wms_capabilities(layers: int) -> bytes:
+    """
+    Generate a WMS 1.3.0 capabilities document similar to the ones of GeoServer
+    """
+    layer = """
+      <Layer queryable="1" opaque="0">
+        <Name>{workspace}:layer{index}</Name>
+        <Title>Layer {index}</Title>
+        <Abstract>Description of layer {index}</Abstract>
+        <KeywordList><Keyword>features</Keyword><Keyword>layer{index}</Keyword></KeywordList>
+        <CRS>EPSG:2056</CRS>
+        <CRS>CRS:84</CRS>
+        <EX_GeographicBoundingBox>
+          <westBoundLongitude>5.96</westBoundLongitude>
+          <eastBoundLongitude>10.49</eastBoundLongitude>
+          <southBoundLatitude>45.82</southBoundLatitude>
+          <northBoundLatitude>47.81</northBoundLatitude>
+        </EX_GeographicBoundingBox>
+        <BoundingBox CRS="EPSG:2056" minx="2485000" miny="1075000" maxx="2834000" maxy="1296000"/>
+        <Style>
+          <Name>style{index}</Name>
+          <Title>Style {index}</Title>
+          <LegendURL width="20" height="20">
+            <Format>image/png</Format>
+            <OnlineResource xmlns:xlink="http://www.w3.org/1999/xlink" xlink:type="simple" xlink:href="http://localhost/geoserver/ows?service=WMS&amp;request=GetLegendGraphic&amp;layer=layer{index}"/>
+          </LegendURL>
+        </Style>
+      </Layer>"""
+    return "".join(
+        [
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<WMS_Capabilities version="1.3.0" xmlns="http://www.opengis.net/wms">'
+            "<Service><Name>WMS</Name><Title>Benchmark</Title></Service>"
+            "<Capability><Layer><Title>Benchmark</Title><CRS>EPSG:2056</CRS>",
+            *(
+                layer.format(workspace=WORKSPACE, index=index)
+                for index in range(layers)
+            ),
+            "</Layer></Capability></WMS_Capabilities>",
+        ]
+    ).encode()
+
+
+def reference(
+    recorder: Recorder, scale: float, max_workers: int, latency: float
+) -> None:
+    """
+    Plain GET requests to the fake GeoServer without the client, measuring the speed of the
+    machine which the results of the scenarios are normalized with
+    """
+    with FakeGeoServer(latency) as server, requests.Session() as session:
+        url = f"{server.url}/rest/workspaces.json"
+        session.get(url)
+        with recorder.measure():
+            for _ in range(sized(200, scale)):
+                with recorder.operation():
+                    session.get(url).raise_for_status()
+
+
+SCENARIOS: dict[str, Callable[[Recorder, float, int, float], None]] = {
+    "workspaces": workspaces,
+    "feature_types": feature_types,
+    "layer_groups": layer_groups,
+    "styles": styles,
+    "copy_workspace": copy_workspace,
+    "capabilities_1k": partial(capabilities, layers=1000),
+    "capabilities_10k": partial(capabilities, layers=10000),
+}
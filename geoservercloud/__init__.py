@@ -1,4 +1,12 @@
+from .asyncgeoservercloud import AsyncGeoServerCloud
+from .fanout import Destination, GeoServerCloudFanOut
 from .geoservercloud import GeoServerCloud
 from .geoservercloudsync import GeoServerCloudSync
 
-__all__: list[str] = ["GeoServerCloud", "GeoServerCloudSync"]
+__all__: list[str] = [
+    "AsyncGeoServerCloud",
+    "Destination",
+    "GeoServerCloud",
+    "GeoServerCloudFanOut",
+    "GeoServerCloudSync",
+]
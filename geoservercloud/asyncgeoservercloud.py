@@ -0,0 +1,99 @@
+from typing import Any
+
+from geoservercloud.geoservercloud import GeoServerCloud
+from geoservercloud.services.asyncowsservice import AsyncOwsService
+from geoservercloud.services.asyncrestclient import AsyncRestClient, ThreadOffload
+from geoservercloud.services.asyncrestservice import AsyncRestService
+from geoservercloud.services.restclient import DEFAULT_POOL_MAXSIZE
+
+
+class AsyncGeoServerCloud(ThreadOffload[GeoServerCloud]):
+    """
+    Asyncio facade allowing CRUD operations on GeoServer resources
+
+    Every public method of :py:class:`GeoServerCloud` is available as a coroutine with the
+    same name, arguments and return tuple, run on a pool of ``max_concurrency`` worker threads
+    (see :py:class:`geoservercloud.services.asyncrestclient.ThreadOffload`). All calls share one
+    connection pool and at most ``max_concurrency`` of them are in flight at the same time, so
+    that many catalog operations can be gathered safely:
+
+    >>> async with AsyncGeoServerCloud(url, max_concurrency=20) as geoserver:
+    ...     await asyncio.gather(
+    ...         *(geoserver.create_workspace(name) for name in workspace_names)
+    ...     )
+
+    Attributes
+    ----------
+    url : str
+        base GeoServer URL
+    user : str
+        GeoServer username
+    password : str
+        GeoServer password
+    max_concurrency : int
+        Maximum number of requests in flight, also used as connection pool size
+    """
+
+    def __init__(
+        self,
+        url: str = "http://localhost:9090/geoserver/cloud",
+        user: str = "admin",
+        password: str = "geoserver",  # nosec
+        verifytls: bool = True,
+        max_concurrency: int = DEFAULT_POOL_MAXSIZE,
+    ) -> None:
+        self.geoserver: GeoServerCloud = GeoServerCloud(
+            url, user, password, verifytls, pool_maxsize=max_concurrency
+        )
+        self.url: str = self.geoserver.url
+        self.auth: tuple[str, str] = self.geoserver.auth
+        super().__init__(
+            self.geoserver,
+            AsyncRestClient(
+                self.url,
+                self.auth,
+                verifytls,
+                max_concurrency=max_concurrency,
+                rest_client=self.geoserver.rest_client,
+            ),
+        )
+        self.rest_service: AsyncRestService = AsyncRestService(
+            self.url, self.auth, verifytls, async_client=self.async_client
+        )
+        self.ows_service: AsyncOwsService = AsyncOwsService(
+            self.url, self.auth, verifytls, async_client=self.async_client
+        )
+
+    @property
+    def default_workspace(self) -> str | None:
+        return self.geoserver.default_workspace
+
+    @default_workspace.setter
+    def default_workspace(self, workspace_name: str | None) -> None:
+        self.geoserver.default_workspace = workspace_name
+
+    @property
+    def default_datastore(self) -> str | None:
+        return self.geoserver.default_datastore
+
+    @default_datastore.setter
+    def default_datastore(self, datastore_name: str | None) -> None:
+        self.geoserver.default_datastore = datastore_name
+
+    def close(self) -> None:
+        """
+        Shut down the worker threads and close the pooled connections
+        """
+        self.async_client.close()
+
+    async def __aenter__(self) -> "AsyncGeoServerCloud":
+        return self
+
+    async def aclose(self) -> None:
+        """
+        Like :py:meth:`close`, without blocking the event loop
+        """
+        await self.async_client.aclose()
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.aclose()
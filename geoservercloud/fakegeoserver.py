@@ -0,0 +1,584 @@
+import hashlib
+import json
+import mimetypes
+import threading
+import time
+from argparse import ArgumentParser
+from collections.abc import Callable
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, NamedTuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import xmltodict
+
+# Keys of the JSON listing and of the items of each REST collection
+COLLECTION_KEYS: dict[str, tuple[str, str]] = {
+    "workspaces": ("workspaces", "workspace"),
+    "namespaces": ("namespaces", "namespace"),
+    "datastores": ("dataStores", "dataStore"),
+    "featuretypes": ("featureTypes", "featureType"),
+    "coveragestores": ("coverageStores", "coverageStore"),
+    "coverages": ("coverages", "coverage"),
+    "wmsstores": ("wmsStores", "wmsStore"),
+    "wmslayers": ("wmsLayers", "wmsLayer"),
+    "wmtsstores": ("wmtsStores", "wmtsStore"),
+    "layers": ("layers", "layer"),
+    "layergroups": ("layerGroups", "layerGroup"),
+    "styles": ("styles", "style"),
+}
+# Extensions selecting the representation of a REST resource
+FORMAT_EXTENSIONS: set[str] = {"json", "xml", "sld", "mbstyle", "zip"}
+STYLE_CONTENT_TYPES: dict[str, str] = {
+    "sld": "application/vnd.ogc.sld+xml",
+    "mbstyle": "application/vnd.geoserver.mbstyle+json",
+    "zip": "application/zip",
+}
+DEFAULT_VERSION = "2.27.0"
+# Attributes of a feature type set by GeoServer if they are not posted
+FEATURE_TYPE_DEFAULTS: dict[str, Any] = {
+    "enabled": True,
+    "projectionPolicy": "FORCE_DECLARED",
+    "serviceConfiguration": False,
+    "circularArcPresent": False,
+    "overridingServiceSRS": False,
+    "padWithZeros": False,
+}
+
+
+class FakeResponse(NamedTuple):
+    status_code: int
+    body: bytes = b""
+    content_type: str = "text/plain"
+    headers: dict[str, str] = {}
+
+
+class FakeCatalog:
+    """
+    Thread-safe in-memory catalog answering the GeoServer REST API requests of
+    :py:class:`geoservercloud.services.restservice.RestService`
+
+    Catalog objects are stored as the JSON (or XML) payloads posted by the client and returned
+    as is, listings use the GeoServer JSON format. Creating a feature type also publishes its
+    layer. Style files and resources are stored as raw bytes.
+
+    Attributes
+    ----------
+    items : dict[str, tuple[str, dict]]
+        (item key, payload) of each catalog object by path, e.g. "workspaces/ws/datastores/ds"
+    children : dict[str, dict[str, None]]
+        names of the objects of each collection path, in creation order
+    style_files : dict[str, tuple[str, bytes]]
+        (content type, content) of the style files by style path
+    resources : dict[str, tuple[str, bytes]]
+        (content type, content) of the resources by path, e.g. "workspaces/ws/styles/icon.png"
+    documents : dict[str, dict]
+        other JSON documents by path, e.g. "services/wms/workspaces/ws/settings"
+    """
+
+    def __init__(self, version: str = DEFAULT_VERSION) -> None:
+        self.items: dict[str, tuple[str, dict]] = {}
+        self.children: dict[str, dict[str, None]] = {}
+        self.style_files: dict[str, tuple[str, bytes]] = {}
+        self.resources: dict[str, tuple[str, bytes]] = {}
+        self.documents: dict[str, dict] = {
+            "about/version": {
+                "about": {"resource": [{"@name": "GeoServer", "Version": version}]}
+            }
+        }
+        self.lock = threading.RLock()
+
+    def handle(
+        self,
+        method: str,
+        path: str,
+        params: dict[str, str] | None = None,
+        headers: dict[str, str] | None = None,
+        body: bytes = b"",
+    ) -> FakeResponse:
+        """
+        Answer a request to a path relative to the REST API root, e.g. "workspaces/ws.json"
+        """
+        params = params or {}
+        headers = {key.lower(): value for key, value in (headers or {}).items()}
+        segments = [unquote(segment) for segment in path.strip("/").split("/")]
+        with self.lock:
+            if segments[0] == "resource":
+                return self.handle_resource(
+                    method, "/".join(segments[1:]), headers, body
+                )
+            segments, extension = self.split_extension(segments)
+            segments = self.resolve_layer_alias(segments)
+            if segments[-1] in COLLECTION_KEYS:
+                return self.handle_collection(method, segments, headers, body)
+            if len(segments) > 1 and segments[-2] in COLLECTION_KEYS:
+                return self.handle_item(
+                    method, segments, extension, params, headers, body
+                )
+            return self.handle_document(method, "/".join(segments), body)
+
+    def handle_collection(
+        self, method: str, segments: list[str], headers: dict[str, str], body: bytes
+    ) -> FakeResponse:
+        collection = "/".join(segments)
+        parent = "/".join(segments[:-1])
+        if parent and parent not in self.items:
+            return FakeResponse(404, f"No such resource: {parent}".encode())
+        list_key, item_key = COLLECTION_KEYS[segments[-1]]
+        if method in ("GET", "HEAD"):
+            names = self.list_children(segments)
+            listing = [{"name": name} for name in names]
+            return json_response({list_key: {item_key: listing} if listing else ""})
+        if method != "POST":
+            return FakeResponse(405)
+        try:
+            root_key, payload = self.parse_payload(body, headers)
+        except ValueError as error:
+            return FakeResponse(400, str(error).encode())
+        name = payload.get("name")
+        if root_key != item_key or not name:
+            return FakeResponse(400, f"Expected a named {item_key}".encode())
+        path = f"{collection}/{name}"
+        if path in self.items:
+            return FakeResponse(409, f"{item_key} '{name}' already exists".encode())
+        if item_key == "featureType":
+            self.complete_feature_type(segments, payload)
+        self.add(path, item_key, payload)
+        if item_key == "featureType":
+            self.publish_layer(segments[1], name)
+        return FakeResponse(201, name.encode(), headers={"Location": path})
+
+    def handle_item(
+        self,
+        method: str,
+        segments: list[str],
+        extension: str | None,
+        params: dict[str, str],
+        headers: dict[str, str],
+        body: bytes,
+    ) -> FakeResponse:
+        path = "/".join(segments)
+        item_key = COLLECTION_KEYS[segments[-2]][1]
+        is_style_file = item_key == "style" and (
+            extension in STYLE_CONTENT_TYPES
+            or (method == "PUT" and extension is None and not is_xml(headers))
+        )
+        if is_style_file:
+            return self.handle_style_file(method, segments, extension, headers, body)
+        if method in ("GET", "HEAD"):
+            if path not in self.items:
+                return FakeResponse(404, f"No such {item_key}: {path}".encode())
+            return json_response({item_key: self.items[path][1]})
+        if method == "PUT":
+            if path not in self.items:
+                return FakeResponse(404, f"No such {item_key}: {path}".encode())
+            try:
+                _, payload = self.parse_payload(body, headers)
+            except ValueError as error:
+                return FakeResponse(400, str(error).encode())
+            self.items[path][1].update(payload)
+            return FakeResponse(200)
+        if method == "DELETE":
+            if path not in self.items:
+                return FakeResponse(404, f"No such {item_key}: {path}".encode())
+            if self.has_children(path) and params.get("recurse") != "true":
+                return FakeResponse(403, f"{item_key} is not empty".encode())
+            self.remove(path)
+            return FakeResponse(200)
+        return FakeResponse(405)
+
+    def handle_style_file(
+        self,
+        method: str,
+        segments: list[str],
+        extension: str | None,
+        headers: dict[str, str],
+        body: bytes,
+    ) -> FakeResponse:
+        path = "/".join(segments)
+        if method in ("GET", "HEAD"):
+            if path not in self.style_files:
+                return FakeResponse(404, f"No style file for {path}".encode())
+            content_type, content = self.style_files[path]
+            return FakeResponse(200, content, content_type)
+        if method != "PUT":
+            return FakeResponse(405)
+        content_type = headers.get(
+            "content-type", STYLE_CONTENT_TYPES.get(extension or "sld", "")
+        )
+        if path not in self.items:
+            # GeoServer creates the style definition when uploading a new style file
+            self.add(
+                path,
+                "style",
+                {"name": segments[-1], "format": extension or "sld"},
+            )
+        self.style_files[path] = (content_type, body)
+        return FakeResponse(200)
+
+    def handle_resource(
+        self, method: str, path: str, headers: dict[str, str], body: bytes
+    ) -> FakeResponse:
+        path = path.strip("/")
+        if method == "PUT":
+            status_code = 200 if path in self.resources else 201
+            content_type = headers.get("content-type") or guess_type(path)
+            self.resources[path] = (content_type, body)
+            return FakeResponse(status_code)
+        if method == "DELETE":
+            removed = [
+                key for key in self.resources if key == path or is_under(key, path)
+            ]
+            for key in removed:
+                del self.resources[key]
+            return FakeResponse(200 if removed else 404)
+        if method not in ("GET", "HEAD"):
+            return FakeResponse(405)
+        if path in self.resources:
+            content_type, content = self.resources[path]
+            return FakeResponse(
+                200,
+                content,
+                content_type,
+                {"ETag": f'"{hashlib.md5(content).hexdigest()}"'},  # nosec
+            )
+        children = self.list_resource_directory(path)
+        if not children and path:
+            return FakeResponse(404, f"No such resource: {path}".encode())
+        parent, _, name = path.rpartition("/")
+        return json_response(
+            {
+                "ResourceDirectory": {
+                    "name": name,
+                    "parent": {
+                        "path": f"/{parent}",
+                        "link": {
+                            "href": f"/rest/resource/{parent}",
+                            "type": "application/json",
+                        },
+                    },
+                    "children": {
+                        "child": [
+                            {
+                                "name": child,
+                                "link": {
+                                    "href": f"/rest/resource/{path}/{child}",
+                                    "type": content_type,
+                                },
+                            }
+                            for child, content_type in children.items()
+                        ]
+                    },
+                }
+            }
+        )
+
+    def handle_document(self, method: str, path: str, body: bytes) -> FakeResponse:
+        if method in ("GET", "HEAD"):
+            if path not in self.documents:
+                return FakeResponse(404, f"No such resource: {path}".encode())
+            return json_response(self.documents[path])
+        if method in ("PUT", "POST"):
+            try:
+                self.documents[path] = json.loads(body)
+            except ValueError as error:
+                return FakeResponse(400, str(error).encode())
+            return FakeResponse(200)
+        if method == "DELETE":
+            return FakeResponse(
+                200 if self.documents.pop(path, None) is not None else 404
+            )
+        return FakeResponse(405)
+
+    def add(self, path: str, item_key: str, payload: dict) -> None:
+        collection, _, name = path.rpartition("/")
+        self.items[path] = (item_key, payload)
+        self.children.setdefault(collection, {})[name] = None
+
+    def remove(self, path: str) -> None:
+        removed = [key for key in self.items if key == path or is_under(key, path)]
+        segments = path.split("/")
+        if segments[0] == "workspaces" and len(segments) == 2:
+            # Deleting a workspace also deletes its layers and resources
+            removed += [
+                key for key in self.items if key.startswith(f"layers/{segments[1]}:")
+            ]
+            for key in [key for key in self.resources if is_under(key, path)]:
+                del self.resources[key]
+        elif len(segments) == 6 and segments[4] == "featuretypes":
+            removed.append(f"layers/{segments[1]}:{segments[5]}")
+        for key in removed:
+            if self.items.pop(key, None) is not None:
+                collection, _, name = key.rpartition("/")
+                self.children.get(collection, {}).pop(name, None)
+            self.style_files.pop(key, None)
+            self.children.pop(key, None)
+
+    @staticmethod
+    def complete_feature_type(segments: list[str], payload: dict) -> None:
+        # Attributes computed by GeoServer when publishing a feature type
+        workspace_name = segments[1]
+        for key, value in FEATURE_TYPE_DEFAULTS.items():
+            payload.setdefault(key, value)
+        payload.setdefault("nativeName", payload["name"])
+        payload.setdefault("attributes", {"attribute": []})
+        payload.setdefault("namespace", {"name": workspace_name})
+        if len(segments) > 3:
+            payload.setdefault(
+                "store",
+                {"@class": "dataStore", "name": f"{workspace_name}:{segments[3]}"},
+            )
+        crs = payload.get("nativeBoundingBox", {}).get("crs", "EPSG:4326")
+        payload.setdefault("srs", crs.get("$") if isinstance(crs, dict) else crs)
+
+    def publish_layer(self, workspace_name: str, name: str) -> None:
+        self.add(
+            f"layers/{workspace_name}:{name}",
+            "layer",
+            {
+                "name": name,
+                "type": "VECTOR",
+                "defaultStyle": {"name": "generic"},
+                "resource": {
+                    "@class": "featureType",
+                    "name": f"{workspace_name}:{name}",
+                },
+                "attribution": {"logoWidth": 0, "logoHeight": 0},
+                "queryable": True,
+            },
+        )
+
+    def list_children(self, segments: list[str]) -> list[str]:
+        if (
+            len(segments) == 3
+            and segments[0] == "workspaces"
+            and segments[2] == "layers"
+        ):
+            prefix = f"{segments[1]}:"
+            return [
+                name.removeprefix(prefix)
+                for name in self.children.get("layers", {})
+                if name.startswith(prefix)
+            ]
+        return list(self.children.get("/".join(segments), {}))
+
+    def has_children(self, path: str) -> bool:
+        return any(
+            names
+            for collection, names in self.children.items()
+            if is_under(collection, path)
+        )
+
+    def list_resource_directory(self, path: str) -> dict[str, str]:
+        children: dict[str, str] = {}
+        for key, (content_type, _) in self.resources.items():
+            if path and not is_under(key, path):
+                continue
+            child, _, rest = key[len(path) :].strip("/").partition("/")
+            children.setdefault(child, "application/json" if rest else content_type)
+        return children
+
+    @staticmethod
+    def split_extension(segments: list[str]) -> tuple[list[str], str | None]:
+        name, _, extension = segments[-1].rpartition(".")
+        if name and extension in FORMAT_EXTENSIONS:
+            return segments[:-1] + [name], extension
+        return segments, None
+
+    @staticmethod
+    def resolve_layer_alias(segments: list[str]) -> list[str]:
+        # /workspaces/{ws}/layers/{name} is the same layer as /layers/{ws}:{name}
+        if (
+            len(segments) == 4
+            and segments[0] == "workspaces"
+            and segments[2] == "layers"
+        ):
+            return ["layers", f"{segments[1]}:{segments[3]}"]
+        return segments
+
+    @staticmethod
+    def parse_payload(body: bytes, headers: dict[str, str]) -> tuple[str, dict]:
+        if is_xml(headers):
+            content = xmltodict.parse(body)
+        else:
+            content = json.loads(body)
+        if not isinstance(content, dict) or len(content) != 1:
+            raise ValueError("Expected a single root element")
+        root_key, payload = next(iter(content.items()))
+        if not isinstance(payload, dict):
+            raise ValueError(f"Invalid {root_key}")
+        return root_key, payload
+
+
+class FakeGeoServer:
+    """
+    In-process HTTP server emulating the REST API of GeoServer with an in-memory catalog,
+    to run benchmarks and concurrency tests without a GeoServer instance.
+    The server listens on a free local port unless a port is given.
+
+    :Example:
+
+    >>> with FakeGeoServer(latency=0.005) as server:
+    ...     geoserver = GeoServerCloud(server.url)
+    ...     geoserver.create_workspace("test")
+
+    Attributes
+    ----------
+    catalog : FakeCatalog
+        in-memory catalog
+    latency : float | Callable[[str, str], float]
+        delay added to each request in seconds, or a function returning the delay of a
+        request from its method and path
+    request_count : int
+        number of requests handled
+    """
+
+    def __init__(
+        self,
+        latency: float | Callable[[str, str], float] = 0.0,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        catalog: FakeCatalog | None = None,
+    ) -> None:
+        self.catalog: FakeCatalog = catalog or FakeCatalog()
+        self.latency: float | Callable[[str, str], float] = latency
+        self.request_count: int = 0
+        self._count_lock = threading.Lock()
+        self.host: str = host
+        self.server = ThreadingHTTPServer((host, port), _handler_class(self))
+        self.server.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.server.server_port}/geoserver"
+
+    def start(self) -> "FakeGeoServer":
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self.server.serve_forever,
+                kwargs={"poll_interval": 0.05},
+                name="fakegeoserver",
+                daemon=True,
+            )
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self.server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self.server.server_close()
+
+    def __enter__(self) -> "FakeGeoServer":
+        return self.start()
+
+    def __exit__(self, *args: Any) -> None:
+        self.stop()
+
+    def delay(self, method: str, path: str) -> float:
+        if callable(self.latency):
+            return self.latency(method, path)
+        return self.latency
+
+    def handle(
+        self, method: str, url: str, headers: dict[str, str], body: bytes
+    ) -> FakeResponse:
+        with self._count_lock:
+            self.request_count += 1
+        split = urlsplit(url)
+        prefix, separator, path = split.path.partition("/rest/")
+        if not separator or prefix.strip("/") not in ("", "geoserver"):
+            return FakeResponse(404, f"No such endpoint: {split.path}".encode())
+        delay = self.delay(method, path)
+        if delay > 0:
+            time.sleep(delay)
+        params = {key: values[-1] for key, values in parse_qs(split.query).items()}
+        return self.catalog.handle(method, path, params, headers, body)
+
+
+def _handler_class(server: FakeGeoServer) -> type[BaseHTTPRequestHandler]:
+    class Handler(BaseHTTPRequestHandler):
+        # Keep connections alive, as GeoServer does
+        protocol_version = "HTTP/1.1"
+        # Headers and body are written separately, do not wait for the ACK of the headers
+        disable_nagle_algorithm = True
+
+        def handle_request(self) -> None:
+            response = server.handle(
+                self.command, self.path, dict(self.headers.items()), self.read_body()
+            )
+            self.send_response(response.status_code)
+            self.send_header("Content-Type", response.content_type)
+            for key, value in response.headers.items():
+                self.send_header(key, value)
+            # HEAD responses announce the length of the body of the GET response
+            self.send_header("Content-Length", str(len(response.body)))
+            self.end_headers()
+            if self.command != "HEAD":
+                self.wfile.write(response.body)
+
+        def read_body(self) -> bytes:
+            if self.headers.get("Transfer-Encoding", "").lower() == "chunked":
+                chunks = []
+                while True:
+                    size = int(self.rfile.readline().split(b";")[0], 16)
+                    chunks.append(self.rfile.read(size))
+                    self.rfile.readline()
+                    if size == 0:
+                        return b"".join(chunks)
+            return self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+        do_GET = do_HEAD = do_POST = do_PUT = do_DELETE = handle_request
+
+        def log_message(self, format: str, *args: Any) -> None:
+            pass
+
+    return Handler
+
+
+def json_response(content: Any) -> FakeResponse:
+    return FakeResponse(200, json.dumps(content).encode(), "application/json")
+
+
+def is_xml(headers: dict[str, str]) -> bool:
+    return "xml" in headers.get("content-type", "")
+
+
+def is_under(path: str, directory: str) -> bool:
+    return path.startswith(f"{directory}/")
+
+
+def guess_type(path: str) -> str:
+    return mimetypes.guess_type(path)[0] or "application/octet-stream"
+
+
+def parse_args():
+    parser = ArgumentParser(
+        description="Serve an in-memory fake GeoServer REST API, e.g. for benchmarks"
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="Address to listen on")
+    parser.add_argument("--port", type=int, default=8080, help="Port to listen on")
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=0.0,
+        help="Delay added to each request, in seconds",
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    server = FakeGeoServer(latency=args.latency, host=args.host, port=args.port)
+    print(f"Serving fake GeoServer on {server.url}")
+    try:
+        server.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server.server_close()
+
+
+if __name__ == "__main__":
+    main()
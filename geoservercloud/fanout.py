@@ -0,0 +1,190 @@
+import zipfile
+from collections.abc import Iterable
+from tempfile import SpooledTemporaryFile
+from time import perf_counter
+from typing import NamedTuple
+
+from requests import RequestException
+
+from geoservercloud.parallel import map_concurrently
+from geoservercloud.services import RestService
+from geoservercloud.services.ratelimiter import RateLimiter
+from geoservercloud.services.restclient import DEFAULT_POOL_MAXSIZE, RestClient
+from geoservercloud.services.restlogger import gs_logger
+from geoservercloud.services.restservice import UpsertStrategy
+from geoservercloud.services.retrypolicy import RetryPolicy
+from geoservercloud.workspacearchive import WorkspaceArchive
+
+# Size of the snapshot kept in memory, larger snapshots are spilled to a temporary file
+DEFAULT_SPOOL_SIZE = 64 * 1024 * 1024
+
+
+class Destination(NamedTuple):
+    """GeoServer instance a workspace is copied to"""
+
+    url: str
+    user: str = "admin"
+    password: str = "geoserver"  # nosec
+    verifytls: bool = True
+    rate_limiter: RateLimiter | None = None
+
+
+class DestinationReport(NamedTuple):
+    """Outcome of the copy to a destination"""
+
+    url: str
+    content: str
+    status_code: int
+    elapsed: float
+
+    @property
+    def ok(self) -> bool:
+        return self.status_code < 400
+
+
+class GeoServerCloudFanOut:
+    """
+    Facade class copying GeoServer resources from a source instance to several destination
+    instances, e.g. to promote a workspace to a staging and several production clusters.
+
+    The source is read once into a snapshot, a workspace archive (see
+    :py:class:`geoservercloud.workspacearchive.WorkspaceArchive`) kept in memory up to
+    spool_size bytes and spilled to a temporary file beyond. The snapshot is then written to
+    all the destinations concurrently, so that a slow or failing destination does not hold up
+    the others.
+
+    Attributes
+    ----------
+    src_url : str
+        base GeoServer URL for source GeoServer instance
+    src_instance : RestService
+        service of the source GeoServer instance
+    dst_instances : dict[str, RestService]
+        services of the destination GeoServer instances, by URL
+    max_workers : int
+        Maximum number of resources read from the source, and written to each destination,
+        concurrently (default: 1, i.e. sequential)
+    spool_size : int
+        Maximum size in bytes of the snapshot kept in memory
+
+    :Example:
+
+    >>> fan_out = GeoServerCloudFanOut(
+    ...     "https://staging.example.com/geoserver", "admin", "geoserver",
+    ...     [Destination("https://eu.example.com/geoserver", "admin", password_eu),
+    ...      Destination("https://ch.example.com/geoserver", "admin", password_ch)],
+    ...     max_workers=8,
+    ... )
+    >>> reports, status_code = fan_out.copy_workspace("workspace")
+    >>> for report in reports:
+    ...     print(report.url, report.status_code, report.elapsed)
+    """
+
+    def __init__(
+        self,
+        src_url: str,
+        src_user: str,
+        src_password: str,
+        destinations: Iterable[Destination],
+        src_verifytls: bool = True,
+        pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+        max_workers: int = 1,
+        upsert_strategy: UpsertStrategy | str | None = None,
+        retry_policy: RetryPolicy | None = None,
+        src_rate_limiter: RateLimiter | None = None,
+        spool_size: int = DEFAULT_SPOOL_SIZE,
+    ) -> None:
+        self.max_workers: int = max_workers
+        self.spool_size: int = spool_size
+        pool_maxsize = max(pool_maxsize, max_workers)
+        self.src_url: str = src_url.strip("/")
+        src_auth = (src_user, src_password)
+        self.src_instance: RestService = RestService(
+            src_url,
+            src_auth,
+            src_verifytls,
+            rest_client=RestClient(
+                src_url,
+                src_auth,
+                src_verifytls,
+                pool_maxsize=pool_maxsize,
+                retry_policy=retry_policy,
+                rate_limiter=src_rate_limiter,
+            ),
+        )
+        self.dst_instances: dict[str, RestService] = {}
+        for destination in destinations:
+            url = destination.url.strip("/")
+            if url in self.dst_instances:
+                raise ValueError(f"Duplicate destination {url}")
+            dst_auth = (destination.user, destination.password)
+            self.dst_instances[url] = RestService(
+                url,
+                dst_auth,
+                destination.verifytls,
+                rest_client=RestClient(
+                    url,
+                    dst_auth,
+                    destination.verifytls,
+                    pool_maxsize=pool_maxsize,
+                    retry_policy=retry_policy,
+                    rate_limiter=destination.rate_limiter,
+                ),
+                upsert_strategy=upsert_strategy,
+            )
+        if not self.dst_instances:
+            raise ValueError("At least one destination is required")
+
+    def copy_workspace(
+        self, workspace_name: str
+    ) -> tuple[list[DestinationReport] | str, int]:
+        """
+        Copy a workspace, its styles (including images), datastores, feature types, layers and
+        layer groups from the source to all the destinations.
+        Return one report per destination, in the order of the destinations, with the status
+        code of the first failed destination (200 if all succeeded), or the error of the source.
+        """
+        with SpooledTemporaryFile(max_size=self.spool_size) as snapshot:
+            entries, status_code = WorkspaceArchive(
+                self.src_instance, self.max_workers
+            ).export_workspace(workspace_name, snapshot)
+            if isinstance(entries, str):
+                return entries, status_code
+            gs_logger.info(
+                "Copying %s entries of workspace %s to %s destinations",
+                len(entries),
+                workspace_name,
+                len(self.dst_instances),
+            )
+            with zipfile.ZipFile(snapshot) as archive:
+                results = dict(
+                    map_concurrently(
+                        lambda url: self.import_archive(url, archive),
+                        self.dst_instances,
+                        len(self.dst_instances),
+                    )
+                )
+        reports = [results[url] for url in self.dst_instances]
+        return reports, next(
+            (report.status_code for report in reports if not report.ok), 200
+        )
+
+    def import_archive(self, url: str, archive: zipfile.ZipFile) -> DestinationReport:
+        """
+        Write a snapshot to a destination, reporting a request which got no response as an error
+        instead of raising it
+        """
+        start = perf_counter()
+        dst_instance = self.dst_instances[url]
+        try:
+            content, status_code = WorkspaceArchive(
+                dst_instance, self.max_workers
+            ).import_archive(archive)
+        except RequestException as error:
+            content, status_code = dst_instance.error_response(error)
+        elapsed = perf_counter() - start
+        if status_code >= 400:
+            gs_logger.warning(
+                "Copy to %s failed with %s: %s", url, status_code, content
+            )
+        return DestinationReport(url, content, status_code, elapsed)
@@ -1,5 +1,8 @@
+from collections.abc import Iterable, Iterator
+from functools import partial
+from io import BytesIO
 from pathlib import Path
-from typing import Any
+from typing import IO, Any
 
 from owslib.map.wms130 import WebMapService_1_3_0
 from owslib.util import ResponseWrapper
@@ -23,8 +26,27 @@ from geoservercloud.models.wmsstore import WmsStore
 from geoservercloud.models.wmtsstore import WmtsStore
 from geoservercloud.models.workspace import Workspace
 from geoservercloud.services import OwsService, RestService
-
-
+from geoservercloud.services.capabilities import LayerRecord
+from geoservercloud.services.catalogcache import CatalogCache, ValidatorCache
+from geoservercloud.services.concurrency import AdaptiveConcurrency
+from geoservercloud.services.instrumentation import RequestObserver
+from geoservercloud.services.maps import MapRequest, MapResult
+from geoservercloud.services.ratelimiter import RateLimiter
+from geoservercloud.services.restclient import DEFAULT_POOL_MAXSIZE, RestClient
+from geoservercloud.services.restservice import UpsertStrategy
+from geoservercloud.services.retrypolicy import RetryPolicy
+from geoservercloud.services.tilepyramid import (
+    DirectoryTileWriter,
+    MBTilesWriter,
+    TileResult,
+    TileWriter,
+    extension,
+)
+from geoservercloud.services.tracing import Tracer, traced
+from geoservercloud.workspacearchive import ArchiveEntry, WorkspaceArchive
+
+
+@traced("GeoServerCloud")
 class GeoServerCloud:
     """
     Facade class allowing CRUD operations on GeoServer resources
@@ -37,6 +59,33 @@ class GeoServerCloud:
         GeoServer username
     password : str
         GeoServer password
+    verifytls : bool
+        Whether to verify the TLS certificate of GeoServer
+    pool_maxsize : int
+        Maximum number of keep-alive connections to GeoServer, shared by REST and OGC requests
+    upsert_strategy : UpsertStrategy | str | None
+        How create methods decide between creating and updating a resource: "probe" (GET first),
+        "head" (HEAD first), "optimistic" (POST, then PUT on 409 Conflict) or "index" (look up
+        a listing of the parent collection fetched once). Default: per-method default
+    cache : CatalogCache | None
+        Optional read-through cache of REST GET responses with per-resource-type TTLs, invalidated
+        by the writes of this instance. Its hit and miss counters are available with cache.stats()
+    validator_cache : ValidatorCache | None
+        Optional store of responses with an ETag or Last-Modified header (e.g. capabilities documents),
+        revalidated with conditional requests and reused when they did not change
+    observers : list[RequestObserver] | None
+        Optional observers notified of the timing and size of every HTTP request, e.g. a
+        :py:class:`geoservercloud.services.instrumentation.MetricsAggregator`
+    tracer : Tracer | None
+        Optional tracer opening a span per facade method, per service step and per HTTP request,
+        e.g. a :py:class:`geoservercloud.services.tracing.OpenTelemetryTracer`. Tracing is
+        disabled by default
+    retry_policy : RetryPolicy | None
+        Optional policy sending again the requests which failed with a transient error (e.g. 503
+        during a rolling restart), by default the idempotent ones only. Default: no retries
+    rate_limiter : RateLimiter | None
+        Optional limits of the request rate and of the requests in flight, separately for REST
+        reads, REST writes and OGC requests. A limiter can be shared by several instances
     """
 
     def __init__(
@@ -45,14 +94,44 @@ class GeoServerCloud:
         user: str = "admin",
         password: str = "geoserver",  # nosec
         verifytls: bool = True,
+        pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+        upsert_strategy: UpsertStrategy | str | None = None,
+        cache: CatalogCache | None = None,
+        validator_cache: ValidatorCache | None = None,
+        observers: list[RequestObserver] | None = None,
+        tracer: Tracer | None = None,
+        retry_policy: RetryPolicy | None = None,
+        rate_limiter: RateLimiter | None = None,
     ) -> None:
 
         self.url: str = url.strip("/")
         self.user: str = user
         self.password: str = password
         self.auth: tuple[str, str] = (user, password)
-        self.rest_service: RestService = RestService(self.url, self.auth, verifytls)
-        self.ows_service: OwsService = OwsService(self.url, self.auth, verifytls)
+        self.cache: CatalogCache | None = cache
+        self.validator_cache: ValidatorCache | None = validator_cache
+        self.rest_client: RestClient = RestClient(
+            self.url,
+            self.auth,
+            verifytls,
+            pool_maxsize=pool_maxsize,
+            cache=cache,
+            validator_cache=validator_cache,
+            observers=observers,
+            tracer=tracer,
+            retry_policy=retry_policy,
+            rate_limiter=rate_limiter,
+        )
+        self.rest_service: RestService = RestService(
+            self.url,
+            self.auth,
+            verifytls,
+            rest_client=self.rest_client,
+            upsert_strategy=upsert_strategy,
+        )
+        self.ows_service: OwsService = OwsService(
+            self.url, self.auth, verifytls, rest_client=self.rest_client
+        )
         self.wms: WebMapService_1_3_0 | None = None
         self.wmts: WebMapTileService | None = None
         self.default_workspace: str | None = None
@@ -204,6 +283,49 @@ class GeoServerCloud:
             set_default_workspace=set_default_workspace,
         )
 
+    def export_workspace(
+        self, workspace_name: str, path: str | Path, max_workers: int = 1
+    ) -> tuple[list[ArchiveEntry] | str, int]:
+        """
+        Export a workspace to a zip archive holding its datastores, feature types, layers,
+        layer groups, styles (definitions and style files) and style images, plus a manifest.
+        The archive can be imported into any GeoServer instance with :py:meth:`import_workspace`.
+
+        :param workspace_name: Name of the workspace
+        :type workspace_name: str
+        :param path: Path of the zip archive
+        :type path: str or Path
+        :param max_workers: Maximum number of resources read concurrently (default: 1)
+        :type max_workers: int, optional
+        :return: Tuple of (entries of the manifest, status_code), or (error, status_code)
+        :rtype: tuple
+
+        :Example:
+
+        >>> staging.export_workspace("myworkspace", "myworkspace.zip", max_workers=8)
+        >>> production.import_workspace("myworkspace.zip", max_workers=8)
+        """
+        return WorkspaceArchive(self.rest_service, max_workers).export_workspace(
+            workspace_name, path
+        )
+
+    def import_workspace(
+        self, path: str | Path, max_workers: int = 1
+    ) -> tuple[str, int]:
+        """
+        Create or update a workspace and its resources from a zip archive written by
+        :py:meth:`export_workspace`, in dependency order. Within each step (e.g. all feature
+        types), up to max_workers resources are written concurrently.
+
+        :param path: Path of the zip archive
+        :type path: str or Path
+        :param max_workers: Maximum number of resources written concurrently (default: 1)
+        :type max_workers: int, optional
+        :return: Tuple of (content, status_code) of the last write, or of the first error
+        :rtype: tuple
+        """
+        return WorkspaceArchive(self.rest_service, max_workers).import_workspace(path)
+
     def get_workspace_wms_settings(
         self, workspace_name: str
     ) -> tuple[dict[str, Any] | str, int]:
@@ -1278,6 +1400,79 @@ class GeoServerCloud:
         ...     cql_filter="key='Value'"
         ... )
         """
+        feature_type = self._build_feature_type(
+            layer_name,
+            workspace_name=workspace_name,
+            datastore_name=datastore_name,
+            title=title,
+            abstract=abstract,
+            attributes=attributes,
+            epsg=epsg,
+            keywords=keywords,
+            time_dimension_info=time_dimension_info,
+            layer_links=layer_links,
+            native_name=native_name,
+            cql_filter=cql_filter,
+        )
+        return self.rest_service.create_feature_type(feature_type=feature_type)
+
+    def create_feature_types(
+        self,
+        specs: Iterable[dict[str, Any]],
+        max_workers: int = 1,
+        adaptive: AdaptiveConcurrency | None = None,
+    ) -> list[tuple[str, int, float]]:
+        """
+        Create many feature types, or update them if they already exist.
+        Existing feature types are found with a single listing per datastore, and up to
+        max_workers requests are sent concurrently over the pooled connections (see pool_maxsize).
+        A failure, including an invalid spec (reported with status 400), does not abort the batch.
+
+        :param specs: List or iterator of dicts holding the arguments of :py:meth:`create_feature_type`
+        :type specs: iterable of dict
+        :param max_workers: Maximum number of requests in flight (default: 1)
+        :type max_workers: int, optional
+        :param adaptive: Controller adjusting the number of requests in flight to the observed
+            latency and errors, instead of max_workers
+        :type adaptive: AdaptiveConcurrency, optional
+        :return: List of (content, status_code, elapsed time in seconds) tuples, in input order
+        :rtype: list of tuple
+
+        :Example:
+
+        >>> create_feature_types(
+        ...     (
+        ...         {"layer_name": table, "workspace_name": "myworkspace", "datastore_name": "mystore"}
+        ...         for table in tables
+        ...     ),
+        ...     max_workers=8,
+        ... )
+        """
+        # Built by the workers, so that an invalid spec only fails its own feature type
+        return self.rest_service.create_feature_types(
+            (partial(self._build_feature_type_from_spec, spec) for spec in specs),
+            max_workers,
+            adaptive,
+        )
+
+    def _build_feature_type_from_spec(self, spec: dict[str, Any]) -> FeatureType:
+        return self._build_feature_type(**spec)
+
+    def _build_feature_type(
+        self,
+        layer_name: str,
+        workspace_name: str | None = None,
+        datastore_name: str | None = None,
+        title: str | dict | None = None,
+        abstract: str | dict | None = None,
+        attributes: dict | None = None,
+        epsg: int = 4326,
+        keywords: list[str] | None = None,
+        time_dimension_info: TimeDimensionInfo | None = None,
+        layer_links: list[dict[str, str]] | None = None,
+        native_name: str | None = None,
+        cql_filter: str | None = None,
+    ) -> FeatureType:
         workspace_name = workspace_name or self.default_workspace
         if not workspace_name:
             raise ValueError("Workspace not provided")
@@ -1292,7 +1487,7 @@ class GeoServerCloud:
             )
             for link in (layer_links or [])
         ]
-        feature_type = FeatureType(
+        return FeatureType(
             name=layer_name,
             native_name=native_name or layer_name,
             workspace_name=workspace_name,
@@ -1307,7 +1502,6 @@ class GeoServerCloud:
             metadata_links=metadata_links,
             cql_filter=cql_filter,
         )
-        return self.rest_service.create_feature_type(feature_type=feature_type)
 
     def delete_feature_type(
         self, workspace_name: str, datastore_name: str, layer_name: str
@@ -1759,7 +1953,10 @@ class GeoServerCloud:
         return self.rest_service.update_layer(layer, workspace_name)
 
     def get_wms_layers(
-        self, workspace_name: str, accept_languages: str | None = None
+        self,
+        workspace_name: str,
+        accept_languages: str | None = None,
+        streaming: bool = False,
     ) -> Any | dict[str, Any]:
         """
         Get the capabilities of all WMS layers for a given workspace
@@ -1768,21 +1965,66 @@ class GeoServerCloud:
         :type workspace_name: str
         :param accept_languages: Optional comma-separated list of preferred languages for localized content
         :type accept_languages: str, optional
-        :return: Parsed WMS capabilities document
+        :param streaming: Read the capabilities incrementally and return lightweight layer records
+            (name, title, bbox, styles, dimensions) instead of the parsed document (default: False)
+        :type streaming: bool, optional
+        :return: Parsed WMS capabilities document, or list of LayerRecord if streaming. The list
+            holds all the records, use iter_wms_layers to process them one at a time
         :rtype: Any or dict
         """
-        return self.ows_service.get_wms_layers(workspace_name, accept_languages)
+        return self.ows_service.get_wms_layers(
+            workspace_name, accept_languages, streaming=streaming
+        )
 
-    def get_wfs_layers(self, workspace_name: str) -> Any | dict[str, Any]:
+    def iter_wms_layers(
+        self, workspace_name: str, accept_languages: str | None = None
+    ) -> Iterator[LayerRecord]:
+        """
+        Iterate over the WMS layers of a workspace, reading the capabilities incrementally so that
+        memory use does not grow with the number of layers
+
+        :param workspace_name: Name of the workspace
+        :type workspace_name: str
+        :param accept_languages: Optional comma-separated list of preferred languages for localized content
+        :type accept_languages: str, optional
+        :return: Iterator of layer records (name, title, bbox, styles, dimensions)
+        :rtype: Iterator of LayerRecord
+
+        :Example:
+
+        >>> for layer in iter_wms_layers("myworkspace"):
+        ...     print(layer.name, layer.styles)
+        """
+        yield from self.ows_service.iter_wms_layers(workspace_name, accept_languages)
+
+    def get_wfs_layers(
+        self, workspace_name: str, streaming: bool = False
+    ) -> Any | dict[str, Any]:
         """
         Get the capabilities of all WFS layers for a given workspace
 
         :param workspace_name: Name of the workspace
         :type workspace_name: str
-        :return: Parsed WFS capabilities document
+        :param streaming: Read the capabilities incrementally and return lightweight layer records
+            (name, title, bbox) instead of the parsed document (default: False)
+        :type streaming: bool, optional
+        :return: Parsed WFS capabilities document, or list of LayerRecord if streaming. The list
+            holds all the records, use iter_wfs_layers to process them one at a time
         :rtype: Any or dict
         """
-        return self.ows_service.get_wfs_layers(workspace_name)
+        return self.ows_service.get_wfs_layers(workspace_name, streaming=streaming)
+
+    def iter_wfs_layers(self, workspace_name: str) -> Iterator[LayerRecord]:
+        """
+        Iterate over the feature types published by WFS in a workspace, reading the capabilities
+        incrementally so that memory use does not grow with the number of feature types
+
+        :param workspace_name: Name of the workspace
+        :type workspace_name: str
+        :return: Iterator of layer records (name, title, bbox)
+        :rtype: Iterator of LayerRecord
+        """
+        yield from self.ows_service.iter_wfs_layers(workspace_name)
 
     def get_map(
         self,
@@ -1841,6 +2083,122 @@ class GeoServerCloud:
             )
         return None
 
+    def get_maps(
+        self,
+        requests: Iterable[MapRequest | dict[str, Any]],
+        max_workers: int = 1,
+        adaptive: AdaptiveConcurrency | None = None,
+    ) -> Iterator[MapResult]:
+        """
+        Render many WMS GetMap requests concurrently over the pooled connections and yield the
+        results as they complete, e.g. to regression-render map views after a style change.
+        The requests are sent to the WMS endpoint of the default workspace if one is set. An
+        invalid request is reported as a result with status 400 and the error message as content,
+        the other requests are still rendered.
+
+        :param requests: Map requests, as MapRequest or dicts with the arguments of :py:meth:`get_map`
+        :type requests: iterable of MapRequest or dict
+        :param max_workers: Maximum number of requests in flight (default: 1)
+        :type max_workers: int, optional
+        :param adaptive: Controller adjusting the number of requests in flight to the observed
+            latency and errors, instead of max_workers
+        :type adaptive: AdaptiveConcurrency, optional
+        :return: Iterator of results (request, status code, content type, size, elapsed seconds, content),
+            in completion order
+        :rtype: Iterator of MapResult
+
+        :Example:
+
+        >>> for result in get_maps(
+        ...     (
+        ...         {"layers": ["myworkspace:mylayer"], "bbox": bbox, "size": (800, 600), "time": time}
+        ...         for bbox in bboxes
+        ...         for time in times
+        ...     ),
+        ...     max_workers=8,
+        ... ):
+        ...     print(result.status_code, result.content_type, result.size, result.elapsed)
+        """
+        yield from self.ows_service.get_maps(
+            requests, max_workers, adaptive, self.default_workspace
+        )
+
+    def get_tiled_map(
+        self,
+        layers: list[str],
+        bbox: tuple[float, float, float, float],
+        size: tuple[int, int],
+        srs: str = "EPSG:2056",
+        transparent: bool = True,
+        styles: list[str] | None = None,
+        language: str | None = None,
+        time: str | None = None,
+        tile_size: int = 2048,
+        gutter: int = 32,
+        max_workers: int = 4,
+        output: str | Path | IO[bytes] | None = None,
+    ) -> tuple[bytes | str, int]:
+        """
+        Render a PNG map larger than GeoServer's rendering limits (max_request_memory,
+        max_rendering_time) by splitting it into a grid of GetMap requests fetched in parallel,
+        then stitching them into one image. Each tile is rendered with a gutter of extra pixels
+        on each side, which is cropped, so that labels and symbols are not cut at tile edges.
+        Tiles are decoded with Pillow if it is installed, otherwise in pure Python (faster if NumPy
+        is installed), in parallel with the rendering of the other tiles. The stitching is done band
+        by band so that memory use depends on the width of the map and tile_size, not on its height.
+
+        :param layers: List of layer names to render
+        :type layers: list of str
+        :param bbox: Bounding box as (minx, miny, maxx, maxy)
+        :type bbox: tuple of float
+        :param size: Image size as (width, height) in pixels
+        :type size: tuple of int
+        :param srs: Spatial reference system (default: "EPSG:2056")
+        :type srs: str, optional
+        :param transparent: Whether the background is transparent (default: True)
+        :type transparent: bool, optional
+        :param styles: Optional list of style names, one per layer
+        :type styles: list of str, optional
+        :param language: Optional language code for localized content
+        :type language: str, optional
+        :param time: Optional time value for time-enabled layers
+        :type time: str, optional
+        :param tile_size: Maximum width and height of a tile in pixels, without gutter (default: 2048)
+        :type tile_size: int, optional
+        :param gutter: Number of pixels rendered around each tile and cropped (default: 32)
+        :type gutter: int, optional
+        :param max_workers: Maximum number of tiles rendered concurrently (default: 4)
+        :type max_workers: int, optional
+        :param output: Path or binary file receiving the PNG image (default: return the image).
+            It is only written once all the tiles were rendered, a failed map leaves it untouched.
+        :type output: str or Path or file-like, optional
+        :return: Tuple of (PNG image, or b"" if written to output, status_code), or
+            (error of the first failed tile, status_code)
+        :rtype: tuple
+        """
+        request = MapRequest(
+            layers=layers,
+            bbox=bbox,
+            size=size,
+            srs=srs,
+            transparent=transparent,
+            styles=styles,
+            language=language,
+            time=time,
+        )
+        buffer = BytesIO()
+        content, status_code = self.ows_service.get_tiled_map(
+            request,
+            buffer if output is None else output,
+            tile_size,
+            gutter,
+            max_workers,
+            self.default_workspace,
+        )
+        if status_code != 200:
+            return content, status_code
+        return (buffer.getvalue() if output is None else b""), status_code
+
     def get_feature_info(
         self,
         layers: list[str],
@@ -1962,6 +2320,74 @@ class GeoServerCloud:
             )
         return None
 
+    def download_tiles(
+        self,
+        layer: str,
+        tile_matrix_set: str,
+        bbox: tuple[float, float, float, float],
+        output: str | Path,
+        min_zoom: int = 0,
+        max_zoom: int | None = None,
+        format: str = "image/png",
+        style: str = "",
+        workspace_name: str | None = None,
+        max_workers: int = 1,
+    ) -> list[TileResult]:
+        """
+        Download the WMTS tiles of a layer covering a bbox over a range of zoom levels, e.g. to
+        pre-warm the tile cache or to check a cascaded WMTS layer offline. The tile rows and
+        columns are computed from the TileMatrix definitions of the capabilities and up to
+        max_workers tiles are fetched concurrently over the pooled connections.
+
+        :param layer: Name of the WMTS layer
+        :type layer: str
+        :param tile_matrix_set: Tile matrix set (e.g. "EPSG:3857")
+        :type tile_matrix_set: str
+        :param bbox: Bounding box as (minx, miny, maxx, maxy) in the CRS of the tile matrix set, x first
+        :type bbox: tuple of float
+        :param output: Directory receiving {tile matrix}/{column}/{row} files, or path of an
+            MBTiles SQLite file if it ends with ".mbtiles"
+        :type output: str or Path
+        :param min_zoom: First zoom level, as position in the tile matrix set (default: 0)
+        :type min_zoom: int, optional
+        :param max_zoom: Last zoom level, inclusive (default: last tile matrix of the set)
+        :type max_zoom: int, optional
+        :param format: Image format (default: "image/png")
+        :type format: str, optional
+        :param style: Style name (default: default style of the layer)
+        :type style: str, optional
+        :param workspace_name: Optional workspace name
+        :type workspace_name: str, optional
+        :param max_workers: Maximum number of tiles fetched concurrently (default: 1)
+        :type max_workers: int, optional
+        :return: One result (tile matrix, row, column, status code, size) per tile, in completion order
+        :rtype: list of TileResult
+        """
+        writer: TileWriter
+        if str(output).endswith(".mbtiles"):
+            writer = MBTilesWriter(
+                output, metadata={"name": layer, "format": extension(format)}
+            )
+        else:
+            writer = DirectoryTileWriter(output, extension(format))
+        try:
+            return list(
+                self.ows_service.download_tiles(
+                    layer,
+                    tile_matrix_set,
+                    bbox,
+                    writer,
+                    min_zoom=min_zoom,
+                    max_zoom=max_zoom,
+                    format=format,
+                    style=style,
+                    workspace_name=workspace_name,
+                    max_workers=max_workers,
+                )
+            )
+        finally:
+            writer.close()
+
     def get_feature(
         self,
         workspace_name: str,
@@ -1992,6 +2418,58 @@ class GeoServerCloud:
             workspace_name, type_name, feature_id, max_feature, format
         )
 
+    def iter_features(
+        self,
+        workspace_name: str,
+        type_name: str,
+        page_size: int = 1000,
+        bbox: tuple[float, float, float, float] | None = None,
+        bbox_crs: str | None = None,
+        cql_filter: str | None = None,
+        sort_by: str | None = None,
+        prefetch: int = 0,
+    ) -> Iterator[dict[str, Any]]:
+        """
+        Iterate over all features of a feature type, fetched page by page with WFS 2.0 GetFeature
+        requests (startIndex/count) and parsed incrementally, so that large layers can be exported
+        with constant memory
+
+        :param workspace_name: Name of the workspace
+        :type workspace_name: str
+        :param type_name: Name of the feature type
+        :type type_name: str
+        :param page_size: Number of features requested per page, GeoServer may return fewer if
+            capped by maxFeatures (default: 1000)
+        :type page_size: int, optional
+        :param bbox: Optional bounding box as (minx, miny, maxx, maxy)
+        :type bbox: tuple of float, optional
+        :param bbox_crs: CRS of the bounding box, e.g. "EPSG:2056" (default: CRS of the layer)
+        :type bbox_crs: str, optional
+        :param cql_filter: Optional CQL filter, cannot be combined with bbox
+        :type cql_filter: str, optional
+        :param sort_by: Optional sort order, e.g. "name ASC", recommended for stable paging
+        :type sort_by: str, optional
+        :param prefetch: Number of following pages fetched concurrently while a page is consumed (default: 0)
+        :type prefetch: int, optional
+        :return: Iterator of GeoJSON features
+        :rtype: Iterator of dict
+
+        :Example:
+
+        >>> for feature in iter_features("myworkspace", "mylayer", page_size=5000, prefetch=2):
+        ...     print(feature["id"])
+        """
+        yield from self.ows_service.iter_features(
+            workspace_name,
+            type_name,
+            page_size=page_size,
+            bbox=bbox,
+            bbox_crs=bbox_crs,
+            cql_filter=cql_filter,
+            sort_by=sort_by,
+            prefetch=prefetch,
+        )
+
     def describe_feature_type(
         self,
         workspace_name: str | None = None,
@@ -1,6 +1,32 @@
-from argparse import ArgumentParser
+import hashlib
+from argparse import ArgumentParser, Namespace
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import nullcontext
+from functools import partial
+from itertools import groupby
+from pathlib import Path
+from typing import Any, TypeVar
 
+from requests import HTTPError, RequestException
+
+from geoservercloud.fanout import Destination, GeoServerCloudFanOut
+from geoservercloud.journal import CopyJournal, fingerprint, open_journal
+from geoservercloud.models.common import EntityModel, ListModel, resource_names
+from geoservercloud.models.style import Style
+from geoservercloud.parallel import map_concurrently
 from geoservercloud.services import RestService
+from geoservercloud.services.concurrency import AdaptiveConcurrency
+from geoservercloud.services.ratelimiter import RateLimiter
+from geoservercloud.services.restclient import DEFAULT_POOL_MAXSIZE, RestClient
+from geoservercloud.services.restlogger import gs_logger
+from geoservercloud.services.restservice import UpsertStrategy
+from geoservercloud.services.retrypolicy import RetryPolicy
+from geoservercloud.syncplan import ResourceChange, SyncAction, SyncPlan
+
+T = TypeVar("T")
+R = TypeVar("R")
+# Resource types which may reference resources of the same type, written in order
+ORDERED_RESOURCE_TYPES: set[str] = {"layergroup"}
 
 
 class GeoServerCloudSync:
@@ -21,6 +47,33 @@ class GeoServerCloudSync:
         GeoServer username for destination GeoServer instance
     dst_password : str
         GeoServer password for destination GeoServer instance
+    pool_maxsize : int
+        Maximum number of keep-alive connections to each GeoServer instance
+    max_workers : int
+        Maximum number of independent copies run concurrently (default: 1, i.e. sequential)
+    upsert_strategy : UpsertStrategy | str | None
+        How the destination instance decides between creating and updating a resource,
+        see :py:class:`geoservercloud.services.restservice.UpsertStrategy`
+    retry_policy : RetryPolicy | None
+        Optional policy retrying the requests to both instances which failed with a transient error
+    adaptive : AdaptiveConcurrency | None
+        Optional controller adjusting the number of concurrent copies to the observed latency and
+        errors, between its min_limit and max_limit, instead of max_workers
+    journal : CopyJournal | None
+        Optional journal of the resources copied successfully, with the fingerprint of their source
+        payload. Resources already recorded with the same fingerprint are not written again, so
+        that an interrupted copy can be resumed
+    src_rate_limiter : RateLimiter | None
+        Optional limits of the requests sent to the source instance
+    dst_rate_limiter : RateLimiter | None
+        Optional limits of the requests sent to the destination instance
+    compare_resources : bool
+        Whether resources (e.g. style images) are only copied if the destination does not hold
+        the same content yet, comparing sizes, then the contents if needed (default: True)
+    etag_is_digest : bool
+        Whether the strong ETags of the resources are digests of their content, so that resources
+        are compared by ETag across both instances, without streaming them (default: False, as
+        ETags are only guaranteed to be unique within a server, e.g. if derived from timestamps)
     """
 
     def __init__(
@@ -33,20 +86,59 @@ class GeoServerCloudSync:
         dst_password: str,
         src_verifytls: bool = True,
         dst_verifytls: bool = True,
+        pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+        max_workers: int = 1,
+        upsert_strategy: UpsertStrategy | str | None = None,
+        retry_policy: RetryPolicy | None = None,
+        src_rate_limiter: RateLimiter | None = None,
+        dst_rate_limiter: RateLimiter | None = None,
+        adaptive: AdaptiveConcurrency | None = None,
+        journal: CopyJournal | None = None,
+        compare_resources: bool = True,
+        etag_is_digest: bool = False,
     ) -> None:
+        self.max_workers: int = max_workers
+        self.compare_resources: bool = compare_resources
+        self.etag_is_digest: bool = etag_is_digest
+        self.adaptive: AdaptiveConcurrency | None = adaptive
+        self.journal: CopyJournal | None = journal
+        pool_maxsize = max(
+            pool_maxsize, max_workers, adaptive.max_limit if adaptive else 0
+        )
         self.src_url: str = src_url.strip("/")
         self.src_user: str = src_user
         self.src_password: str = src_password
         self.src_auth: tuple[str, str] = (src_user, src_password)
         self.src_instance: RestService = RestService(
-            src_url, self.src_auth, src_verifytls
+            src_url,
+            self.src_auth,
+            src_verifytls,
+            rest_client=RestClient(
+                src_url,
+                self.src_auth,
+                src_verifytls,
+                pool_maxsize=pool_maxsize,
+                retry_policy=retry_policy,
+                rate_limiter=src_rate_limiter,
+            ),
         )
         self.dst_url: str = dst_url.strip("/")
         self.dst_user: str = dst_user
         self.dst_password: str = dst_password
         self.dst_auth: tuple[str, str] = (dst_user, dst_password)
         self.dst_instance: RestService = RestService(
-            dst_url, self.dst_auth, src_verifytls
+            dst_url,
+            self.dst_auth,
+            dst_verifytls,
+            rest_client=RestClient(
+                dst_url,
+                self.dst_auth,
+                dst_verifytls,
+                pool_maxsize=pool_maxsize,
+                retry_policy=retry_policy,
+                rate_limiter=dst_rate_limiter,
+            ),
+            upsert_strategy=upsert_strategy,
         )
 
     def copy_workspace(
@@ -56,12 +148,17 @@ class GeoServerCloudSync:
         Copy a workspace from the source to the destination GeoServer instance.
         If deep_copy is True, the copy includes the PostGIS datastores, the feature types in the datastores,
         the corresponding layers, the layer groups and the styles in the workspace (including images).
+        Resources are copied in dependency order: workspace, then styles and datastores, then feature
+        types and layers, then layer groups. Within each step, up to max_workers copies run concurrently.
         """
         workspace, status_code = self.src_instance.get_workspace(workspace_name)
         if isinstance(workspace, str):
             return workspace, status_code
-        new_workspace, new_ws_status_code = self.dst_instance.create_workspace(
-            workspace
+        new_workspace, new_ws_status_code = self.journaled(
+            "workspace",
+            workspace_name,
+            partial(self.dst_instance.create_workspace, workspace),
+            workspace,
         )
         if self.not_ok(new_ws_status_code):
             return new_workspace, new_ws_status_code
@@ -91,9 +188,19 @@ class GeoServerCloudSync:
             return datastores, status_code
         elif datastores.aslist() == []:
             return "", status_code
-        for datastore in datastores.aslist():
-            content, status_code = self.copy_pg_datastore(
-                workspace_name, datastore["name"], deep_copy=deep_copy
+        datastore_names = [datastore["name"] for datastore in datastores.aslist()]
+        content, status_code = self.copy_all(
+            lambda datastore_name: self.copy_pg_datastore(
+                workspace_name, datastore_name
+            ),
+            datastore_names,
+        )
+        if self.not_ok(status_code) or not deep_copy:
+            return content, status_code
+        # Feature types are copied once all datastores exist
+        for datastore_name in datastore_names:
+            content, status_code = self.copy_feature_types(
+                workspace_name, datastore_name, copy_layers=True
             )
             if self.not_ok(status_code):
                 return content, status_code
@@ -111,13 +218,20 @@ class GeoServerCloudSync:
         )
         if isinstance(datastore, str):
             return datastore, status_code
-        new_ds, new_ds_status_code = self.dst_instance.create_datastore(
-            workspace_name, datastore
+        new_ds, new_ds_status_code = self.journaled(
+            "datastore",
+            f"{workspace_name}:{datastore_name}",
+            partial(self.dst_instance.create_datastore, workspace_name, datastore),
+            datastore,
         )
         if self.not_ok(new_ds_status_code):
             return new_ds, new_ds_status_code
         if deep_copy:
-            self.copy_feature_types(workspace_name, datastore_name, copy_layers=True)
+            content, status_code = self.copy_feature_types(
+                workspace_name, datastore_name, copy_layers=True
+            )
+            if self.not_ok(status_code):
+                return content, status_code
         return new_ds, new_ds_status_code
 
     def copy_feature_types(
@@ -133,19 +247,18 @@ class GeoServerCloudSync:
             return feature_types, status_code
         elif feature_types.aslist() == []:
             return "", status_code
-        for feature_type in feature_types.aslist():
+
+        def copy(feature_type_name: str) -> tuple[str, int]:
             content, status_code = self.copy_feature_type(
-                workspace_name, datastore_name, feature_type["name"]
+                workspace_name, datastore_name, feature_type_name
             )
-            if self.not_ok(status_code):
+            if self.not_ok(status_code) or not copy_layers:
                 return content, status_code
-            if copy_layers:
-                content, status_code = self.copy_layer(
-                    workspace_name, feature_type["name"]
-                )
-                if self.not_ok(status_code):
-                    return content, status_code
-        return content, status_code
+            return self.copy_layer(workspace_name, feature_type_name)
+
+        return self.copy_all(
+            copy, [feature_type["name"] for feature_type in feature_types.aslist()]
+        )
 
     def copy_feature_type(
         self, workspace_name: str, datastore_name: str, feature_type_name: str
@@ -158,7 +271,12 @@ class GeoServerCloudSync:
         )
         if isinstance(feature_type, str):
             return feature_type, status_code
-        return self.dst_instance.create_feature_type(feature_type)
+        return self.journaled(
+            "featuretype",
+            f"{workspace_name}:{datastore_name}:{feature_type_name}",
+            partial(self.dst_instance.create_feature_type, feature_type),
+            feature_type,
+        )
 
     def copy_layer(
         self, workspace_name: str, feature_type_name: str
@@ -171,7 +289,12 @@ class GeoServerCloudSync:
         )
         if isinstance(layer, str):
             return layer, status_code
-        return self.dst_instance.update_layer(layer, workspace_name)
+        return self.journaled(
+            "layer",
+            f"{workspace_name}:{feature_type_name}",
+            partial(self.dst_instance.update_layer, layer, workspace_name),
+            layer,
+        )
 
     def copy_layer_groups(self, workspace_name: str) -> tuple[str, int]:
         """
@@ -201,8 +324,16 @@ class GeoServerCloudSync:
         )
         if isinstance(layer_group, str):
             return layer_group, status_code
-        return self.dst_instance.create_layer_group(
-            layer_group_name, workspace_name, layer_group
+        return self.journaled(
+            "layergroup",
+            f"{workspace_name}:{layer_group_name}",
+            partial(
+                self.dst_instance.create_layer_group,
+                layer_group_name,
+                workspace_name,
+                layer_group,
+            ),
+            layer_group,
         )
 
     def copy_styles(
@@ -216,10 +347,12 @@ class GeoServerCloudSync:
             return styles, status_code
         elif styles.aslist() == []:
             return "", status_code
-        for style in styles.aslist():
-            content, status_code = self.copy_style(style["name"], workspace_name)
-            if self.not_ok(status_code):
-                return content, status_code
+        content, status_code = self.copy_all(
+            lambda style_name: self.copy_style(style_name, workspace_name),
+            [style["name"] for style in styles.aslist()],
+        )
+        if self.not_ok(status_code):
+            return content, status_code
         if include_images:
             content, status_code = self.copy_style_images(workspace_name)
             if self.not_ok(status_code):
@@ -239,14 +372,34 @@ class GeoServerCloudSync:
         )
         if isinstance(style_definition, str):
             return style_definition, status_code
+        style, status_code = self.src_instance.get_style(style_name, workspace_name)
+        if isinstance(style, str):
+            return style, status_code
+        return self.journaled(
+            "style",
+            self.qualified_name(workspace_name, style_name),
+            partial(
+                self.write_style, style_name, style_definition, style, workspace_name
+            ),
+            style_definition,
+            style,
+        )
+
+    def write_style(
+        self,
+        style_name: str,
+        style_definition: Style,
+        style: bytes,
+        workspace_name: str | None = None,
+    ) -> tuple[str, int]:
+        """
+        Write a style definition and its style file to the destination GeoServer instance
+        """
         content, status_code = self.dst_instance.create_style_definition(
             style_name, style_definition, workspace_name
         )
         if self.not_ok(status_code):
             return content, status_code
-        style, status_code = self.src_instance.get_style(style_name, workspace_name)
-        if isinstance(style, str):
-            return style, status_code
         return self.dst_instance.create_style(style_name, style, workspace_name)
 
     def copy_style_images(self, workspace_name: str | None = None) -> tuple[str, int]:
@@ -261,14 +414,16 @@ class GeoServerCloudSync:
         images = [child for child in resource_dir.children if child.is_image()]
         if images == []:
             return "", status_code
-        for image in images:
-            content, status_code = self.copy_resource(
+        return self.copy_all(
+            lambda image: self.copy_resource(
                 resource_dir="styles",
                 resource_name=image.name,
                 content_type=image.type,
                 workspace_name=workspace_name,
-            )
-        return content, status_code
+            ),
+            images,
+            stop_on_error=False,
+        )
 
     def copy_resource(
         self,
@@ -278,26 +433,575 @@ class GeoServerCloudSync:
         workspace_name: str | None = None,
     ) -> tuple[str, int]:
         """
-        Copy a resource from source to destination GeoServer instance
+        Copy a resource from source to destination GeoServer instance, streaming it chunk by
+        chunk with constant memory. If compare_resources is True, the resource is skipped if the
+        destination already holds the same content, see :py:meth:`compare_resource`.
         """
-        resource, status_code = self.src_instance.get_resource(
+        digest: str | None = None
+        if self.compare_resources:
+            unchanged, digest = self.compare_resource(
+                resource_dir, resource_name, workspace_name
+            )
+            if unchanged:
+                gs_logger.debug(
+                    "Skipping resource %s/%s, unchanged", resource_dir, resource_name
+                )
+                return "", 200
+        return self.pipe_resource(
+            resource_dir, resource_name, content_type, workspace_name, digest
+        )
+
+    def pipe_resource(
+        self,
+        resource_dir: str,
+        resource_name: str,
+        content_type: str,
+        workspace_name: str | None = None,
+        digest: str | None = None,
+    ) -> tuple[str, int]:
+        """
+        Stream a resource from the source to the destination with constant memory. Its fingerprint
+        (the SHA-256 digest of its content) is computed on the fly and recorded in the journal,
+        if any, once the resource is written. A resource already recorded in the journal is
+        skipped if the digest of the source, given or streamed beforehand, did not change.
+        """
+        name = self.qualified_name(workspace_name, f"{resource_dir}/{resource_name}")
+        if self.journal is not None and self.journal.recorded("resource", name):
+            if digest is None:
+                digest, _ = self.resource_digest(
+                    self.src_instance, resource_dir, resource_name, workspace_name
+                )
+            if digest is not None and self.journal.confirmed("resource", name, digest):
+                gs_logger.debug("Skipping resource %s, already copied", name)
+                return "", 200
+        chunks, status_code = self.src_instance.stream_resource(
             resource_dir, resource_name, workspace_name
         )
-        if self.not_ok(status_code):
-            return resource.decode(), status_code
-        return self.dst_instance.put_resource(
-            path=resource_dir,
-            name=resource_name,
-            workspace_name=workspace_name,
-            content_type=content_type,
-            data=resource,
+        if isinstance(chunks, str):
+            return chunks, status_code
+        hashed_digest = hashlib.sha256()
+
+        def hashed() -> Iterator[bytes]:
+            for chunk in chunks:
+                hashed_digest.update(chunk)
+                yield chunk
+
+        # Release the source connection even if the upload fails before consuming all the chunks
+        with chunks:
+            content, status_code = self.dst_instance.put_resource(
+                resource_dir, resource_name, content_type, hashed(), workspace_name
+            )
+        if self.journal is not None and not self.not_ok(status_code):
+            self.journal.record("resource", name, hashed_digest.hexdigest())
+        return content, status_code
+
+    def compare_resource(
+        self,
+        resource_dir: str,
+        resource_name: str,
+        workspace_name: str | None = None,
+    ) -> tuple[bool, str | None]:
+        """
+        Whether the destination already holds the same resource as the source. The headers of
+        both resources are compared first: if etag_is_digest is set and both have a strong ETag,
+        the resource is unchanged if and only if the ETags are equal. Otherwise, it changed if the
+        sizes differ, and both resources are streamed and their SHA-256 digests compared, with
+        constant memory.
+        Return whether the resource is unchanged, and the digest of the source if it was computed.
+        """
+        try:
+            dst_headers, dst_status_code = self.dst_instance.head_resource(
+                resource_dir, resource_name, workspace_name
+            )
+            if dst_status_code != 200:
+                return False, None
+            src_headers, src_status_code = self.src_instance.head_resource(
+                resource_dir, resource_name, workspace_name
+            )
+        except HTTPError:
+            # HEAD not supported, copy the resource
+            return False, None
+        if src_status_code != 200:
+            return False, None
+        if self.etag_is_digest:
+            src_etag = strong_etag(src_headers.get("ETag"))
+            dst_etag = strong_etag(dst_headers.get("ETag"))
+            if src_etag is not None and dst_etag is not None:
+                return src_etag == dst_etag, None
+        src_size = src_headers.get("Content-Length")
+        dst_size = dst_headers.get("Content-Length")
+        if src_size is not None and dst_size is not None and src_size != dst_size:
+            return False, None
+        src_digest, _ = self.resource_digest(
+            self.src_instance, resource_dir, resource_name, workspace_name
+        )
+        if src_digest is None:
+            return False, None
+        dst_digest, _ = self.resource_digest(
+            self.dst_instance, resource_dir, resource_name, workspace_name
+        )
+        return dst_digest == src_digest, src_digest
+
+    @staticmethod
+    def resource_digest(
+        rest_service: RestService,
+        resource_dir: str,
+        resource_name: str,
+        workspace_name: str | None = None,
+    ) -> tuple[str | None, int]:
+        """
+        SHA-256 digest of the content of a resource, streamed with constant memory, or None if
+        the request failed
+        """
+        chunks, status_code = rest_service.stream_resource(
+            resource_dir, resource_name, workspace_name
+        )
+        if isinstance(chunks, str):
+            return None, status_code
+        digest = hashlib.sha256()
+        with chunks:
+            for chunk in chunks:
+                digest.update(chunk)
+        return digest.hexdigest(), status_code
+
+    def sync_workspace(
+        self, workspace_name: str, dry_run: bool = False, prune: bool = False
+    ) -> tuple[SyncPlan | str, int]:
+        """
+        Synchronize a workspace incrementally from the source to the destination GeoServer instance.
+        The workspace, its styles, datastores, feature types, layers and layer groups are read from both
+        instances and compared by payload: only the resources which are missing or differ on the
+        destination are written. Resources which only exist on the destination are deleted if prune
+        is True. If dry_run is True, nothing is written.
+        Only the resources which the destination answers 404 for are created: any other failure to
+        read the destination (e.g. 401, 403, 5xx, timeout) aborts the sync before writing anything.
+        Return the sync plan listing the action (create, update, delete, unchanged) for each resource,
+        or the first error.
+        """
+        plan = SyncPlan()
+        try:
+            workspace, status_code = self.src_instance.get_workspace(workspace_name)
+            if isinstance(workspace, str):
+                return workspace, status_code
+            dst_workspace, dst_status_code = self.dst_instance.get_workspace(
+                workspace_name
+            )
+            error = self.read_error(dst_workspace, dst_status_code)
+            if error:
+                return error
+            plan.add(
+                "workspace",
+                workspace_name,
+                workspace,
+                dst_workspace,
+                apply=partial(self.dst_instance.create_workspace, workspace),
+            )
+            for plan_resources in (
+                self.plan_styles,
+                self.plan_datastores,
+                self.plan_layer_groups,
+            ):
+                content, status_code = plan_resources(plan, workspace_name)
+                if self.not_ok(status_code):
+                    return content, status_code
+        except RequestException as error:
+            return RestService.error_response(error)
+        if dry_run:
+            return plan, 200
+        return self.apply_plan(plan, prune=prune)
+
+    def apply_plan(
+        self, plan: SyncPlan, prune: bool = False
+    ) -> tuple[SyncPlan | str, int]:
+        """
+        Write the pending changes of a sync plan to the destination GeoServer instance.
+        Creations and updates are applied in plan order, then deletions in reverse order.
+        Consecutive changes of the same resource type are applied concurrently, except for layer
+        groups, which may contain other layer groups and are applied one at a time.
+        """
+        writes = plan.pending()
+        deletions = [
+            change
+            for change in plan.pending(prune=prune)
+            if change.action == SyncAction.DELETE
+        ]
+        for changes in (writes, deletions[::-1]):
+            for resource_type, group in groupby(
+                changes, key=lambda change: change.resource_type
+            ):
+                if resource_type in ORDERED_RESOURCE_TYPES:
+                    for change in group:
+                        content, status_code = self.apply_change(change)
+                        if self.not_ok(status_code):
+                            return content, status_code
+                    continue
+                content, status_code = self.copy_all(self.apply_change, group)
+                if self.not_ok(status_code):
+                    return content, status_code
+        return plan, 200
+
+    @staticmethod
+    def apply_change(change: ResourceChange) -> tuple[str, int]:
+        return change.apply() if change.apply else ("", 200)
+
+    def plan_styles(self, plan: SyncPlan, workspace_name: str) -> tuple[str, int]:
+        """
+        Add the changes required to synchronize the styles of a workspace to a sync plan
+        """
+        styles, status_code = self.src_instance.get_styles(workspace_name)
+        if isinstance(styles, str):
+            return styles, status_code
+        dst_styles, dst_status_code = self.dst_instance.get_styles(workspace_name)
+        error = self.read_error(dst_styles, dst_status_code)
+        if error:
+            return error
+
+        def fetch(style_name: str) -> tuple[tuple[Any, int], ...]:
+            return (
+                self.src_instance.get_style_definition(style_name, workspace_name),
+                self.src_instance.get_style(style_name, workspace_name),
+                self.dst_instance.get_style_definition(style_name, workspace_name),
+                self.dst_instance.get_style(style_name, workspace_name),
+            )
+
+        for style_name, (
+            (definition, status_code),
+            (style, style_status_code),
+            (dst_definition, dst_status_code),
+            (dst_style, dst_style_status_code),
+        ) in self.concurrently(fetch, resource_names(styles)):
+            if isinstance(definition, str):
+                return definition, status_code
+            if isinstance(style, str):
+                return style, style_status_code
+            error = self.read_error(dst_definition, dst_status_code) or self.read_error(
+                dst_style, dst_style_status_code
+            )
+            if error:
+                return error
+            plan.add(
+                "style",
+                style_name,
+                definition,
+                dst_definition,
+                apply=partial(
+                    self.write_style, style_name, definition, style, workspace_name
+                ),
+                extra_changed_keys=["body"] if style != dst_style else None,
+            )
+        for style_name in self.extra_names(styles, dst_styles):
+            plan.add(
+                "style",
+                style_name,
+                None,
+                None,
+                apply=partial(
+                    self.dst_instance.delete_style, style_name, workspace_name
+                ),
+            )
+        return "", 200
+
+    def plan_datastores(self, plan: SyncPlan, workspace_name: str) -> tuple[str, int]:
+        """
+        Add the changes required to synchronize the datastores of a workspace, their feature types
+        and the corresponding layers to a sync plan
+        """
+        datastores, status_code = self.src_instance.get_datastores(workspace_name)
+        if isinstance(datastores, str):
+            return datastores, status_code
+        dst_datastores, dst_status_code = self.dst_instance.get_datastores(
+            workspace_name
         )
+        error = self.read_error(dst_datastores, dst_status_code)
+        if error:
+            return error
+        datastore_names = resource_names(datastores)
+
+        def fetch(datastore_name: str) -> tuple[tuple[Any, int], tuple[Any, int]]:
+            return (
+                self.src_instance.get_datastore(workspace_name, datastore_name),
+                self.dst_instance.get_datastore(workspace_name, datastore_name),
+            )
+
+        for datastore_name, (
+            (datastore, status_code),
+            (dst_datastore, dst_status_code),
+        ) in self.concurrently(fetch, datastore_names):
+            if isinstance(datastore, str):
+                return datastore, status_code
+            error = self.read_error(dst_datastore, dst_status_code)
+            if error:
+                return error
+            plan.add(
+                "datastore",
+                datastore_name,
+                datastore,
+                dst_datastore,
+                apply=partial(
+                    self.dst_instance.create_datastore, workspace_name, datastore
+                ),
+            )
+        for datastore_name in self.extra_names(datastores, dst_datastores):
+            plan.add(
+                "datastore",
+                datastore_name,
+                None,
+                None,
+                apply=partial(
+                    self.dst_instance.delete_datastore, workspace_name, datastore_name
+                ),
+            )
+        for datastore_name in datastore_names:
+            content, status_code = self.plan_feature_types(
+                plan, workspace_name, datastore_name
+            )
+            if self.not_ok(status_code):
+                return content, status_code
+        return "", 200
+
+    def plan_feature_types(
+        self, plan: SyncPlan, workspace_name: str, datastore_name: str
+    ) -> tuple[str, int]:
+        """
+        Add the changes required to synchronize the feature types of a datastore and the
+        corresponding layers to a sync plan
+        """
+        feature_types, status_code = self.src_instance.get_feature_types(
+            workspace_name, datastore_name
+        )
+        if isinstance(feature_types, str):
+            return feature_types, status_code
+        dst_feature_types, dst_status_code = self.dst_instance.get_feature_types(
+            workspace_name, datastore_name
+        )
+        error = self.read_error(dst_feature_types, dst_status_code)
+        if error:
+            return error
+
+        def fetch(feature_type_name: str) -> tuple[tuple[Any, int], ...]:
+            return (
+                self.src_instance.get_feature_type(
+                    workspace_name, datastore_name, feature_type_name
+                ),
+                self.dst_instance.get_feature_type(
+                    workspace_name, datastore_name, feature_type_name
+                ),
+                self.src_instance.get_layer(workspace_name, feature_type_name),
+                self.dst_instance.get_layer(workspace_name, feature_type_name),
+            )
+
+        layers = []
+        for feature_type_name, (
+            (feature_type, status_code),
+            (dst_feature_type, dst_status_code),
+            (layer, layer_status_code),
+            (dst_layer, dst_layer_status_code),
+        ) in self.concurrently(fetch, resource_names(feature_types)):
+            if isinstance(feature_type, str):
+                return feature_type, status_code
+            if isinstance(layer, str):
+                return layer, layer_status_code
+            error = self.read_error(
+                dst_feature_type, dst_status_code
+            ) or self.read_error(dst_layer, dst_layer_status_code)
+            if error:
+                return error
+            plan.add(
+                "featuretype",
+                f"{datastore_name}/{feature_type_name}",
+                feature_type,
+                dst_feature_type,
+                apply=partial(self.dst_instance.create_feature_type, feature_type),
+            )
+            layers.append((feature_type_name, layer, dst_layer))
+        # Layers are planned after all feature types so that they are applied once these exist
+        for feature_type_name, layer, dst_layer in layers:
+            plan.add(
+                "layer",
+                f"{datastore_name}/{feature_type_name}",
+                layer,
+                dst_layer,
+                apply=partial(self.dst_instance.update_layer, layer, workspace_name),
+            )
+        for feature_type_name in self.extra_names(feature_types, dst_feature_types):
+            plan.add(
+                "featuretype",
+                f"{datastore_name}/{feature_type_name}",
+                None,
+                None,
+                apply=partial(
+                    self.dst_instance.delete_feature_type,
+                    workspace_name,
+                    datastore_name,
+                    feature_type_name,
+                ),
+            )
+        return "", 200
+
+    def plan_layer_groups(self, plan: SyncPlan, workspace_name: str) -> tuple[str, int]:
+        """
+        Add the changes required to synchronize the layer groups of a workspace to a sync plan
+        """
+        layer_groups, status_code = self.src_instance.get_layer_groups(workspace_name)
+        if isinstance(layer_groups, str):
+            return layer_groups, status_code
+        dst_layer_groups, dst_status_code = self.dst_instance.get_layer_groups(
+            workspace_name
+        )
+        error = self.read_error(dst_layer_groups, dst_status_code)
+        if error:
+            return error
+
+        def fetch(layer_group_name: str) -> tuple[tuple[Any, int], tuple[Any, int]]:
+            return (
+                self.src_instance.get_layer_group(workspace_name, layer_group_name),
+                self.dst_instance.get_layer_group(workspace_name, layer_group_name),
+            )
+
+        # Keep the source order, layer groups may contain other layer groups
+        layer_group_names = resource_names(layer_groups)
+        fetched = dict(self.concurrently(fetch, layer_group_names))
+        for layer_group_name in layer_group_names:
+            (layer_group, status_code), (dst_layer_group, dst_status_code) = fetched[
+                layer_group_name
+            ]
+            if isinstance(layer_group, str):
+                return layer_group, status_code
+            error = self.read_error(dst_layer_group, dst_status_code)
+            if error:
+                return error
+            plan.add(
+                "layergroup",
+                layer_group_name,
+                layer_group,
+                dst_layer_group,
+                apply=partial(
+                    self.dst_instance.create_layer_group,
+                    layer_group_name,
+                    workspace_name,
+                    layer_group,
+                ),
+            )
+        for layer_group_name in self.extra_names(layer_groups, dst_layer_groups):
+            plan.add(
+                "layergroup",
+                layer_group_name,
+                None,
+                None,
+                apply=partial(
+                    self.dst_instance.delete_layer_group,
+                    workspace_name,
+                    layer_group_name,
+                ),
+            )
+        return "", 200
+
+    @classmethod
+    def read_error(cls, content: Any, status_code: int) -> tuple[str, int] | None:
+        """
+        Error of a failed GET of a destination resource, or None if the resource was read (content
+        not given as an error message) or does not exist (404). Any other failure, e.g. a response
+        which cannot be parsed, must not be mistaken for a missing resource to create.
+        """
+        if not isinstance(content, str) or status_code == 404:
+            return None
+        if cls.not_ok(status_code):
+            return content, status_code
+        return f"Unexpected response from the destination: {content[:1000]}", 502
+
+    @staticmethod
+    def extra_names(
+        resources: ListModel | str, dst_resources: ListModel | str
+    ) -> list[str]:
+        """
+        Names of the resources which only exist on the destination
+        """
+        names = set(resource_names(resources))
+        return [name for name in resource_names(dst_resources) if name not in names]
+
+    def copy_all(
+        self,
+        copy: Callable[[T], tuple[str, int]],
+        items: Iterable[T],
+        stop_on_error: bool = True,
+    ) -> tuple[str, int]:
+        """
+        Apply a copy function to independent items, running up to max_workers copies concurrently.
+        If stop_on_error is True, return the first error to complete and cancel the pending
+        copies. Otherwise, copy all items and return the error of the first failed item in the
+        order of items, or the result of the last item if all copies succeeded, whatever the
+        order in which the copies complete.
+        """
+        result: tuple[str, int] = ("", 200)
+        result_index: int = -1
+        failed: bool = False
+        for (index, _), (content, status_code) in self.concurrently(
+            lambda indexed: copy(indexed[1]), enumerate(items)
+        ):
+            if self.not_ok(status_code):
+                if stop_on_error:
+                    return content, status_code
+                if not failed or index < result_index:
+                    result, result_index, failed = (content, status_code), index, True
+            elif not failed and index > result_index:
+                result, result_index = (content, status_code), index
+        return result
+
+    def journaled(
+        self,
+        resource_type: str,
+        name: str,
+        write: Callable[[], tuple[str, int]],
+        *payloads: EntityModel | bytes,
+    ) -> tuple[str, int]:
+        """
+        Write a resource to the destination unless the journal confirms it was already written
+        with the same source payloads, and record it in the journal once written
+        """
+        if self.journal is None:
+            return write()
+        payload_fingerprint = fingerprint(*payloads)
+        if self.journal.confirmed(resource_type, name, payload_fingerprint):
+            gs_logger.debug("Skipping %s %s, already copied", resource_type, name)
+            return "", 200
+        content, status_code = write()
+        if not self.not_ok(status_code):
+            self.journal.record(resource_type, name, payload_fingerprint)
+        return content, status_code
+
+    @staticmethod
+    def qualified_name(workspace_name: str | None, name: str) -> str:
+        return f"{workspace_name}:{name}" if workspace_name else name
+
+    def concurrently(
+        self, func: Callable[[T], R], items: Iterable[T]
+    ) -> Iterator[tuple[T, R]]:
+        """
+        Call func on each item with up to max_workers calls in flight, or as many as allowed by
+        the adaptive controller which then observes the requests to both instances
+        """
+        if self.adaptive is not None:
+            return self.adaptive.map(
+                func,
+                items,
+                [self.src_instance.rest_client, self.dst_instance.rest_client],
+            )
+        return map_concurrently(func, items, self.max_workers)
 
     @staticmethod
     def not_ok(http_status_code: int) -> bool:
         return http_status_code >= 400
 
 
+def strong_etag(etag: str | None) -> str | None:
+    """
+    Strong ETag, or None for a missing or weak ETag, which does not guarantee identical content
+    """
+    if etag is None or etag.startswith("W/"):
+        return None
+    return etag
+
+
 def parse_args():
     parser = ArgumentParser(description="""
         Copy a workspace from a GeoServer instance to another, including PG datastores,
@@ -321,35 +1025,210 @@ def parse_args():
     )
     parser.add_argument(
         "--dst_url",
-        help="URL of the destination GeoServer instance",
-        default="http://localhost:8080/geoserver",
+        action="append",
+        help="URL of the destination GeoServer instance (default: http://localhost:8080/geoserver). "
+        "Repeat it to copy the workspace to several destinations: the source is then read once "
+        "and written to all the destinations concurrently",
     )
     parser.add_argument(
         "--dst_user",
-        default="admin",
-        help="Admin user of the destination GeoServer instance",
+        action="append",
+        help="Admin user of the destination GeoServer instance (default: admin), given once for "
+        "all the destinations or once per --dst_url",
     )
     parser.add_argument(
         "--dst_password",
-        default="geoserver",
-        help="Admin password of the destination GeoServer instance",
+        action="append",
+        help="Admin password of the destination GeoServer instance (default: geoserver), given "
+        "once for all the destinations or once per --dst_url",
     )
     parser.add_argument(
         "--workspace",
         help="Workspace to copy",
     )
+    parser.add_argument(
+        "--pool_maxsize",
+        type=int,
+        default=DEFAULT_POOL_MAXSIZE,
+        help="Maximum number of keep-alive connections to each GeoServer instance",
+    )
+    parser.add_argument(
+        "--max_workers",
+        type=int,
+        default=1,
+        help="Maximum number of resources copied concurrently",
+    )
+    parser.add_argument(
+        "--adaptive",
+        action="store_true",
+        help="Adjust the number of concurrent copies to the latency and errors of GeoServer, "
+        "up to --max_workers",
+    )
+    parser.add_argument(
+        "--sync",
+        action="store_true",
+        help="Only write the resources which differ between source and destination",
+    )
+    parser.add_argument(
+        "--dry_run",
+        "--dry-run",
+        action="store_true",
+        help="Print the sync plan without writing anything (implies --sync)",
+    )
+    parser.add_argument(
+        "--prune",
+        action="store_true",
+        help="With --sync, delete the resources which only exist on the destination",
+    )
+    parser.add_argument(
+        "--upsert_strategy",
+        choices=[strategy.value for strategy in UpsertStrategy],
+        help="How to decide between creating and updating a resource on the destination",
+    )
+    parser.add_argument(
+        "--max_retries",
+        type=int,
+        default=0,
+        help="Maximum number of retries of the idempotent requests failing with a transient "
+        "error (502, 503, 504, 429 or connection error)",
+    )
+    parser.add_argument(
+        "--retry_post",
+        action="store_true",
+        help="With --max_retries, retry the POST requests too: a POST which reached GeoServer "
+        "before failing may then be sent twice",
+    )
+    parser.add_argument(
+        "--etag_is_digest",
+        action="store_true",
+        help="Compare the style images by ETag, without downloading them, when both instances "
+        "compute their ETags from the content of the images",
+    )
+    parser.add_argument(
+        "--journal",
+        help="Journal file recording the copied resources, as JSON lines or SQLite if the "
+        "extension is .db, .sqlite or .sqlite3. An existing journal is only reused with --resume",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Resume an interrupted copy: skip the resources recorded in the journal whose "
+        "source did not change since (default journal: copy-workspace-<workspace>.jsonl)",
+    )
     return parser.parse_args()
 
 
+def destinations(args: Namespace) -> list[Destination]:
+    """Destinations given on the command line, sharing a user or password given once"""
+    urls: list[str] = args.dst_url or ["http://localhost:8080/geoserver"]
+    users: list[str] = args.dst_user or ["admin"]
+    passwords: list[str] = args.dst_password or ["geoserver"]
+    for option, values in (("--dst_user", users), ("--dst_password", passwords)):
+        if len(values) not in (1, len(urls)):
+            raise SystemExit(f"{option} must be given once, or once per --dst_url")
+    return [
+        Destination(url, users[index % len(users)], passwords[index % len(passwords)])
+        for index, url in enumerate(urls)
+    ]
+
+
+def fan_out(
+    args: Namespace, dst: list[Destination], retry_policy: RetryPolicy | None
+) -> None:
+    """Copy the workspace to several destinations, see :py:class:`GeoServerCloudFanOut`"""
+    for option in ("sync", "dry_run", "prune", "journal", "resume", "adaptive"):
+        if getattr(args, option):
+            raise SystemExit(
+                f"--{option} is not supported with several destinations (--dst_url)"
+            )
+    reports, code = GeoServerCloudFanOut(
+        args.src_url,
+        args.src_user,
+        args.src_password,
+        dst,
+        pool_maxsize=args.pool_maxsize,
+        max_workers=args.max_workers,
+        upsert_strategy=args.upsert_strategy,
+        retry_policy=retry_policy,
+    ).copy_workspace(args.workspace)
+    if isinstance(reports, str):
+        print(code, reports)
+        return
+    for report in reports:
+        print(report.url, report.status_code, f"{report.elapsed:.1f} s", report.content)
+    print(code)
+
+
 def main():
     args = parse_args()
+    dst = destinations(args)
+    retry_policy = (
+        RetryPolicy(max_retries=args.max_retries, retry_post=args.retry_post)
+        if args.max_retries
+        else None
+    )
+    if len(dst) > 1:
+        fan_out(args, dst, retry_policy)
+        return
     geoserversync = GeoServerCloudSync(
         args.src_url,
         args.src_user,
         args.src_password,
-        args.dst_url,
-        args.dst_user,
-        args.dst_password,
+        dst[0].url,
+        dst[0].user,
+        dst[0].password,
+        pool_maxsize=args.pool_maxsize,
+        max_workers=args.max_workers,
+        upsert_strategy=args.upsert_strategy,
+        retry_policy=retry_policy,
+        adaptive=(
+            AdaptiveConcurrency(
+                initial_limit=min(4, args.max_workers), max_limit=args.max_workers
+            )
+            if args.adaptive
+            else None
+        ),
+        etag_is_digest=args.etag_is_digest,
+    )
+    if args.sync or args.dry_run:
+        plan, code = geoserversync.sync_workspace(
+            args.workspace, dry_run=args.dry_run, prune=args.prune
+        )
+        print(code)
+        print(plan)
+        return
+    journal_path: str | None = args.journal or (
+        f"copy-workspace-{args.workspace}.jsonl" if args.resume else None
     )
-    content, code = geoserversync.copy_workspace(args.workspace, deep_copy=True)
+    if (
+        journal_path
+        and not args.resume
+        and Path(journal_path).exists()
+        and Path(journal_path).stat().st_size
+    ):
+        raise SystemExit(
+            f"The journal {journal_path} already exists: pass --resume to resume the copy it "
+            "records, or delete it to start a new copy"
+        )
+    try:
+        copy_journal = (
+            open_journal(
+                journal_path,
+                context={
+                    "src_url": geoserversync.src_url,
+                    "dst_url": geoserversync.dst_url,
+                    "workspace": args.workspace,
+                },
+                resume=args.resume,
+            )
+            if journal_path
+            else None
+        )
+    except ValueError as error:
+        raise SystemExit(str(error)) from error
+    with copy_journal or nullcontext() as journal:
+        geoserversync.journal = journal
+        content, code = geoserversync.copy_workspace(args.workspace, deep_copy=True)
+        if journal is not None and args.resume:
+            print(f"{journal.skipped} resources already copied were skipped")
     print(code, content)
@@ -0,0 +1,229 @@
+import hashlib
+import json
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any
+
+from geoservercloud.models.common import EntityModel
+from geoservercloud.syncplan import VOLATILE_KEYS
+
+SQLITE_SUFFIXES: set[str] = {".db", ".sqlite", ".sqlite3"}
+
+
+def fingerprint(*parts: EntityModel | bytes | dict[str, Any]) -> str:
+    """
+    SHA-256 digest of the payloads of a resource: the PUT payload of models (without the keys
+    which differ between instances, e.g. dateModified), serialized as canonical JSON, and raw
+    bytes for style files and resources
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, bytes):
+            digest.update(part)
+            continue
+        payload = part.put_payload() if isinstance(part, EntityModel) else part
+        digest.update(
+            json.dumps(
+                _without_volatile_keys(payload), sort_keys=True, default=str
+            ).encode()
+        )
+    return digest.hexdigest()
+
+
+def _without_volatile_keys(payload: Any) -> Any:
+    if isinstance(payload, dict):
+        return {
+            key: _without_volatile_keys(value)
+            for key, value in payload.items()
+            if key not in VOLATILE_KEYS
+        }
+    if isinstance(payload, list):
+        return [_without_volatile_keys(value) for value in payload]
+    return payload
+
+
+class CopyJournal(ABC):
+    """
+    Journal of the resources written successfully to the destination GeoServer instance by a copy,
+    with the fingerprint of their source payload. When resuming a copy, the resources recorded with
+    the same fingerprint are skipped, while the ones which changed at the source since are written
+    again. The journal is bound to a context (e.g. source and destination URLs) and refuses to
+    resume a copy made in another context.
+
+    Use :py:func:`open_journal` to open a JSONL or SQLite journal.
+
+    Attributes
+    ----------
+    path : Path
+        journal file
+    context : dict[str, Any]
+        context of the copy
+    entries : dict[tuple[str, str], str]
+        fingerprint of each recorded resource, keyed by resource type and name
+    skipped : int
+        number of resources skipped since the journal was opened
+    """
+
+    def __init__(self, path: str | Path, context: dict[str, Any] | None = None) -> None:
+        self.path: Path = Path(path)
+        self.context: dict[str, Any] = context or {}
+        self.entries: dict[tuple[str, str], str] = {}
+        self.skipped: int = 0
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> "CopyJournal":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def confirmed(self, resource_type: str, name: str, fingerprint: str) -> bool:
+        """
+        Whether the resource was already written with the same source payload, counting it as
+        skipped if so
+        """
+        with self._lock:
+            if self.entries.get((resource_type, name)) != fingerprint:
+                return False
+            self.skipped += 1
+            return True
+
+    def recorded(self, resource_type: str, name: str) -> bool:
+        """Whether the resource was written, whatever its source payload"""
+        with self._lock:
+            return (resource_type, name) in self.entries
+
+    def record(self, resource_type: str, name: str, fingerprint: str) -> None:
+        """Record a resource written successfully to the destination"""
+        with self._lock:
+            self.entries[(resource_type, name)] = fingerprint
+            self.write(resource_type, name, fingerprint)
+
+    def check_context(self, stored_context: dict[str, Any] | None) -> None:
+        if stored_context is not None and stored_context != self.context:
+            raise ValueError(
+                f"The journal {self.path} was written by another copy ({stored_context}), "
+                f"it cannot be resumed for {self.context}"
+            )
+
+    @abstractmethod
+    def write(self, resource_type: str, name: str, fingerprint: str) -> None:
+        """Store the record of a resource"""
+
+    def close(self) -> None:
+        pass
+
+
+class JsonlJournal(CopyJournal):
+    """
+    Journal stored as JSON lines: a first line holding the context, then one line per resource.
+    Each line is flushed when written, so that the journal survives a crash of the copy.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        context: dict[str, Any] | None = None,
+        resume: bool = False,
+    ) -> None:
+        super().__init__(path, context)
+        stored_context = self.load() if resume and self.path.exists() else None
+        self.file = open(self.path, "a" if resume else "w", encoding="utf-8")
+        # A missing or empty journal is resumed as a new one
+        if stored_context is None:
+            self.append({"context": self.context})
+
+    def load(self) -> dict[str, Any] | None:
+        """Load the recorded resources, and return the stored context if any"""
+        stored_context = None
+        with open(self.path, encoding="utf-8") as file:
+            for line in file:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # Last line truncated by a crash
+                    continue
+                if "context" in entry:
+                    stored_context = entry["context"]
+                    self.check_context(stored_context)
+                elif "type" in entry:
+                    self.entries[(entry["type"], entry["name"])] = entry["fingerprint"]
+        return stored_context
+
+    def append(self, entry: dict[str, Any]) -> None:
+        self.file.write(json.dumps(entry) + "\n")
+        self.file.flush()
+
+    def write(self, resource_type: str, name: str, fingerprint: str) -> None:
+        self.append({"type": resource_type, "name": name, "fingerprint": fingerprint})
+
+    def close(self) -> None:
+        self.file.close()
+
+
+class SqliteJournal(CopyJournal):
+    """
+    Journal stored in a SQLite database, committed after each resource
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        context: dict[str, Any] | None = None,
+        resume: bool = False,
+    ) -> None:
+        super().__init__(path, context)
+        self.connection = sqlite3.connect(self.path, check_same_thread=False)
+        with self.connection:
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS context (value TEXT NOT NULL)"
+            )
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS entries (type TEXT NOT NULL, name TEXT NOT NULL, "
+                "fingerprint TEXT NOT NULL, PRIMARY KEY (type, name))"
+            )
+        row = self.connection.execute("SELECT value FROM context").fetchone()
+        if resume:
+            self.check_context(json.loads(row[0]) if row else None)
+            self.entries = {
+                (resource_type, name): fingerprint
+                for resource_type, name, fingerprint in self.connection.execute(
+                    "SELECT type, name, fingerprint FROM entries"
+                )
+            }
+        else:
+            with self.connection:
+                self.connection.execute("DELETE FROM entries")
+        if not resume or row is None:
+            with self.connection:
+                self.connection.execute("DELETE FROM context")
+                self.connection.execute(
+                    "INSERT INTO context VALUES (?)", (json.dumps(self.context),)
+                )
+
+    def write(self, resource_type: str, name: str, fingerprint: str) -> None:
+        with self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?)",
+                (resource_type, name, fingerprint),
+            )
+
+    def close(self) -> None:
+        self.connection.close()
+
+
+def open_journal(
+    path: str | Path, context: dict[str, Any] | None = None, resume: bool = False
+) -> CopyJournal:
+    """
+    Open a copy journal, stored in SQLite if the file extension is .db, .sqlite or .sqlite3 and
+    as JSON lines otherwise. Unless resume is True, an existing journal is cleared.
+    """
+    if Path(path).suffix in SQLITE_SUFFIXES:
+        return SqliteJournal(path, context, resume)
+    return JsonlJournal(path, context, resume)
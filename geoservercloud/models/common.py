@@ -73,6 +73,15 @@ class ListModel(BaseModel, Generic[T]):
         return json.dumps(self._items, indent=4)
 
 
+def resource_names(resources: ListModel | str) -> list[str]:
+    """
+    Names of the resources of a list response, or an empty list if the request failed
+    """
+    if isinstance(resources, str):
+        return []
+    return [resource["name"] for resource in resources.aslist()]
+
+
 class ReferencedObjectModel(BaseModel):
     def __init__(self, name: str, href: str | None = None):
         self.name: str = name
@@ -0,0 +1,57 @@
+import contextvars
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from itertools import islice
+from typing import TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def map_concurrently(
+    func: Callable[[T], R],
+    items: Iterable[T],
+    max_workers: int = 1,
+    limit: Callable[[], int] | None = None,
+) -> Iterator[tuple[T, R]]:
+    """
+    Call ``func`` on each item and yield ``(item, result)`` pairs as the calls complete
+
+    At most ``max_workers`` calls are in flight at the same time and ``items`` is consumed
+    lazily, so it can be a generator producing an unbounded number of items. Exceptions
+    raised by ``func`` are re-raised when the corresponding result is yielded. If the
+    caller stops iterating, calls which have not started yet are cancelled.
+    With ``max_workers <= 1``, calls run sequentially in the calling thread.
+    If ``limit`` is given, it is called whenever a call completes and returns the number of
+    calls allowed in flight (e.g. by an adaptive controller), capped by ``max_workers``.
+    """
+    if max_workers <= 1:
+        for item in items:
+            yield item, func(item)
+        return
+    iterator = iter(items)
+    executor = ThreadPoolExecutor(
+        max_workers=max_workers, thread_name_prefix="geoservercloud"
+    )
+    pending: dict[Future[R], T] = {}
+
+    def submit(item: T) -> None:
+        # Copy the context so that context variables (e.g. tracing) follow the call
+        context = contextvars.copy_context()
+        pending[executor.submit(context.run, func, item)] = item
+
+    def allowed() -> int:
+        return max_workers if limit is None else max(1, min(limit(), max_workers))
+
+    try:
+        for item in islice(iterator, allowed()):
+            submit(item)
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                item = pending.pop(future)
+                for next_item in islice(iterator, max(allowed() - len(pending), 0)):
+                    submit(next_item)
+                yield item, future.result()
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
@@ -1,7 +1,33 @@
+from .asyncowsservice import AsyncOwsService
+from .asyncrestclient import AsyncRestClient
+from .asyncrestservice import AsyncRestService
+from .catalogcache import CatalogCache, ValidatorCache
+from .concurrency import AdaptiveConcurrency
+from .instrumentation import MetricsAggregator, RequestEvent, RequestObserver
 from .owsservice import OwsService
-from .restservice import RestService
+from .ratelimiter import RateLimiter, RequestLimiter
+from .restservice import RestService, UpsertStrategy
+from .retrypolicy import RetryPolicy, retrying
+from .tracing import OpenTelemetryTracer, RecordingTracer, Tracer
 
 __all__ = [
+    "AdaptiveConcurrency",
+    "AsyncOwsService",
+    "AsyncRestClient",
+    "AsyncRestService",
+    "CatalogCache",
+    "MetricsAggregator",
+    "OpenTelemetryTracer",
     "OwsService",
+    "RateLimiter",
+    "RecordingTracer",
+    "RequestLimiter",
+    "RequestEvent",
+    "RequestObserver",
     "RestService",
+    "RetryPolicy",
+    "Tracer",
+    "UpsertStrategy",
+    "ValidatorCache",
+    "retrying",
 ]
@@ -0,0 +1,29 @@
+from geoservercloud.services.asyncrestclient import AsyncRestClient, ThreadOffload
+from geoservercloud.services.owsservice import OwsService
+from geoservercloud.services.restclient import DEFAULT_POOL_MAXSIZE
+
+
+class AsyncOwsService(ThreadOffload[OwsService]):
+    """
+    Asyncio variant of :py:class:`OwsService`, exposing each of its methods as a coroutine
+    with the same name and return value, run on the worker threads of the client
+    (see :py:class:`geoservercloud.services.asyncrestclient.ThreadOffload`)
+    """
+
+    def __init__(
+        self,
+        url: str,
+        auth: tuple[str, str],
+        verifytls: bool = True,
+        async_client: AsyncRestClient | None = None,
+        max_concurrency: int = DEFAULT_POOL_MAXSIZE,
+    ) -> None:
+        async_client = async_client or AsyncRestClient(
+            url, auth, verifytls, max_concurrency=max_concurrency
+        )
+        self.url: str = url
+        self.auth: tuple[str, str] = auth
+        self.ows_service: OwsService = OwsService(
+            url, auth, verifytls, rest_client=async_client.rest_client
+        )
+        super().__init__(self.ows_service, async_client)
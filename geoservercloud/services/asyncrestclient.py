@@ -0,0 +1,175 @@
+import asyncio
+import contextvars
+import functools
+import inspect
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Generic, TypeVar
+
+from requests import Response
+
+from .restclient import DEFAULT_POOL_MAXSIZE, RequestBody, RestClient
+
+T = TypeVar("T")
+S = TypeVar("S")
+
+
+class AsyncRestClient:
+    """
+    Asyncio client issuing requests through a pooled :py:class:`RestClient`
+
+    Requests are run on a dedicated thread pool sized like the connection pool, so that
+    any number of coroutines can be gathered while at most ``max_concurrency`` requests
+    are in flight over the shared keep-alive connections.
+
+    Attributes
+    ----------
+    rest_client : RestClient
+        underlying HTTP client holding the connection pool
+    max_concurrency : int
+        maximum number of requests in flight
+    """
+
+    def __init__(
+        self,
+        url: str,
+        auth: tuple[str, str],
+        verifytls: bool = True,
+        max_concurrency: int = DEFAULT_POOL_MAXSIZE,
+        rest_client: RestClient | None = None,
+    ) -> None:
+        self.rest_client: RestClient = rest_client or RestClient(
+            url, auth, verifytls, pool_maxsize=max_concurrency
+        )
+        self.max_concurrency: int = max_concurrency
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_concurrency, thread_name_prefix="geoservercloud"
+        )
+
+    @property
+    def url(self) -> str:
+        return self.rest_client.url
+
+    async def run(self, func: Callable[..., T], /, *args: Any, **kwargs: Any) -> T:
+        """
+        Run a blocking call on the client thread pool, propagating the current context
+        """
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        call = functools.partial(context.run, func, *args, **kwargs)
+        return await loop.run_in_executor(self.executor, call)
+
+    async def get(
+        self,
+        path: str,
+        params: dict[str, str] | None = None,
+        headers: dict[str, str] | None = None,
+    ) -> Response:
+        return await self.run(
+            self.rest_client.get, path, params=params, headers=headers
+        )
+
+    async def post(
+        self,
+        path: str,
+        params: dict[str, str] | None = None,
+        headers: dict[str, str] | None = None,
+        json: dict[str, dict[str, Any] | Any] | None = None,
+        data: RequestBody | None = None,
+    ) -> Response:
+        return await self.run(
+            self.rest_client.post,
+            path,
+            params=params,
+            headers=headers,
+            json=json,
+            data=data,
+        )
+
+    async def put(
+        self,
+        path: str,
+        params: dict[str, str] | None = None,
+        headers: dict[str, str] | None = None,
+        json: dict[str, dict[str, Any] | Any] | None = None,
+        data: RequestBody | None = None,
+    ) -> Response:
+        return await self.run(
+            self.rest_client.put,
+            path,
+            params=params,
+            headers=headers,
+            json=json,
+            data=data,
+        )
+
+    async def delete(
+        self,
+        path: str,
+        params: dict[str, str] | None = None,
+        headers: dict[str, str] | None = None,
+    ) -> Response:
+        return await self.run(
+            self.rest_client.delete, path, params=params, headers=headers
+        )
+
+    def close(self) -> None:
+        """Shut down the thread pool and close the pooled connections"""
+        self.executor.shutdown(wait=True)
+        self.rest_client.close()
+
+    async def aclose(self) -> None:
+        """
+        Like :py:meth:`close`, waiting for the requests in flight without blocking the event loop
+        """
+        await asyncio.get_running_loop().run_in_executor(None, self.close)
+
+    async def __aenter__(self) -> "AsyncRestClient":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.aclose()
+
+
+class ThreadOffload(Generic[S]):
+    """
+    Asyncio wrapper of a synchronous object: each public method of the wrapped object is
+    available as a coroutine with the same name, arguments, docstring and return value, running
+    the blocking call on the thread pool of ``async_client``. Other attributes are those of the
+    wrapped object.
+
+    This is a thread offload, not a native asyncio transport: each call occupies a worker thread
+    while its requests are sent with requests, so that at most ``async_client.max_concurrency``
+    calls make progress at the same time and the others wait for a free thread. Generator
+    methods, whose work happens while they are iterated, are not available.
+
+    Attributes
+    ----------
+    wrapped : S
+        synchronous object whose methods are offloaded
+    async_client : AsyncRestClient
+        client holding the thread pool and the connection pool
+    """
+
+    def __init__(self, wrapped: S, async_client: AsyncRestClient) -> None:
+        self.wrapped: S = wrapped
+        self.async_client: AsyncRestClient = async_client
+
+    def __getattr__(self, name: str) -> Any:
+        # Only called for the attributes which are not found on the wrapper itself
+        if name.startswith("_") or name in ("wrapped", "async_client"):
+            raise AttributeError(name)
+        attribute = getattr(self.wrapped, name)
+        if not inspect.ismethod(attribute):
+            return attribute
+        if inspect.isgeneratorfunction(inspect.unwrap(attribute)):
+            raise AttributeError(
+                f"{type(self.wrapped).__name__}.{name} is a generator, which cannot be offloaded"
+            )
+        async_client = self.async_client
+
+        @functools.wraps(attribute)
+        async def offloaded(*args: Any, **kwargs: Any) -> Any:
+            return await async_client.run(attribute, *args, **kwargs)
+
+        return offloaded
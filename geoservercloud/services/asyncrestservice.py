@@ -0,0 +1,40 @@
+from geoservercloud.services.asyncrestclient import AsyncRestClient, ThreadOffload
+from geoservercloud.services.restclient import DEFAULT_POOL_MAXSIZE
+from geoservercloud.services.restservice import RestService
+
+
+class AsyncRestService(ThreadOffload[RestService]):
+    """
+    Asyncio variant of :py:class:`RestService`, exposing each of its methods as a coroutine
+    with the same name and return value, run on the worker threads of the client
+    (see :py:class:`geoservercloud.services.asyncrestclient.ThreadOffload`)
+
+    Attributes
+    ----------
+    url : str
+        base GeoServer URL
+    auth : tuple[str, str]
+        username and password for GeoServer
+    async_client : AsyncRestClient
+        asyncio HTTP client, may be shared with other services to reuse its connection pool
+    rest_service : RestService
+        synchronous service running the calls
+    """
+
+    def __init__(
+        self,
+        url: str,
+        auth: tuple[str, str],
+        verifytls: bool = True,
+        async_client: AsyncRestClient | None = None,
+        max_concurrency: int = DEFAULT_POOL_MAXSIZE,
+    ) -> None:
+        async_client = async_client or AsyncRestClient(
+            url, auth, verifytls, max_concurrency=max_concurrency
+        )
+        self.url: str = url
+        self.auth: tuple[str, str] = auth
+        self.rest_service: RestService = RestService(
+            url, auth, verifytls, rest_client=async_client.rest_client
+        )
+        super().__init__(self.rest_service, async_client)
@@ -0,0 +1,172 @@
+from collections.abc import Iterator
+from typing import IO, NamedTuple
+from xml.etree.ElementTree import Element, iterparse
+
+
+class LayerRecord(NamedTuple):
+    """
+    Lightweight description of a layer read from a capabilities document
+
+    Attributes
+    ----------
+    name : str
+        name of the layer, prefixed with its workspace for global capabilities
+    title : str | None
+        title of the layer
+    bbox : tuple[float, float, float, float] | None
+        WGS84 bounding box as (minx, miny, maxx, maxy)
+    styles : list[str]
+        names of the available styles (WMS only)
+    dimensions : dict[str, str]
+        extent of each dimension (e.g. "time", "elevation") by dimension name (WMS only)
+    """
+
+    name: str
+    title: str | None
+    bbox: tuple[float, float, float, float] | None
+    styles: list[str]
+    dimensions: dict[str, str]
+
+
+def read_wms_layers(source: IO[bytes] | str) -> Iterator[LayerRecord]:
+    """
+    Lazily yield the named layers of a WMS 1.3.0 capabilities document, in document order
+
+    The document is read incrementally and each layer element is freed once it has been
+    processed, so memory use does not grow with the number of layers. The root layer is
+    not yielded. Layer groups are yielded before the layers they contain.
+
+    :param source: File name or binary file-like object, e.g. the raw stream of a response
+    """
+    # Stack of [element, record fields, emitted, depth] for the open Layer elements
+    stack: list[list] = []
+    depth = 0
+    for event, element in iterparse(source, events=("start", "end")):
+        tag = _local_name(element.tag)
+        if event == "start":
+            depth += 1
+            if tag == "Layer":
+                # Child layers come after the metadata of their parent: the parent is complete
+                if stack:
+                    yield from _emit_wms_layer(stack[-1], len(stack))
+                stack.append([element, _empty_fields(), False, depth])
+            continue
+        depth -= 1
+        if not stack:
+            continue
+        if tag == "Layer":
+            yield from _emit_wms_layer(stack.pop(), len(stack) + 1)
+            _free(element, stack[-1][0] if stack else None)
+        elif depth == stack[-1][3]:
+            # Metadata of the innermost open layer, e.g. one of the thousands of CRS of the root
+            _read_wms_field(tag, element, stack[-1][1])
+            _free(element, stack[-1][0])
+
+
+def read_wfs_layers(source: IO[bytes] | str) -> Iterator[LayerRecord]:
+    """
+    Lazily yield the feature types of a WFS 1.1.0 or 2.0.0 capabilities document, in document order
+
+    The document is read incrementally and each feature type element is freed once it has
+    been processed.
+
+    :param source: File name or binary file-like object, e.g. the raw stream of a response
+    """
+    feature_type_list: Element | None = None
+    for event, element in iterparse(source, events=("start", "end")):
+        tag = _local_name(element.tag)
+        if event == "start":
+            if tag == "FeatureTypeList":
+                feature_type_list = element
+            continue
+        if tag != "FeatureType":
+            continue
+        name = _child_text(element, "Name")
+        if name:
+            yield LayerRecord(
+                name=name,
+                title=_child_text(element, "Title"),
+                bbox=_ows_bbox(element.find("{*}WGS84BoundingBox")),
+                styles=[],
+                dimensions={},
+            )
+        _free(element, feature_type_list)
+
+
+def _free(element: Element, parent: Element | None) -> None:
+    """
+    Free a processed element. At its end event, an element is the last child of its parent
+    read so far, so that it is detached in constant time.
+    """
+    element.clear()
+    if parent is not None and len(parent) and parent[-1] is element:
+        del parent[-1]
+
+
+def _emit_wms_layer(entry: list, depth: int) -> Iterator[LayerRecord]:
+    _, fields, emitted, _ = entry
+    entry[2] = True
+    # The root layer (depth 1) holds the service-wide defaults and is not a publishable layer
+    if emitted or depth < 2 or not fields["name"]:
+        return
+    yield LayerRecord(**fields)
+
+
+def _empty_fields() -> dict:
+    return {"name": None, "title": None, "bbox": None, "styles": [], "dimensions": {}}
+
+
+def _read_wms_field(tag: str, element: Element, fields: dict) -> None:
+    if tag == "Name":
+        fields["name"] = (element.text or "").strip()
+    elif tag == "Title":
+        fields["title"] = (element.text or "").strip()
+    elif tag == "EX_GeographicBoundingBox":
+        try:
+            fields["bbox"] = tuple(
+                float(_child_text(element, child) or "")
+                for child in (
+                    "westBoundLongitude",
+                    "southBoundLatitude",
+                    "eastBoundLongitude",
+                    "northBoundLatitude",
+                )
+            )
+        except ValueError:
+            fields["bbox"] = None
+    elif tag == "Style":
+        style_name = _child_text(element, "Name")
+        if style_name:
+            fields["styles"].append(style_name)
+    elif tag == "Dimension":
+        fields["dimensions"][element.get("name", "")] = (element.text or "").strip()
+
+
+def _ows_bbox(element: Element | None) -> tuple[float, float, float, float] | None:
+    if element is None:
+        return None
+    try:
+        lower = [
+            float(value)
+            for value in (_child_text(element, "LowerCorner") or "").split()
+        ]
+        upper = [
+            float(value)
+            for value in (_child_text(element, "UpperCorner") or "").split()
+        ]
+    except ValueError:
+        return None
+    if len(lower) != 2 or len(upper) != 2:
+        return None
+    return lower[0], lower[1], upper[0], upper[1]
+
+
+def _child_text(element: Element, name: str) -> str | None:
+    child = element.find(f"{{*}}{name}")
+    if child is None or child.text is None:
+        return None
+    return child.text.strip()
+
+
+def _local_name(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
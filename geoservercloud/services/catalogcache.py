@@ -0,0 +1,351 @@
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Mapping
+
+from requests import Response
+
+DEFAULT_MAX_ENTRIES = 1024
+DEFAULT_TTL = 60.0
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+# Path prefixes of the catalog APIs whose GET responses are cached
+DEFAULT_PREFIXES: tuple[str, ...] = ("/rest/", "/gwc/rest/", "/acl/")
+# Writes to these resource types also change the published layers
+LAYER_RESOURCE_TYPES: set[str] = {
+    "featuretypes",
+    "coverages",
+    "wmslayers",
+    "wmtslayers",
+}
+
+CacheKey = tuple[str, tuple[tuple[str, str], ...], tuple[tuple[str, str], ...]]
+
+
+class CatalogCache:
+    """
+    Thread-safe read-through cache for GET responses of the GeoServer catalog APIs
+
+    Responses are keyed by REST path, query parameters and headers and evicted in
+    least-recently-used order. Each resource type (the collection name in the path, e.g.
+    "workspaces", "datastores", "featuretypes", "styles") can have its own time to live.
+    A POST, PUT or DELETE issued through the same client invalidates all cached entries
+    under the written path as well as the listing of its parent collection.
+
+    Attributes
+    ----------
+    max_entries : int
+        maximum number of cached responses
+    default_ttl : float
+        time to live in seconds of resource types not listed in ttls
+    ttls : dict[str, float]
+        time to live in seconds per resource type, 0 disables caching of that type
+    prefixes : tuple[str, ...]
+        path prefixes of the cached endpoints
+    hits : int
+        number of requests served from the cache
+    misses : int
+        number of cacheable requests sent to GeoServer
+    evictions : int
+        number of entries dropped to respect max_entries
+    invalidations : int
+        number of entries dropped because of a write
+    """
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        default_ttl: float = DEFAULT_TTL,
+        ttls: Mapping[str, float] | None = None,
+        prefixes: tuple[str, ...] = DEFAULT_PREFIXES,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.max_entries: int = max_entries
+        self.default_ttl: float = default_ttl
+        self.ttls: dict[str, float] = dict(ttls or {})
+        self.prefixes: tuple[str, ...] = prefixes
+        self.clock: Callable[[], float] = clock
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+        self.invalidations: int = 0
+        self._entries: OrderedDict[CacheKey, tuple[float, Response]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def cacheable(self, path: str) -> bool:
+        return path.startswith(self.prefixes) and self.ttl(path) > 0
+
+    def ttl(self, path: str) -> float:
+        return self.ttls.get(resource_type(path), self.default_ttl)
+
+    def get(
+        self,
+        path: str,
+        params: Mapping[str, str] | None = None,
+        headers: Mapping[str, str] | None = None,
+    ) -> Response | None:
+        """
+        Return the cached response for a request, or None if it is missing or expired
+        """
+        key = cache_key(path, params, headers)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > self.clock():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(
+        self,
+        path: str,
+        response: Response,
+        params: Mapping[str, str] | None = None,
+        headers: Mapping[str, str] | None = None,
+    ) -> None:
+        """
+        Store a successful response, evicting the least recently used entries if needed
+        """
+        if response.status_code != 200 or not self.cacheable(path):
+            return
+        key = cache_key(path, params, headers)
+        with self._lock:
+            self._entries[key] = (self.clock() + self.ttl(path), response)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, path: str) -> int:
+        """
+        Drop the entries under a written path and the listing of its parent collection.
+        Return the number of dropped entries.
+        """
+        prefixes = invalidated_prefixes(path)
+        with self._lock:
+            keys = [
+                key
+                for key in self._entries
+                if any(
+                    _is_under(key[0], prefix, recursive)
+                    for prefix, recursive in prefixes
+                )
+            ]
+            for key in keys:
+                del self._entries[key]
+            self.invalidations += len(keys)
+        return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict[str, int | float]:
+        """
+        Return the counters of the cache, e.g. to tune its size and TTLs
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+class ValidatorCache:
+    """
+    Thread-safe store of GET responses carrying an ETag or Last-Modified validator
+
+    The validators are sent back as If-None-Match / If-Modified-Since headers so that
+    GeoServer can answer 304 Not Modified, in which case the stored body is reused instead
+    of being downloaded again. Entries are evicted in least-recently-used order when either
+    limit is exceeded.
+
+    Attributes
+    ----------
+    max_entries : int
+        maximum number of stored responses
+    max_bytes : int
+        maximum total size of the stored bodies
+    revalidations : int
+        number of 304 responses answered with a stored body
+    stores : int
+        number of responses stored
+    """
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ) -> None:
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.max_entries: int = max_entries
+        self.max_bytes: int = max_bytes
+        self.revalidations: int = 0
+        self.stores: int = 0
+        self.size: int = 0
+        self._entries: OrderedDict[CacheKey, Response] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def conditional_headers(
+        self,
+        path: str,
+        params: Mapping[str, str] | None = None,
+        headers: Mapping[str, str] | None = None,
+    ) -> dict[str, str]:
+        """
+        Return the request headers completed with the validators of the stored response, if any
+        """
+        conditional_headers: dict[str, str] = dict(headers or {})
+        with self._lock:
+            response = self._entries.get(cache_key(path, params, headers))
+        if response is not None:
+            if "ETag" in response.headers:
+                conditional_headers["If-None-Match"] = response.headers["ETag"]
+            if "Last-Modified" in response.headers:
+                conditional_headers["If-Modified-Since"] = response.headers[
+                    "Last-Modified"
+                ]
+        return conditional_headers
+
+    def resolve(
+        self,
+        path: str,
+        response: Response,
+        params: Mapping[str, str] | None = None,
+        headers: Mapping[str, str] | None = None,
+    ) -> Response:
+        """
+        Return the stored response if GeoServer answered 304 Not Modified, otherwise store
+        the response if it carries a validator and return it
+        """
+        key = cache_key(path, params, headers)
+        with self._lock:
+            if response.status_code == 304:
+                stored = self._entries.get(key)
+                if stored is None:
+                    return response
+                self._entries.move_to_end(key)
+                self.revalidations += 1
+                return stored
+            if self._entries.get(key) is not None:
+                self.size -= len(self._entries.pop(key).content)
+            if (
+                response.status_code != 200
+                or not (
+                    "ETag" in response.headers or "Last-Modified" in response.headers
+                )
+                or len(response.content) > self.max_bytes
+            ):
+                return response
+            self._entries[key] = response
+            self.size += len(response.content)
+            self.stores += 1
+            while len(self._entries) > self.max_entries or self.size > self.max_bytes:
+                self.size -= len(self._entries.popitem(last=False)[1].content)
+        return response
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.size,
+                "stores": self.stores,
+                "revalidations": self.revalidations,
+            }
+
+
+def cache_key(
+    path: str,
+    params: Mapping[str, str] | None = None,
+    headers: Mapping[str, str] | None = None,
+) -> CacheKey:
+    return (
+        path,
+        tuple(sorted((str(k), str(v)) for k, v in (params or {}).items())),
+        tuple(sorted((str(k).lower(), str(v)) for k, v in (headers or {}).items())),
+    )
+
+
+def resource_type(path: str) -> str:
+    """
+    Return the collection name of a REST path, e.g. "datastores" for
+    "/rest/workspaces/ws/datastores/ds.json" or "/rest/workspaces/ws/datastores.json"
+    """
+    segments = _segments(path)
+    if not segments:
+        return ""
+    # Catalog paths alternate between collection names and resource names
+    return segments[-1] if len(segments) % 2 else segments[-2]
+
+
+def invalidated_prefixes(path: str) -> list[tuple[str, bool]]:
+    """
+    Return the path prefixes whose cached entries are outdated after a write to path,
+    each with a flag telling whether the entries below the prefix are outdated too
+    """
+    base, segments = _split_api(path)
+    if len(segments) % 2:
+        # Write to a collection (e.g. POST): only its listing changes
+        prefixes = [("/".join([base, *segments]), False)]
+    else:
+        # Write to a resource: the resource, its children and the listing of its parent collection
+        prefixes = [
+            ("/".join([base, *segments]), True),
+            ("/".join([base, *segments[:-1]]), False),
+        ]
+    # Publishing or removing a feature type or coverage changes its layer
+    if resource_type(path) in LAYER_RESOURCE_TYPES:
+        prefixes.append((f"{base}/layers", True))
+        if len(segments) > 1 and segments[0] == "workspaces":
+            prefixes.append((f"{base}/workspaces/{segments[1]}/layers", True))
+    return prefixes
+
+
+def _is_under(path: str, prefix: str, recursive: bool) -> bool:
+    if _strip_extension(path) == prefix:
+        return True
+    return recursive and path.startswith(f"{prefix}/")
+
+
+def _strip_extension(segment: str) -> str:
+    for extension in (".json", ".xml", ".sld", ".html"):
+        if segment.endswith(extension):
+            return segment[: -len(extension)]
+    return segment
+
+
+def _split_api(path: str) -> tuple[str, list[str]]:
+    parts = [part for part in path.split("?")[0].split("/") if part]
+    for index, part in enumerate(parts):
+        if part in ("rest", "api"):
+            base = "/" + "/".join(parts[: index + 1])
+            segments = parts[index + 1 :]
+            if segments:
+                segments[-1] = _strip_extension(segments[-1])
+            return base, segments
+    return "", [_strip_extension(part) for part in parts]
+
+
+def _segments(path: str) -> list[str]:
+    return _split_api(path)[1]
@@ -0,0 +1,159 @@
+import math
+import threading
+from collections.abc import Callable, Iterable, Iterator
+from typing import TYPE_CHECKING, TypeVar
+
+from geoservercloud.parallel import map_concurrently
+
+from .instrumentation import RequestEvent, RequestObserver
+from .restlogger import gs_logger
+
+if TYPE_CHECKING:
+    from .restclient import RestClient
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# Status codes signalling an overloaded server
+OVERLOAD_STATUSES: frozenset[int] = frozenset({429, 500, 502, 503, 504, 599})
+
+
+class AdaptiveConcurrency(RequestObserver):
+    """
+    AIMD controller of the number of requests in flight of the bulk operations. It observes the
+    requests of the clients it is attached to and, after each window of requests, increases the
+    limit by one while the 95th percentile of the latency and the error rate stay stable, or
+    divides it by ``1 / backoff`` on server errors (5xx, 429, no response) or latency spikes.
+    Each change of the limit is reported to the other observers of the clients, e.g. to a
+    :py:class:`geoservercloud.services.instrumentation.MetricsAggregator`.
+
+    Attributes
+    ----------
+    name : str
+        name reported with the limit
+    limit : int
+        current number of requests allowed in flight
+    min_limit : int
+        lower bound of the limit
+    max_limit : int
+        upper bound of the limit, also the size of the thread pools of the bulk operations
+    backoff : float
+        factor applied to the limit when the server is overloaded
+    latency_tolerance : float
+        the latency spikes when the p95 of a window exceeds the lowest p95 observed so far
+        multiplied by this factor...
+    latency_slack : float
+        ...and by at least this time in seconds, so that sub-millisecond noise is ignored
+    max_error_rate : float
+        ratio of the requests of a window allowed to fail with an overload status
+    min_samples : int
+        minimum number of requests of a window; a window holds at least ``limit`` requests
+
+    :Example:
+
+    >>> adaptive = AdaptiveConcurrency(initial_limit=4, max_limit=32)
+    >>> geoserver.create_feature_types(specs, adaptive=adaptive)
+    >>> adaptive.limit
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = 4,
+        min_limit: int = 1,
+        max_limit: int = 32,
+        backoff: float = 0.5,
+        latency_tolerance: float = 2.0,
+        latency_slack: float = 0.05,
+        max_error_rate: float = 0.0,
+        min_samples: int = 10,
+        name: str = "adaptive",
+    ) -> None:
+        if not 1 <= min_limit <= initial_limit <= max_limit:
+            raise ValueError(
+                "The limits must verify 1 <= min_limit <= initial_limit <= max_limit"
+            )
+        if not 0 < backoff < 1:
+            raise ValueError("backoff must be between 0 and 1")
+        self.name: str = name
+        self.limit: int = initial_limit
+        self.min_limit: int = min_limit
+        self.max_limit: int = max_limit
+        self.backoff: float = backoff
+        self.latency_tolerance: float = latency_tolerance
+        self.latency_slack: float = latency_slack
+        self.max_error_rate: float = max_error_rate
+        self.min_samples: int = min_samples
+        self.baseline: float | None = None
+        self.clients: list["RestClient"] = []
+        self._latencies: list[float] = []
+        self._errors: int = 0
+        self._lock = threading.Lock()
+
+    def attach(self, rest_client: "RestClient") -> None:
+        """Observe the requests of a client, if not already done"""
+        with self._lock:
+            if any(client is rest_client for client in self.clients):
+                return
+            self.clients.append(rest_client)
+        rest_client.add_observer(self)
+        rest_client.notify_concurrency(self.name, self.limit)
+
+    def request_finished(self, event: RequestEvent) -> None:
+        with self._lock:
+            self._latencies.append(event.total_time)
+            self._errors += event.status_code in OVERLOAD_STATUSES
+            if len(self._latencies) < max(self.limit, self.min_samples):
+                return
+            previous = self.limit
+            self.update()
+            limit = self.limit
+        if limit != previous:
+            for client in self.clients:
+                client.notify_concurrency(self.name, limit)
+
+    def update(self) -> None:
+        """Adjust the limit at the end of a window of requests, and start a new window"""
+        latencies = sorted(self._latencies)
+        p95 = latencies[max(math.ceil(0.95 * len(latencies)), 1) - 1]
+        error_rate = self._errors / len(latencies)
+        self._latencies = []
+        self._errors = 0
+        overloaded = error_rate > self.max_error_rate
+        if self.baseline is not None and not overloaded:
+            overloaded = p95 > max(
+                self.baseline * self.latency_tolerance,
+                self.baseline + self.latency_slack,
+            )
+        if not overloaded and (self.baseline is None or p95 < self.baseline):
+            self.baseline = p95
+        previous = self.limit
+        if overloaded:
+            self.limit = max(self.min_limit, math.floor(self.limit * self.backoff))
+        else:
+            self.limit = min(self.max_limit, self.limit + 1)
+        if self.limit != previous:
+            gs_logger.info(
+                "Concurrency limit %s: %s -> %s (p95 %.3f s, error rate %.2f)",
+                self.name,
+                previous,
+                self.limit,
+                p95,
+                error_rate,
+            )
+
+    def current_limit(self) -> int:
+        return self.limit
+
+    def map(
+        self,
+        func: Callable[[T], R],
+        items: Iterable[T],
+        rest_clients: Iterable["RestClient"] = (),
+    ) -> Iterator[tuple[T, R]]:
+        """
+        Like :py:func:`geoservercloud.parallel.map_concurrently`, with the number of calls in
+        flight following the limit, adjusted from the requests of the given clients
+        """
+        for rest_client in rest_clients:
+            self.attach(rest_client)
+        return map_concurrently(func, items, self.max_limit, limit=self.current_limit)
@@ -0,0 +1,134 @@
+import codecs
+import json
+import re
+from collections.abc import Iterable, Iterator
+from typing import Any
+
+FEATURES_ARRAY = re.compile(r'"features"\s*:\s*\[')
+# Characters changing the nesting depth of a feature, or starting a string
+STRUCTURE = re.compile(r'[{}"]')
+# Body of a string up to its closing quote, or up to the end of the text
+STRING_BODY = re.compile(r'(?:[^"\\]|\\.)*', re.S)
+VALUE = re.compile(r"[^\s,]")
+DECODER = json.JSONDecoder()
+
+
+def read_features(chunks: Iterable[bytes]) -> Iterator[dict[str, Any]]:
+    """
+    Incrementally parse a GeoJSON FeatureCollection and lazily yield its features
+
+    Only the feature being decoded is kept in memory, the part of the document already
+    parsed is dropped as the chunks are consumed. A feature split across chunks is scanned
+    for its end as the chunks come in, and only decoded once complete, so that the time spent
+    is linear in the size of the document whatever the size of the features. The "features" member is
+    expected before any other member holding a nested "features" key, which is the case for
+    the documents written by GeoServer. Documents without a "features" array, such as OGC
+    exception reports, raise a ValueError.
+
+    :param chunks: Chunks of the document, e.g. response.iter_content(chunk_size)
+    """
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    iterator = iter(chunks)
+    head = ""
+    start: re.Match | None = None
+    # Look for the start of the features array, keeping the beginning of the document for errors
+    for chunk in iterator:
+        searched = max(len(head) - 64, 0)
+        head += utf8.decode(chunk)
+        start = FEATURES_ARRAY.search(head, searched)
+        if start:
+            break
+    if not start:
+        head += utf8.decode(b"", final=True)
+        raise ValueError(f"Not a GeoJSON FeatureCollection: {head[:1000]}")
+    scanner = _FeatureScanner()
+    text = head[start.end() :]
+    del head
+    while True:
+        yield from scanner.feed(text)
+        if scanner.done:
+            return
+        next_chunk = next(iterator, None)
+        if next_chunk is None:
+            break
+        text = utf8.decode(next_chunk)
+    yield from scanner.feed(utf8.decode(b"", final=True))
+    if not scanner.done:
+        raise ValueError("Unexpected end of GeoJSON document")
+
+
+class _FeatureScanner:
+    """
+    Split the text of a features array, fed piece by piece, into features. The features held
+    in a piece are decoded directly. For a feature split across pieces, the scan state
+    (nesting depth, inside a string, pending escape) is kept across pieces, and its text is
+    only joined and decoded once its closing brace is found.
+    """
+
+    def __init__(self) -> None:
+        self.done: bool = False
+        self.depth: int = 0
+        self.in_string: bool = False
+        self.escaped: bool = False
+        self.pieces: list[str] = []
+
+    def feed(self, text: str) -> Iterator[dict[str, Any]]:
+        length = len(text)
+        position = 0
+        # Start of the current feature in text
+        start = 0
+        if self.escaped and length:
+            self.escaped = False
+            position = 1
+        while position < length:
+            if not self.depth:
+                match = VALUE.search(text, position)
+                if not match:
+                    return
+                if match.group() == "]":
+                    self.done = True
+                    return
+                if match.group() != "{":
+                    raise ValueError(
+                        f"Unexpected {match.group()!r} in GeoJSON features array"
+                    )
+                start = match.start()
+                try:
+                    feature, position = DECODER.raw_decode(text, start)
+                except json.JSONDecodeError:
+                    # Most likely a feature split across pieces, scan for its end instead
+                    self.depth = 1
+                    position = match.end()
+                else:
+                    yield feature
+            elif self.in_string:
+                body = STRING_BODY.match(text, position)
+                end = body.end() if body else position
+                if end == length:
+                    position = end
+                elif text[end] == "\\":
+                    # Escape split across pieces: skip the escaped character of the next one
+                    self.escaped = True
+                    position = length
+                else:
+                    self.in_string = False
+                    position = end + 1
+            else:
+                match = STRUCTURE.search(text, position)
+                if not match:
+                    position = length
+                    break
+                position = match.end()
+                if match.group() == '"':
+                    self.in_string = True
+                elif match.group() == "{":
+                    self.depth += 1
+                else:
+                    self.depth -= 1
+                    if not self.depth:
+                        self.pieces.append(text[start:position])
+                        feature = json.loads("".join(self.pieces))
+                        self.pieces = []
+                        yield feature
+        if self.depth:
+            self.pieces.append(text[start:])
@@ -0,0 +1,435 @@
+import bisect
+import math
+import socket
+import threading
+from collections.abc import Callable, Mapping
+from time import perf_counter
+from typing import Any, NamedTuple
+
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError
+
+# Placeholder replacing the segment following each of these segments in path templates
+PATH_PLACEHOLDERS: dict[str, str] = {
+    "workspaces": "{ws}",
+    "namespaces": "{ns}",
+    "datastores": "{ds}",
+    "featuretypes": "{ft}",
+    "coveragestores": "{cs}",
+    "coverages": "{coverage}",
+    "wmsstores": "{store}",
+    "wmtsstores": "{store}",
+    "wmslayers": "{layer}",
+    "layers": "{layer}",
+    "layergroups": "{lg}",
+    "styles": "{style}",
+    "user": "{user}",
+    "role": "{role}",
+    "gridsets": "{gridset}",
+    "blobstores": "{blobstore}",
+    "seed": "{layer}",
+    "id": "{id}",
+}
+OWS_SERVICES: set[str] = {"ows", "wms", "wfs", "wcs", "gwc"}
+# Upper bounds of the latency histogram buckets, in seconds
+DEFAULT_BUCKETS: tuple[float, ...] = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+
+class RequestEvent(NamedTuple):
+    """
+    Measurements of an HTTP request sent by :py:class:`RestClient`
+
+    Attributes
+    ----------
+    method : str
+        HTTP method
+    url : str
+        full URL, without query string
+    path_template : str
+        path with the resource names replaced by placeholders, e.g.
+        "/rest/workspaces/{ws}/datastores/{ds}.json", suffixed with the OGC request if any
+    status_code : int
+        HTTP status code, 599 if no response was received
+    bytes_sent : int
+        size of the request body
+    bytes_received : int
+        size of the response body (Content-Length for streamed responses)
+    connect_time : float
+        time spent opening new connections, i.e. TCP connection and TLS handshake, in seconds,
+        excluding the DNS resolution. It is 0 when a pooled keep-alive connection is reused.
+    elapsed : float
+        time until the response headers were parsed, in seconds
+    total_time : float
+        time until the response body was received (or the headers for streamed responses),
+        in seconds
+    retries : int
+        number of attempts which failed before this one, each attempt being notified separately
+    error : str | None
+        exception raised if no response was received
+    dns_time : float
+        time spent resolving the host name of new connections, in seconds. It is 0 when a
+        pooled keep-alive connection is reused.
+    """
+
+    method: str
+    url: str
+    path_template: str
+    status_code: int
+    bytes_sent: int
+    bytes_received: int
+    connect_time: float
+    elapsed: float
+    total_time: float
+    retries: int = 0
+    error: str | None = None
+    dns_time: float = 0.0
+
+
+class RequestObserver:
+    """
+    Base class of the observers notified around every request of a :py:class:`RestClient`.
+    Observers are called in the thread sending the request and must be thread-safe.
+    """
+
+    def request_started(self, method: str, url: str) -> None:
+        pass
+
+    def request_finished(self, event: RequestEvent) -> None:
+        pass
+
+    def concurrency_changed(self, name: str, limit: int) -> None:
+        """
+        Called when an adaptive controller observing the client changes its concurrency limit
+        """
+
+
+class EndpointStats:
+    """
+    Statistics of the requests to an endpoint (method and path template)
+
+    Attributes
+    ----------
+    count : int
+        number of requests
+    errors : int
+        number of requests answered with a status code >= 400 or without response
+    retries : int
+        number of requests which were retries of a failed attempt
+    bytes_sent : int
+        total size of the request bodies
+    bytes_received : int
+        total size of the response bodies
+    total_time : float
+        cumulated time of the requests in seconds
+    connect_time : float
+        cumulated time spent opening connections, excluding DNS resolution, in seconds
+    dns_time : float
+        cumulated time spent resolving host names in seconds
+    max_time : float
+        time of the slowest request in seconds
+    buckets : tuple[float, ...]
+        upper bounds of the histogram buckets in seconds
+    histogram : list[int]
+        number of requests per bucket, the last one counting the requests slower than all bounds
+    """
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self.count: int = 0
+        self.errors: int = 0
+        self.retries: int = 0
+        self.bytes_sent: int = 0
+        self.bytes_received: int = 0
+        self.total_time: float = 0.0
+        self.connect_time: float = 0.0
+        self.dns_time: float = 0.0
+        self.max_time: float = 0.0
+        self.buckets: tuple[float, ...] = buckets
+        self.histogram: list[int] = [0] * (len(buckets) + 1)
+
+    def record(self, event: RequestEvent) -> None:
+        self.count += 1
+        self.errors += event.status_code >= 400
+        self.retries += event.retries > 0
+        self.bytes_sent += event.bytes_sent
+        self.bytes_received += event.bytes_received
+        self.total_time += event.total_time
+        self.connect_time += event.connect_time
+        self.dns_time += event.dns_time
+        self.max_time = max(self.max_time, event.total_time)
+        self.histogram[bisect.bisect_left(self.buckets, event.total_time)] += 1
+
+    @property
+    def mean_time(self) -> float:
+        return self.total_time / self.count if self.count else 0.0
+
+    def quantile(self, q: float) -> float:
+        """
+        Estimate a quantile (e.g. 0.95) of the request time as the upper bound of its bucket,
+        or the maximum time for the last bucket
+        """
+        rank = max(math.ceil(q * self.count), 1)
+        seen = 0
+        for index, count in enumerate(self.histogram):
+            seen += count
+            if seen >= rank:
+                return (
+                    self.buckets[index] if index < len(self.buckets) else self.max_time
+                )
+        return 0.0
+
+    def asdict(self) -> dict[str, Any]:
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "retries": self.retries,
+            "bytes_sent": self.bytes_sent,
+            "bytes_received": self.bytes_received,
+            "total_time": self.total_time,
+            "connect_time": self.connect_time,
+            "dns_time": self.dns_time,
+            "mean_time": self.mean_time,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "max_time": self.max_time,
+            "histogram": dict(
+                zip([*(str(bound) for bound in self.buckets), "+Inf"], self.histogram)
+            ),
+        }
+
+
+class MetricsAggregator(RequestObserver):
+    """
+    Observer aggregating the requests per endpoint, i.e. per method and path template, and
+    keeping the current limit of the adaptive concurrency controllers in ``concurrency``
+
+    :Example:
+
+    >>> metrics = MetricsAggregator()
+    >>> geoserver = GeoServerCloud(url, observers=[metrics])
+    >>> geoserver.create_workspace("test")
+    >>> print(metrics.report())
+    """
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self.buckets: tuple[float, ...] = buckets
+        self.endpoints: dict[tuple[str, str], EndpointStats] = {}
+        self.concurrency: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def request_finished(self, event: RequestEvent) -> None:
+        key = (event.method, event.path_template)
+        with self._lock:
+            stats = self.endpoints.get(key)
+            if stats is None:
+                stats = self.endpoints[key] = EndpointStats(self.buckets)
+            stats.record(event)
+
+    def concurrency_changed(self, name: str, limit: int) -> None:
+        with self._lock:
+            self.concurrency[name] = limit
+
+    def reset(self) -> None:
+        with self._lock:
+            self.endpoints.clear()
+
+    def snapshot(self) -> dict[str, dict[str, Any]]:
+        """
+        Statistics of each endpoint keyed by "METHOD path_template", slowest endpoints first
+        """
+        with self._lock:
+            endpoints = sorted(
+                self.endpoints.items(), key=lambda item: -item[1].total_time
+            )
+            return {
+                f"{method} {template}": stats.asdict()
+                for (method, template), stats in endpoints
+            }
+
+    def report(self) -> str:
+        """
+        Table of the endpoints sorted by cumulated time, showing which calls dominate a run
+        """
+        lines = [
+            f"{'endpoint':<70} {'count':>7} {'errors':>6} {'total s':>9} {'mean ms':>9} "
+            f"{'p95 ms':>9} {'KiB out':>9} {'KiB in':>9}"
+        ]
+        for endpoint, stats in self.snapshot().items():
+            lines.append(
+                f"{endpoint:<70} {stats['count']:>7} {stats['errors']:>6} "
+                f"{stats['total_time']:>9.3f} {stats['mean_time'] * 1000:>9.1f} "
+                f"{stats['p95'] * 1000:>9.1f} {stats['bytes_sent'] / 1024:>9.1f} "
+                f"{stats['bytes_received'] / 1024:>9.1f}"
+            )
+        with self._lock:
+            concurrency = dict(self.concurrency)
+        for name, limit in concurrency.items():
+            lines.append(f"concurrency limit {name}: {limit}")
+        return "\n".join(lines)
+
+
+def path_template(path: str, params: Mapping[str, Any] | None = None) -> str:
+    """
+    Replace the resource names of a path by placeholders, so that requests to the same
+    endpoint share a template, e.g. "/rest/workspaces/{ws}/datastores/{ds}.json" for
+    "/rest/workspaces/ws/datastores/ds.json". OGC requests are suffixed with their type,
+    e.g. "/{ws}/wms?request=GetMap".
+    """
+    segments = path.split("?")[0].split("/")
+    template: list[str] = []
+    for index, segment in enumerate(segments):
+        # Resource names are compared with the template, so that e.g. a workspace named
+        # "styles" is not mistaken for the styles collection
+        previous = template[-1] if template else ""
+        if previous == "resource":
+            template.append("{path}")
+            break
+        if previous in PATH_PLACEHOLDERS and segment:
+            name, dot, extension = segment.rpartition(".")
+            suffix = f".{extension}" if dot and name else ""
+            template.append(PATH_PLACEHOLDERS[previous] + suffix)
+        elif (
+            index == 1
+            and len(segments) > 2
+            and segments[2] in OWS_SERVICES
+            and segment not in OWS_SERVICES
+        ):
+            # Workspace virtual service, e.g. /{ws}/wms
+            template.append("{ws}")
+        else:
+            template.append(segment)
+    request = next(
+        (value for key, value in (params or {}).items() if key.lower() == "request"),
+        None,
+    )
+    result = "/".join(template)
+    return f"{result}?request={request}" if request else result
+
+
+class ConnectTimer:
+    """
+    Measure the time spent opening connections by the current thread, and the part of it
+    spent resolving host names
+    """
+
+    _local = threading.local()
+
+    @classmethod
+    def reset(cls) -> None:
+        cls._local.elapsed = 0.0
+        cls._local.dns_elapsed = 0.0
+
+    @classmethod
+    def add(cls, elapsed: float) -> None:
+        cls._local.elapsed = getattr(cls._local, "elapsed", 0.0) + elapsed
+
+    @classmethod
+    def add_dns(cls, elapsed: float) -> None:
+        cls._local.dns_elapsed = getattr(cls._local, "dns_elapsed", 0.0) + elapsed
+
+    @classmethod
+    def elapsed(cls) -> float:
+        """Time spent opening connections, excluding DNS resolution"""
+        return max(cls.total() - cls.dns_elapsed(), 0.0)
+
+    @classmethod
+    def dns_elapsed(cls) -> float:
+        return getattr(cls._local, "dns_elapsed", 0.0)
+
+    @classmethod
+    def total(cls) -> float:
+        return getattr(cls._local, "elapsed", 0.0)
+
+
+def resolve_and_connect(
+    connection: HTTPConnection, new_conn: Callable[[], socket.socket]
+) -> socket.socket:
+    """
+    Open the socket of a connection, timing the resolution of its host name separately: the
+    addresses are resolved here, then tried in order as urllib3 would do
+    """
+    start = perf_counter()
+    try:
+        addresses = socket.getaddrinfo(
+            connection._dns_host, connection.port, 0, socket.SOCK_STREAM
+        )
+    except OSError:
+        # Resolved again by urllib3, which reports the error
+        addresses = []
+    finally:
+        ConnectTimer.add_dns(perf_counter() - start)
+    if not addresses:
+        return new_conn()
+    dns_host = connection._dns_host
+    error: ConnectTimeoutError | None = None
+    try:
+        for *_, sockaddr in addresses:
+            connection._dns_host = str(sockaddr[0])
+            try:
+                return new_conn()
+            except ConnectTimeoutError as address_error:
+                # Includes NewConnectionError
+                error = address_error
+    finally:
+        connection._dns_host = dns_host
+    assert error is not None  # nosec
+    raise error
+
+
+class TimedHTTPConnection(HTTPConnection):
+    def _new_conn(self) -> socket.socket:
+        return resolve_and_connect(self, super()._new_conn)
+
+    def connect(self) -> None:
+        start = perf_counter()
+        try:
+            super().connect()
+        finally:
+            ConnectTimer.add(perf_counter() - start)
+
+
+class TimedHTTPSConnection(HTTPSConnection):
+    def _new_conn(self) -> socket.socket:
+        return resolve_and_connect(self, super()._new_conn)
+
+    def connect(self) -> None:
+        start = perf_counter()
+        try:
+            super().connect()
+        finally:
+            ConnectTimer.add(perf_counter() - start)
+
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+class TimedHTTPAdapter(HTTPAdapter):
+    """
+    HTTP adapter whose connections report the time spent opening them, and resolving their host
+    name, to :py:class:`ConnectTimer`
+    """
+
+    def init_poolmanager(self, *args: Any, **kwargs: Any) -> None:
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": TimedHTTPConnectionPool,
+            "https": TimedHTTPSConnectionPool,
+        }
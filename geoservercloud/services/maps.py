@@ -0,0 +1,169 @@
+from typing import Any, NamedTuple
+
+from owslib.crs import Crs
+
+
+class MapRequest(NamedTuple):
+    """
+    Parameters of a WMS 1.3.0 GetMap request
+
+    Attributes
+    ----------
+    layers : list[str]
+        names of the layers to render
+    bbox : tuple[float, float, float, float]
+        bounding box as (minx, miny, maxx, maxy), swapped for CRS with a north/east axis order
+    size : tuple[int, int]
+        image size as (width, height) in pixels
+    srs : str
+        spatial reference system
+    format : str
+        image format
+    transparent : bool
+        whether the background is transparent
+    styles : list[str] | None
+        style of each layer, default styles if None
+    language : str | None
+        language of the labels
+    time : str | None
+        value of the time dimension
+    """
+
+    layers: list[str]
+    bbox: tuple[float, float, float, float]
+    size: tuple[int, int]
+    srs: str = "EPSG:2056"
+    format: str = "image/png"
+    transparent: bool = True
+    styles: list[str] | None = None
+    language: str | None = None
+    time: str | None = None
+
+    def params(self) -> dict[str, str]:
+        """
+        Return the KVP parameters of the request, built like OWSLib does
+        """
+        if self.styles and len(self.styles) != len(self.layers):
+            raise ValueError("styles must have one entry per layer")
+        bbox = self.bbox
+        if Crs(self.srs).axisorder == "yx":
+            bbox = (bbox[1], bbox[0], bbox[3], bbox[2])
+        params: dict[str, str] = {
+            "service": "WMS",
+            "version": "1.3.0",
+            "request": "GetMap",
+            "layers": ",".join(self.layers),
+            "styles": ",".join(self.styles or []),
+            "width": str(self.size[0]),
+            "height": str(self.size[1]),
+            "crs": self.srs,
+            "bbox": ",".join(str(value) for value in bbox),
+            "format": self.format,
+            "transparent": str(self.transparent).upper(),
+            "exceptions": "XML",
+            "bgcolor": "0xFFFFFF",
+        }
+        if self.time is not None:
+            params["time"] = self.time
+        if self.language is not None:
+            params["language"] = self.language
+        return params
+
+    @classmethod
+    def create(cls, request: "MapRequest | dict[str, Any]") -> "MapRequest":
+        if isinstance(request, MapRequest):
+            return request
+        return cls(**request)
+
+
+class MapResult(NamedTuple):
+    """
+    Outcome of a GetMap request
+
+    Attributes
+    ----------
+    request : MapRequest | dict[str, Any]
+        rendered request, as given if it is invalid
+    status_code : int
+        HTTP status code, 599 if no response was received
+    content_type : str | None
+        content type of the response, e.g. "image/png" or "application/vnd.ogc.se_xml" for
+        service exceptions
+    size : int
+        size of the response body in bytes
+    elapsed : float
+        time between sending the request and receiving the whole response, in seconds
+    content : bytes
+        response body
+    """
+
+    request: MapRequest | dict[str, Any]
+    status_code: int
+    content_type: str | None
+    size: int
+    elapsed: float
+    content: bytes
+
+
+class MapTile(NamedTuple):
+    """
+    Part of a large GetMap request rendered on its own
+
+    Attributes
+    ----------
+    row : int
+        row of the tile in the grid
+    column : int
+        column of the tile in the grid
+    request : MapRequest
+        request of the tile, including the gutter
+    crop : tuple[int, int, int, int]
+        part of the tile image kept in the stitched image, as (left, top, width, height) pixels
+    """
+
+    row: int
+    column: int
+    request: MapRequest
+    crop: tuple[int, int, int, int]
+
+
+def split_map_request(
+    request: MapRequest, tile_size: int, gutter: int = 0
+) -> list[list[MapTile]]:
+    """
+    Split a GetMap request into a grid of PNG requests of at most tile_size pixels (plus the
+    gutter on each side), returned as bands of tiles from top to bottom. The gutter is rendered
+    around each tile and cropped, so that labels and symbols crossing tile edges are complete.
+    """
+    if tile_size < 1 or gutter < 0:
+        raise ValueError("tile_size must be positive and gutter must not be negative")
+    width, height = request.size
+    min_x, min_y, max_x, max_y = request.bbox
+    pixel_width = (max_x - min_x) / width
+    pixel_height = (max_y - min_y) / height
+    bands: list[list[MapTile]] = []
+    for row, top in enumerate(range(0, height, tile_size)):
+        tile_height = min(tile_size, height - top)
+        band: list[MapTile] = []
+        for column, left in enumerate(range(0, width, tile_size)):
+            tile_width = min(tile_size, width - left)
+            bbox = (
+                min_x + (left - gutter) * pixel_width,
+                max_y - (top + tile_height + gutter) * pixel_height,
+                min_x + (left + tile_width + gutter) * pixel_width,
+                max_y - (top - gutter) * pixel_height,
+            )
+            band.append(
+                MapTile(
+                    row,
+                    column,
+                    request._replace(
+                        bbox=bbox,
+                        size=(tile_width + 2 * gutter, tile_height + 2 * gutter),
+                        format="image/png",
+                    ),
+                    (gutter, gutter, tile_width, tile_height),
+                )
+            )
+        bands.append(band)
+    return bands
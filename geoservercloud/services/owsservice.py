@@ -1,20 +1,64 @@
+import shutil
+from collections import deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
 from json import JSONDecodeError
-from typing import Any
+from pathlib import Path
+from tempfile import SpooledTemporaryFile
+from time import perf_counter
+from typing import IO, Any
 
 import xmltodict
 from owslib.map.wms130 import WebMapService_1_3_0
 from owslib.wmts import WebMapTileService
-from requests import Response
+from requests import RequestException, Response
 
-from geoservercloud.services.restclient import RestClient
+from geoservercloud.parallel import map_concurrently
+from geoservercloud.services.capabilities import (
+    LayerRecord,
+    read_wfs_layers,
+    read_wms_layers,
+)
+from geoservercloud.services.concurrency import AdaptiveConcurrency
+from geoservercloud.services.geojson import read_features
+from geoservercloud.services.maps import (
+    MapRequest,
+    MapResult,
+    MapTile,
+    split_map_request,
+)
+from geoservercloud.services.png import PNG_SIGNATURE, PngImage, PngWriter
+from geoservercloud.services.restclient import NO_RESPONSE_STATUS, RestClient
+from geoservercloud.services.tilepyramid import (
+    Tile,
+    TileMatrix,
+    TileResult,
+    TileWriter,
+    iter_tiles,
+    tile_ranges,
+)
+from geoservercloud.services.tracing import traced
 
+DEFAULT_PAGE_SIZE = 1000
+# Size of a stitched image kept in memory, larger images are spilled to a temporary file
+STITCH_SPOOL_SIZE = 64 * 1024 * 1024
+CHUNK_SIZE = 64 * 1024
 
+
+@traced("OwsService")
 class OwsService:
-    def __init__(self, url: str, auth: tuple[str, str], verifytls: bool = True) -> None:
+    def __init__(
+        self,
+        url: str,
+        auth: tuple[str, str],
+        verifytls: bool = True,
+        rest_client: RestClient | None = None,
+    ) -> None:
         self.url: str = url
         self.auth: tuple[str, str] = auth
         self.ows_endpoints = self.OwsEndpoints()
-        self.rest_client = RestClient(url, auth, verifytls)
+        self.rest_client: RestClient = rest_client or RestClient(url, auth, verifytls)
 
     def create_wms(self, workspace_name: str | None = None) -> WebMapService_1_3_0:
         if workspace_name is None:
@@ -41,24 +85,101 @@ class OwsService:
             password=self.auth[1],
         )
 
+    def get_tile_matrices(
+        self, tile_matrix_set: str, workspace_name: str | None = None
+    ) -> tuple[list[TileMatrix], str]:
+        """
+        Return the tile matrices of a WMTS tile matrix set, ordered from the smallest scale,
+        and the CRS of the set
+        """
+        wmts: WebMapTileService = self.create_wmts(workspace_name)
+        if tile_matrix_set not in wmts.tilematrixsets:
+            raise ValueError(f"Unknown tile matrix set: {tile_matrix_set}")
+        matrix_set = wmts.tilematrixsets[tile_matrix_set]
+        return [
+            TileMatrix.from_owslib(tile_matrix, matrix_set.crs)
+            for tile_matrix in matrix_set.tilematrix.values()
+        ], matrix_set.crs
+
+    def download_tiles(
+        self,
+        layer: str,
+        tile_matrix_set: str,
+        bbox: tuple[float, float, float, float],
+        writer: TileWriter,
+        min_zoom: int = 0,
+        max_zoom: int | None = None,
+        format: str = "image/png",
+        style: str = "",
+        workspace_name: str | None = None,
+        max_workers: int = 1,
+    ) -> Iterator[TileResult]:
+        """
+        Fetch the tiles of a layer covering a bbox with WMTS GetTile requests, up to max_workers
+        at a time, write the successful ones and yield a result per tile as soon as it is done
+        """
+        tile_matrices, crs = self.get_tile_matrices(tile_matrix_set, workspace_name)
+        ranges = tile_ranges(tile_matrices, bbox, crs, min_zoom, max_zoom)
+        path: str = (
+            self.ows_endpoints.workspace_wmts(workspace_name)
+            if workspace_name
+            else self.ows_endpoints.wmts()
+        )
+        params: dict[str, str] = {
+            "service": "WMTS",
+            "version": "1.0.0",
+            "request": "GetTile",
+            "layer": layer,
+            "style": style,
+            "format": format,
+            "tilematrixset": tile_matrix_set,
+        }
+
+        def get_tile(tile: Tile) -> tuple[int, bytes]:
+            try:
+                response: Response = self.rest_client.get(
+                    path,
+                    params={
+                        **params,
+                        "tilematrix": tile.tile_matrix.identifier,
+                        "tilerow": str(tile.row),
+                        "tilecol": str(tile.column),
+                    },
+                )
+            except RequestException as error:
+                if error.response is not None:
+                    return error.response.status_code, b""
+                return NO_RESPONSE_STATUS, b""
+            return response.status_code, response.content
+
+        for tile, (status_code, content) in map_concurrently(
+            get_tile, iter_tiles(ranges), max_workers
+        ):
+            size = 0
+            if status_code == 200 and content:
+                writer.write(tile, content)
+                size = len(content)
+            yield TileResult(
+                tile.tile_matrix.identifier, tile.row, tile.column, status_code, size
+            )
+
     def get_wms_capabilities(
         self, workspace_name: str, accept_languages: str | None = None
     ) -> dict[str, Any]:
         path: str = self.ows_endpoints.workspace_wms(workspace_name)
-        params: dict[str, str] = {
-            "service": "WMS",
-            "version": "1.3.0",
-            "request": "GetCapabilities",
-        }
-        if accept_languages:
-            params["AcceptLanguages"] = accept_languages
+        params: dict[str, str] = self.wms_capabilities_params(accept_languages)
         response: Response = self.rest_client.get(path, params=params)
         return xmltodict.parse(response.content)
 
     def get_wms_layers(
-        self, workspace_name: str, accept_languages: str | None = None
-    ) -> Any | dict[str, Any] | list[dict]:
-
+        self,
+        workspace_name: str,
+        accept_languages: str | None = None,
+        streaming: bool = False,
+    ) -> Any | dict[str, Any] | list[dict] | list[LayerRecord]:
+        # The records are read incrementally but returned as a list, see iter_wms_layers
+        if streaming:
+            return list(self.iter_wms_layers(workspace_name, accept_languages))
         capabilities: dict[str, Any] = self.get_wms_capabilities(
             workspace_name, accept_languages
         )
@@ -70,6 +191,196 @@ class OwsService:
         except KeyError:
             return capabilities
 
+    def iter_wms_layers(
+        self, workspace_name: str, accept_languages: str | None = None
+    ) -> Iterator[LayerRecord]:
+        """
+        Stream the WMS capabilities of a workspace and lazily yield a record per layer
+        """
+        path: str = self.ows_endpoints.workspace_wms(workspace_name)
+        params: dict[str, str] = self.wms_capabilities_params(accept_languages)
+        with self.rest_client.get(path, params=params, stream=True) as response:
+            if response.status_code == 404:
+                return
+            response.raw.decode_content = True
+            yield from read_wms_layers(response.raw)
+
+    @staticmethod
+    def wms_capabilities_params(accept_languages: str | None = None) -> dict[str, str]:
+        params: dict[str, str] = {
+            "service": "WMS",
+            "version": "1.3.0",
+            "request": "GetCapabilities",
+        }
+        if accept_languages:
+            params["AcceptLanguages"] = accept_languages
+        return params
+
+    def get_maps(
+        self,
+        requests: Iterable[MapRequest | dict[str, Any]],
+        max_workers: int = 1,
+        adaptive: AdaptiveConcurrency | None = None,
+        workspace_name: str | None = None,
+    ) -> Iterator[MapResult]:
+        """
+        Send WMS GetMap requests, up to max_workers at a time (or as many as allowed by the
+        adaptive controller if given), and yield a result per request as soon as it completes.
+        Failed requests are reported with their status code, invalid requests with status 400
+        and the error message as content, without interrupting the other requests. The
+        requests are sent to the WMS endpoint of the workspace if given.
+        """
+        get_map = partial(self._get_map, workspace_name=workspace_name)
+        for _, result in (
+            adaptive.map(get_map, requests, [self.rest_client])
+            if adaptive is not None
+            else map_concurrently(get_map, requests, max_workers)
+        ):
+            yield result
+
+    def get_tiled_map(
+        self,
+        request: MapRequest,
+        output: str | Path | IO[bytes],
+        tile_size: int = 2048,
+        gutter: int = 32,
+        max_workers: int = 4,
+        workspace_name: str | None = None,
+    ) -> tuple[str, int]:
+        """
+        Render a GetMap request too large for the server limits as a grid of PNG tiles fetched
+        up to max_workers at a time, and stitch them into one PNG image written to output.
+        Tiles are decoded and cropped in the worker threads, and stitched band by band. The
+        submission of tiles is held back while a band is incomplete, so that only about one
+        band of tiles is held in memory.
+        The output only receives a complete image: a path is written through a temporary file
+        next to it, and a file object receives the image once stitched, kept in memory up to
+        STITCH_SPOOL_SIZE bytes and spilled to a temporary file beyond.
+        Return ("", 200), or the error of the first failed tile.
+        """
+        if not isinstance(output, (str, Path)):
+            with SpooledTemporaryFile(max_size=STITCH_SPOOL_SIZE) as stitched:
+                content, status_code = self._stitch_tiles(
+                    request, stitched, tile_size, gutter, max_workers, workspace_name
+                )
+                if status_code == 200:
+                    stitched.seek(0)
+                    shutil.copyfileobj(stitched, output)
+                return content, status_code
+        path = Path(output)
+        partial_path = path.with_name(f"{path.name}.partial")
+        try:
+            with open(partial_path, "wb") as file:
+                content, status_code = self._stitch_tiles(
+                    request, file, tile_size, gutter, max_workers, workspace_name
+                )
+            if status_code == 200:
+                partial_path.replace(path)
+            return content, status_code
+        finally:
+            partial_path.unlink(missing_ok=True)
+
+    def _stitch_tiles(
+        self,
+        request: MapRequest,
+        output: IO[bytes],
+        tile_size: int,
+        gutter: int,
+        max_workers: int,
+        workspace_name: str | None,
+    ) -> tuple[str, int]:
+        bands: list[list[MapTile]] = split_map_request(request, tile_size, gutter)
+        writer = PngWriter(output, *request.size)
+        # Cropped rows of the tiles received ahead of the band being written
+        pending: dict[tuple[int, int], list[bytes]] = {}
+        next_band: int = 0
+        # Tiles in flight or pending: enough for a band and the tiles rendered after it, so
+        # that a slow tile holds back the submission of new tiles instead of filling memory
+        max_tiles: int = len(bands[0]) + max_workers
+        tiles: Iterator[MapTile] = (tile for band in bands for tile in band)
+        for tile, (rows, status_code) in map_concurrently(
+            partial(self._get_tile, workspace_name=workspace_name),
+            tiles,
+            max_workers,
+            limit=lambda: max_tiles - len(pending),
+        ):
+            if isinstance(rows, str):
+                # Stopping the iteration cancels the tiles not requested yet
+                return rows, status_code
+            pending[(tile.row, tile.column)] = rows
+            while next_band < len(bands) and all(
+                (tile.row, tile.column) in pending for tile in bands[next_band]
+            ):
+                band_rows = [
+                    pending.pop((tile.row, tile.column)) for tile in bands[next_band]
+                ]
+                for row_parts in zip(*band_rows):
+                    writer.write_row(b"".join(row_parts))
+                next_band += 1
+        writer.close()
+        return "", 200
+
+    def _get_tile(
+        self, tile: MapTile, workspace_name: str | None
+    ) -> tuple[list[bytes] | str, int]:
+        """
+        Render a tile, decode it and return the RGBA rows of its cropped part. This runs in
+        the worker threads, so that decoding overlaps with the rendering of the other tiles.
+        A response which is not a PNG image of the tile size is reported with status 502.
+        """
+        result = self._get_map(tile.request, workspace_name)
+        if result.status_code != 200 or not result.content.startswith(PNG_SIGNATURE):
+            return (
+                f"GetMap of tile {tile.row},{tile.column} failed with status "
+                f"{result.status_code}: {result.content[:1000]!r}"
+            ), (result.status_code if result.status_code >= 400 else 502)
+        try:
+            image = PngImage.decode(result.content)
+        except ValueError as error:
+            return f"Tile {tile.row},{tile.column} is not a valid PNG: {error}", 502
+        if (image.width, image.height) != tile.request.size:
+            return (
+                f"Tile {tile.row},{tile.column} is {image.width}x{image.height} "
+                f"instead of {tile.request.size[0]}x{tile.request.size[1]}"
+            ), 502
+        left, top, width, height = tile.crop
+        return [
+            row[left * 4 : (left + width) * 4] for row in image.rows[top : top + height]
+        ], 200
+
+    def _get_map(
+        self,
+        request: MapRequest | dict[str, Any],
+        workspace_name: str | None = None,
+    ) -> MapResult:
+        try:
+            map_request: MapRequest = MapRequest.create(request)
+            params: dict[str, str] = map_request.params()
+        except (TypeError, ValueError, IndexError) as error:
+            message: bytes = f"Invalid GetMap request: {error}".encode()
+            return MapResult(request, 400, "text/plain", len(message), 0.0, message)
+        path: str = (
+            self.ows_endpoints.workspace_wms(workspace_name)
+            if workspace_name
+            else self.ows_endpoints.wms()
+        )
+        start: float = perf_counter()
+        try:
+            response: Response | None = self.rest_client.get(path, params=params)
+        except RequestException as error:
+            response = error.response
+        elapsed: float = perf_counter() - start
+        if response is None:
+            return MapResult(map_request, NO_RESPONSE_STATUS, None, 0, elapsed, b"")
+        return MapResult(
+            map_request,
+            response.status_code,
+            response.headers.get("Content-Type"),
+            len(response.content),
+            elapsed,
+            response.content,
+        )
+
     def get_legend_graphic(
         self,
         layer: str | list[str],
@@ -110,13 +421,35 @@ class OwsService:
         )
         return xmltodict.parse(response.content)
 
-    def get_wfs_layers(self, workspace_name: str) -> Any | dict[str, Any]:
+    def get_wfs_layers(
+        self, workspace_name: str, streaming: bool = False
+    ) -> Any | dict[str, Any] | list[LayerRecord]:
+        # The records are read incrementally but returned as a list, see iter_wfs_layers
+        if streaming:
+            return list(self.iter_wfs_layers(workspace_name))
         capabilities: dict[str, Any] = self.get_wfs_capabilities(workspace_name)
         try:
             return capabilities["wfs:WFS_Capabilities"]["FeatureTypeList"]
         except KeyError:
             return capabilities
 
+    def iter_wfs_layers(self, workspace_name: str) -> Iterator[LayerRecord]:
+        """
+        Stream the WFS capabilities of a workspace and lazily yield a record per feature type
+        """
+        params: dict[str, str] = {
+            "service": "WFS",
+            "version": "1.1.0",
+            "request": "GetCapabilities",
+        }
+        with self.rest_client.get(
+            self.ows_endpoints.workspace_wfs(workspace_name), params=params, stream=True
+        ) as response:
+            if response.status_code == 404:
+                return
+            response.raw.decode_content = True
+            yield from read_wfs_layers(response.raw)
+
     def get_feature(
         self,
         workspace_name: str,
@@ -143,6 +476,117 @@ class OwsService:
         except JSONDecodeError:
             return response.content.decode()
 
+    def iter_features(
+        self,
+        workspace_name: str,
+        type_name: str,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        bbox: tuple[float, float, float, float] | None = None,
+        bbox_crs: str | None = None,
+        cql_filter: str | None = None,
+        sort_by: str | None = None,
+        prefetch: int = 0,
+    ) -> Iterator[dict[str, Any]]:
+        """
+        Lazily yield the GeoJSON features of a feature type, requesting them page by page with
+        WFS 2.0 startIndex/count paging. Each page is parsed incrementally. The next page starts
+        after the features actually returned, which may be fewer than page_size if GeoServer
+        caps the number of features, and the iteration stops on an empty page. With
+        prefetch > 0, up to that many following pages are requested concurrently while a page
+        is consumed.
+        """
+        if page_size < 1:
+            raise ValueError("page_size must be at least 1")
+        if bbox and cql_filter:
+            raise ValueError(
+                "bbox and cql_filter cannot be combined, use BBOX() in cql_filter"
+            )
+        path: str = self.ows_endpoints.workspace_wfs(workspace_name)
+        params: dict[str, str] = {
+            "service": "WFS",
+            "version": "2.0.0",
+            "request": "GetFeature",
+            "typeNames": type_name,
+            "outputFormat": "application/json",
+            "count": str(page_size),
+        }
+        if bbox:
+            params["bbox"] = ",".join(
+                str(value) for value in (*bbox, bbox_crs) if value
+            )
+        if cql_filter:
+            params["cql_filter"] = cql_filter
+        if sort_by:
+            params["sortBy"] = sort_by
+
+        def page_params(start_index: int) -> dict[str, str]:
+            return {**params, "startIndex": str(start_index)}
+
+        # GeoServer caps count to the maxFeatures of the layer or service, so that a page may
+        # be shorter than page_size: page on the number of features actually returned
+        if prefetch < 1:
+            start_index = 0
+            while True:
+                received = 0
+                for feature in self._stream_features(path, page_params(start_index)):
+                    received += 1
+                    yield feature
+                if not received:
+                    return
+                start_index += received
+
+        features = self._get_features_page(path, page_params(0))
+        yield from features
+        step = len(features)
+        if not step:
+            return
+        with ThreadPoolExecutor(
+            max_workers=prefetch, thread_name_prefix="geoservercloud"
+        ) as executor:
+            pages: deque[tuple[int, Future[list[dict[str, Any]]]]] = deque()
+            next_index: int = step
+            try:
+                while True:
+                    while len(pages) < prefetch:
+                        pages.append(
+                            (
+                                next_index,
+                                executor.submit(
+                                    self._get_features_page,
+                                    path,
+                                    page_params(next_index),
+                                ),
+                            )
+                        )
+                        next_index += step
+                    start_index, future = pages.popleft()
+                    features = future.result()
+                    if not features:
+                        return
+                    yield from features
+                    if len(features) < step:
+                        # The pages prefetched after a short page start at the wrong index
+                        for _, pending in pages:
+                            pending.cancel()
+                        pages.clear()
+                        next_index = start_index + len(features)
+            finally:
+                for _, pending in pages:
+                    pending.cancel()
+
+    def _stream_features(
+        self, path: str, params: dict[str, str]
+    ) -> Iterator[dict[str, Any]]:
+        with self.rest_client.get(path, params=params, stream=True) as response:
+            if response.status_code == 404:
+                raise ValueError(f"WFS endpoint not found: {path}")
+            yield from read_features(response.iter_content(chunk_size=CHUNK_SIZE))
+
+    def _get_features_page(
+        self, path: str, params: dict[str, str]
+    ) -> list[dict[str, Any]]:
+        return list(self._stream_features(path, params))
+
     def describe_feature_type(
         self,
         workspace_name: str | None = None,
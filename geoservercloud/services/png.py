@@ -0,0 +1,229 @@
+import struct
+import zlib
+from collections.abc import Iterator
+from io import BytesIO
+from typing import IO
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover - NumPy is optional
+    numpy = None  # type: ignore[assignment]
+
+try:
+    from PIL import Image
+except ImportError:  # pragma: no cover - Pillow is optional
+    Image = None  # type: ignore[assignment]
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+# Bytes per pixel of the supported 8-bit color types
+BYTES_PER_PIXEL: dict[int, int] = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}
+
+
+class PngImage:
+    """
+    Decoded 8-bit PNG image, converted to RGBA
+
+    Pillow is used to decode the image if it is installed. Otherwise, the image is decoded in
+    Python, sped up by NumPy if it is installed, and only non-interlaced images with a bit
+    depth of 8 are supported, which covers the PNG output of GeoServer.
+
+    Attributes
+    ----------
+    width : int
+        width in pixels
+    height : int
+        height in pixels
+    rows : list[bytes]
+        RGBA scanlines, without filter byte
+    """
+
+    def __init__(self, width: int, height: int, rows: list[bytes]) -> None:
+        self.width: int = width
+        self.height: int = height
+        self.rows: list[bytes] = rows
+
+    @classmethod
+    def decode(cls, data: bytes) -> "PngImage":
+        if not data.startswith(PNG_SIGNATURE):
+            raise ValueError(f"Not a PNG image: {data[:200]!r}")
+        if Image is not None:
+            return cls._decode_pillow(data)
+        header: bytes = b""
+        palette: bytes = b""
+        transparency: bytes = b""
+        compressed: list[bytes] = []
+        for chunk_type, chunk_data in _read_chunks(data):
+            if chunk_type == b"IHDR":
+                header = chunk_data
+            elif chunk_type == b"PLTE":
+                palette = chunk_data
+            elif chunk_type == b"tRNS":
+                transparency = chunk_data
+            elif chunk_type == b"IDAT":
+                compressed.append(chunk_data)
+        width, height, bit_depth, color_type, _, _, interlace = struct.unpack(
+            ">IIBBBBB", header
+        )
+        if bit_depth != 8 or color_type not in BYTES_PER_PIXEL or interlace:
+            raise ValueError(
+                f"Unsupported PNG: bit depth {bit_depth}, color type {color_type}, "
+                f"interlace {interlace}"
+            )
+        bpp = BYTES_PER_PIXEL[color_type]
+        palette_tables = (
+            _palette_tables(palette, transparency) if color_type == 3 else []
+        )
+        raw = zlib.decompress(b"".join(compressed))
+        stride = width * bpp
+        rows: list[bytes] = []
+        previous = bytes(stride)
+        for y in range(height):
+            start = y * (stride + 1)
+            row = _unfilter(
+                raw[start], raw[start + 1 : start + 1 + stride], previous, bpp
+            )
+            rows.append(_to_rgba(row, color_type, palette_tables))
+            previous = row
+        return cls(width, height, rows)
+
+    @classmethod
+    def _decode_pillow(cls, data: bytes) -> "PngImage":
+        try:
+            with Image.open(BytesIO(data), formats=["PNG"]) as image:
+                pixels: bytes = image.convert("RGBA").tobytes()
+                width, height = image.size
+        except (OSError, SyntaxError) as error:
+            raise ValueError(f"Invalid PNG image: {error}") from error
+        stride = width * 4
+        return cls(
+            width,
+            height,
+            [pixels[y * stride : (y + 1) * stride] for y in range(height)],
+        )
+
+
+class PngWriter:
+    """
+    Write an 8-bit RGBA PNG image row by row, compressing it on the fly
+    """
+
+    def __init__(self, file: IO[bytes], width: int, height: int) -> None:
+        self.file: IO[bytes] = file
+        self.width: int = width
+        self.height: int = height
+        self.rows_written: int = 0
+        self.compressor = zlib.compressobj(6)
+        self.file.write(PNG_SIGNATURE)
+        self._write_chunk(
+            b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0)
+        )
+
+    def write_row(self, row: bytes) -> None:
+        if len(row) != self.width * 4:
+            raise ValueError(f"Row of {len(row)} bytes for a width of {self.width}")
+        # Filter type 0 (None)
+        data = self.compressor.compress(b"\x00" + row)
+        if data:
+            self._write_chunk(b"IDAT", data)
+        self.rows_written += 1
+
+    def close(self) -> None:
+        if self.rows_written != self.height:
+            raise ValueError(f"{self.rows_written} rows written out of {self.height}")
+        self._write_chunk(b"IDAT", self.compressor.flush())
+        self._write_chunk(b"IEND", b"")
+
+    def _write_chunk(self, chunk_type: bytes, data: bytes) -> None:
+        self.file.write(struct.pack(">I", len(data)))
+        self.file.write(chunk_type)
+        self.file.write(data)
+        self.file.write(struct.pack(">I", zlib.crc32(chunk_type + data)))
+
+
+def _read_chunks(data: bytes) -> Iterator[tuple[bytes, bytes]]:
+    position = len(PNG_SIGNATURE)
+    while position + 8 <= len(data):
+        (length,) = struct.unpack(">I", data[position : position + 4])
+        chunk_type = data[position + 4 : position + 8]
+        yield chunk_type, data[position + 8 : position + 8 + length]
+        if chunk_type == b"IEND":
+            return
+        position += 12 + length
+
+
+def _unfilter(filter_type: int, row: bytes, previous: bytes, bpp: int) -> bytes:
+    if filter_type == 0:
+        return row
+    if numpy is not None and filter_type in (1, 2):
+        return _unfilter_numpy(filter_type, row, previous, bpp)
+    current = bytearray(row)
+    length = len(current)
+    if filter_type == 1:  # Sub
+        for i in range(bpp, length):
+            current[i] = (current[i] + current[i - bpp]) & 0xFF
+    elif filter_type == 2:  # Up
+        for i in range(length):
+            current[i] = (current[i] + previous[i]) & 0xFF
+    elif filter_type == 3:  # Average
+        for i in range(length):
+            left = current[i - bpp] if i >= bpp else 0
+            current[i] = (current[i] + ((left + previous[i]) >> 1)) & 0xFF
+    elif filter_type == 4:  # Paeth
+        for i in range(length):
+            left = current[i - bpp] if i >= bpp else 0
+            up = previous[i]
+            up_left = previous[i - bpp] if i >= bpp else 0
+            estimate = left + up - up_left
+            distance_left = abs(estimate - left)
+            distance_up = abs(estimate - up)
+            distance_up_left = abs(estimate - up_left)
+            if distance_left <= distance_up and distance_left <= distance_up_left:
+                predictor = left
+            elif distance_up <= distance_up_left:
+                predictor = up
+            else:
+                predictor = up_left
+            current[i] = (current[i] + predictor) & 0xFF
+    else:
+        raise ValueError(f"Invalid PNG filter type: {filter_type}")
+    return bytes(current)
+
+
+def _unfilter_numpy(filter_type: int, row: bytes, previous: bytes, bpp: int) -> bytes:
+    current = numpy.frombuffer(row, dtype=numpy.uint8)
+    if filter_type == 1:
+        # Running sum per channel, wrapping around at 256
+        return current.reshape(-1, bpp).cumsum(axis=0, dtype=numpy.uint8).tobytes()
+    return (current + numpy.frombuffer(previous, dtype=numpy.uint8)).tobytes()
+
+
+def _palette_tables(palette: bytes, transparency: bytes) -> list[bytes]:
+    """
+    Return one 256-byte translation table per RGBA channel, mapping palette indices to values
+    """
+    palette = palette[:768].ljust(768, b"\x00")
+    alphas = transparency[:256].ljust(256, b"\xff")
+    return [palette[0::3], palette[1::3], palette[2::3], alphas]
+
+
+def _to_rgba(row: bytes, color_type: int, palette_tables: list[bytes]) -> bytes:
+    if color_type == 6:
+        return row
+    if color_type == 3:
+        return _interleave(*(row.translate(table) for table in palette_tables))
+    if color_type == 2:
+        pixels = len(row) // 3
+        return _interleave(row[0::3], row[1::3], row[2::3], b"\xff" * pixels)
+    if color_type == 4:
+        gray = row[0::2]
+        return _interleave(gray, gray, gray, row[1::2])
+    return _interleave(row, row, row, b"\xff" * len(row))
+
+
+def _interleave(red: bytes, green: bytes, blue: bytes, alpha: bytes) -> bytes:
+    rgba = bytearray(len(red) * 4)
+    rgba[0::4] = red
+    rgba[1::4] = green
+    rgba[2::4] = blue
+    rgba[3::4] = alpha
+    return bytes(rgba)
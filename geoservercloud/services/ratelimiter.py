@@ -0,0 +1,172 @@
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from time import monotonic, sleep
+
+READ_METHODS: frozenset[str] = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket allowing ``rate`` requests per second on average and bursts of
+    up to ``burst`` requests. Each caller reserves a token, possibly ahead of time, and sleeps
+    until it is due, so that waiting callers are served in order.
+    """
+
+    def __init__(self, rate: float, burst: float | None = None) -> None:
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate: float = rate
+        self.burst: float = burst if burst is not None else max(rate, 1.0)
+        if self.burst < 1:
+            raise ValueError("burst must be at least 1")
+        self.tokens: float = self.burst
+        self.updated: float = monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """
+        Take a token and return the time to wait in seconds before using it
+        """
+        with self._lock:
+            now = monotonic()
+            self.tokens = min(
+                self.burst, self.tokens + (now - self.updated) * self.rate
+            )
+            self.updated = now
+            self.tokens -= 1
+            return -self.tokens / self.rate if self.tokens < 0 else 0.0
+
+    def acquire(self) -> float:
+        """
+        Wait for a token, return the time waited in seconds
+        """
+        wait = self.reserve()
+        if wait > 0:
+            sleep(wait)
+        return wait
+
+
+class RequestLimiter:
+    """
+    Rate and concurrency limits of a class of requests
+
+    Attributes
+    ----------
+    bucket : TokenBucket | None
+        token bucket limiting the request rate, None for no rate limit
+    max_in_flight : int | None
+        maximum number of requests awaiting their response, None for no limit
+    requests : int
+        number of requests which went through the limiter
+    wait_time : float
+        cumulated time spent waiting for the limits, in seconds
+    """
+
+    def __init__(
+        self,
+        rate: float | None = None,
+        burst: float | None = None,
+        max_in_flight: int | None = None,
+    ) -> None:
+        if max_in_flight is not None and max_in_flight < 1:
+            raise ValueError("max_in_flight must be at least 1")
+        self.bucket: TokenBucket | None = (
+            TokenBucket(rate, burst) if rate is not None else None
+        )
+        self.max_in_flight: int | None = max_in_flight
+        self.requests: int = 0
+        self.wait_time: float = 0.0
+        self._semaphore: threading.BoundedSemaphore | None = (
+            threading.BoundedSemaphore(max_in_flight)
+            if max_in_flight is not None
+            else None
+        )
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def limit(self) -> Iterator[None]:
+        """
+        Wait for a token and a free slot, and hold the slot while the block runs
+        """
+        start = monotonic()
+        if self.bucket is not None:
+            self.bucket.acquire()
+        if self._semaphore is not None:
+            self._semaphore.acquire()
+        with self._lock:
+            self.requests += 1
+            self.wait_time += monotonic() - start
+        try:
+            yield
+        finally:
+            if self._semaphore is not None:
+                self._semaphore.release()
+
+
+class RateLimiter:
+    """
+    Client-side limits of the requests sent to a GeoServer cluster, configured separately for
+    REST reads (GET, HEAD), REST writes and OGC (OWS) requests. A limiter is thread-safe and can
+    be shared by several clients targeting the same cluster, which then share the limits.
+
+    The in-flight slot of a streamed response is released when its headers are received.
+
+    Attributes
+    ----------
+    reads : RequestLimiter | None
+        limits of the REST read requests, None for no limit
+    writes : RequestLimiter | None
+        limits of the REST write requests (POST, PUT, DELETE), None for no limit
+    ows : RequestLimiter | None
+        limits of the OGC requests, e.g. WMS GetMap or WFS GetFeature, None for no limit
+
+    :Example:
+
+    >>> limiter = RateLimiter(
+    ...     reads=RequestLimiter(rate=50, max_in_flight=16),
+    ...     writes=RequestLimiter(rate=10, max_in_flight=4),
+    ... )
+    >>> geoserver1 = GeoServerCloud(url, rate_limiter=limiter)
+    >>> geoserver2 = GeoServerCloud(url, rate_limiter=limiter)
+    """
+
+    def __init__(
+        self,
+        reads: RequestLimiter | None = None,
+        writes: RequestLimiter | None = None,
+        ows: RequestLimiter | None = None,
+    ) -> None:
+        self.reads: RequestLimiter | None = reads
+        self.writes: RequestLimiter | None = writes
+        self.ows: RequestLimiter | None = ows
+
+    def limiter(self, method: str, path: str) -> RequestLimiter | None:
+        """Limits applying to a request"""
+        if "/rest/" not in path and not path.endswith("/rest"):
+            return self.ows
+        return self.reads if method in READ_METHODS else self.writes
+
+    @contextmanager
+    def limit(self, method: str, path: str) -> Iterator[None]:
+        """
+        Wait until a request may be sent, and count it as in flight while the block runs
+        """
+        limiter = self.limiter(method, path)
+        if limiter is None:
+            yield
+            return
+        with limiter.limit():
+            yield
+
+    def stats(self) -> dict[str, dict[str, float]]:
+        """Number of requests and time waited per class of requests"""
+        return {
+            name: {"requests": limiter.requests, "wait_time": limiter.wait_time}
+            for name, limiter in (
+                ("reads", self.reads),
+                ("writes", self.writes),
+                ("ows", self.ows),
+            )
+            if limiter is not None
+        }
@@ -1,10 +1,55 @@
-from typing import Any
+import mmap
+from collections.abc import Callable, Iterable
+from functools import partial
+from time import perf_counter, sleep
+from typing import IO, Any
 
 import requests
 
+from .catalogcache import CatalogCache, ValidatorCache
+from .instrumentation import (
+    ConnectTimer,
+    RequestEvent,
+    RequestObserver,
+    TimedHTTPAdapter,
+    path_template,
+)
+from .ratelimiter import RateLimiter
 from .restlogger import gs_logger
+from .retrypolicy import RetryPolicy, current_retry_policy
+from .tracing import Tracer
 
 TIMEOUT = 120
+DEFAULT_POOL_CONNECTIONS = 10
+DEFAULT_POOL_MAXSIZE = 10
+# Status reported for requests which failed without an HTTP response (e.g. connection errors)
+NO_RESPONSE_STATUS = 599
+# Request body sent as is, or streamed from a binary file, a memory map or an iterator of chunks
+RequestBody = bytes | str | IO[bytes] | mmap.mmap | Iterable[bytes]
+
+
+def create_session(
+    pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+    pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+    pool_block: bool = False,
+) -> requests.Session:
+    """
+    Create a requests session with a keep-alive connection pool mounted for HTTP and HTTPS
+
+    :param pool_connections: Number of per-host connection pools to cache
+    :param pool_maxsize: Maximum number of connections kept alive per host
+    :param pool_block: Whether to wait for a free connection when the pool is exhausted
+        instead of opening a throw-away connection
+    """
+    session = requests.Session()
+    adapter = TimedHTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        pool_block=pool_block,
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
 
 
 class RestClient:
@@ -17,31 +62,134 @@ class RestClient:
         base GeoServer URL
     auth : tuple[str, str]
         username and password for GeoServer
+    session : requests.Session
+        long-lived session holding the keep-alive connection pool, shared by all requests
+    cache : CatalogCache | None
+        optional read-through cache of catalog GET responses, invalidated by the writes of this client
+    validator_cache : ValidatorCache | None
+        optional store of responses carrying an ETag or Last-Modified header, revalidated with
+        conditional GET requests and reused when GeoServer answers 304 Not Modified
+    observers : list[RequestObserver]
+        observers notified around every request, e.g. a
+        :py:class:`geoservercloud.services.instrumentation.MetricsAggregator`
+    tracer : Tracer
+        tracer opening a span around every request and propagating it in the request headers,
+        a no-op :py:class:`geoservercloud.services.tracing.Tracer` by default
+    retry_policy : RetryPolicy | None
+        policy retrying the requests which failed with a transient error, None to never retry.
+        It can be overridden per call or with :py:func:`geoservercloud.services.retrypolicy.retrying`
+    rate_limiter : RateLimiter | None
+        optional limits of the request rate and of the number of requests in flight, possibly
+        shared with other clients. Each retry counts as a new request.
     """
 
-    def __init__(self, url: str, auth: tuple[str, str], verifytls: bool = True) -> None:
+    def __init__(
+        self,
+        url: str,
+        auth: tuple[str, str],
+        verifytls: bool = True,
+        session: requests.Session | None = None,
+        pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+        cache: CatalogCache | None = None,
+        validator_cache: ValidatorCache | None = None,
+        observers: list[RequestObserver] | None = None,
+        tracer: Tracer | None = None,
+        retry_policy: RetryPolicy | None = None,
+        rate_limiter: RateLimiter | None = None,
+    ) -> None:
         self.url: str = url
         self.auth: tuple[str, str] = auth
         self.verifytls: bool = verifytls
+        self.session: requests.Session = session or create_session(
+            pool_maxsize=pool_maxsize
+        )
+        self.cache: CatalogCache | None = cache
+        self.validator_cache: ValidatorCache | None = validator_cache
+        self.observers: list[RequestObserver] = list(observers or [])
+        self.tracer: Tracer = tracer or Tracer()
+        self.retry_policy: RetryPolicy | None = retry_policy
+        self.rate_limiter: RateLimiter | None = rate_limiter
+
+    def add_observer(self, observer: RequestObserver) -> None:
+        self.observers.append(observer)
+
+    def remove_observer(self, observer: RequestObserver) -> None:
+        self.observers.remove(observer)
+
+    def close(self) -> None:
+        """Close the pooled connections"""
+        self.session.close()
 
     def get(
         self,
         path: str,
         params: dict[str, str] | None = None,
         headers: dict[str, str] | None = None,
+        stream: bool = False,
+        retry_policy: RetryPolicy | None = None,
     ) -> requests.Response:
+        """
+        GET request. With stream=True, the body is not downloaded up front and must be read
+        from the response (e.g. response.raw or iter_content) before closing it; the caches
+        are bypassed in that case.
+        """
         full_url = f"{self.url}{path}"
+        cache: CatalogCache | None = (
+            self.cache
+            if self.cache is not None and not stream and self.cache.cacheable(path)
+            else None
+        )
+        if cache is not None:
+            cached_response = cache.get(path, params, headers)
+            if cached_response is not None:
+                gs_logger.debug("Using cached response for: %s", full_url)
+                return cached_response
         gs_logger.debug("Doing GET request to: %s", full_url)
-        response: requests.Response = requests.get(
+        request_headers: dict[str, str] | None = headers
+        validator_cache: ValidatorCache | None = (
+            None if stream else self.validator_cache
+        )
+        if validator_cache is not None:
+            request_headers = validator_cache.conditional_headers(path, params, headers)
+        response: requests.Response = self.send(
+            "GET",
+            path,
+            params=params,
+            headers=request_headers,
+            stream=stream,
+            retry_policy=retry_policy,
+        )
+        gs_logger.info(
+            "[GET] (%s) - %s",
+            response.status_code,
             full_url,
+            extra={"response": response},
+        )
+        if response.status_code != 404:
+            response.raise_for_status()
+        if validator_cache is not None:
+            response = validator_cache.resolve(path, response, params, headers)
+        if cache is not None:
+            cache.put(path, response, params, headers)
+        return response
+
+    def head(
+        self,
+        path: str,
+        params: dict[str, str] | None = None,
+        headers: dict[str, str] | None = None,
+        retry_policy: RetryPolicy | None = None,
+    ) -> requests.Response:
+        full_url = f"{self.url}{path}"
+        response: requests.Response = self.send(
+            "HEAD",
+            path,
             params=params,
             headers=headers,
-            auth=self.auth,
-            timeout=TIMEOUT,
-            verify=self.verifytls,
+            retry_policy=retry_policy,
         )
         gs_logger.info(
-            "[GET] (%s) - %s",
+            "[HEAD] (%s) - %s",
             response.status_code,
             full_url,
             extra={"response": response},
@@ -56,19 +204,19 @@ class RestClient:
         params: dict[str, str] | None = None,
         headers: dict[str, str] | None = None,
         json: dict[str, dict[str, Any] | Any] | None = None,
-        data: bytes | str | None = None,
+        data: RequestBody | None = None,
+        retry_policy: RetryPolicy | None = None,
     ) -> requests.Response:
         full_url = f"{self.url}{path}"
         self.log_payload("POST", json, data)
-        response: requests.Response = requests.post(
-            full_url,
+        response: requests.Response = self.send(
+            "POST",
+            path,
             params=params,
             headers=headers,
             json=json,
             data=data,
-            auth=self.auth,
-            timeout=TIMEOUT,
-            verify=self.verifytls,
+            retry_policy=retry_policy,
         )
         gs_logger.info(
             "[POST] (%s) - %s",
@@ -76,6 +224,7 @@ class RestClient:
             full_url,
             extra={"response": response},
         )
+        self.invalidate_cache(path)
         if response.status_code != 409:
             response.raise_for_status()
         return response
@@ -86,19 +235,19 @@ class RestClient:
         params: dict[str, str] | None = None,
         headers: dict[str, str] | None = None,
         json: dict[str, dict[str, Any] | Any] | None = None,
-        data: bytes | str | None = None,
+        data: RequestBody | None = None,
+        retry_policy: RetryPolicy | None = None,
     ) -> requests.Response:
         full_url = f"{self.url}{path}"
         self.log_payload("PUT", json, data)
-        response: requests.Response = requests.put(
-            full_url,
+        response: requests.Response = self.send(
+            "PUT",
+            path,
             params=params,
             headers=headers,
             json=json,
             data=data,
-            auth=self.auth,
-            timeout=TIMEOUT,
-            verify=self.verifytls,
+            retry_policy=retry_policy,
         )
         gs_logger.info(
             "[PUT] (%s) - %s",
@@ -106,6 +255,7 @@ class RestClient:
             full_url,
             extra={"response": response},
         )
+        self.invalidate_cache(path)
         response.raise_for_status()
         return response
 
@@ -114,15 +264,15 @@ class RestClient:
         path: str,
         params: dict[str, str] | None = None,
         headers: dict[str, str] | None = None,
+        retry_policy: RetryPolicy | None = None,
     ) -> requests.Response:
         full_url = f"{self.url}{path}"
-        response: requests.Response = requests.delete(
-            full_url,
+        response: requests.Response = self.send(
+            "DELETE",
+            path,
             params=params,
             headers=headers,
-            auth=self.auth,
-            timeout=TIMEOUT,
-            verify=self.verifytls,
+            retry_policy=retry_policy,
         )
         gs_logger.info(
             "[DELETE] (%s) - %s",
@@ -130,12 +280,195 @@ class RestClient:
             full_url,
             extra={"response": response},
         )
+        self.invalidate_cache(path)
         if response.status_code != 404:
             response.raise_for_status()
         return response
 
+    def send(
+        self,
+        method: str,
+        path: str,
+        params: dict[str, str] | None = None,
+        stream: bool = False,
+        **kwargs: Any,
+    ) -> requests.Response:
+        """
+        Send a request through the session in a tracing span and notify the observers
+        """
+        # HEAD requests are not redirected, like with requests.head
+        kwargs.setdefault("allow_redirects", method != "HEAD")
+        if not self.tracer.enabled:
+            return self.transmit(method, path, params, stream, **kwargs)
+        template = path_template(path, params)
+        with self.tracer.start_span(
+            f"HTTP {method}",
+            {
+                "http.request.method": method,
+                "url.full": f"{self.url}{path}",
+                "url.template": template,
+            },
+        ) as span:
+            headers = dict(kwargs.get("headers") or {})
+            self.tracer.inject(headers)
+            kwargs["headers"] = headers
+            response = self.transmit(method, path, params, stream, **kwargs)
+            span.set_attribute("http.response.status_code", response.status_code)
+            return response
+
+    def transmit(
+        self,
+        method: str,
+        path: str,
+        params: dict[str, str] | None = None,
+        stream: bool = False,
+        retry_policy: RetryPolicy | None = None,
+        **kwargs: Any,
+    ) -> requests.Response:
+        """
+        Send a request, and send it again after a transient error as allowed by the retry policy:
+        the one given, else the one of the enclosing :py:func:`retrying` block, else the one of
+        the client. Bodies which cannot be replayed (file objects, iterators) are never retried.
+        """
+        policy = retry_policy or current_retry_policy() or self.retry_policy
+        data = kwargs.get("data")
+        if policy is not None and not replayable(data):
+            policy = None
+        retries = 0
+        while True:
+            if isinstance(data, mmap.mmap):
+                # Memory-mapped files are read from their current position when sent
+                data.seek(0)
+            try:
+                if self.rate_limiter is None:
+                    response = self.attempt(
+                        method, path, params, stream, retries, **kwargs
+                    )
+                else:
+                    with self.rate_limiter.limit(method, path):
+                        response = self.attempt(
+                            method, path, params, stream, retries, **kwargs
+                        )
+            except requests.RequestException as error:
+                if policy is None or not policy.should_retry(
+                    method, retries, error=error
+                ):
+                    raise
+                reason = repr(error)
+                delay = policy.delay(retries)
+            else:
+                if policy is None or not policy.should_retry(
+                    method, retries, response=response
+                ):
+                    return response
+                reason = f"status {response.status_code}"
+                delay = policy.delay(retries, response)
+                response.close()
+            retries += 1
+            gs_logger.warning(
+                "[%s] %s%s failed with %s, retry %s of %s in %.2f s",
+                method,
+                self.url,
+                path,
+                reason,
+                retries,
+                policy.max_retries,
+                delay,
+            )
+            sleep(delay)
+
+    def attempt(
+        self,
+        method: str,
+        path: str,
+        params: dict[str, str] | None = None,
+        stream: bool = False,
+        retries: int = 0,
+        **kwargs: Any,
+    ) -> requests.Response:
+        """
+        Send a request through the session once and notify the observers
+        """
+        full_url = f"{self.url}{path}"
+        request = partial(
+            self.session.request,
+            method,
+            full_url,
+            params=params,
+            stream=stream,
+            auth=self.auth,
+            timeout=TIMEOUT,
+            verify=self.verifytls,
+            **kwargs,
+        )
+        if not self.observers:
+            return request()
+        self.call_observers(lambda observer: observer.request_started(method, full_url))
+        template = path_template(path, params)
+        ConnectTimer.reset()
+        start = perf_counter()
+        try:
+            response: requests.Response = request()
+        except requests.RequestException as error:
+            self.notify(
+                RequestEvent(
+                    method=method,
+                    url=full_url,
+                    path_template=template,
+                    status_code=NO_RESPONSE_STATUS,
+                    bytes_sent=body_size(kwargs.get("data")),
+                    bytes_received=0,
+                    connect_time=ConnectTimer.elapsed(),
+                    dns_time=ConnectTimer.dns_elapsed(),
+                    elapsed=0.0,
+                    total_time=perf_counter() - start,
+                    retries=retries,
+                    error=repr(error),
+                )
+            )
+            raise
+        self.notify(
+            RequestEvent(
+                method=method,
+                url=full_url,
+                path_template=template,
+                status_code=response.status_code,
+                bytes_sent=body_size(response.request.body),
+                bytes_received=(
+                    int(response.headers.get("Content-Length") or 0)
+                    if stream
+                    else len(response.content)
+                ),
+                connect_time=ConnectTimer.elapsed(),
+                dns_time=ConnectTimer.dns_elapsed(),
+                elapsed=response.elapsed.total_seconds(),
+                total_time=perf_counter() - start,
+                retries=retries,
+            )
+        )
+        return response
+
+    def notify(self, event: RequestEvent) -> None:
+        self.call_observers(lambda observer: observer.request_finished(event))
+
+    def notify_concurrency(self, name: str, limit: int) -> None:
+        self.call_observers(lambda observer: observer.concurrency_changed(name, limit))
+
+    def call_observers(self, call: Callable[[RequestObserver], None]) -> None:
+        for observer in self.observers:
+            try:
+                call(observer)
+            except Exception:
+                # A faulty observer must not break the request
+                gs_logger.exception("Request observer %s failed", observer)
+
+    def invalidate_cache(self, path: str) -> None:
+        """Drop the cached responses made outdated by a write to path"""
+        if self.cache is not None:
+            self.cache.invalidate(path)
+
     def log_payload(
-        self, method: str, json: dict | None, data: bytes | str | None
+        self, method: str, json: dict | None, data: RequestBody | None
     ) -> None:
         payload_string = None
         if json is not None:
@@ -143,6 +476,25 @@ class RestClient:
         elif data is not None:
             if isinstance(data, str):
                 payload_string = data
-            else:
+            elif isinstance(data, (bytes, bytearray, mmap.mmap)):
                 payload_string = f"<binary data, {len(data)} bytes>"
+            else:
+                payload_string = "<streamed binary data>"
         gs_logger.debug("Doing %s request with payload: %s", method, payload_string)
+
+
+def body_size(body: Any) -> int:
+    """Size of a request body, 0 if it is streamed from a file or an iterator"""
+    if isinstance(body, str):
+        return len(body.encode())
+    if isinstance(body, (bytes, bytearray, mmap.mmap)):
+        return len(body)
+    return 0
+
+
+def replayable(body: Any) -> bool:
+    """
+    Whether a request body can be sent again, i.e. it is not consumed by sending it or, for
+    memory-mapped files, it can be rewound
+    """
+    return body is None or isinstance(body, (str, bytes, bytearray, dict, mmap.mmap))
@@ -1,9 +1,16 @@
+import mmap
+import threading
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import AbstractContextManager
+from enum import Enum
 from json import JSONDecodeError
 from pathlib import Path
-from typing import Any
+from time import perf_counter
+from typing import IO, Any, TypeVar
 
 from owslib.wmts import WebMapTileService
-from requests import Response
+from requests import HTTPError, RequestException, Response
+from requests.structures import CaseInsensitiveDict
 
 from geoservercloud.models.common import BaseModel
 from geoservercloud.models.coverage import Coverage
@@ -27,10 +34,68 @@ from geoservercloud.models.wmsstore import WmsStore
 from geoservercloud.models.wmtsstore import WmtsStore
 from geoservercloud.models.workspace import Workspace
 from geoservercloud.models.workspaces import Workspaces
-from geoservercloud.services.restclient import RestClient
+from geoservercloud.parallel import map_concurrently
+from geoservercloud.services.concurrency import AdaptiveConcurrency
+from geoservercloud.services.restclient import (
+    NO_RESPONSE_STATUS,
+    RequestBody,
+    RestClient,
+)
+from geoservercloud.services.tracing import Span, traced
 from geoservercloud.templates import Templates
 
+CHUNK_SIZE = 64 * 1024
 
+T = TypeVar("T")
+
+
+class UpsertStrategy(Enum):
+    """
+    How create methods find out whether a resource must be created (POST) or updated (PUT)
+
+    PROBE: GET the resource first (two requests per resource)
+    HEAD: HEAD the resource first, saving the transfer of the response body
+    OPTIMISTIC: POST and fall back to PUT if GeoServer answers that the resource already exists,
+        with 409 Conflict or, for stores, feature types and styles, with a 500 or 403 error
+        reporting that it "already exists" (one request per new resource)
+    INDEX: list the parent collection once and look names up in the listing
+        (one request per new resource plus one per collection)
+    """
+
+    PROBE = "probe"
+    HEAD = "head"
+    OPTIMISTIC = "optimistic"
+    INDEX = "index"
+
+
+class ResponseChunks(Iterator[bytes]):
+    """
+    Body of a streamed response by chunks. The response is closed, releasing its connection,
+    once the chunks are consumed or when closed explicitly, e.g. if their consumer fails.
+    """
+
+    def __init__(self, response: Response, chunk_size: int = CHUNK_SIZE) -> None:
+        self.response: Response = response
+        self.chunks: Iterator[bytes] = response.iter_content(chunk_size=chunk_size)
+
+    def __next__(self) -> bytes:
+        try:
+            return next(self.chunks)
+        except StopIteration:
+            self.close()
+            raise
+
+    def close(self) -> None:
+        self.response.close()
+
+    def __enter__(self) -> "ResponseChunks":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+@traced("RestService")
 class RestService:
     """
     Service responsible for serializing and deserializing payloads and routing requests to GeoServer REST API
@@ -41,12 +106,31 @@ class RestService:
         base GeoServer URL
     auth : tuple[str, str]
         username and password for GeoServer
+    rest_client : RestClient
+        HTTP client, may be shared with other services to reuse its connection pool
+    upsert_strategy : UpsertStrategy | None
+        strategy used by create methods to choose between POST and PUT, or None to use
+        each method's default (optimistic for workspaces, probe otherwise)
+    catalog_index : dict[str, set[str]]
+        names of the resources in each collection listed by the INDEX upsert strategy
     """
 
-    def __init__(self, url: str, auth: tuple[str, str], verifytls: bool = True) -> None:
+    def __init__(
+        self,
+        url: str,
+        auth: tuple[str, str],
+        verifytls: bool = True,
+        rest_client: RestClient | None = None,
+        upsert_strategy: UpsertStrategy | str | None = None,
+    ) -> None:
         self.url: str = url
         self.auth: tuple[str, str] = auth
-        self.rest_client = RestClient(url, auth, verifytls)
+        self.rest_client: RestClient = rest_client or RestClient(url, auth, verifytls)
+        self.upsert_strategy: UpsertStrategy | None = (
+            UpsertStrategy(upsert_strategy) if upsert_strategy else None
+        )
+        self.catalog_index: dict[str, set[str]] = {}
+        self._catalog_index_lock = threading.Lock()
         self.acl_endpoints = self.AclEndpoints()
         self.gwc_endpoints = self.GwcEndpoints()
         self.rest_endpoints = self.RestEndpoints()
@@ -81,16 +165,26 @@ class RestService:
 
     def create_workspace(self, workspace: Workspace) -> tuple[str, int]:
         path: str = self.rest_endpoints.workspaces()
-        response: Response = self.rest_client.post(path, json=workspace.post_payload())
-        if response.status_code == 409:
-            path = self.rest_endpoints.workspace(workspace.name)
-            response = self.rest_client.put(path, json=workspace.put_payload())
+        resource_path: str = self.rest_endpoints.workspace(workspace.name)
+        response: Response = self.upsert(
+            workspace.name,
+            path,
+            resource_path,
+            post=lambda: self.rest_client.post(
+                path, json=self._serialize(workspace.post_payload)
+            ),
+            put=lambda: self.rest_client.put(
+                resource_path, json=self._serialize(workspace.put_payload)
+            ),
+            default_strategy=UpsertStrategy.OPTIMISTIC,
+        )
         return response.content.decode(), response.status_code
 
     def delete_workspace(self, workspace: Workspace) -> tuple[str, int]:
         path: str = self.rest_endpoints.workspace(workspace.name)
         params: dict[str, str] = {"recurse": "true"}
         response: Response = self.rest_client.delete(path, params=params)
+        self.clear_catalog_index()
         return response.content.decode(), response.status_code
 
     def get_workspace_wms_settings(
@@ -106,7 +200,7 @@ class RestService:
     ) -> tuple[str, int]:
         response: Response = self.rest_client.put(
             self.rest_endpoints.workspace_wms_settings(workspace_name),
-            json=wms_settings.put_payload(),
+            json=self._serialize(wms_settings.put_payload),
         )
         return response.content.decode(), response.status_code
 
@@ -127,18 +221,21 @@ class RestService:
     def create_datastore(
         self, workspace_name: str, datastore: DataStore
     ) -> tuple[str, int]:
-        if not self.resource_exists(
-            self.rest_endpoints.datastore(workspace_name, datastore.name)
-        ):
-            response: Response = self.rest_client.post(
-                self.rest_endpoints.datastores(workspace_name),
-                json=datastore.post_payload(),
-            )
-        else:
-            response = self.rest_client.put(
-                self.rest_endpoints.datastore(workspace_name, datastore.name),
-                json=datastore.put_payload(),
-            )
+        path: str = self.rest_endpoints.datastores(workspace_name)
+        resource_path: str = self.rest_endpoints.datastore(
+            workspace_name, datastore.name
+        )
+        response: Response = self.upsert(
+            datastore.name,
+            path,
+            resource_path,
+            post=lambda: self.rest_client.post(
+                path, json=self._serialize(datastore.post_payload)
+            ),
+            put=lambda: self.rest_client.put(
+                resource_path, json=self._serialize(datastore.put_payload)
+            ),
+        )
         return response.content.decode(), response.status_code
 
     def delete_datastore(
@@ -148,6 +245,7 @@ class RestService:
         path = self.rest_endpoints.datastore(workspace_name, datastore_name)
         params: dict[str, str] = {"recurse": "true"}
         response: Response = self.rest_client.delete(path, params=params)
+        self.clear_catalog_index()
         return response.content.decode(), response.status_code
 
     def get_wms_store(
@@ -161,18 +259,21 @@ class RestService:
     def create_wms_store(
         self, workspace_name: str, wms_store: WmsStore
     ) -> tuple[str, int]:
-        if not self.resource_exists(
-            self.rest_endpoints.wmsstore(workspace_name, wms_store.name)
-        ):
-            response: Response = self.rest_client.post(
-                self.rest_endpoints.wmsstores(workspace_name),
-                json=wms_store.post_payload(),
-            )
-        else:
-            response = self.rest_client.put(
-                self.rest_endpoints.wmsstore(workspace_name, wms_store.name),
-                json=wms_store.put_payload(),
-            )
+        path: str = self.rest_endpoints.wmsstores(workspace_name)
+        resource_path: str = self.rest_endpoints.wmsstore(
+            workspace_name, wms_store.name
+        )
+        response: Response = self.upsert(
+            wms_store.name,
+            path,
+            resource_path,
+            post=lambda: self.rest_client.post(
+                path, json=self._serialize(wms_store.post_payload)
+            ),
+            put=lambda: self.rest_client.put(
+                resource_path, json=self._serialize(wms_store.put_payload)
+            ),
+        )
         return response.content.decode(), response.status_code
 
     def delete_wms_store(
@@ -200,7 +301,7 @@ class RestService:
             self.delete_wms_layer(workspace_name, wms_store_name, wms_layer.name)
         response: Response = self.rest_client.post(
             self.rest_endpoints.wmslayers(workspace_name, wms_store_name),
-            json=wms_layer.post_payload(),
+            json=self._serialize(wms_layer.post_payload),
         )
         return response.content.decode(), response.status_code
 
@@ -217,18 +318,21 @@ class RestService:
     def create_wmts_store(
         self, workspace_name: str, wmts_store: WmtsStore
     ) -> tuple[str, int]:
-        if not self.resource_exists(
-            self.rest_endpoints.wmtsstore(workspace_name, wmts_store.name)
-        ):
-            response: Response = self.rest_client.post(
-                self.rest_endpoints.wmtsstores(workspace_name),
-                json=wmts_store.post_payload(),
-            )
-        else:
-            response = self.rest_client.put(
-                self.rest_endpoints.wmtsstore(workspace_name, wmts_store.name),
-                json=wmts_store.put_payload(),
-            )
+        path: str = self.rest_endpoints.wmtsstores(workspace_name)
+        resource_path: str = self.rest_endpoints.wmtsstore(
+            workspace_name, wmts_store.name
+        )
+        response: Response = self.upsert(
+            wmts_store.name,
+            path,
+            resource_path,
+            post=lambda: self.rest_client.post(
+                path, json=self._serialize(wmts_store.post_payload)
+            ),
+            put=lambda: self.rest_client.put(
+                resource_path, json=self._serialize(wmts_store.put_payload)
+            ),
+        )
         return response.content.decode(), response.status_code
 
     def delete_wmts_store(
@@ -317,7 +421,7 @@ class RestService:
             return "", code
         response: Response = self.rest_client.put(
             self.gwc_endpoints.layer(gwc_layer.workspace_name, gwc_layer.layer_name),
-            json=gwc_layer.put_payload(),
+            json=self._serialize(gwc_layer.put_payload),
         )
         return response.content.decode(), response.status_code
 
@@ -348,7 +452,7 @@ class RestService:
     def create_gwc_blobstore(self, blobstore: S3Blobstore) -> tuple[str, int]:
         response: Response = self.rest_client.put(
             self.gwc_endpoints.blobstore(blobstore.id),
-            json=blobstore.put_payload(),
+            json=self._serialize(blobstore.put_payload),
         )
         return response.content.decode(), response.status_code
 
@@ -397,7 +501,7 @@ class RestService:
         """
         response: Response = self.rest_client.post(
             self.rest_endpoints.coverages(coverage.workspace_name, coverage.store_name),
-            json=coverage.post_payload(),
+            json=self._serialize(coverage.post_payload),
         )
         return response.content.decode(), response.status_code
 
@@ -416,7 +520,7 @@ class RestService:
         """
         response: Response = self.rest_client.post(
             self.rest_endpoints.coveragestores(coverage_store.workspace.name),
-            json=coverage_store.post_payload(),
+            json=self._serialize(coverage_store.post_payload),
         )
         return response.content.decode(), response.status_code
 
@@ -493,25 +597,83 @@ class RestService:
         response: Response = self.rest_client.delete(path, params=params)
         return response.content.decode(), response.status_code
 
-    def create_feature_type(self, feature_type: FeatureType) -> tuple[str, int]:
+    def create_feature_type(
+        self,
+        feature_type: FeatureType,
+        upsert_strategy: UpsertStrategy | None = None,
+    ) -> tuple[str, int]:
         path: str = self.rest_endpoints.featuretypes(
             feature_type.workspace_name, feature_type.store_name
         )
         resource_path: str = self.rest_endpoints.featuretype(
             feature_type.workspace_name, feature_type.store_name, feature_type.name
         )
-        if not self.resource_exists(resource_path):
-            response: Response = self.rest_client.post(
-                path,
-                json=feature_type.post_payload(),
-            )
-        else:
-            response = self.rest_client.put(
-                resource_path,
-                json=feature_type.put_payload(),
-            )
+        response: Response = self.upsert(
+            feature_type.name,
+            path,
+            resource_path,
+            post=lambda: self.rest_client.post(
+                path, json=self._serialize(feature_type.post_payload)
+            ),
+            put=lambda: self.rest_client.put(
+                resource_path, json=self._serialize(feature_type.put_payload)
+            ),
+            strategy=upsert_strategy,
+        )
         return response.content.decode(), response.status_code
 
+    def create_feature_types(
+        self,
+        feature_types: Iterable[FeatureType | Callable[[], FeatureType]],
+        max_workers: int = 1,
+        adaptive: AdaptiveConcurrency | None = None,
+    ) -> list[tuple[str, int, float]]:
+        """
+        Create or update many feature types, with up to max_workers requests in flight, or as
+        many as allowed by the adaptive controller if given.
+        Existing feature types are looked up in a single listing per datastore instead of being
+        probed one by one. A failure does not abort the batch: feature types may be given as
+        functions building them, called concurrently like the requests, and a function raising a
+        TypeError or ValueError (e.g. for an invalid specification) only fails its own item,
+        with status 400.
+        Return one (content, status_code, elapsed time in seconds) tuple per feature type, in input order.
+        """
+        # Make sure the datastore listings are fresh
+        self.clear_catalog_index()
+
+        def create(
+            item: FeatureType | Callable[[], FeatureType],
+        ) -> tuple[str, int, float]:
+            start: float = perf_counter()
+            try:
+                feature_type = item() if callable(item) else item
+            except (TypeError, ValueError) as error:
+                # Not sent to GeoServer
+                return str(error), 400, perf_counter() - start
+            try:
+                content, status_code = self.create_feature_type(
+                    feature_type, upsert_strategy=UpsertStrategy.INDEX
+                )
+            except RequestException as error:
+                content, status_code = self.error_response(error)
+            return content, status_code, perf_counter() - start
+
+        results: dict[int, tuple[str, int, float]] = {
+            index: result
+            for (index, _), result in (
+                adaptive.map(
+                    lambda item: create(item[1]),
+                    enumerate(feature_types),
+                    [self.rest_client],
+                )
+                if adaptive is not None
+                else map_concurrently(
+                    lambda item: create(item[1]), enumerate(feature_types), max_workers
+                )
+            )
+        }
+        return [results[index] for index in range(len(results))]
+
     def delete_feature_type(
         self, workspace_name: str, datastore_name: str, layer_name: str
     ) -> tuple[str, int]:
@@ -519,6 +681,7 @@ class RestService:
             self.rest_endpoints.featuretype(workspace_name, datastore_name, layer_name),
             params={"recurse": "true"},
         )
+        self.clear_catalog_index()
         return response.content.decode(), response.status_code
 
     def get_layer_groups(self, workspace_name: str) -> tuple[LayerGroups | str, int]:
@@ -541,18 +704,21 @@ class RestService:
         workspace_name: str,
         layer_group: LayerGroup,
     ) -> tuple[str, int]:
-        if not self.resource_exists(
-            self.rest_endpoints.layergroup(workspace_name, layer_group_name)
-        ):
-            response: Response = self.rest_client.post(
-                self.rest_endpoints.layergroups(workspace_name),
-                json=layer_group.post_payload(),
-            )
-        else:
-            response = self.rest_client.put(
-                self.rest_endpoints.layergroup(workspace_name, layer_group_name),
-                json=layer_group.put_payload(),
-            )
+        path: str = self.rest_endpoints.layergroups(workspace_name)
+        resource_path: str = self.rest_endpoints.layergroup(
+            workspace_name, layer_group_name
+        )
+        response: Response = self.upsert(
+            layer_group_name,
+            path,
+            resource_path,
+            post=lambda: self.rest_client.post(
+                path, json=self._serialize(layer_group.post_payload)
+            ),
+            put=lambda: self.rest_client.put(
+                resource_path, json=self._serialize(layer_group.put_payload)
+            ),
+        )
         return response.content.decode(), response.status_code
 
     def delete_layer_group(
@@ -561,6 +727,7 @@ class RestService:
         response: Response = self.rest_client.delete(
             self.rest_endpoints.layergroup(workspace_name, layer_group_name)
         )
+        self.clear_catalog_index()
         return response.content.decode(), response.status_code
 
     def get_styles(self, workspace_name: str | None = None) -> tuple[Styles | str, int]:
@@ -585,15 +752,17 @@ class RestService:
         resource_path = self.rest_endpoints.style(
             workspace_name=workspace_name, style_name=style_name, format="xml"
         )
-        data: bytes = style.xml_post_payload().encode()
+        data: bytes = self._serialize(style.xml_post_payload).encode()
         headers: dict[str, str] = {"Content-Type": "text/xml"}
-        # Use "Accept" header otherwise GeoServer throws a 500 on GET when the resource exists
-        if not self.resource_exists(
-            resource_path, headers={"Accept": "application/json"}
-        ):
-            response: Response = self.rest_client.post(path, data=data, headers=headers)
-        else:
-            response = self.rest_client.put(resource_path, data=data, headers=headers)
+        response: Response = self.upsert(
+            style_name,
+            self.rest_endpoints.styles(workspace_name=workspace_name),
+            resource_path,
+            post=lambda: self.rest_client.post(path, data=data, headers=headers),
+            put=lambda: self.rest_client.put(resource_path, data=data, headers=headers),
+            # Use "Accept" header otherwise GeoServer throws a 500 on GET when the resource exists
+            probe_headers={"Accept": "application/json"},
+        )
         return response.content.decode(), response.status_code
 
     def get_style(
@@ -630,6 +799,17 @@ class RestService:
         )
         return response.content.decode(), response.status_code
 
+    def delete_style(
+        self, style_name: str, workspace_name: str | None = None
+    ) -> tuple[str, int]:
+        """Delete a style definition and its style file"""
+        response: Response = self.rest_client.delete(
+            self.rest_endpoints.style(style_name, workspace_name),
+            params={"purge": "true"},
+        )
+        self.clear_catalog_index()
+        return response.content.decode(), response.status_code
+
     def get_layer(
         self, workspace_name: str, layer_name: str
     ) -> tuple[Layer | str, int]:
@@ -641,7 +821,7 @@ class RestService:
     def update_layer(self, layer: Layer, workspace_name: str) -> tuple[str, int]:
         response: Response = self.rest_client.put(
             self.rest_endpoints.workspace_layer(workspace_name, layer.name),
-            json=layer.put_payload(),
+            json=self._serialize(layer.put_payload),
         )
         return response.content.decode(), response.status_code
 
@@ -835,12 +1015,93 @@ class RestService:
         )
         return response.content, response.status_code
 
+    def stream_resource(
+        self,
+        path: str,
+        resource_name: str,
+        workspace_name: str | None = None,
+        chunk_size: int = CHUNK_SIZE,
+    ) -> tuple[ResponseChunks | str, int]:
+        """
+        Stream the content of a resource without holding it in memory: return an iterator of
+        chunks of at most chunk_size bytes, which must be consumed or closed to release the
+        connection, or the error message if the request failed
+        """
+        response: Response = self.rest_client.get(
+            self.rest_endpoints.resource(path, resource_name, workspace_name),
+            stream=True,
+        )
+        if not response.ok:
+            with response:
+                return response.content.decode(), response.status_code
+        return ResponseChunks(response, chunk_size), response.status_code
+
+    def download_resource(
+        self,
+        path: str,
+        resource_name: str,
+        output: str | Path | IO[bytes],
+        workspace_name: str | None = None,
+    ) -> tuple[str, int]:
+        """
+        Write the content of a resource to a file, given by its path or as a binary file object,
+        chunk by chunk. The file is not created if the request fails.
+        """
+        chunks, status_code = self.stream_resource(path, resource_name, workspace_name)
+        if isinstance(chunks, str):
+            return chunks, status_code
+        with chunks:
+            if isinstance(output, (str, Path)):
+                with open(output, "wb") as file:
+                    file.writelines(chunks)
+            else:
+                output.writelines(chunks)
+        return "", status_code
+
+    def head_resource(
+        self, path: str, resource_name: str, workspace_name: str | None = None
+    ) -> tuple[CaseInsensitiveDict[str], int]:
+        """
+        Headers of a resource (e.g. ETag, Content-Length, Last-Modified) without its content
+        """
+        response: Response = self.rest_client.head(
+            self.rest_endpoints.resource(path, resource_name, workspace_name),
+        )
+        return response.headers, response.status_code
+
     def put_resource(
         self,
         path: str,
         name: str,
         content_type: str,
-        data: bytes,
+        data: bytes | IO[bytes] | Path | Iterable[bytes],
+        workspace_name: str | None = None,
+    ) -> tuple[str, int]:
+        """
+        Create or replace a resource. The content is given as bytes, or streamed from a binary
+        file object, from a local file (memory-mapped) or from an iterator of chunks (sent with
+        chunked transfer encoding). Contents streamed from file objects or iterators are not
+        sent again by retry policies, local files are.
+        """
+        if isinstance(data, Path):
+            with open(data, "rb") as file:
+                if data.stat().st_size == 0:
+                    # Empty files cannot be memory-mapped
+                    return self.send_resource(
+                        path, name, content_type, b"", workspace_name
+                    )
+                with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    return self.send_resource(
+                        path, name, content_type, mapped, workspace_name
+                    )
+        return self.send_resource(path, name, content_type, data, workspace_name)
+
+    def send_resource(
+        self,
+        path: str,
+        name: str,
+        content_type: str,
+        data: RequestBody,
         workspace_name: str | None = None,
     ) -> tuple[str, int]:
         headers = {"Content-Type": content_type}
@@ -865,6 +1126,141 @@ class RestService:
         response: Response = self.rest_client.get(path, headers=headers)
         return response.status_code == 200
 
+    @staticmethod
+    def already_exists(response: Response) -> bool:
+        """
+        Whether a POST failed because the resource already exists: GeoServer answers 409 for
+        workspaces, but 500 or 403 with an "already exists" message for stores, feature types
+        and styles
+        """
+        if response.status_code == 409:
+            return True
+        return response.status_code in (403, 500) and "already exists" in response.text
+
+    def upsert(
+        self,
+        name: str,
+        collection_path: str,
+        resource_path: str,
+        post: Callable[[], Response],
+        put: Callable[[], Response],
+        probe_headers: dict[str, str] | None = None,
+        default_strategy: UpsertStrategy = UpsertStrategy.PROBE,
+        strategy: UpsertStrategy | None = None,
+    ) -> Response:
+        """
+        Create a resource with POST, or update it with PUT if it already exists, according to the
+        upsert strategy of the service (or default_strategy if the service has none)
+
+        :param name: Name of the resource, looked up in the collection listing by the INDEX strategy
+        :param collection_path: Path of the JSON listing of the collection containing the resource
+        :param resource_path: Path of the resource, probed by the PROBE and HEAD strategies
+        :param post: Function creating the resource
+        :param put: Function updating the resource
+        :param probe_headers: Headers sent when probing the resource
+        :param default_strategy: Strategy used if neither strategy nor the service define one
+        :param strategy: Strategy overriding the one of the service for this call
+        """
+        strategy = strategy or self.upsert_strategy or default_strategy
+        if strategy == UpsertStrategy.OPTIMISTIC:
+            try:
+                with self._span("upsert.post"):
+                    response: Response = post()
+            except HTTPError as error:
+                if error.response is None or not self.already_exists(error.response):
+                    raise
+                response = error.response
+            if self.already_exists(response):
+                with self._span("upsert.put"):
+                    response = put()
+        else:
+            with self._span(
+                "upsert.probe", {"geoserver.upsert_strategy": strategy.value}
+            ) as span:
+                if strategy == UpsertStrategy.INDEX:
+                    exists = name in self.get_catalog_index(collection_path)
+                elif strategy == UpsertStrategy.HEAD:
+                    exists = (
+                        self.rest_client.head(
+                            resource_path, headers=probe_headers
+                        ).status_code
+                        == 200
+                    )
+                else:
+                    exists = self.resource_exists(resource_path, headers=probe_headers)
+                span.set_attribute("geoserver.exists", exists)
+            with self._span("upsert.put" if exists else "upsert.post"):
+                response = put() if exists else post()
+        if response.ok:
+            with self._catalog_index_lock:
+                if collection_path in self.catalog_index:
+                    self.catalog_index[collection_path].add(name)
+        return response
+
+    def _span(
+        self, name: str, attributes: dict[str, Any] | None = None
+    ) -> AbstractContextManager[Span]:
+        """
+        Span named "RestService.<name>" around an internal step, child of the current span
+        """
+        return self.rest_client.tracer.start_span(f"RestService.{name}", attributes)
+
+    def _serialize(self, payload: Callable[[], T]) -> T:
+        """
+        Build the payload of a request in a span
+        """
+        with self._span("serialize"):
+            return payload()
+
+    def get_catalog_index(self, collection_path: str) -> set[str]:
+        """
+        Return the names of the resources in a collection, listing it on first access only
+        """
+        with self._catalog_index_lock:
+            if collection_path not in self.catalog_index:
+                self.catalog_index[collection_path] = self.list_names(collection_path)
+            return self.catalog_index[collection_path]
+
+    def clear_catalog_index(self) -> None:
+        """
+        Forget the collection listings of the INDEX upsert strategy, e.g. after deleting resources
+        """
+        with self._catalog_index_lock:
+            self.catalog_index.clear()
+
+    def list_names(self, collection_path: str) -> set[str]:
+        """
+        Return the names of the resources listed by a collection endpoint,
+        e.g. {"featureTypes": {"featureType": [{"name": ...}]}}
+        """
+        response: Response = self.rest_client.get(
+            collection_path, headers={"Accept": "application/json"}
+        )
+        if response.status_code != 200:
+            return set()
+        try:
+            content = response.json()
+        except JSONDecodeError:
+            return set()
+        items = (
+            next(iter(content.values()), None) if isinstance(content, dict) else None
+        )
+        if isinstance(items, dict):
+            items = next(iter(items.values()), None)
+        if isinstance(items, dict):
+            items = [items]
+        return {item["name"] for item in items or [] if isinstance(item, dict)}
+
+    @staticmethod
+    def error_response(error: RequestException) -> tuple[str, int]:
+        """
+        Return the content and status code of a failed request,
+        or the error message and NO_RESPONSE_STATUS if no response was received
+        """
+        if error.response is not None:
+            return error.response.content.decode(), error.response.status_code
+        return str(error), NO_RESPONSE_STATUS
+
     @staticmethod
     def deserialize_response(
         response: Response, data_type: type[BaseModel]
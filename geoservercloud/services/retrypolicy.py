@@ -0,0 +1,147 @@
+import math
+import random
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+import requests
+
+IDEMPOTENT_METHODS: frozenset[str] = frozenset(
+    {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+)
+# Transient errors returned by GeoServer replicas or their load balancer, e.g. during rolling restarts
+RETRY_STATUSES: frozenset[int] = frozenset({429, 502, 503, 504})
+
+_override: ContextVar["RetryPolicy | None"] = ContextVar(
+    "retry_policy_override", default=None
+)
+
+
+class RetryPolicy:
+    """
+    Policy deciding whether and when a failed request is sent again
+
+    Attributes
+    ----------
+    max_retries : int
+        maximum number of retries of a request, 0 to disable retries
+    backoff_factor : float
+        base delay in seconds, doubled at each retry (capped exponential backoff)
+    max_backoff : float
+        maximum delay between two attempts in seconds, when GeoServer sends no Retry-After header
+    max_retry_after : float
+        maximum delay honored from a Retry-After header, in seconds
+    jitter : bool
+        whether the delay is drawn uniformly between 0 and the backoff ("full jitter"), so that
+        concurrent clients do not retry in lockstep
+    statuses : frozenset[int]
+        HTTP status codes considered transient
+    retry_post : bool
+        whether POST requests, which are not idempotent, are retried too
+    """
+
+    def __init__(
+        self,
+        max_retries: int = 3,
+        backoff_factor: float = 0.5,
+        max_backoff: float = 30.0,
+        max_retry_after: float = 120.0,
+        jitter: bool = True,
+        statuses: frozenset[int] = RETRY_STATUSES,
+        retry_post: bool = False,
+    ) -> None:
+        if max_retries < 0:
+            raise ValueError("max_retries must be positive or 0")
+        self.max_retries: int = max_retries
+        self.backoff_factor: float = backoff_factor
+        self.max_backoff: float = max_backoff
+        self.max_retry_after: float = max_retry_after
+        self.jitter: bool = jitter
+        self.statuses: frozenset[int] = statuses
+        self.retry_post: bool = retry_post
+
+    def __repr__(self) -> str:
+        return (
+            f"RetryPolicy(max_retries={self.max_retries}, "
+            f"backoff_factor={self.backoff_factor}, retry_post={self.retry_post})"
+        )
+
+    def allows(self, method: str) -> bool:
+        """Whether requests with this method may be retried"""
+        return method in IDEMPOTENT_METHODS or (method == "POST" and self.retry_post)
+
+    def should_retry(
+        self,
+        method: str,
+        retries: int,
+        response: requests.Response | None = None,
+        error: requests.RequestException | None = None,
+    ) -> bool:
+        """
+        Whether a request which already was retried ``retries`` times is sent again after
+        receiving a response or raising an error
+        """
+        if retries >= self.max_retries or not self.allows(method):
+            return False
+        if response is not None:
+            return response.status_code in self.statuses
+        return isinstance(error, (requests.ConnectionError, requests.Timeout))
+
+    def delay(self, retries: int, response: requests.Response | None = None) -> float:
+        """
+        Time to wait in seconds before the next attempt: the Retry-After header of the response
+        if any, otherwise the capped exponential backoff, with jitter
+        """
+        retry_after = parse_retry_after(response) if response is not None else None
+        if retry_after is not None:
+            return min(retry_after, self.max_retry_after)
+        backoff = min(self.backoff_factor * 2**retries, self.max_backoff)
+        return random.uniform(0, backoff) if self.jitter else backoff  # nosec
+
+
+def parse_retry_after(response: requests.Response) -> float | None:
+    """
+    Delay in seconds requested by a Retry-After header, given in seconds or as an HTTP date
+    """
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        pass
+    else:
+        # "nan" and "inf" are parsed by float, fall back to the computed backoff
+        return max(seconds, 0.0) if math.isfinite(seconds) else None
+    try:
+        date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=timezone.utc)
+    return max((date - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+def current_retry_policy() -> RetryPolicy | None:
+    """Policy set by the innermost :py:func:`retrying` block, if any"""
+    return _override.get()
+
+
+@contextmanager
+def retrying(policy: RetryPolicy) -> Iterator[RetryPolicy]:
+    """
+    Apply a retry policy to all the requests sent in the block, including the requests sent
+    by facade methods and by their worker threads, instead of the policy of the client
+
+    :Example:
+
+    >>> with retrying(RetryPolicy(max_retries=5, retry_post=True)):
+    ...     geoserver.create_feature_types(specs, max_workers=8)
+    """
+    token = _override.set(policy)
+    try:
+        yield policy
+    finally:
+        _override.reset(token)
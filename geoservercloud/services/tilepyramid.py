@@ -0,0 +1,270 @@
+import math
+import sqlite3
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any, NamedTuple, Protocol
+
+# Size of a pixel in meters according to the WMTS specification
+STANDARDIZED_PIXEL_SIZE = 0.00028
+# Meters per degree on the equator of the WGS84 ellipsoid, used by WMTS for geographic CRS
+METERS_PER_DEGREE = 6378137 * 2 * math.pi / 360
+GEOGRAPHIC_CRS_CODES: set[str] = {"4326", "4258", "4269", "CRS84"}
+# Tolerance avoiding an extra row or column when the bbox ends exactly on a tile edge
+EPSILON = 1e-9
+
+MIME_EXTENSIONS: dict[str, str] = {
+    "image/png": "png",
+    "image/png8": "png",
+    "image/jpeg": "jpg",
+    "image/gif": "gif",
+    "image/webp": "webp",
+    "application/vnd.mapbox-vector-tile": "pbf",
+    "application/x-protobuf;type=mapbox-vector-tile": "pbf",
+}
+
+
+class TileMatrix(NamedTuple):
+    """
+    Definition of a tile matrix (zoom level) of a WMTS tile matrix set
+
+    Attributes
+    ----------
+    identifier : str
+        identifier used as TileMatrix parameter of GetTile requests
+    scale_denominator : float
+        scale denominator of the tile matrix
+    top_left_corner : tuple[float, float]
+        (x, y) coordinates of the top left corner of the matrix
+    tile_width : int
+        width of a tile in pixels
+    tile_height : int
+        height of a tile in pixels
+    matrix_width : int
+        number of tile columns
+    matrix_height : int
+        number of tile rows
+    """
+
+    identifier: str
+    scale_denominator: float
+    top_left_corner: tuple[float, float]
+    tile_width: int
+    tile_height: int
+    matrix_width: int
+    matrix_height: int
+
+    @classmethod
+    def from_owslib(cls, tile_matrix: Any, crs: str) -> "TileMatrix":
+        """
+        Convert an owslib.wmts.TileMatrix, whose top left corner follows the axis order of the CRS
+        """
+        x, y = tile_matrix.topleftcorner
+        if _is_geographic(crs) and "CRS84" not in crs:
+            # EPSG geographic CRS are latitude first
+            x, y = y, x
+        return cls(
+            identifier=tile_matrix.identifier,
+            scale_denominator=tile_matrix.scaledenominator,
+            top_left_corner=(x, y),
+            tile_width=tile_matrix.tilewidth,
+            tile_height=tile_matrix.tileheight,
+            matrix_width=tile_matrix.matrixwidth,
+            matrix_height=tile_matrix.matrixheight,
+        )
+
+
+class TileRange(NamedTuple):
+    """
+    Inclusive range of tile rows and columns of a tile matrix covering a bbox
+    """
+
+    zoom: int
+    tile_matrix: TileMatrix
+    min_row: int
+    max_row: int
+    min_column: int
+    max_column: int
+
+    @property
+    def tile_count(self) -> int:
+        return (self.max_row - self.min_row + 1) * (
+            self.max_column - self.min_column + 1
+        )
+
+
+class Tile(NamedTuple):
+    zoom: int
+    tile_matrix: TileMatrix
+    row: int
+    column: int
+
+
+class TileResult(NamedTuple):
+    """
+    Outcome of the download of one tile
+
+    Attributes
+    ----------
+    tile_matrix : str
+        identifier of the tile matrix
+    row : int
+        tile row
+    column : int
+        tile column
+    status_code : int
+        HTTP status code of the GetTile request
+    size : int
+        size of the tile in bytes, 0 if it was not written
+    """
+
+    tile_matrix: str
+    row: int
+    column: int
+    status_code: int
+    size: int
+
+
+class TileWriter(Protocol):
+    def write(self, tile: Tile, content: bytes) -> None: ...
+
+    def close(self) -> None: ...
+
+
+class DirectoryTileWriter:
+    """
+    Write tiles to {directory}/{tile matrix}/{column}/{row}.{extension}
+    """
+
+    def __init__(self, directory: str | Path, extension: str = "png") -> None:
+        self.directory: Path = Path(directory)
+        self.extension: str = extension
+
+    def write(self, tile: Tile, content: bytes) -> None:
+        path = (
+            self.directory
+            / _safe_name(tile.tile_matrix.identifier)
+            / str(tile.column)
+            / f"{tile.row}.{self.extension}"
+        )
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(content)
+
+    def close(self) -> None:
+        pass
+
+
+class MBTilesWriter:
+    """
+    Write tiles to an MBTiles SQLite file. The zoom level is the position of the tile matrix
+    in its tile matrix set and rows are flipped to the TMS scheme, as required by MBTiles.
+    """
+
+    def __init__(
+        self, path: str | Path, metadata: dict[str, str] | None = None
+    ) -> None:
+        self.connection: sqlite3.Connection = sqlite3.connect(path)
+        self.connection.executescript("""
+            CREATE TABLE IF NOT EXISTS metadata (name TEXT PRIMARY KEY, value TEXT);
+            CREATE TABLE IF NOT EXISTS tiles (
+                zoom_level INTEGER,
+                tile_column INTEGER,
+                tile_row INTEGER,
+                tile_data BLOB,
+                PRIMARY KEY (zoom_level, tile_column, tile_row)
+            );
+            """)
+        self.connection.executemany(
+            "INSERT OR REPLACE INTO metadata (name, value) VALUES (?, ?)",
+            (metadata or {}).items(),
+        )
+
+    def write(self, tile: Tile, content: bytes) -> None:
+        self.connection.execute(
+            "INSERT OR REPLACE INTO tiles (zoom_level, tile_column, tile_row, tile_data) "
+            "VALUES (?, ?, ?, ?)",
+            (
+                tile.zoom,
+                tile.column,
+                tile.tile_matrix.matrix_height - 1 - tile.row,
+                content,
+            ),
+        )
+
+    def close(self) -> None:
+        self.connection.commit()
+        self.connection.close()
+
+
+def tile_range(
+    zoom: int,
+    tile_matrix: TileMatrix,
+    bbox: tuple[float, float, float, float],
+    crs: str,
+) -> TileRange | None:
+    """
+    Compute the tiles of a tile matrix intersecting a bbox (minx, miny, maxx, maxy) expressed
+    in the CRS of the tile matrix set, x first. Return None if the bbox is outside the matrix.
+    """
+    meters_per_unit = METERS_PER_DEGREE if _is_geographic(crs) else 1.0
+    pixel_span = (
+        tile_matrix.scale_denominator * STANDARDIZED_PIXEL_SIZE / meters_per_unit
+    )
+    tile_span_x = tile_matrix.tile_width * pixel_span
+    tile_span_y = tile_matrix.tile_height * pixel_span
+    left, top = tile_matrix.top_left_corner
+    min_x, min_y, max_x, max_y = bbox
+    min_column = max(math.floor((min_x - left) / tile_span_x + EPSILON), 0)
+    max_column = min(
+        math.floor((max_x - left) / tile_span_x - EPSILON), tile_matrix.matrix_width - 1
+    )
+    min_row = max(math.floor((top - max_y) / tile_span_y + EPSILON), 0)
+    max_row = min(
+        math.floor((top - min_y) / tile_span_y - EPSILON), tile_matrix.matrix_height - 1
+    )
+    if min_column > max_column or min_row > max_row:
+        return None
+    return TileRange(zoom, tile_matrix, min_row, max_row, min_column, max_column)
+
+
+def tile_ranges(
+    tile_matrices: list[TileMatrix],
+    bbox: tuple[float, float, float, float],
+    crs: str,
+    min_zoom: int = 0,
+    max_zoom: int | None = None,
+) -> list[TileRange]:
+    """
+    Compute the tile ranges covering a bbox for the tile matrices between min_zoom and
+    max_zoom (inclusive), zoom levels being positions in the tile matrix set
+    """
+    if max_zoom is None:
+        max_zoom = len(tile_matrices) - 1
+    if not 0 <= min_zoom <= max_zoom < len(tile_matrices):
+        raise ValueError(
+            f"Invalid zoom range {min_zoom}-{max_zoom} for {len(tile_matrices)} tile matrices"
+        )
+    ranges = (
+        tile_range(zoom, tile_matrices[zoom], bbox, crs)
+        for zoom in range(min_zoom, max_zoom + 1)
+    )
+    return [range_ for range_ in ranges if range_ is not None]
+
+
+def iter_tiles(ranges: list[TileRange]) -> Iterator[Tile]:
+    for range_ in ranges:
+        for row in range(range_.min_row, range_.max_row + 1):
+            for column in range(range_.min_column, range_.max_column + 1):
+                yield Tile(range_.zoom, range_.tile_matrix, row, column)
+
+
+def extension(format: str) -> str:
+    return MIME_EXTENSIONS.get(format, format.rsplit("/", 1)[-1])
+
+
+def _is_geographic(crs: str) -> bool:
+    return crs.replace("::", ":").rsplit(":", 1)[-1] in GEOGRAPHIC_CRS_CODES
+
+
+def _safe_name(identifier: str) -> str:
+    # Tile matrix identifiers of GeoServer gridsets contain colons, e.g. "EPSG:3857:5"
+    return identifier.replace(":", "_").replace("/", "_")
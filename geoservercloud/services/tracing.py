@@ -0,0 +1,261 @@
+import functools
+import inspect
+import secrets
+import threading
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import time_ns
+from typing import Any, TypeVar
+
+try:
+    from opentelemetry import propagate as otel_propagate
+    from opentelemetry import trace as otel_trace
+except ImportError:  # pragma: no cover - OpenTelemetry is optional
+    otel_propagate = None  # type: ignore[assignment]
+    otel_trace = None  # type: ignore[assignment]
+
+T = TypeVar("T")
+
+
+class Span:
+    """
+    No-op span, also the interface of the spans yielded by :py:meth:`Tracer.start_span`
+    """
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def record_exception(self, exception: BaseException) -> None:
+        pass
+
+
+NOOP_SPAN = Span()
+
+
+class Tracer:
+    """
+    Tracer doing nothing, used when tracing is disabled. Subclasses set ``enabled`` to True and
+    implement :py:meth:`start_span` and :py:meth:`inject`.
+    """
+
+    enabled: bool = False
+
+    @contextmanager
+    def start_span(
+        self, name: str, attributes: dict[str, Any] | None = None
+    ) -> Iterator[Span]:
+        """
+        Open a span, child of the current span, and make it current in the block
+        """
+        yield NOOP_SPAN
+
+    def inject(self, headers: dict[str, str]) -> None:
+        """
+        Add the headers propagating the current span to a downstream request, e.g. traceparent
+        """
+
+
+class RecordedSpan(Span):
+    """
+    Span kept in memory by :py:class:`RecordingTracer`
+
+    Attributes
+    ----------
+    name : str
+        name of the operation, e.g. "RestService.create_layer_group" or "HTTP POST"
+    trace_id : str
+        32 hexadecimal digits identifying the trace
+    span_id : str
+        16 hexadecimal digits identifying the span
+    parent_id : str | None
+        span_id of the parent span, None for a root span
+    start_time : int
+        start time in nanoseconds since the epoch
+    end_time : int | None
+        end time in nanoseconds since the epoch, None while the span is open
+    attributes : dict[str, Any]
+        attributes of the span, e.g. the HTTP status code
+    error : str | None
+        exception raised in the span, if any
+    """
+
+    def __init__(
+        self,
+        name: str,
+        trace_id: str,
+        parent_id: str | None = None,
+        attributes: dict[str, Any] | None = None,
+    ) -> None:
+        self.name: str = name
+        self.trace_id: str = trace_id
+        self.span_id: str = secrets.token_hex(8)
+        self.parent_id: str | None = parent_id
+        self.start_time: int = time_ns()
+        self.end_time: int | None = None
+        self.attributes: dict[str, Any] = dict(attributes or {})
+        self.error: str | None = None
+
+    @property
+    def duration(self) -> float:
+        """Duration in seconds, 0 while the span is open"""
+        return (self.end_time - self.start_time) / 1e9 if self.end_time else 0.0
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def record_exception(self, exception: BaseException) -> None:
+        self.error = repr(exception)
+
+    def __repr__(self) -> str:
+        return f"<RecordedSpan {self.name} {self.duration * 1000:.1f} ms>"
+
+
+class RecordingTracer(Tracer):
+    """
+    Tracer keeping the finished spans in memory and propagating them with W3C traceparent
+    headers, for debugging without an OpenTelemetry setup
+
+    :Example:
+
+    >>> tracer = RecordingTracer()
+    >>> geoserver = GeoServerCloud(url, tracer=tracer)
+    >>> geoserver.create_layer_group("group", "workspace", layers=["layer"])
+    >>> print(tracer.report())
+    """
+
+    enabled = True
+
+    def __init__(self) -> None:
+        self.spans: list[RecordedSpan] = []
+        self._current: ContextVar[RecordedSpan | None] = ContextVar(
+            f"current_span_{id(self)}", default=None
+        )
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def start_span(
+        self, name: str, attributes: dict[str, Any] | None = None
+    ) -> Iterator[Span]:
+        parent = self._current.get()
+        span = RecordedSpan(
+            name,
+            trace_id=parent.trace_id if parent else secrets.token_hex(16),
+            parent_id=parent.span_id if parent else None,
+            attributes=attributes,
+        )
+        token = self._current.set(span)
+        try:
+            yield span
+        except BaseException as exception:
+            span.record_exception(exception)
+            raise
+        finally:
+            self._current.reset(token)
+            span.end_time = time_ns()
+            with self._lock:
+                self.spans.append(span)
+
+    def inject(self, headers: dict[str, str]) -> None:
+        span = self._current.get()
+        if span is not None:
+            headers["traceparent"] = f"00-{span.trace_id}-{span.span_id}-01"
+
+    def reset(self) -> None:
+        with self._lock:
+            self.spans.clear()
+
+    def report(self) -> str:
+        """
+        Tree of the finished spans with their duration, children indented under their parent
+        """
+        with self._lock:
+            spans = sorted(self.spans, key=lambda span: span.start_time)
+        children: dict[str | None, list[RecordedSpan]] = {}
+        for span in spans:
+            children.setdefault(span.parent_id, []).append(span)
+        span_ids = {span.span_id for span in spans}
+        lines: list[str] = []
+
+        def add(span: RecordedSpan, depth: int) -> None:
+            error = f" {span.error}" if span.error else ""
+            lines.append(
+                f"{'  ' * depth}{span.name} {span.duration * 1000:.1f} ms{error}"
+            )
+            for child in children.get(span.span_id, []):
+                add(child, depth + 1)
+
+        for span in spans:
+            if span.parent_id is None or span.parent_id not in span_ids:
+                add(span, 0)
+        return "\n".join(lines)
+
+
+class OpenTelemetryTracer(Tracer):
+    """
+    Tracer creating OpenTelemetry spans, exported by the SDK configured by the application,
+    and propagating the context with the configured propagator (W3C traceparent by default).
+    Requires the opentelemetry-api package.
+
+    :param tracer: OpenTelemetry tracer, default: the tracer of the global tracer provider
+    """
+
+    enabled = True
+
+    def __init__(self, tracer: Any = None) -> None:
+        if otel_trace is None:
+            raise ImportError(
+                "OpenTelemetryTracer requires the opentelemetry-api package"
+            )
+        self.tracer = tracer or otel_trace.get_tracer("geoservercloud")
+
+    @contextmanager
+    def start_span(
+        self, name: str, attributes: dict[str, Any] | None = None
+    ) -> Iterator[Span]:
+        with self.tracer.start_as_current_span(name, attributes=attributes) as span:
+            yield span
+
+    def inject(self, headers: dict[str, str]) -> None:
+        otel_propagate.inject(headers)
+
+
+def traced(component: str) -> Callable[[type[T]], type[T]]:
+    """
+    Class decorator opening a span named "<component>.<method>" around each public method,
+    with the tracer of the ``rest_client`` of the instance. The status code of methods returning
+    a (content, status_code) tuple is set as attribute. Static methods and generators (whose
+    work happens after the method returns) are left untouched.
+    """
+
+    def decorator(cls: type[T]) -> type[T]:
+        for name, func in inspect.getmembers(cls, inspect.isfunction):
+            if name.startswith("_") or name not in cls.__dict__:
+                continue
+            if isinstance(inspect.getattr_static(cls, name), staticmethod):
+                continue
+            if inspect.isgeneratorfunction(func):
+                continue
+            setattr(cls, name, _traced_method(f"{component}.{name}", func))
+        return cls
+
+    return decorator
+
+
+def _traced_method(span_name: str, func: Callable) -> Callable:
+    @functools.wraps(func)
+    def method(self, *args: Any, **kwargs: Any) -> Any:
+        tracer: Tracer = self.rest_client.tracer
+        if not tracer.enabled:
+            return func(self, *args, **kwargs)
+        with tracer.start_span(span_name) as span:
+            result = func(self, *args, **kwargs)
+            if (
+                isinstance(result, tuple)
+                and len(result) == 2
+                and isinstance(result[1], int)
+            ):
+                span.set_attribute("geoserver.status_code", result[1])
+            return result
+
+    return method
@@ -0,0 +1,152 @@
+from collections.abc import Callable
+from enum import Enum
+from typing import Any
+
+from geoservercloud.models.common import EntityModel
+
+# Keys which differ between GeoServer instances even when the resources are identical
+VOLATILE_KEYS: set[str] = {"dateCreated", "dateModified"}
+
+
+class SyncAction(Enum):
+    CREATE = "create"
+    UPDATE = "update"
+    DELETE = "delete"
+    UNCHANGED = "unchanged"
+
+
+class ResourceChange:
+    """
+    Planned change for a single resource of the destination GeoServer instance
+
+    Attributes
+    ----------
+    resource_type : str
+        type of resource, e.g. "featuretype"
+    name : str
+        name of the resource, prefixed with its store name for feature types and layers
+    action : SyncAction
+        action required to bring the destination in line with the source
+    changed_keys : list[str]
+        top-level payload keys which differ between source and destination (updates only)
+    apply : Callable[[], tuple[str, int]] | None
+        function writing the change to the destination
+    """
+
+    def __init__(
+        self,
+        resource_type: str,
+        name: str,
+        action: SyncAction,
+        changed_keys: list[str] | None = None,
+        apply: Callable[[], tuple[str, int]] | None = None,
+    ) -> None:
+        self.resource_type: str = resource_type
+        self.name: str = name
+        self.action: SyncAction = action
+        self.changed_keys: list[str] = changed_keys or []
+        self.apply: Callable[[], tuple[str, int]] | None = apply
+
+    def asdict(self) -> dict[str, Any]:
+        return EntityModel.add_item_to_dict(
+            {
+                "resource_type": self.resource_type,
+                "name": self.name,
+                "action": self.action.value,
+            },
+            "changed_keys",
+            self.changed_keys or None,
+        )
+
+    def __str__(self) -> str:
+        line = f"{self.action.value:<10}{self.resource_type:<14}{self.name}"
+        if self.changed_keys:
+            line += f" ({', '.join(self.changed_keys)})"
+        return line
+
+
+class SyncPlan:
+    """
+    Ordered list of resource changes computed by comparing a source and a destination catalog
+    """
+
+    def __init__(self) -> None:
+        self.changes: list[ResourceChange] = []
+
+    def add(
+        self,
+        resource_type: str,
+        name: str,
+        source: EntityModel | None,
+        destination: EntityModel | str | None,
+        apply: Callable[[], tuple[str, int]] | None = None,
+        extra_changed_keys: list[str] | None = None,
+    ) -> ResourceChange:
+        """
+        Compare the source and destination versions of a resource and record the resulting change.
+        A destination given as a string (error message of a GET answered 404) is considered missing,
+        other errors must be handled by the caller.
+        A missing source means the resource only exists on the destination.
+        """
+        if source is None:
+            change = ResourceChange(resource_type, name, SyncAction.DELETE, apply=apply)
+        elif destination is None or isinstance(destination, str):
+            change = ResourceChange(resource_type, name, SyncAction.CREATE, apply=apply)
+        else:
+            keys = changed_keys(source, destination) + (extra_changed_keys or [])
+            if keys:
+                change = ResourceChange(
+                    resource_type, name, SyncAction.UPDATE, keys, apply=apply
+                )
+            else:
+                change = ResourceChange(resource_type, name, SyncAction.UNCHANGED)
+        self.changes.append(change)
+        return change
+
+    def pending(self, prune: bool = False) -> list[ResourceChange]:
+        """
+        Changes which need to be written to the destination, deletions included only if prune is True
+        """
+        actions = {SyncAction.CREATE, SyncAction.UPDATE}
+        if prune:
+            actions.add(SyncAction.DELETE)
+        return [change for change in self.changes if change.action in actions]
+
+    def summary(self) -> dict[str, int]:
+        counts = {action.value: 0 for action in SyncAction}
+        for change in self.changes:
+            counts[change.action.value] += 1
+        return counts
+
+    def aslist(self) -> list[dict[str, Any]]:
+        return [change.asdict() for change in self.changes]
+
+    def __str__(self) -> str:
+        lines = [str(change) for change in self.changes]
+        lines.append(
+            ", ".join(f"{count} {action}" for action, count in self.summary().items())
+        )
+        return "\n".join(lines)
+
+
+def changed_keys(source: EntityModel, destination: EntityModel) -> list[str]:
+    """
+    Return the top-level keys of the PUT payloads which differ between two versions of a resource
+    """
+    source_content = _payload_content(source.put_payload())
+    destination_content = _payload_content(destination.put_payload())
+    return sorted(
+        key
+        for key in source_content.keys() | destination_content.keys()
+        if key not in VOLATILE_KEYS
+        and source_content.get(key) != destination_content.get(key)
+    )
+
+
+def _payload_content(payload: dict[str, Any]) -> dict[str, Any]:
+    # Payloads are wrapped in a single root key, e.g. {"featureType": {...}}
+    if len(payload) == 1:
+        content = next(iter(payload.values()))
+        if isinstance(content, dict):
+            return content
+    return payload
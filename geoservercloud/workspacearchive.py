@@ -0,0 +1,400 @@
+import hashlib
+import json
+import zipfile
+from collections.abc import Callable
+from datetime import datetime, timezone
+from functools import partial
+from pathlib import Path, PurePosixPath
+from typing import IO, Any, NamedTuple
+
+from requests import Response
+
+from geoservercloud.models.common import resource_names
+from geoservercloud.models.datastore import DataStore
+from geoservercloud.models.featuretype import FeatureType
+from geoservercloud.models.layer import Layer
+from geoservercloud.models.layergroup import LayerGroup
+from geoservercloud.models.style import Style
+from geoservercloud.models.workspace import Workspace
+from geoservercloud.parallel import map_concurrently
+from geoservercloud.services.restlogger import gs_logger
+from geoservercloud.services.restservice import RestService
+
+FORMAT_VERSION = 1
+MANIFEST = "manifest.json"
+# Entries of a step only depend on the entries of the previous steps. Style files are imported
+# with their style definition and layer groups sequentially, as they may contain each other
+IMPORT_STEPS: tuple[tuple[str, ...], ...] = (
+    ("workspace",),
+    ("style", "datastore", "resource"),
+    ("featuretype",),
+    ("layer",),
+)
+ENTRY_TYPES: tuple[str, ...] = (
+    "workspace",
+    "style",
+    "stylefile",
+    "datastore",
+    "resource",
+    "featuretype",
+    "layer",
+    "layergroup",
+)
+
+
+class ArchiveEntry(NamedTuple):
+    """
+    File of a workspace archive, listed in its manifest
+    """
+
+    resource_type: str
+    name: str
+    path: str
+    size: int
+    sha256: str
+    content_type: str | None = None
+
+
+class WorkspaceArchive:
+    """
+    Export of a workspace to a zip archive, and import of the archive into any GeoServer instance.
+
+    The archive holds the JSON representation of the workspace, its datastores, feature types,
+    layers, layer groups and style definitions as returned by the REST API, the style files
+    (e.g. SLD) and the style images, plus a manifest listing the entries in dependency order
+    with their size and SHA-256 digest. The entries are written to the archive as they are
+    read from GeoServer, up to max_workers at a time.
+
+    Attributes
+    ----------
+    rest_service : RestService
+        service of the GeoServer instance to export from or to import into
+    max_workers : int
+        maximum number of concurrent requests (default: 1, i.e. sequential)
+
+    :Example:
+
+    >>> WorkspaceArchive(staging.rest_service, 8).export_workspace("ws", "ws.zip")
+    >>> WorkspaceArchive(production.rest_service, 8).import_workspace("ws.zip")
+    """
+
+    def __init__(self, rest_service: RestService, max_workers: int = 1) -> None:
+        self.rest_service: RestService = rest_service
+        self.max_workers: int = max_workers
+
+    def export_workspace(
+        self, workspace_name: str, path: str | Path | IO[bytes]
+    ) -> tuple[list[ArchiveEntry] | str, int]:
+        """
+        Write a workspace and the resources it contains to a zip archive, given by its path
+        or as a binary file object. An archive given by its path is written to a temporary
+        file next to it and only moved to the path once complete, so that a failed export
+        never leaves a truncated archive (nor replaces an existing one).
+        Return the entries of the manifest, or the first error.
+        """
+        if not isinstance(path, (str, Path)):
+            return self.write_archive(workspace_name, path)
+        path = Path(path)
+        partial_path = path.with_name(f"{path.name}.partial")
+        try:
+            entries, status_code = self.write_archive(workspace_name, partial_path)
+            if not isinstance(entries, str):
+                partial_path.replace(path)
+            return entries, status_code
+        finally:
+            partial_path.unlink(missing_ok=True)
+
+    def write_archive(
+        self, workspace_name: str, path: Path | IO[bytes]
+    ) -> tuple[list[ArchiveEntry] | str, int]:
+        """
+        Like :py:meth:`export_workspace`, writing the archive in place
+        """
+        endpoints = self.rest_service.rest_endpoints
+        response = self.rest_service.rest_client.get(
+            endpoints.workspace(workspace_name)
+        )
+        if not response.ok:
+            return response.content.decode(), response.status_code
+        listings: dict[str, Callable[[], tuple[Any, int]]] = {
+            "datastores": partial(self.rest_service.get_datastores, workspace_name),
+            "styles": partial(self.rest_service.get_styles, workspace_name),
+            "layergroups": partial(self.rest_service.get_layer_groups, workspace_name),
+            "images": partial(
+                self.rest_service.get_resource_directory, "styles", workspace_name
+            ),
+        }
+        listed = dict(
+            map_concurrently(lambda key: listings[key](), listings, self.max_workers)
+        )
+        for key in ("datastores", "styles", "layergroups"):
+            content, status_code = listed[key]
+            if isinstance(content, str):
+                return content, status_code
+        resource_dir, _ = listed["images"]
+        # The styles directory does not exist if the workspace has no style file
+        images = (
+            [child for child in resource_dir.children if child.is_image()]
+            if not isinstance(resource_dir, str)
+            else []
+        )
+        datastore_names = resource_names(listed["datastores"][0])
+        feature_types: dict[str, tuple[Any, int]] = dict(
+            map_concurrently(
+                lambda datastore_name: self.rest_service.get_feature_types(
+                    workspace_name, datastore_name
+                ),
+                datastore_names,
+                self.max_workers,
+            )
+        )
+        tasks: list[tuple[str, str, str, str]] = []
+        for datastore_name in datastore_names:
+            content, status_code = feature_types[datastore_name]
+            if isinstance(content, str):
+                return content, status_code
+            tasks.append(
+                (
+                    "datastore",
+                    datastore_name,
+                    f"datastores/{datastore_name}.json",
+                    endpoints.datastore(workspace_name, datastore_name),
+                )
+            )
+            for feature_type_name in resource_names(content):
+                tasks.append(
+                    (
+                        "featuretype",
+                        feature_type_name,
+                        f"featuretypes/{datastore_name}/{feature_type_name}.json",
+                        endpoints.featuretype(
+                            workspace_name, datastore_name, feature_type_name
+                        ),
+                    )
+                )
+                tasks.append(
+                    (
+                        "layer",
+                        feature_type_name,
+                        f"layers/{feature_type_name}.json",
+                        endpoints.workspace_layer(workspace_name, feature_type_name),
+                    )
+                )
+        tasks.extend(
+            (
+                "style",
+                style_name,
+                f"styles/{style_name}.json",
+                endpoints.style(style_name, workspace_name),
+            )
+            for style_name in resource_names(listed["styles"][0])
+        )
+        tasks.extend(
+            (
+                "resource",
+                image.name,
+                f"resources/styles/{image.name}",
+                endpoints.resource("styles", image.name, workspace_name),
+            )
+            for image in images
+        )
+        # Keep the source order of the layer groups, they may contain each other
+        tasks.extend(
+            (
+                "layergroup",
+                layer_group_name,
+                f"layergroups/{layer_group_name}.json",
+                endpoints.layergroup(workspace_name, layer_group_name),
+            )
+            for layer_group_name in resource_names(listed["layergroups"][0])
+        )
+        order: dict[str, int] = {task[2]: index for index, task in enumerate(tasks)}
+        entries: list[ArchiveEntry] = []
+        with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+            archive.writestr("workspace.json", response.content)
+            entries.append(
+                entry("workspace", workspace_name, "workspace.json", response)
+            )
+            for task, fetched in map_concurrently(
+                lambda task: self.fetch(workspace_name, *task),
+                tasks,
+                self.max_workers,
+            ):
+                for resource_type, name, entry_path, result in fetched:
+                    if not result.ok:
+                        return result.content.decode(), result.status_code
+                    archive.writestr(entry_path, result.content)
+                    entries.append(entry(resource_type, name, entry_path, result))
+                    order.setdefault(entry_path, order[task[2]])
+            entries.sort(
+                key=lambda item: (
+                    ENTRY_TYPES.index(item.resource_type),
+                    order.get(item.path, -1),
+                )
+            )
+            archive.writestr(
+                MANIFEST,
+                json.dumps(
+                    {
+                        "version": FORMAT_VERSION,
+                        "workspace": workspace_name,
+                        "source": self.rest_service.url,
+                        "created": datetime.now(timezone.utc).isoformat(),
+                        "entries": [item._asdict() for item in entries],
+                    },
+                    indent=2,
+                ),
+            )
+        gs_logger.info(
+            "Exported %s entries of workspace %s", len(entries), workspace_name
+        )
+        return entries, 200
+
+    def fetch(
+        self,
+        workspace_name: str,
+        resource_type: str,
+        name: str,
+        entry_path: str,
+        path: str,
+    ) -> list[tuple[str, str, str, Response]]:
+        """
+        Read the entries of a resource: its representation, and the style file of a style
+        """
+        response = self.rest_service.rest_client.get(path)
+        fetched = [(resource_type, name, entry_path, response)]
+        if resource_type == "style" and response.ok:
+            format = response.json()["style"].get("format") or "sld"
+            fetched.append(
+                (
+                    "stylefile",
+                    name,
+                    f"styles/{name}.{format}",
+                    self.rest_service.rest_client.get(
+                        self.rest_service.rest_endpoints.style(
+                            name, workspace_name, format=format
+                        )
+                    ),
+                )
+            )
+        return fetched
+
+    def import_workspace(self, path: str | Path | IO[bytes]) -> tuple[str, int]:
+        """
+        Create or update the workspace of a zip archive and the resources it contains.
+        Resources are written in dependency order: workspace, then styles, datastores and style
+        images, then feature types, then layers, then layer groups. Within each step, up to
+        max_workers resources are written concurrently.
+        Return the result of the last write, or the first error.
+        """
+        with zipfile.ZipFile(path) as archive:
+            return self.import_archive(archive)
+
+    def import_archive(self, archive: zipfile.ZipFile) -> tuple[str, int]:
+        """
+        Like :py:meth:`import_workspace`, from an open archive. An archive open for reading can
+        be imported into several instances concurrently.
+        """
+        manifest = json.loads(archive.read(MANIFEST))
+        if manifest.get("version") != FORMAT_VERSION:
+            raise ValueError(
+                f"Unsupported workspace archive version {manifest.get('version')}"
+            )
+        workspace_name: str = manifest["workspace"]
+        entries = [ArchiveEntry(**item) for item in manifest["entries"]]
+        style_files = {
+            item.name: item for item in entries if item.resource_type == "stylefile"
+        }
+        write = partial(self.write, archive, workspace_name, style_files)
+        content, status_code = "", 200
+        for step in IMPORT_STEPS:
+            for _, (content, status_code) in map_concurrently(
+                write,
+                [item for item in entries if item.resource_type in step],
+                self.max_workers,
+            ):
+                if status_code >= 400:
+                    return content, status_code
+        for item in entries:
+            if item.resource_type == "layergroup":
+                content, status_code = write(item)
+                if status_code >= 400:
+                    return content, status_code
+        return content, status_code
+
+    def write(
+        self,
+        archive: zipfile.ZipFile,
+        workspace_name: str,
+        style_files: dict[str, ArchiveEntry],
+        item: ArchiveEntry,
+    ) -> tuple[str, int]:
+        """
+        Write the resource of an archive entry to GeoServer
+        """
+        data = read(archive, item)
+        if item.resource_type == "resource":
+            directory = str(PurePosixPath(item.path).parent.relative_to("resources"))
+            return self.rest_service.put_resource(
+                directory,
+                item.name,
+                item.content_type or "application/octet-stream",
+                data,
+                workspace_name,
+            )
+        payload = json.loads(data)
+        if item.resource_type == "workspace":
+            return self.rest_service.create_workspace(
+                Workspace.from_get_response_payload(payload)
+            )
+        if item.resource_type == "datastore":
+            return self.rest_service.create_datastore(
+                workspace_name, DataStore.from_get_response_payload(payload)
+            )
+        if item.resource_type == "featuretype":
+            return self.rest_service.create_feature_type(
+                FeatureType.from_get_response_payload(payload)
+            )
+        if item.resource_type == "layer":
+            return self.rest_service.update_layer(
+                Layer.from_get_response_payload(payload), workspace_name
+            )
+        if item.resource_type == "layergroup":
+            return self.rest_service.create_layer_group(
+                item.name, workspace_name, LayerGroup.from_get_response_payload(payload)
+            )
+        if item.resource_type == "style":
+            content, status_code = self.rest_service.create_style_definition(
+                item.name, Style.from_get_response_payload(payload), workspace_name
+            )
+            style_file = style_files.get(item.name)
+            if status_code >= 400 or style_file is None:
+                return content, status_code
+            return self.rest_service.create_style(
+                item.name,
+                read(archive, style_file),
+                workspace_name,
+                format=PurePosixPath(style_file.path).suffix[1:],
+            )
+        raise ValueError(f"Unknown archive entry type {item.resource_type}")
+
+
+def entry(resource_type: str, name: str, path: str, response: Response) -> ArchiveEntry:
+    return ArchiveEntry(
+        resource_type,
+        name,
+        path,
+        len(response.content),
+        hashlib.sha256(response.content).hexdigest(),
+        response.headers.get("Content-Type"),
+    )
+
+
+def read(archive: zipfile.ZipFile, item: ArchiveEntry) -> bytes:
+    """
+    Read an archive entry, checking its digest against the manifest
+    """
+    data = archive.read(item.path)
+    if hashlib.sha256(data).hexdigest() != item.sha256:
+        raise ValueError(f"The archive entry {item.path} is corrupted")
+    return data
@@ -0,0 +1,93 @@
+from io import BytesIO
+
+from geoservercloud.services.capabilities import (
+    LayerRecord,
+    read_wfs_layers,
+    read_wms_layers,
+)
+
+WMS_CAPABILITIES = b"""<?xml version="1.0" encoding="UTF-8"?>
+<WMS_Capabilities version="1.3.0" xmlns="http://www.opengis.net/wms">
+  <Service><Name>WMS</Name><Title>GeoServer Web Map Service</Title></Service>
+  <Capability>
+    <Layer>
+      <Title>Root</Title>
+      <EX_GeographicBoundingBox>
+        <westBoundLongitude>-180</westBoundLongitude>
+        <eastBoundLongitude>180</eastBoundLongitude>
+        <southBoundLatitude>-90</southBoundLatitude>
+        <northBoundLatitude>90</northBoundLatitude>
+      </EX_GeographicBoundingBox>
+      <Layer queryable="1">
+        <Name>ws:roads</Name>
+        <Title>Roads</Title>
+        <EX_GeographicBoundingBox>
+          <westBoundLongitude>5.9</westBoundLongitude>
+          <eastBoundLongitude>10.5</eastBoundLongitude>
+          <southBoundLatitude>45.8</southBoundLatitude>
+          <northBoundLatitude>47.8</northBoundLatitude>
+        </EX_GeographicBoundingBox>
+        <Dimension name="time" units="ISO8601" default="2024-01-01">2023-01-01,2024-01-01</Dimension>
+        <Style><Name>line</Name><Title>Line</Title></Style>
+        <Style><Name>dashed</Name><Title>Dashed</Title></Style>
+      </Layer>
+      <Layer>
+        <Name>ws:group</Name>
+        <Title>Group</Title>
+        <Layer><Name>ws:lakes</Name><Title>Lakes</Title></Layer>
+        <Layer><Title>Unnamed</Title></Layer>
+      </Layer>
+    </Layer>
+  </Capability>
+</WMS_Capabilities>
+"""
+
+WFS_CAPABILITIES = b"""<?xml version="1.0" encoding="UTF-8"?>
+<wfs:WFS_Capabilities version="2.0.0" xmlns:wfs="http://www.opengis.net/wfs/2.0"
+    xmlns:ows="http://www.opengis.net/ows/1.1">
+  <wfs:FeatureTypeList>
+    <wfs:FeatureType>
+      <wfs:Name>ws:roads</wfs:Name>
+      <wfs:Title>Roads</wfs:Title>
+      <ows:WGS84BoundingBox>
+        <ows:LowerCorner>5.9 45.8</ows:LowerCorner>
+        <ows:UpperCorner>10.5 47.8</ows:UpperCorner>
+      </ows:WGS84BoundingBox>
+    </wfs:FeatureType>
+    <wfs:FeatureType>
+      <wfs:Name>ws:lakes</wfs:Name>
+    </wfs:FeatureType>
+  </wfs:FeatureTypeList>
+</wfs:WFS_Capabilities>
+"""
+
+
+def test_read_wms_layers():
+    layers = list(read_wms_layers(BytesIO(WMS_CAPABILITIES)))
+
+    assert layers == [
+        LayerRecord(
+            name="ws:roads",
+            title="Roads",
+            bbox=(5.9, 45.8, 10.5, 47.8),
+            styles=["line", "dashed"],
+            dimensions={"time": "2023-01-01,2024-01-01"},
+        ),
+        LayerRecord("ws:group", "Group", None, [], {}),
+        LayerRecord("ws:lakes", "Lakes", None, [], {}),
+    ]
+
+
+def test_read_wms_layers_is_lazy():
+    layers = read_wms_layers(BytesIO(WMS_CAPABILITIES))
+
+    assert next(layers).name == "ws:roads"
+
+
+def test_read_wfs_layers():
+    layers = list(read_wfs_layers(BytesIO(WFS_CAPABILITIES)))
+
+    assert layers == [
+        LayerRecord("ws:roads", "Roads", (5.9, 45.8, 10.5, 47.8), [], {}),
+        LayerRecord("ws:lakes", None, None, [], {}),
+    ]
@@ -0,0 +1,231 @@
+import pytest
+import responses
+from responses.registries import OrderedRegistry
+
+from geoservercloud import GeoServerCloud
+from geoservercloud.services.catalogcache import (
+    CatalogCache,
+    ValidatorCache,
+    invalidated_prefixes,
+    resource_type,
+)
+from geoservercloud.services.restclient import RestClient
+
+GEOSERVER_URL = "http://geoserver"
+WORKSPACE_PATH = "/rest/workspaces/ws.json"
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now: float = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def rest_client(cache: CatalogCache) -> RestClient:
+    return RestClient(GEOSERVER_URL, auth=("test", "test"), cache=cache)
+
+
+@pytest.mark.parametrize(
+    "path,expected",
+    [
+        ("/rest/workspaces.json", "workspaces"),
+        ("/rest/workspaces/ws.json", "workspaces"),
+        ("/rest/workspaces/ws/datastores/ds.json", "datastores"),
+        ("/rest/workspaces/ws/datastores/ds/featuretypes.json", "featuretypes"),
+        ("/rest/layers/ws:layer.json", "layers"),
+        ("/gwc/rest/layers/ws:layer.json", "layers"),
+    ],
+)
+def test_resource_type(path, expected):
+    assert resource_type(path) == expected
+
+
+def test_invalidated_prefixes():
+    assert invalidated_prefixes("/rest/workspaces/ws/datastores/ds.json") == [
+        ("/rest/workspaces/ws/datastores/ds", True),
+        ("/rest/workspaces/ws/datastores", False),
+    ]
+    assert invalidated_prefixes("/rest/workspaces.json") == [
+        ("/rest/workspaces", False)
+    ]
+
+
+def test_cache_hit_and_miss():
+    cache = CatalogCache()
+    client = rest_client(cache)
+
+    with responses.RequestsMock() as rsps:
+        get = rsps.get(
+            url=f"{GEOSERVER_URL}{WORKSPACE_PATH}", status=200, json={"a": 1}
+        )
+        first = client.get(WORKSPACE_PATH)
+        second = client.get(WORKSPACE_PATH)
+
+    assert get.call_count == 1
+    assert second is first
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_cache_ignores_errors_and_ows():
+    cache = CatalogCache()
+    client = rest_client(cache)
+
+    with responses.RequestsMock() as rsps:
+        missing = rsps.get(url=f"{GEOSERVER_URL}{WORKSPACE_PATH}", status=404)
+        wms = rsps.get(url=f"{GEOSERVER_URL}/wms", status=200)
+        for _ in range(2):
+            client.get(WORKSPACE_PATH)
+            client.get("/wms")
+
+    assert missing.call_count == 2
+    assert wms.call_count == 2
+    assert len(cache) == 0
+
+
+def test_cache_ttl_per_resource_type():
+    clock = Clock()
+    cache = CatalogCache(default_ttl=10, ttls={"styles": 0}, clock=clock)
+    client = rest_client(cache)
+
+    with responses.RequestsMock() as rsps:
+        workspace = rsps.get(url=f"{GEOSERVER_URL}{WORKSPACE_PATH}", status=200)
+        styles = rsps.get(url=f"{GEOSERVER_URL}/rest/styles.json", status=200)
+        client.get(WORKSPACE_PATH)
+        client.get("/rest/styles.json")
+        clock.now = 5
+        client.get(WORKSPACE_PATH)
+        client.get("/rest/styles.json")
+        clock.now = 11
+        client.get(WORKSPACE_PATH)
+
+    assert workspace.call_count == 2
+    assert styles.call_count == 2
+
+
+def test_cache_lru_eviction():
+    cache = CatalogCache(max_entries=2)
+    client = rest_client(cache)
+
+    with responses.RequestsMock() as rsps:
+        calls = {
+            name: rsps.get(
+                url=f"{GEOSERVER_URL}/rest/workspaces/{name}.json", status=200
+            )
+            for name in ("ws1", "ws2", "ws3")
+        }
+        client.get("/rest/workspaces/ws1.json")
+        client.get("/rest/workspaces/ws2.json")
+        client.get("/rest/workspaces/ws1.json")
+        client.get("/rest/workspaces/ws3.json")
+        client.get("/rest/workspaces/ws1.json")
+        client.get("/rest/workspaces/ws2.json")
+
+    assert calls["ws1"].call_count == 1
+    assert calls["ws2"].call_count == 2
+    assert cache.stats()["evictions"] == 2
+
+
+def test_cache_invalidated_by_writes():
+    cache = CatalogCache()
+    geoserver = GeoServerCloud(url=GEOSERVER_URL, cache=cache)
+    datastore_path = "/rest/workspaces/ws/datastores/ds.json"
+
+    with responses.RequestsMock() as rsps:
+        workspaces = rsps.get(
+            url=f"{GEOSERVER_URL}/rest/workspaces.json",
+            status=200,
+            json={"workspaces": ""},
+        )
+        datastore = rsps.get(url=f"{GEOSERVER_URL}{datastore_path}", status=200)
+        rsps.get(url=f"{GEOSERVER_URL}/rest/about/version.json", status=200)
+        rsps.delete(url=f"{GEOSERVER_URL}/rest/workspaces/ws.json", status=200)
+
+        geoserver.get_workspaces()
+        geoserver.rest_client.get(datastore_path)
+        geoserver.rest_client.get("/rest/about/version.json")
+        geoserver.get_workspaces()
+        geoserver.rest_client.get(datastore_path)
+        geoserver.delete_workspace("ws")
+        geoserver.get_workspaces()
+        geoserver.rest_client.get(datastore_path)
+
+    assert workspaces.call_count == 2
+    assert datastore.call_count == 2
+    assert len(cache) == 3
+    assert cache.stats()["invalidations"] == 2
+
+
+def test_conditional_get_reuses_body_on_not_modified():
+    validator_cache = ValidatorCache()
+    geoserver = GeoServerCloud(url=GEOSERVER_URL, validator_cache=validator_cache)
+    capabilities = "<WMS_Capabilities><Capability/></WMS_Capabilities>"
+
+    with responses.RequestsMock(registry=OrderedRegistry) as rsps:
+        rsps.get(
+            url=f"{GEOSERVER_URL}/ws/wms",
+            status=200,
+            body=capabilities,
+            headers={"ETag": '"v1"', "Last-Modified": "Wed, 01 Jan 2025 00:00:00 GMT"},
+        )
+        rsps.get(
+            url=f"{GEOSERVER_URL}/ws/wms",
+            status=304,
+            match=[
+                responses.matchers.header_matcher(
+                    {
+                        "If-None-Match": '"v1"',
+                        "If-Modified-Since": "Wed, 01 Jan 2025 00:00:00 GMT",
+                    },
+                    strict_match=False,
+                )
+            ],
+        )
+        first = geoserver.ows_service.get_wms_capabilities("ws")
+        second = geoserver.ows_service.get_wms_capabilities("ws")
+
+        assert len(rsps.calls) == 2
+
+    assert first == second == {"WMS_Capabilities": {"Capability": None}}
+    assert validator_cache.stats()["revalidations"] == 1
+
+
+def test_validator_cache_without_validators():
+    validator_cache = ValidatorCache()
+    client = RestClient(
+        GEOSERVER_URL, auth=("test", "test"), validator_cache=validator_cache
+    )
+
+    with responses.RequestsMock() as rsps:
+        rsps.get(url=f"{GEOSERVER_URL}{WORKSPACE_PATH}", status=200, json={})
+        client.get(WORKSPACE_PATH)
+        client.get(WORKSPACE_PATH)
+
+        assert "If-None-Match" not in rsps.calls[1].request.headers
+    assert len(validator_cache) == 0
+
+
+def test_validator_cache_size_limit():
+    validator_cache = ValidatorCache(max_bytes=10)
+    client = RestClient(
+        GEOSERVER_URL, auth=("test", "test"), validator_cache=validator_cache
+    )
+
+    with responses.RequestsMock() as rsps:
+        for name, body in (("small", "12345"), ("other", "123456"), ("big", "x" * 11)):
+            rsps.get(
+                url=f"{GEOSERVER_URL}/rest/{name}",
+                status=200,
+                body=body,
+                headers={"ETag": name},
+            )
+            client.get(f"/rest/{name}")
+
+    assert validator_cache.stats() == {
+        "entries": 1,
+        "bytes": 6,
+        "stores": 2,
+        "revalidations": 0,
+    }
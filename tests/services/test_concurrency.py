@@ -0,0 +1,159 @@
+import pytest
+import responses
+
+from geoservercloud import GeoServerCloud, GeoServerCloudSync
+from geoservercloud.fakegeoserver import FakeGeoServer
+from geoservercloud.services.concurrency import AdaptiveConcurrency
+from geoservercloud.services.instrumentation import MetricsAggregator, RequestEvent
+
+GEOSERVER_URL = "http://geoserver"
+WORKSPACE = "test_workspace"
+DATASTORE = "test_datastore"
+
+
+def event(total_time: float = 0.01, status_code: int = 200) -> RequestEvent:
+    return RequestEvent(
+        method="GET",
+        url=f"{GEOSERVER_URL}/wms",
+        path_template="/wms?request=GetMap",
+        status_code=status_code,
+        bytes_sent=0,
+        bytes_received=0,
+        connect_time=0.0,
+        elapsed=total_time,
+        total_time=total_time,
+    )
+
+
+def feed(adaptive: AdaptiveConcurrency, count: int, **kwargs) -> None:
+    for _ in range(count):
+        adaptive.request_finished(event(**kwargs))
+
+
+def test_additive_increase() -> None:
+    adaptive = AdaptiveConcurrency(initial_limit=2, max_limit=4, min_samples=10)
+
+    feed(adaptive, 9)
+    assert adaptive.limit == 2
+    feed(adaptive, 1)
+    assert adaptive.limit == 3
+    feed(adaptive, 30)
+    assert adaptive.limit == 4
+
+
+def test_multiplicative_decrease_on_errors() -> None:
+    adaptive = AdaptiveConcurrency(initial_limit=8, max_limit=16, min_samples=4)
+
+    feed(adaptive, 7)
+    feed(adaptive, 1, status_code=503)
+
+    assert adaptive.limit == 4
+
+
+def test_decrease_on_latency_spike() -> None:
+    adaptive = AdaptiveConcurrency(
+        initial_limit=4, max_limit=16, min_samples=4, latency_slack=0.05
+    )
+    feed(adaptive, 4, total_time=0.02)
+    assert adaptive.limit == 5
+    assert adaptive.baseline == 0.02
+
+    # Higher but within the slack
+    feed(adaptive, 5, total_time=0.06)
+    assert adaptive.limit == 6
+    feed(adaptive, 6, total_time=0.2)
+    assert adaptive.limit == 3
+    assert adaptive.baseline == 0.02
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {"initial_limit": 0},
+        {"initial_limit": 8, "max_limit": 4},
+        {"min_limit": 4, "initial_limit": 2},
+        {"backoff": 1.0},
+    ],
+)
+def test_invalid_settings(kwargs) -> None:
+    with pytest.raises(ValueError):
+        AdaptiveConcurrency(**kwargs)
+
+
+def test_get_maps_backs_off() -> None:
+    metrics = MetricsAggregator()
+    geoserver = GeoServerCloud(GEOSERVER_URL, observers=[metrics])
+    adaptive = AdaptiveConcurrency(initial_limit=4, max_limit=8, min_samples=4)
+    requests = [
+        {"layers": ["layer"], "bbox": (0, 0, 1, 1), "size": (256, 256)}
+        for _ in range(8)
+    ]
+
+    with responses.RequestsMock() as rsps:
+        rsps.get(f"{geoserver.url}/wms", status=503, body="overloaded")
+        results = list(geoserver.get_maps(requests, adaptive=adaptive))
+
+    assert [result.status_code for result in results] == [503] * 8
+    assert adaptive.limit == 1
+    assert metrics.concurrency == {"adaptive": 1}
+    assert "concurrency limit adaptive: 1" in metrics.report()
+
+
+def test_create_feature_types_ramps_up() -> None:
+    adaptive = AdaptiveConcurrency(
+        initial_limit=1, max_limit=4, min_samples=5, name="feature_types"
+    )
+    metrics = MetricsAggregator()
+    with FakeGeoServer() as server:
+        geoserver = GeoServerCloud(server.url, observers=[metrics])
+        geoserver.create_workspace(WORKSPACE)
+        geoserver.create_pg_datastore(
+            WORKSPACE, DATASTORE, "localhost", 5432, "db", "user", "password"
+        )
+
+        results = geoserver.create_feature_types(
+            (
+                {
+                    "layer_name": f"layer{i}",
+                    "workspace_name": WORKSPACE,
+                    "datastore_name": DATASTORE,
+                }
+                for i in range(30)
+            ),
+            adaptive=adaptive,
+        )
+
+    assert [result[1] for result in results] == [201] * 30
+    assert adaptive.limit > 1
+    assert metrics.concurrency == {"feature_types": adaptive.limit}
+
+
+def test_sync_copy_workspace() -> None:
+    adaptive = AdaptiveConcurrency(initial_limit=2, max_limit=4, min_samples=4)
+    with FakeGeoServer() as source, FakeGeoServer() as destination:
+        geoserver = GeoServerCloud(source.url)
+        geoserver.create_workspace(WORKSPACE)
+        geoserver.create_pg_datastore(
+            WORKSPACE, DATASTORE, "localhost", 5432, "db", "user", "password"
+        )
+        for i in range(10):
+            geoserver.create_feature_type(f"layer{i}", WORKSPACE, DATASTORE)
+        sync = GeoServerCloudSync(
+            source.url,
+            "admin",
+            "geoserver",
+            destination.url,
+            "admin",
+            "geoserver",
+            adaptive=adaptive,
+        )
+
+        content, status_code = sync.copy_workspace(WORKSPACE, deep_copy=True)
+
+        assert status_code < 400, content
+        assert destination.catalog.items.keys() == source.catalog.items.keys()
+    assert adaptive.clients == [
+        sync.src_instance.rest_client,
+        sync.dst_instance.rest_client,
+    ]
+    assert adaptive.limit > 2
@@ -0,0 +1,38 @@
+import json
+
+import pytest
+
+from geoservercloud.services.geojson import read_features
+
+FEATURES = [
+    {
+        "type": "Feature",
+        "id": f"layer.{i}",
+        "properties": {"name": f"é{i}", "a": [1, "]"], "b": '{"}\\'},
+    }
+    for i in range(5)
+]
+DOCUMENT = json.dumps(
+    {"type": "FeatureCollection", "features": FEATURES, "numberMatched": 5}
+).encode()
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 64, len(DOCUMENT)])
+def test_read_features(chunk_size):
+    chunks = (DOCUMENT[i : i + chunk_size] for i in range(0, len(DOCUMENT), chunk_size))
+
+    assert list(read_features(chunks)) == FEATURES
+
+
+def test_read_features_empty_collection():
+    assert list(read_features([b'{"type":"FeatureCollection","features":[]}'])) == []
+
+
+def test_read_features_not_geojson():
+    with pytest.raises(ValueError, match="ExceptionReport"):
+        list(read_features([b"<ows:ExceptionReport/>"]))
+
+
+def test_read_features_truncated():
+    with pytest.raises(ValueError):
+        list(read_features([DOCUMENT[:-40]]))
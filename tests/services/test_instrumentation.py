@@ -0,0 +1,225 @@
+import socket
+from typing import Any
+
+import pytest
+import requests
+import responses
+from pytest_mock import MockerFixture
+
+from geoservercloud import GeoServerCloud
+from geoservercloud.fakegeoserver import FakeGeoServer
+from geoservercloud.services.instrumentation import (
+    EndpointStats,
+    MetricsAggregator,
+    RequestEvent,
+    RequestObserver,
+    path_template,
+)
+from geoservercloud.services.restclient import NO_RESPONSE_STATUS, RestClient
+
+GEOSERVER_URL = "http://geoserver"
+
+
+class EventRecorder(RequestObserver):
+    def __init__(self) -> None:
+        self.started: list[tuple[str, str]] = []
+        self.events: list[RequestEvent] = []
+
+    def request_started(self, method: str, url: str) -> None:
+        self.started.append((method, url))
+
+    def request_finished(self, event: RequestEvent) -> None:
+        self.events.append(event)
+
+
+def event(total_time: float, status_code: int = 200) -> RequestEvent:
+    return RequestEvent(
+        method="GET",
+        url=f"{GEOSERVER_URL}/rest/workspaces.json",
+        path_template="/rest/workspaces.json",
+        status_code=status_code,
+        bytes_sent=0,
+        bytes_received=10,
+        connect_time=0.0,
+        elapsed=total_time,
+        total_time=total_time,
+    )
+
+
+@pytest.mark.parametrize(
+    "path,params,template",
+    [
+        ("/rest/workspaces.json", None, "/rest/workspaces.json"),
+        (
+            "/rest/workspaces/ws/datastores/ds.json",
+            None,
+            "/rest/workspaces/{ws}/datastores/{ds}.json",
+        ),
+        (
+            "/rest/workspaces/styles/styles/point.sld",
+            None,
+            "/rest/workspaces/{ws}/styles/{style}.sld",
+        ),
+        (
+            "/rest/workspaces/ws/datastores/ds/featuretypes",
+            None,
+            "/rest/workspaces/{ws}/datastores/{ds}/featuretypes",
+        ),
+        ("/rest/layers/ws:layer.json", None, "/rest/layers/{layer}.json"),
+        ("/rest/resource/styles/icons/icon.png", None, "/rest/resource/{path}"),
+        ("/ws/wms", {"REQUEST": "GetMap"}, "/{ws}/wms?request=GetMap"),
+        ("/wms", {"request": "GetCapabilities"}, "/wms?request=GetCapabilities"),
+        (
+            "/gwc/rest/seed/ws:layer.json",
+            None,
+            "/gwc/rest/seed/{layer}.json",
+        ),
+    ],
+)
+def test_path_template(path, params, template) -> None:
+    assert path_template(path, params) == template
+
+
+def test_endpoint_stats() -> None:
+    stats = EndpointStats(buckets=(0.01, 0.1, 1.0))
+    for total_time in (0.005, 0.05, 0.05, 0.5, 2.0):
+        stats.record(event(total_time))
+    stats.record(event(0.05, status_code=500))
+
+    assert stats.count == 6
+    assert stats.errors == 1
+    assert stats.bytes_received == 60
+    assert stats.histogram == [1, 3, 1, 1]
+    assert stats.quantile(0.5) == 0.1
+    assert stats.quantile(0.95) == 2.0
+    assert stats.mean_time == pytest.approx(2.655 / 6)
+    assert stats.asdict()["histogram"] == {"0.01": 1, "0.1": 3, "1.0": 1, "+Inf": 1}
+
+
+def test_metrics_aggregator() -> None:
+    metrics = MetricsAggregator()
+    geoserver = GeoServerCloud(GEOSERVER_URL, observers=[metrics])
+
+    with responses.RequestsMock() as rsps:
+        rsps.get(f"{GEOSERVER_URL}/rest/workspaces/ws1.json", status=404, body="")
+        rsps.get(f"{GEOSERVER_URL}/rest/workspaces/ws2.json", status=404, body="")
+        rsps.post(f"{GEOSERVER_URL}/rest/workspaces.json", status=201, body="ws1")
+        rsps.post(f"{GEOSERVER_URL}/rest/workspaces.json", status=201, body="ws2")
+        geoserver.get_workspace("ws1")
+        geoserver.get_workspace("ws2")
+        geoserver.create_workspace("ws1")
+        geoserver.create_workspace("ws2")
+
+    snapshot = metrics.snapshot()
+    assert set(snapshot) == {
+        "GET /rest/workspaces/{ws}.json",
+        "POST /rest/workspaces.json",
+    }
+    assert snapshot["GET /rest/workspaces/{ws}.json"]["count"] == 2
+    assert snapshot["GET /rest/workspaces/{ws}.json"]["errors"] == 2
+    post = snapshot["POST /rest/workspaces.json"]
+    assert post["count"] == 2
+    assert post["errors"] == 0
+    assert post["bytes_received"] == 6
+    assert post["bytes_sent"] > 0
+    assert "POST /rest/workspaces.json" in metrics.report()
+
+    metrics.reset()
+    assert metrics.snapshot() == {}
+
+
+def test_observer_events() -> None:
+    observer = EventRecorder()
+    rest_client = RestClient(GEOSERVER_URL, auth=("test", "test"), observers=[observer])
+
+    with responses.RequestsMock() as rsps:
+        rsps.put(f"{GEOSERVER_URL}/rest/styles/point.sld", status=200, body="")
+        rsps.get(
+            f"{GEOSERVER_URL}/rest/styles.json",
+            body=requests.ConnectionError("refused"),
+        )
+        rest_client.put("/rest/styles/point.sld", data=b"<sld/>")
+        with pytest.raises(requests.ConnectionError):
+            rest_client.get("/rest/styles.json")
+
+    assert observer.started == [
+        ("PUT", f"{GEOSERVER_URL}/rest/styles/point.sld"),
+        ("GET", f"{GEOSERVER_URL}/rest/styles.json"),
+    ]
+    put, get = observer.events
+    assert put.path_template == "/rest/styles/{style}.sld"
+    assert put.status_code == 200
+    assert put.bytes_sent == 6
+    assert put.error is None
+    assert put.total_time >= put.elapsed >= 0
+    assert get.status_code == NO_RESPONSE_STATUS
+    assert get.error is not None and "refused" in get.error
+
+    rest_client.remove_observer(observer)
+    with responses.RequestsMock() as rsps:
+        rsps.get(f"{GEOSERVER_URL}/rest/styles.json", json={})
+        rest_client.get("/rest/styles.json")
+    assert len(observer.events) == 2
+
+
+def test_failing_observer_does_not_fail_request() -> None:
+    class FailingObserver(RequestObserver):
+        def request_started(self, method: str, url: str) -> None:
+            raise RuntimeError("failing observer")
+
+        def request_finished(self, event: RequestEvent) -> None:
+            raise RuntimeError("failing observer")
+
+    observer = EventRecorder()
+    rest_client = RestClient(
+        GEOSERVER_URL, auth=("test", "test"), observers=[FailingObserver(), observer]
+    )
+
+    with responses.RequestsMock() as rsps:
+        rsps.get(f"{GEOSERVER_URL}/rest/styles.json", json={})
+        assert rest_client.get("/rest/styles.json").status_code == 200
+
+    # The other observers are still notified
+    assert observer.started == [("GET", f"{GEOSERVER_URL}/rest/styles.json")]
+    assert len(observer.events) == 1
+
+
+def test_dns_time_next_address(mocker: MockerFixture) -> None:
+    observer = EventRecorder()
+    resolve = socket.getaddrinfo
+
+    def getaddrinfo(host: str, *args: Any) -> list:
+        if host != "geoserver.test":
+            return resolve(host, *args)
+        # The first address refuses the connection, the next one is tried
+        return [
+            (socket.AF_INET, socket.SOCK_STREAM, 6, "", ("127.0.0.2", 0)),
+            (socket.AF_INET, socket.SOCK_STREAM, 6, "", ("127.0.0.1", 0)),
+        ]
+
+    mocker.patch("socket.getaddrinfo", side_effect=getaddrinfo)
+    with FakeGeoServer() as server:
+        url = server.url.replace("127.0.0.1", "geoserver.test")
+        rest_client = RestClient(url, auth=("admin", "geoserver"))
+        rest_client.add_observer(observer)
+        assert rest_client.get("/rest/workspaces.json").status_code == 200
+
+    assert observer.events[0].dns_time > 0
+    assert observer.events[0].connect_time > 0
+
+
+def test_connect_time() -> None:
+    observer = EventRecorder()
+    with FakeGeoServer() as server:
+        rest_client = RestClient(server.url, auth=("admin", "geoserver"))
+        rest_client.add_observer(observer)
+        rest_client.get("/rest/workspaces.json")
+        rest_client.get("/rest/workspaces.json")
+
+    first, second = observer.events
+    assert first.connect_time > 0
+    assert first.dns_time > 0
+    # The keep-alive connection is reused
+    assert second.connect_time == 0
+    assert second.dns_time == 0
+    assert first.bytes_received > 0
@@ -0,0 +1,134 @@
+import struct
+import zlib
+from io import BytesIO
+
+import pytest
+
+from geoservercloud.services import png
+from geoservercloud.services.png import PngImage, PngWriter
+
+
+def paeth(left: int, up: int, up_left: int) -> int:
+    estimate = left + up - up_left
+    distances = [abs(estimate - left), abs(estimate - up), abs(estimate - up_left)]
+    return [left, up, up_left][distances.index(min(distances))]
+
+
+def filter_row(filter_type: int, row: bytes, previous: bytes, bpp: int) -> bytes:
+    filtered = bytearray()
+    for i, value in enumerate(row):
+        left = row[i - bpp] if i >= bpp else 0
+        up = previous[i]
+        up_left = previous[i - bpp] if i >= bpp else 0
+        predictor = [0, left, up, (left + up) // 2, paeth(left, up, up_left)][
+            filter_type
+        ]
+        filtered.append((value - predictor) & 0xFF)
+    return bytes([filter_type]) + bytes(filtered)
+
+
+def encode_png(
+    rows: list[bytes],
+    width: int,
+    color_type: int,
+    chunks: tuple[tuple[bytes, bytes], ...] = (),
+) -> bytes:
+    """Encode rows, cycling through the 5 filter types"""
+    bpp = png.BYTES_PER_PIXEL[color_type]
+    previous = bytes(width * bpp)
+    raw = b""
+    for y, row in enumerate(rows):
+        raw += filter_row(y % 5, row, previous, bpp)
+        previous = row
+
+    def chunk(chunk_type: bytes, data: bytes) -> bytes:
+        return (
+            struct.pack(">I", len(data))
+            + chunk_type
+            + data
+            + struct.pack(">I", zlib.crc32(chunk_type + data))
+        )
+
+    header = struct.pack(">IIBBBBB", width, len(rows), 8, color_type, 0, 0, 0)
+    return (
+        png.PNG_SIGNATURE
+        + chunk(b"IHDR", header)
+        + b"".join(chunk(chunk_type, data) for chunk_type, data in chunks)
+        + chunk(b"IDAT", zlib.compress(raw))
+        + chunk(b"IEND", b"")
+    )
+
+
+def rgba_rows(width: int, height: int) -> list[bytes]:
+    return [
+        bytes(
+            value
+            for x in range(width)
+            for value in ((x * 37) % 256, (y * 91) % 256, (x * y) % 256, (x + y) % 256)
+        )
+        for y in range(height)
+    ]
+
+
+@pytest.fixture(params=["python", "numpy", "pillow"])
+def decoder(request, monkeypatch):
+    if request.param == "pillow":
+        pytest.importorskip("PIL")
+        return
+    monkeypatch.setattr(png, "Image", None)
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(png, "numpy", None)
+
+
+def test_decode_rgba(decoder):
+    rows = rgba_rows(7, 10)
+
+    image = PngImage.decode(encode_png(rows, 7, 6))
+
+    assert (image.width, image.height) == (7, 10)
+    assert image.rows == rows
+
+
+def test_decode_rgb(decoder):
+    rows = [bytes(range(y, y + 9)) for y in range(5)]
+
+    image = PngImage.decode(encode_png(rows, 3, 2))
+
+    assert image.rows[1] == bytes([1, 2, 3, 255, 4, 5, 6, 255, 7, 8, 9, 255])
+
+
+def test_decode_palette(decoder):
+    palette = bytes([255, 0, 0, 0, 255, 0])
+    rows = [bytes([0, 1, 1]), bytes([1, 0, 0])]
+
+    image = PngImage.decode(
+        encode_png(rows, 3, 3, ((b"PLTE", palette), (b"tRNS", b"\x80")))
+    )
+
+    assert image.rows[0] == bytes([255, 0, 0, 128, 0, 255, 0, 255, 0, 255, 0, 255])
+
+
+def test_decode_not_png():
+    with pytest.raises(ValueError):
+        PngImage.decode(b"<ServiceExceptionReport/>")
+
+
+def test_writer_roundtrip():
+    rows = rgba_rows(5, 4)
+    output = BytesIO()
+    writer = PngWriter(output, 5, 4)
+    for row in rows:
+        writer.write_row(row)
+    writer.close()
+
+    assert PngImage.decode(output.getvalue()).rows == rows
+
+
+def test_writer_checks_row_count():
+    writer = PngWriter(BytesIO(), 5, 4)
+    writer.write_row(bytes(20))
+
+    with pytest.raises(ValueError):
+        writer.close()
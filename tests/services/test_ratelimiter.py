@@ -0,0 +1,104 @@
+import threading
+from time import monotonic, sleep
+
+import pytest
+
+from geoservercloud import GeoServerCloud
+from geoservercloud.fakegeoserver import FakeGeoServer
+from geoservercloud.parallel import map_concurrently
+from geoservercloud.services.ratelimiter import (
+    RateLimiter,
+    RequestLimiter,
+    TokenBucket,
+)
+
+
+def test_token_bucket() -> None:
+    bucket = TokenBucket(rate=10, burst=2)
+
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == 0
+    # Tokens are reserved in order: the third and fourth callers wait 0.1 and 0.2 s
+    assert bucket.reserve() == pytest.approx(0.1, abs=0.01)
+    assert bucket.reserve() == pytest.approx(0.2, abs=0.01)
+
+
+def test_token_bucket_rate() -> None:
+    bucket = TokenBucket(rate=50, burst=1)
+    start = monotonic()
+
+    for _ in range(6):
+        bucket.acquire()
+
+    assert monotonic() - start >= 0.09
+
+
+@pytest.mark.parametrize(
+    "kwargs", [{"rate": 0}, {"rate": 1, "burst": 0.5}, {"max_in_flight": 0}]
+)
+def test_invalid_limits(kwargs) -> None:
+    with pytest.raises(ValueError):
+        RequestLimiter(**kwargs)
+
+
+def test_max_in_flight() -> None:
+    limiter = RequestLimiter(max_in_flight=2)
+    in_flight = 0
+    max_in_flight = 0
+    lock = threading.Lock()
+
+    def request(_) -> None:
+        nonlocal in_flight, max_in_flight
+        with limiter.limit():
+            with lock:
+                in_flight += 1
+                max_in_flight = max(max_in_flight, in_flight)
+            sleep(0.01)
+            with lock:
+                in_flight -= 1
+
+    list(map_concurrently(request, range(10), max_workers=5))
+
+    assert max_in_flight == 2
+    assert limiter.requests == 10
+    assert limiter.wait_time > 0
+
+
+@pytest.mark.parametrize(
+    "method,path,expected",
+    [
+        ("GET", "/rest/workspaces.json", "reads"),
+        ("HEAD", "/rest/workspaces/ws.json", "reads"),
+        ("POST", "/rest/workspaces.json", "writes"),
+        ("DELETE", "/gwc/rest/layers/ws:layer", "writes"),
+        ("GET", "/ws/wms", "ows"),
+        ("POST", "/wfs", "ows"),
+        ("GET", "/gwc/service/wmts", "ows"),
+    ],
+)
+def test_request_classes(method, path, expected) -> None:
+    rate_limiter = RateLimiter(
+        reads=RequestLimiter(), writes=RequestLimiter(), ows=RequestLimiter()
+    )
+
+    assert rate_limiter.limiter(method, path) is getattr(rate_limiter, expected)
+
+
+def test_shared_rate_limiter() -> None:
+    rate_limiter = RateLimiter(writes=RequestLimiter(rate=20, burst=1))
+
+    with FakeGeoServer() as server1, FakeGeoServer() as server2:
+        geoserver1 = GeoServerCloud(server1.url, rate_limiter=rate_limiter)
+        geoserver2 = GeoServerCloud(server2.url, rate_limiter=rate_limiter)
+        start = monotonic()
+        for i in range(3):
+            geoserver1.create_workspace(f"workspace{i}")
+            geoserver2.create_workspace(f"workspace{i}")
+        elapsed = monotonic() - start
+        geoserver1.get_workspaces()
+
+    # 6 writes at 20 per second, the first one without waiting
+    assert elapsed >= 0.24
+    assert rate_limiter.stats() == {
+        "writes": {"requests": 6, "wait_time": pytest.approx(0.25, abs=0.05)}
+    }
@@ -1,6 +1,11 @@
+from collections.abc import Iterator
+from io import BytesIO
+from pathlib import Path
+
 import pytest
 import responses
 
+from geoservercloud.fakegeoserver import FakeGeoServer
 from geoservercloud.models.resourcedirectory import ResourceDirectory
 from geoservercloud.services.restservice import RestService
 
@@ -72,3 +77,71 @@ def test_get_global_style_resource_directory(
         resource_dir, code = rest_service.get_resource_directory(path="styles")
         assert isinstance(resource_dir, ResourceDirectory)
         assert len(resource_dir.children) == 2
+
+
+@pytest.fixture
+def fake_service() -> Iterator[tuple[FakeGeoServer, RestService]]:
+    with FakeGeoServer() as server:
+        yield server, RestService(server.url, auth=("admin", "geoserver"))
+
+
+def test_put_resource_streamed(
+    fake_service: tuple[FakeGeoServer, RestService], tmp_path: Path
+):
+    server, rest_service = fake_service
+    content = bytes(range(256)) * 1024
+    path = tmp_path / "icon.png"
+    path.write_bytes(content)
+    empty_path = tmp_path / "empty.png"
+    empty_path.touch()
+
+    for name, data in (
+        ("mapped.png", path),
+        ("empty.png", empty_path),
+        ("file.png", BytesIO(content)),
+        ("chunks.png", (content[i : i + 1000] for i in range(0, len(content), 1000))),
+    ):
+        _, status_code = rest_service.put_resource(
+            "styles", name, "image/png", data, "test"
+        )
+        assert status_code == 201
+
+    resources = server.catalog.resources
+    assert resources["workspaces/test/styles/mapped.png"] == ("image/png", content)
+    assert resources["workspaces/test/styles/empty.png"] == ("image/png", b"")
+    assert resources["workspaces/test/styles/file.png"] == ("image/png", content)
+    assert resources["workspaces/test/styles/chunks.png"] == ("image/png", content)
+
+
+def test_stream_resource(
+    fake_service: tuple[FakeGeoServer, RestService], tmp_path: Path
+):
+    server, rest_service = fake_service
+    content = bytes(range(256)) * 1024
+    server.catalog.resources["workspaces/test/styles/icon.png"] = ("image/png", content)
+
+    chunks, status_code = rest_service.stream_resource(
+        "styles", "icon.png", "test", chunk_size=1000
+    )
+    assert status_code == 200
+    assert not isinstance(chunks, str)
+    chunk_list = list(chunks)
+    assert max(len(chunk) for chunk in chunk_list) == 1000
+    assert b"".join(chunk_list) == content
+
+    output = tmp_path / "icon.png"
+    assert rest_service.download_resource("styles", "icon.png", output, "test") == (
+        "",
+        200,
+    )
+    assert output.read_bytes() == content
+    file = BytesIO()
+    rest_service.download_resource("styles", "icon.png", file, "test")
+    assert file.getvalue() == content
+
+    missing = tmp_path / "missing.png"
+    message, status_code = rest_service.download_resource(
+        "styles", "missing.png", missing, "test"
+    )
+    assert status_code == 404
+    assert not missing.exists()
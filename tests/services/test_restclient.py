@@ -0,0 +1,49 @@
+import responses
+
+from geoservercloud import GeoServerCloud, GeoServerCloudSync
+from geoservercloud.services.restclient import RestClient
+
+GEOSERVER_URL = "http://geoserver"
+
+
+def test_rest_client_reuses_session():
+    rest_client = RestClient(GEOSERVER_URL, auth=("test", "test"), pool_maxsize=4)
+    adapter = rest_client.session.get_adapter(f"{GEOSERVER_URL}/rest")
+    assert adapter._pool_maxsize == 4  # type: ignore
+
+    with responses.RequestsMock() as rsps:
+        rsps.get(url=f"{GEOSERVER_URL}/rest/workspaces.json", status=200, json={})
+        rsps.get(url=f"{GEOSERVER_URL}/rest/workspaces.json", status=200, json={})
+        session = rest_client.session
+        rest_client.get("/rest/workspaces.json")
+        rest_client.get("/rest/workspaces.json")
+        assert rest_client.session is session
+
+
+def test_geoserver_shares_rest_client_between_services():
+    geoserver = GeoServerCloud(url=GEOSERVER_URL, pool_maxsize=20)
+
+    assert geoserver.rest_service.rest_client is geoserver.rest_client
+    assert geoserver.ows_service.rest_client is geoserver.rest_client
+    adapter = geoserver.rest_client.session.get_adapter(f"{GEOSERVER_URL}/wms")
+    assert adapter._pool_maxsize == 20  # type: ignore
+
+
+def test_geoserver_sync_pool_maxsize():
+    geoserver_sync = GeoServerCloudSync(
+        "http://src",
+        "admin",
+        "geoserver",
+        "http://dst",
+        "admin",
+        "geoserver",
+        pool_maxsize=5,
+    )
+
+    for instance in (geoserver_sync.src_instance, geoserver_sync.dst_instance):
+        adapter = instance.rest_client.session.get_adapter(instance.url)
+        assert adapter._pool_maxsize == 5  # type: ignore
+    assert (
+        geoserver_sync.src_instance.rest_client.session
+        is not geoserver_sync.dst_instance.rest_client.session
+    )
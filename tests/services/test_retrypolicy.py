@@ -0,0 +1,216 @@
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from pathlib import Path
+
+import pytest
+import requests
+import responses
+from pytest_mock import MockerFixture
+from responses import registries
+
+from geoservercloud import GeoServerCloud
+from geoservercloud.services.instrumentation import MetricsAggregator
+from geoservercloud.services.restclient import RestClient
+from geoservercloud.services.retrypolicy import (
+    RetryPolicy,
+    parse_retry_after,
+    retrying,
+)
+
+GEOSERVER_URL = "http://geoserver"
+WORKSPACES_URL = f"{GEOSERVER_URL}/rest/workspaces.json"
+
+
+def response(status_code: int, headers: dict[str, str] | None = None):
+    result = requests.Response()
+    result.status_code = status_code
+    result.headers.update(headers or {})
+    return result
+
+
+@pytest.fixture
+def sleep(mocker: MockerFixture):
+    return mocker.patch("geoservercloud.services.restclient.sleep")
+
+
+@pytest.mark.parametrize(
+    "method,retry_post,status_code,retries,expected",
+    [
+        ("GET", False, 503, 0, True),
+        ("PUT", False, 502, 2, True),
+        ("DELETE", False, 429, 0, True),
+        ("GET", False, 503, 3, False),
+        ("GET", False, 500, 0, False),
+        ("GET", False, 404, 0, False),
+        ("POST", False, 503, 0, False),
+        ("POST", True, 504, 0, True),
+    ],
+)
+def test_should_retry(method, retry_post, status_code, retries, expected) -> None:
+    policy = RetryPolicy(max_retries=3, retry_post=retry_post)
+
+    assert (
+        policy.should_retry(method, retries, response=response(status_code)) is expected
+    )
+
+
+def test_should_retry_errors() -> None:
+    policy = RetryPolicy()
+
+    assert policy.should_retry("GET", 0, error=requests.ConnectionError())
+    assert policy.should_retry("GET", 0, error=requests.ReadTimeout())
+    assert not policy.should_retry("GET", 0, error=requests.TooManyRedirects())
+    assert not policy.should_retry("POST", 0, error=requests.ConnectionError())
+
+
+def test_delay() -> None:
+    policy = RetryPolicy(backoff_factor=0.5, max_backoff=3.0, jitter=False)
+
+    assert [policy.delay(retries) for retries in range(5)] == [0.5, 1, 2, 3, 3]
+    assert policy.delay(0, response(503, {"Retry-After": "7"})) == 7
+    assert RetryPolicy(max_retry_after=5).delay(
+        0, response(503, {"Retry-After": "60"})
+    ) == (5)
+    jittered = RetryPolicy(backoff_factor=1.0, max_backoff=10.0)
+    assert all(0 <= jittered.delay(2) <= 4 for _ in range(100))
+
+
+def test_parse_retry_after() -> None:
+    date = datetime.now(timezone.utc) + timedelta(seconds=30)
+
+    assert parse_retry_after(response(503)) is None
+    assert parse_retry_after(response(503, {"Retry-After": "2.5"})) == 2.5
+    assert parse_retry_after(response(503, {"Retry-After": "-1"})) == 0
+    delay = parse_retry_after(
+        response(503, {"Retry-After": format_datetime(date, usegmt=True)})
+    )
+    assert delay is not None
+    assert 25 < delay <= 30
+    assert parse_retry_after(response(503, {"Retry-After": "soon"})) is None
+    assert parse_retry_after(response(503, {"Retry-After": "nan"})) is None
+    assert parse_retry_after(response(503, {"Retry-After": "inf"})) is None
+    assert RetryPolicy(backoff_factor=0.0).delay(
+        0, response(503, {"Retry-After": "nan"})
+    ) == (0)
+
+
+def test_invalid_policy() -> None:
+    with pytest.raises(ValueError):
+        RetryPolicy(max_retries=-1)
+
+
+def test_retry_transient_errors(sleep, caplog) -> None:
+    metrics = MetricsAggregator()
+    rest_client = RestClient(
+        GEOSERVER_URL,
+        auth=("test", "test"),
+        observers=[metrics],
+        retry_policy=RetryPolicy(jitter=False),
+    )
+
+    with responses.RequestsMock(registry=registries.OrderedRegistry) as rsps:
+        rsps.get(WORKSPACES_URL, body=requests.ConnectionError("reset"))
+        rsps.get(WORKSPACES_URL, status=503, headers={"Retry-After": "2"})
+        rsps.get(WORKSPACES_URL, status=200, json={"workspaces": ""})
+        assert rest_client.get("/rest/workspaces.json").status_code == 200
+
+    assert [call.args for call in sleep.call_args_list] == [(0.5,), (2.0,)]
+    assert "retry 1 of 3" in caplog.text
+    assert "failed with status 503, retry 2 of 3 in 2.00 s" in caplog.text
+    stats = metrics.snapshot()["GET /rest/workspaces.json"]
+    assert stats["count"] == 3
+    assert stats["errors"] == 2
+    assert stats["retries"] == 2
+
+
+def test_retries_exhausted(sleep) -> None:
+    rest_client = RestClient(
+        GEOSERVER_URL, auth=("test", "test"), retry_policy=RetryPolicy(max_retries=2)
+    )
+
+    with responses.RequestsMock() as rsps:
+        rsps.get(WORKSPACES_URL, status=503)
+        with pytest.raises(requests.HTTPError):
+            rest_client.get("/rest/workspaces.json")
+        assert len(rsps.calls) == 3
+
+    assert sleep.call_count == 2
+
+
+def test_post_is_not_retried_by_default(sleep) -> None:
+    rest_client = RestClient(
+        GEOSERVER_URL, auth=("test", "test"), retry_policy=RetryPolicy()
+    )
+
+    with responses.RequestsMock(registry=registries.OrderedRegistry) as rsps:
+        rsps.post(WORKSPACES_URL, status=503)
+        with pytest.raises(requests.HTTPError):
+            rest_client.post("/rest/workspaces.json", json={})
+
+        rsps.post(WORKSPACES_URL, status=503)
+        rsps.post(WORKSPACES_URL, status=201)
+        assert (
+            rest_client.post(
+                "/rest/workspaces.json",
+                json={},
+                retry_policy=RetryPolicy(retry_post=True),
+            ).status_code
+            == 201
+        )
+
+    assert sleep.call_count == 1
+
+
+def test_streamed_body_is_not_retried(sleep) -> None:
+    rest_client = RestClient(
+        GEOSERVER_URL, auth=("test", "test"), retry_policy=RetryPolicy()
+    )
+
+    with responses.RequestsMock() as rsps:
+        rsps.put(f"{GEOSERVER_URL}/rest/resource/file.bin", status=503)
+        response = rest_client.send(
+            "PUT", "/rest/resource/file.bin", data=iter([b"a", b"b"])
+        )
+        assert response.status_code == 503
+        assert len(rsps.calls) == 1
+
+    sleep.assert_not_called()
+
+
+def test_memory_mapped_file_is_retried(sleep, tmp_path: Path) -> None:
+    geoserver = GeoServerCloud(GEOSERVER_URL, retry_policy=RetryPolicy())
+    path = tmp_path / "icon.png"
+    path.write_bytes(b"\x89PNG")
+    bodies: list[bytes] = []
+
+    def callback(request) -> tuple[int, dict[str, str], str]:
+        bodies.append(request.body)
+        return (503 if len(bodies) == 1 else 201), {}, ""
+
+    with responses.RequestsMock() as rsps:
+        rsps.add_callback(
+            "PUT", f"{GEOSERVER_URL}/rest/resource/styles/icon.png", callback=callback
+        )
+        assert geoserver.rest_service.put_resource(
+            "styles", "icon.png", "image/png", path
+        ) == ("", 201)
+
+    assert bodies == [b"\x89PNG", b"\x89PNG"]
+    assert sleep.call_count == 1
+
+
+def test_retrying_overrides_client_policy(sleep) -> None:
+    geoserver = GeoServerCloud(GEOSERVER_URL, retry_policy=RetryPolicy())
+
+    with responses.RequestsMock(registry=registries.OrderedRegistry) as rsps:
+        rsps.get(WORKSPACES_URL, status=503)
+        with retrying(RetryPolicy(max_retries=0)):
+            with pytest.raises(requests.HTTPError):
+                geoserver.get_workspaces()
+
+        rsps.post(WORKSPACES_URL, status=502)
+        rsps.post(WORKSPACES_URL, status=201, body="ws")
+        with retrying(RetryPolicy(retry_post=True)):
+            assert geoserver.create_workspace("ws") == ("ws", 201)
+
+    assert sleep.call_count == 1
@@ -0,0 +1,99 @@
+import sqlite3
+
+import pytest
+
+from geoservercloud.services.tilepyramid import (
+    MBTilesWriter,
+    Tile,
+    TileMatrix,
+    tile_range,
+    tile_ranges,
+)
+
+ORIGIN = 20037508.342789244
+WEB_MERCATOR_MATRICES = [
+    TileMatrix(
+        identifier=f"EPSG:3857:{zoom}",
+        scale_denominator=559082264.0287178 / 2**zoom,
+        top_left_corner=(-ORIGIN, ORIGIN),
+        tile_width=256,
+        tile_height=256,
+        matrix_width=2**zoom,
+        matrix_height=2**zoom,
+    )
+    for zoom in range(4)
+]
+
+
+def test_tile_range_web_mercator():
+    tile_range_ = tile_range(
+        3, WEB_MERCATOR_MATRICES[3], (0, 0, ORIGIN / 2, ORIGIN / 2), "EPSG:3857"
+    )
+
+    assert tile_range_
+    assert (tile_range_.min_column, tile_range_.max_column) == (4, 5)
+    assert (tile_range_.min_row, tile_range_.max_row) == (2, 3)
+    assert tile_range_.tile_count == 4
+
+
+def test_tile_range_clipped_to_matrix():
+    tile_range_ = tile_range(
+        1, WEB_MERCATOR_MATRICES[1], (-2 * ORIGIN, -1, 2 * ORIGIN, 1), "EPSG:3857"
+    )
+
+    assert tile_range_
+    assert (tile_range_.min_column, tile_range_.max_column) == (0, 1)
+    assert (tile_range_.min_row, tile_range_.max_row) == (0, 1)
+
+
+def test_tile_range_outside_matrix():
+    assert (
+        tile_range(
+            0, WEB_MERCATOR_MATRICES[0], (3 * ORIGIN, 0, 4 * ORIGIN, 1), "EPSG:3857"
+        )
+        is None
+    )
+
+
+def test_tile_range_geographic():
+    class OwslibTileMatrix:
+        identifier = "EPSG:4326:0"
+        scaledenominator = 279541132.0143589
+        # Latitude first
+        topleftcorner = (90.0, -180.0)
+        tilewidth = 256
+        tileheight = 256
+        matrixwidth = 2
+        matrixheight = 1
+
+    tile_matrix = TileMatrix.from_owslib(
+        OwslibTileMatrix(), "urn:ogc:def:crs:EPSG::4326"
+    )
+    tile_range_ = tile_range(
+        0, tile_matrix, (10, 40, 20, 50), "urn:ogc:def:crs:EPSG::4326"
+    )
+
+    assert tile_matrix.top_left_corner == (-180.0, 90.0)
+    assert tile_range_
+    assert (tile_range_.min_column, tile_range_.max_column) == (1, 1)
+    assert (tile_range_.min_row, tile_range_.max_row) == (0, 0)
+
+
+def test_tile_ranges_invalid_zoom():
+    with pytest.raises(ValueError):
+        tile_ranges(WEB_MERCATOR_MATRICES, (0, 0, 1, 1), "EPSG:3857", 2, 4)
+
+
+def test_mbtiles_writer_flips_rows(tmp_path):
+    path = tmp_path / "tiles.mbtiles"
+    writer = MBTilesWriter(path, metadata={"name": "layer"})
+    writer.write(Tile(2, WEB_MERCATOR_MATRICES[2], 0, 1), b"tile")
+    writer.close()
+
+    with sqlite3.connect(path) as connection:
+        assert connection.execute("SELECT * FROM tiles").fetchall() == [
+            (2, 1, 3, b"tile")
+        ]
+        assert connection.execute("SELECT * FROM metadata").fetchall() == [
+            ("name", "layer")
+        ]
@@ -0,0 +1,189 @@
+import pytest
+import requests
+import responses
+
+from geoservercloud import GeoServerCloud
+from geoservercloud.fakegeoserver import FakeGeoServer
+from geoservercloud.services import tracing
+from geoservercloud.services.restclient import RestClient
+from geoservercloud.services.tracing import (
+    OpenTelemetryTracer,
+    RecordedSpan,
+    RecordingTracer,
+)
+
+GEOSERVER_URL = "http://geoserver"
+WORKSPACE = "test_workspace"
+DATASTORE = "test_datastore"
+
+
+def by_name(tracer: RecordingTracer) -> dict[str, RecordedSpan]:
+    return {span.name: span for span in tracer.spans}
+
+
+def test_no_tracing_by_default() -> None:
+    geoserver = GeoServerCloud(GEOSERVER_URL)
+
+    with responses.RequestsMock() as rsps:
+        rsps.get(f"{GEOSERVER_URL}/rest/workspaces.json", json={"workspaces": ""})
+        geoserver.get_workspaces()
+        assert "traceparent" not in rsps.calls[0].request.headers
+
+    assert geoserver.rest_client.tracer.enabled is False
+
+
+def test_spans() -> None:
+    tracer = RecordingTracer()
+    geoserver = GeoServerCloud(GEOSERVER_URL, tracer=tracer)
+
+    with responses.RequestsMock() as rsps:
+        rsps.post(f"{GEOSERVER_URL}/rest/workspaces.json", status=201, body=WORKSPACE)
+        geoserver.create_workspace(WORKSPACE)
+        request_headers = rsps.calls[0].request.headers
+
+    spans = by_name(tracer)
+    assert set(spans) == {
+        "GeoServerCloud.create_workspace",
+        "RestService.create_workspace",
+        "RestService.upsert",
+        "RestService.upsert.post",
+        "RestService.serialize",
+        "HTTP POST",
+    }
+    facade = spans["GeoServerCloud.create_workspace"]
+    http = spans["HTTP POST"]
+    assert facade.parent_id is None
+    assert spans["RestService.create_workspace"].parent_id == facade.span_id
+    assert (
+        spans["RestService.upsert.post"].parent_id
+        == spans["RestService.upsert"].span_id
+    )
+    assert (
+        spans["RestService.serialize"].parent_id
+        == spans["RestService.upsert.post"].span_id
+    )
+    assert http.parent_id == spans["RestService.upsert.post"].span_id
+    assert {span.trace_id for span in tracer.spans} == {facade.trace_id}
+    assert request_headers["traceparent"] == f"00-{http.trace_id}-{http.span_id}-01"
+    assert http.attributes == {
+        "http.request.method": "POST",
+        "url.full": f"{GEOSERVER_URL}/rest/workspaces.json",
+        "url.template": "/rest/workspaces.json",
+        "http.response.status_code": 201,
+    }
+    assert facade.attributes["geoserver.status_code"] == 201
+    assert facade.duration >= http.duration > 0
+    assert tracer.report().splitlines()[0].startswith("GeoServerCloud.create_workspace")
+
+
+def test_upsert_probe_spans() -> None:
+    tracer = RecordingTracer()
+    geoserver = GeoServerCloud(GEOSERVER_URL, tracer=tracer)
+    path = f"{GEOSERVER_URL}/rest/workspaces/{WORKSPACE}/datastores"
+
+    with responses.RequestsMock() as rsps:
+        rsps.get(f"{path}/{DATASTORE}.json", status=200, json={})
+        rsps.put(f"{path}/{DATASTORE}.json", status=200)
+        geoserver.create_pg_datastore(
+            WORKSPACE, DATASTORE, "localhost", 5432, "db", "user", "password"
+        )
+
+    spans = by_name(tracer)
+    upsert = spans["RestService.upsert"]
+    probe = spans["RestService.upsert.probe"]
+    put = spans["RestService.upsert.put"]
+    assert probe.parent_id == put.parent_id == upsert.span_id
+    assert probe.attributes == {
+        "geoserver.upsert_strategy": "probe",
+        "geoserver.exists": True,
+    }
+    assert spans["RestService.resource_exists"].parent_id == probe.span_id
+    assert spans["HTTP PUT"].parent_id == put.span_id
+    assert spans["RestService.serialize"].parent_id == put.span_id
+    assert probe.end_time is not None and probe.end_time <= put.start_time
+
+
+def test_span_error() -> None:
+    tracer = RecordingTracer()
+    rest_client = RestClient(GEOSERVER_URL, auth=("test", "test"), tracer=tracer)
+
+    with responses.RequestsMock() as rsps:
+        rsps.get(
+            f"{GEOSERVER_URL}/rest/workspaces.json",
+            body=requests.ConnectionError("refused"),
+        )
+        with pytest.raises(requests.ConnectionError):
+            rest_client.get("/rest/workspaces.json")
+
+    (span,) = tracer.spans
+    assert span.name == "HTTP GET"
+    assert span.error is not None and "refused" in span.error
+    assert "http.response.status_code" not in span.attributes
+
+
+def test_spans_of_concurrent_requests() -> None:
+    tracer = RecordingTracer()
+    with FakeGeoServer() as server:
+        geoserver = GeoServerCloud(server.url, tracer=tracer)
+        geoserver.create_workspace(WORKSPACE)
+        geoserver.create_pg_datastore(
+            WORKSPACE, DATASTORE, "localhost", 5432, "db", "user", "password"
+        )
+        tracer.reset()
+
+        geoserver.create_feature_types(
+            (
+                {
+                    "layer_name": f"layer{i}",
+                    "workspace_name": WORKSPACE,
+                    "datastore_name": DATASTORE,
+                }
+                for i in range(4)
+            ),
+            max_workers=4,
+        )
+
+    root = by_name(tracer)["GeoServerCloud.create_feature_types"]
+    batch = by_name(tracer)["RestService.create_feature_types"]
+    # Spans opened in the worker threads are children of the batch span
+    assert {span.trace_id for span in tracer.spans} == {root.trace_id}
+    assert [
+        span.parent_id
+        for span in tracer.spans
+        if span.name == "RestService.create_feature_type"
+    ] == [batch.span_id] * 4
+
+
+def test_opentelemetry_tracer_requires_opentelemetry(monkeypatch) -> None:
+    monkeypatch.setattr(tracing, "otel_trace", None)
+
+    with pytest.raises(ImportError):
+        OpenTelemetryTracer()
+
+
+def test_opentelemetry_tracer() -> None:
+    pytest.importorskip("opentelemetry.sdk")
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+    from opentelemetry.sdk.trace.export.in_memory_span_exporter import (
+        InMemorySpanExporter,
+    )
+
+    exporter = InMemorySpanExporter()
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+    geoserver = GeoServerCloud(
+        GEOSERVER_URL,
+        tracer=OpenTelemetryTracer(provider.get_tracer("test")),
+    )
+
+    with responses.RequestsMock() as rsps:
+        rsps.get(f"{GEOSERVER_URL}/rest/workspaces.json", json={"workspaces": ""})
+        geoserver.get_workspaces()
+        assert "traceparent" in rsps.calls[0].request.headers
+
+    assert [span.name for span in exporter.get_finished_spans()] == [
+        "HTTP GET",
+        "RestService.get_workspaces",
+        "GeoServerCloud.get_workspaces",
+    ]
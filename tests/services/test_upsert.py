@@ -0,0 +1,138 @@
+import pytest
+import requests
+import responses
+
+from geoservercloud.models.featuretype import FeatureType
+from geoservercloud.services.restservice import RestService, UpsertStrategy
+
+BASE_URL = "http://geoserver/rest/workspaces/ws/datastores/ds"
+
+
+def feature_type(name: str) -> FeatureType:
+    return FeatureType(
+        name=name, native_name=name, workspace_name="ws", store_name="ds"
+    )
+
+
+def rest_service(strategy: str) -> RestService:
+    return RestService("http://geoserver", ("test", "test"), upsert_strategy=strategy)
+
+
+def test_upsert_default_probe():
+    with responses.RequestsMock() as rsps:
+        rsps.get(url=f"{BASE_URL}/featuretypes/ft1.json", status=200, json={})
+        rsps.put(url=f"{BASE_URL}/featuretypes/ft1.json", status=200)
+
+        content, status_code = RestService(
+            "http://geoserver", ("test", "test")
+        ).create_feature_type(feature_type("ft1"))
+
+    assert status_code == 200
+
+
+def test_upsert_optimistic_creates_with_one_request():
+    with responses.RequestsMock() as rsps:
+        rsps.post(url=f"{BASE_URL}/featuretypes.json", status=201, body=b"ft1")
+
+        content, status_code = rest_service("optimistic").create_feature_type(
+            feature_type("ft1")
+        )
+
+    assert (content, status_code) == ("ft1", 201)
+
+
+def test_upsert_optimistic_updates_on_conflict():
+    with responses.RequestsMock() as rsps:
+        rsps.post(url=f"{BASE_URL}/featuretypes.json", status=409)
+        rsps.put(url=f"{BASE_URL}/featuretypes/ft1.json", status=200)
+
+        content, status_code = rest_service(
+            UpsertStrategy.OPTIMISTIC
+        ).create_feature_type(feature_type("ft1"))
+
+    assert status_code == 200
+
+
+@pytest.mark.parametrize(
+    "status, body",
+    [
+        (500, "Resource named 'ft1' already exists in store: 'ds'"),
+        (403, "Style 'ft1' already exists"),
+    ],
+)
+def test_upsert_optimistic_updates_if_already_exists(status, body):
+    with responses.RequestsMock() as rsps:
+        rsps.post(url=f"{BASE_URL}/featuretypes.json", status=status, body=body)
+        rsps.put(url=f"{BASE_URL}/featuretypes/ft1.json", status=200)
+
+        content, status_code = rest_service(
+            UpsertStrategy.OPTIMISTIC
+        ).create_feature_type(feature_type("ft1"))
+
+    assert status_code == 200
+
+
+def test_upsert_optimistic_other_error():
+    with responses.RequestsMock() as rsps:
+        rsps.post(url=f"{BASE_URL}/featuretypes.json", status=500, body="Broken")
+
+        with pytest.raises(requests.HTTPError):
+            rest_service(UpsertStrategy.OPTIMISTIC).create_feature_type(
+                feature_type("ft1")
+            )
+
+
+def test_upsert_head():
+    with responses.RequestsMock() as rsps:
+        rsps.head(url=f"{BASE_URL}/featuretypes/ft1.json", status=404)
+        rsps.post(url=f"{BASE_URL}/featuretypes.json", status=201)
+
+        content, status_code = rest_service("head").create_feature_type(
+            feature_type("ft1")
+        )
+
+    assert status_code == 201
+
+
+def test_upsert_index_lists_collection_once():
+    service = rest_service("index")
+    with responses.RequestsMock() as rsps:
+        listing = rsps.get(
+            url=f"{BASE_URL}/featuretypes.json",
+            status=200,
+            json={"featureTypes": {"featureType": [{"name": "existing"}]}},
+        )
+        rsps.put(url=f"{BASE_URL}/featuretypes/existing.json", status=200)
+        post = rsps.post(url=f"{BASE_URL}/featuretypes.json", status=201)
+
+        assert service.create_feature_type(feature_type("existing"))[1] == 200
+        assert service.create_feature_type(feature_type("new1"))[1] == 201
+        assert service.create_feature_type(feature_type("new2"))[1] == 201
+
+    assert listing.call_count == 1
+    assert post.call_count == 2
+    assert service.catalog_index[
+        f"/rest/workspaces/ws/datastores/ds/featuretypes.json"
+    ] == {
+        "existing",
+        "new1",
+        "new2",
+    }
+
+
+def test_upsert_index_empty_collection():
+    service = rest_service("index")
+    with responses.RequestsMock() as rsps:
+        rsps.get(
+            url=f"{BASE_URL}/featuretypes.json",
+            status=200,
+            json={"featureTypes": ""},
+        )
+        rsps.post(url=f"{BASE_URL}/featuretypes.json", status=201)
+
+        assert service.create_feature_type(feature_type("ft1"))[1] == 201
+
+
+def test_invalid_upsert_strategy():
+    with pytest.raises(ValueError):
+        rest_service("unknown")
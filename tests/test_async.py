@@ -0,0 +1,107 @@
+import asyncio
+import inspect
+import threading
+
+import pytest
+import responses
+
+from geoservercloud import AsyncGeoServerCloud
+from geoservercloud.models.workspace import Workspace
+from geoservercloud.services import AsyncOwsService, AsyncRestService
+
+GEOSERVER_URL = "http://geoserver"
+WORKSPACES = [f"workspace_{i}" for i in range(5)]
+
+
+@pytest.mark.parametrize(
+    "async_cls,sync_attribute",
+    [
+        (AsyncGeoServerCloud, "geoserver"),
+        (AsyncRestService, "rest_service"),
+        (AsyncOwsService, "ows_service"),
+    ],
+)
+def test_async_methods_match_sync_methods(async_cls: type, sync_attribute: str) -> None:
+    async_instance = (
+        async_cls(GEOSERVER_URL)
+        if async_cls is AsyncGeoServerCloud
+        else async_cls(GEOSERVER_URL, ("test", "test"))
+    )
+    sync_instance = getattr(async_instance, sync_attribute)
+    for name, method in inspect.getmembers(sync_instance, inspect.ismethod):
+        if name.startswith("_") or name in ("close", "aclose"):
+            continue
+        if inspect.isgeneratorfunction(inspect.unwrap(method)):
+            with pytest.raises(AttributeError, match="generator"):
+                getattr(async_instance, name)
+            continue
+        async_method = getattr(async_instance, name)
+        assert inspect.iscoroutinefunction(async_method), name
+        assert inspect.signature(async_method) == inspect.signature(method), name
+        assert async_method.__doc__ == method.__doc__, name
+    # Static methods and other attributes are those of the synchronous object
+    assert AsyncRestService(GEOSERVER_URL, ("test", "test")).rest_endpoints
+    async_instance.async_client.close()
+
+
+def test_async_call_runs_on_worker_thread() -> None:
+    async def get_thread_name(geoserver: AsyncGeoServerCloud) -> str:
+        return await geoserver.async_client.run(lambda: threading.current_thread().name)
+
+    geoserver = AsyncGeoServerCloud(url=GEOSERVER_URL)
+    assert asyncio.run(get_thread_name(geoserver)).startswith("geoservercloud")
+    geoserver.close()
+
+
+def test_async_create_workspaces_gathered() -> None:
+    async def create_workspaces() -> list[tuple[str, int]]:
+        async with AsyncGeoServerCloud(
+            url=GEOSERVER_URL, max_concurrency=3
+        ) as geoserver:
+            return await asyncio.gather(
+                *(geoserver.create_workspace(name) for name in WORKSPACES)
+            )
+
+    with responses.RequestsMock() as rsps:
+        for name in WORKSPACES:
+            rsps.post(
+                url=f"{GEOSERVER_URL}/rest/workspaces.json",
+                status=201,
+                body=name.encode(),
+                match=[
+                    responses.matchers.json_params_matcher(
+                        {"workspace": {"name": name, "isolated": False}}
+                    )
+                ],
+            )
+
+        results = asyncio.run(create_workspaces())
+
+    assert sorted(results) == [(name, 201) for name in WORKSPACES]
+
+
+def test_async_default_workspace() -> None:
+    geoserver = AsyncGeoServerCloud(url=GEOSERVER_URL)
+    geoserver.default_workspace = "test_workspace"
+
+    assert geoserver.geoserver.default_workspace == "test_workspace"
+    geoserver.close()
+
+
+def test_async_rest_service_get_workspace() -> None:
+    async def get_workspace() -> tuple:
+        rest_service = AsyncRestService(GEOSERVER_URL, ("test", "test"))
+        async with rest_service.async_client:
+            return await rest_service.get_workspace("test_workspace")
+
+    with responses.RequestsMock() as rsps:
+        rsps.get(
+            url=f"{GEOSERVER_URL}/rest/workspaces/test_workspace.json",
+            status=200,
+            json={"workspace": {"name": "test_workspace", "isolated": True}},
+        )
+        workspace, status_code = asyncio.run(get_workspace())
+
+    assert isinstance(workspace, Workspace)
+    assert workspace.isolated
+    assert status_code == 200
@@ -0,0 +1,166 @@
+import json
+from io import BytesIO
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from benchmarks.runner import (
+    Result,
+    best_of,
+    compare,
+    main,
+    measure_reference,
+    percentile,
+    relative_metrics,
+    run_isolated,
+    run_scenario,
+)
+from benchmarks.scenarios import wms_capabilities
+from geoservercloud.services.capabilities import read_wms_layers
+
+
+def result(**metrics: Any) -> Result:
+    values: dict[str, Any] = {
+        "scenario": "workspaces",
+        "requests": 100,
+        "duration": 1.0,
+        "requests_per_second": 100.0,
+        "p50": 1.0,
+        "p95": 2.0,
+        "peak_rss": 50.0,
+    }
+    values.update(metrics)
+    return Result(**values)
+
+
+def test_percentile() -> None:
+    values = [float(value) for value in range(1, 101)]
+
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 95) == 95.0
+    assert percentile([3.0], 95) == 3.0
+    assert percentile([], 50) == 0.0
+
+
+@pytest.mark.parametrize(
+    "metrics,regressions",
+    [
+        ({}, []),
+        ({"requests_per_second": 60.0, "p50": 2.0}, []),
+        (
+            {"requests_per_second": 40.0},
+            ["workspaces: requests_per_second 0.04 vs baseline 0.1"],
+        ),
+        ({"p95": 3.0}, []),
+        ({"p95": 3.6}, ["workspaces: p95 3.6 vs baseline 2.0"]),
+        ({"peak_rss": 80.0}, ["workspaces: peak_rss 80.0 vs baseline 50.0"]),
+        ({"scenario": "unknown", "p95": 10.0}, []),
+    ],
+)
+def test_compare(metrics, regressions) -> None:
+    # Relative to 1000 plain requests per second, i.e. a reference latency of 1 ms
+    baseline = {
+        "workspaces": {
+            "requests_per_second": 0.1,
+            "p50": 1.0,
+            "p95": 2.0,
+            "peak_rss": 50.0,
+        }
+    }
+
+    assert compare([result(**metrics)], baseline, 1000.0, tolerance=0.5) == regressions
+
+
+def test_relative_metrics() -> None:
+    # A machine twice as fast runs the scenario twice as fast: same relative metrics
+    slow = relative_metrics(result(), 500.0)
+
+    assert slow == {
+        "requests_per_second": 0.2,
+        "p50": 0.5,
+        "p95": 1.0,
+        "peak_rss": 50.0,
+    }
+    assert (
+        relative_metrics(result(requests_per_second=200.0, p50=0.5, p95=1.0), 1000.0)
+        == slow
+    )
+
+
+def test_best_of() -> None:
+    best = best_of(
+        [
+            result(requests_per_second=90.0, p50=1.0, p95=3.0),
+            result(requests_per_second=110.0, p50=1.5, p95=2.0),
+        ]
+    )
+
+    assert best == result(requests_per_second=110.0, p50=1.0, p95=2.0)
+
+
+def test_run_scenario() -> None:
+    result = run_scenario("copy_workspace", scale=0.05, max_workers=2)
+
+    assert result.scenario == "copy_workspace"
+    # Workspace, datastore, feature type, layer, style with its image, layer group
+    assert result.requests > 10
+    assert result.requests_per_second > 0
+    assert 0 < result.p50 <= result.p95
+
+
+def test_run_isolated() -> None:
+    result = run_isolated("workspaces", scale=0.05)
+
+    assert result.requests == 10
+    assert result.peak_rss > 0
+
+
+def test_measure_reference() -> None:
+    assert measure_reference(scale=0.05) > 0
+
+
+def test_wms_capabilities() -> None:
+    layers = list(read_wms_layers(BytesIO(wms_capabilities(3))))
+
+    assert [layer.name for layer in layers] == [
+        "bench:layer0",
+        "bench:layer1",
+        "bench:layer2",
+    ]
+
+
+def test_baseline(tmp_path: Path) -> None:
+    baseline = tmp_path / "baseline.json"
+    args = [
+        "--scenario",
+        "workspaces",
+        "--scale",
+        "0.05",
+        "--repeat",
+        "1",
+        "--baseline",
+        str(baseline),
+    ]
+
+    assert main(args + ["--save_baseline"]) == 0
+    content = json.loads(baseline.read_text())
+    assert content["reference"] > 0
+    assert content["settings"] == {
+        "scale": 0.05,
+        "max_workers": 1,
+        "latency": 0.0,
+        "repeat": 1,
+    }
+    assert set(content["scenarios"]["workspaces"]) == {
+        "requests_per_second",
+        "p50",
+        "p95",
+        "peak_rss",
+    }
+
+    content["scenarios"]["workspaces"]["requests_per_second"] = 10**9
+    baseline.write_text(json.dumps(content))
+    assert main(args) == 1
+    # Results measured with other settings are not comparable
+    assert main(args + ["--max_workers", "4"]) == 0
@@ -0,0 +1,179 @@
+from collections.abc import Iterator
+
+import pytest
+import requests
+
+from geoservercloud import GeoServerCloud
+from geoservercloud.fakegeoserver import FakeCatalog, FakeGeoServer
+from geoservercloud.geoservercloudsync import GeoServerCloudSync
+from geoservercloud.models.featuretype import FeatureType
+from geoservercloud.models.layergroup import LayerGroup
+from geoservercloud.models.style import Style
+from geoservercloud.models.workspace import Workspace
+from geoservercloud.services.restservice import UpsertStrategy
+
+WORKSPACE = "test_workspace"
+DATASTORE = "test_datastore"
+SLD = b"<StyledLayerDescriptor/>"
+
+
+@pytest.fixture
+def server() -> Iterator[FakeGeoServer]:
+    with FakeGeoServer() as server:
+        yield server
+
+
+@pytest.fixture
+def geoserver(server: FakeGeoServer) -> GeoServerCloud:
+    return GeoServerCloud(server.url)
+
+
+def populate(geoserver: GeoServerCloud) -> None:
+    geoserver.create_workspace(WORKSPACE)
+    geoserver.create_pg_datastore(
+        WORKSPACE, DATASTORE, "localhost", 5432, "db", "user", "password"
+    )
+    geoserver.create_feature_type("layer1", WORKSPACE, DATASTORE)
+    geoserver.create_feature_type("layer2", WORKSPACE, DATASTORE)
+    geoserver.create_style_definition("style", "style.sld", WORKSPACE)
+    geoserver.rest_service.create_style("style", SLD, WORKSPACE)
+    geoserver.create_layer_group("group", WORKSPACE, layers=["layer1", "layer2"])
+    geoserver.rest_service.put_resource(
+        "styles", "icon.png", "image/png", b"\x89PNG", WORKSPACE
+    )
+
+
+def test_version(geoserver: GeoServerCloud) -> None:
+    content, status_code = geoserver.get_version()
+
+    assert status_code == 200
+    assert content["about"]["resource"][0]["Version"] == "2.27.0"  # type: ignore
+
+
+def test_workspace_lifecycle(geoserver: GeoServerCloud) -> None:
+    assert geoserver.create_workspace(WORKSPACE) == (WORKSPACE, 201)
+    # Existing workspaces are updated
+    assert geoserver.create_workspace(WORKSPACE, isolated=True) == ("", 200)
+    workspace, status_code = geoserver.rest_service.get_workspace(WORKSPACE)
+    assert status_code == 200
+    assert isinstance(workspace, Workspace)
+    assert workspace.isolated is True
+    assert geoserver.get_workspaces() == ([{"name": WORKSPACE}], 200)
+    assert geoserver.delete_workspace(WORKSPACE) == ("", 200)
+    assert geoserver.get_workspace(WORKSPACE)[1] == 404
+    assert geoserver.get_workspaces() == ([], 200)
+
+
+def test_catalog(geoserver: GeoServerCloud) -> None:
+    populate(geoserver)
+
+    feature_type, status_code = geoserver.rest_service.get_feature_type(
+        WORKSPACE, DATASTORE, "layer1"
+    )
+    assert status_code == 200
+    assert isinstance(feature_type, FeatureType)
+    assert feature_type.store_name == DATASTORE
+    assert geoserver.get_feature_types(WORKSPACE, DATASTORE)[0] == [
+        {"name": "layer1"},
+        {"name": "layer2"},
+    ]
+    layer, status_code = geoserver.rest_service.get_layer(WORKSPACE, "layer1")
+    assert status_code == 200
+    assert layer.resource_name == f"{WORKSPACE}:layer1"  # type: ignore
+    layer_group, status_code = geoserver.rest_service.get_layer_group(
+        WORKSPACE, "group"
+    )
+    assert status_code == 200
+    assert isinstance(layer_group, LayerGroup)
+    style, status_code = geoserver.rest_service.get_style_definition("style", WORKSPACE)
+    assert status_code == 200
+    assert isinstance(style, Style)
+    assert geoserver.rest_service.get_style("style", WORKSPACE) == (SLD, 200)
+    resource_dir, status_code = geoserver.rest_service.get_resource_directory(
+        "styles", WORKSPACE
+    )
+    assert status_code == 200
+    assert [child.name for child in resource_dir.children] == ["icon.png"]  # type: ignore
+    assert resource_dir.children[0].is_image()  # type: ignore
+
+
+def test_delete_recursively(geoserver: GeoServerCloud, server: FakeGeoServer) -> None:
+    populate(geoserver)
+    response = requests.delete(f"{server.url}/rest/workspaces/{WORKSPACE}.json")
+    assert response.status_code == 403
+
+    geoserver.delete_workspace(WORKSPACE)
+
+    assert server.catalog.items == {}
+    assert server.catalog.resources == {}
+    assert server.catalog.style_files == {}
+
+
+@pytest.mark.parametrize("strategy", list(UpsertStrategy))
+def test_upsert_strategies(server: FakeGeoServer, strategy: UpsertStrategy) -> None:
+    geoserver = GeoServerCloud(server.url)
+    geoserver.rest_service.upsert_strategy = strategy
+    populate(geoserver)
+    server.request_count = 0
+
+    populate(geoserver)
+
+    assert server.request_count > 0
+    assert geoserver.get_feature_types(WORKSPACE, DATASTORE)[0] == [
+        {"name": "layer1"},
+        {"name": "layer2"},
+    ]
+
+
+def test_copy_workspace(geoserver: GeoServerCloud, server: FakeGeoServer) -> None:
+    populate(geoserver)
+    with FakeGeoServer() as destination:
+        sync = GeoServerCloudSync(
+            server.url,
+            "admin",
+            "geoserver",
+            destination.url,
+            "admin",
+            "geoserver",
+            max_workers=4,
+        )
+
+        content, status_code = sync.copy_workspace(WORKSPACE, deep_copy=True)
+
+        assert status_code < 400, content
+        assert destination.catalog.items.keys() == server.catalog.items.keys()
+        assert destination.catalog.style_files == server.catalog.style_files
+        assert destination.catalog.resources == server.catalog.resources
+
+
+def test_latency() -> None:
+    delays: list[tuple[str, str]] = []
+
+    def latency(method: str, path: str) -> float:
+        delays.append((method, path))
+        return 0.01
+
+    with FakeGeoServer(latency=latency) as server:
+        response = requests.get(f"{server.url}/rest/workspaces.json")
+
+    assert response.status_code == 200
+    assert response.elapsed.total_seconds() >= 0.01
+    assert delays == [("GET", "workspaces.json")]
+
+
+def test_catalog_handle() -> None:
+    catalog = FakeCatalog()
+
+    assert (
+        catalog.handle("GET", "workspaces/missing/datastores.json").status_code == 404
+    )
+    assert (
+        catalog.handle(
+            "POST", "workspaces.json", body=b'{"datastore": {"name": "ds"}}'
+        ).status_code
+        == 400
+    )
+    assert (
+        catalog.handle("PUT", "workspaces/missing.json", body=b"{}").status_code == 404
+    )
+    assert catalog.handle("GET", "resource/missing.png").status_code == 404
@@ -0,0 +1,96 @@
+from collections.abc import Iterator
+
+import pytest
+
+from geoservercloud import Destination, GeoServerCloud, GeoServerCloudFanOut
+from geoservercloud.fakegeoserver import FakeGeoServer
+from geoservercloud.services.restclient import NO_RESPONSE_STATUS
+
+WORKSPACE = "test_workspace"
+DATASTORE = "test_datastore"
+
+
+@pytest.fixture
+def source() -> Iterator[FakeGeoServer]:
+    with FakeGeoServer() as server:
+        geoserver = GeoServerCloud(server.url)
+        geoserver.create_workspace(WORKSPACE)
+        geoserver.create_pg_datastore(
+            WORKSPACE, DATASTORE, "localhost", 5432, "db", "user", "password"
+        )
+        for i in range(3):
+            geoserver.create_feature_type(f"layer{i}", WORKSPACE, DATASTORE)
+        geoserver.create_style_definition("style", "style.sld", WORKSPACE)
+        geoserver.rest_service.create_style("style", b"<sld/>", WORKSPACE)
+        geoserver.rest_service.put_resource(
+            "styles", "icon.png", "image/png", b"\x89PNG", WORKSPACE
+        )
+        geoserver.create_layer_group("group", WORKSPACE, ["layer0", "layer1"])
+        yield server
+
+
+@pytest.mark.parametrize("spool_size", [0, 1024 * 1024])
+def test_copy_workspace(source: FakeGeoServer, spool_size: int) -> None:
+    with FakeGeoServer() as first, FakeGeoServer() as second:
+        source.request_count = 0
+        fan_out = GeoServerCloudFanOut(
+            source.url,
+            "admin",
+            "geoserver",
+            [Destination(first.url), Destination(second.url)],
+            max_workers=4,
+            spool_size=spool_size,
+        )
+
+        reports, status_code = fan_out.copy_workspace(WORKSPACE)
+
+        assert status_code == 200, reports
+        assert isinstance(reports, list)
+        assert [report.url for report in reports] == [first.url, second.url]
+        assert all(report.ok for report in reports)
+        # Workspace, 4 listings, 1 feature type listing, datastore, 3 feature types and
+        # layers, style definition and file, image, layer group
+        assert source.request_count == 1 + 4 + 1 + 1 + 6 + 2 + 1 + 1
+        for destination in (first, second):
+            assert destination.catalog.items.keys() == source.catalog.items.keys()
+            assert destination.catalog.style_files == source.catalog.style_files
+            assert destination.catalog.resources == source.catalog.resources
+
+
+def test_copy_workspace_failed_destination(source: FakeGeoServer) -> None:
+    unreachable = "http://127.0.0.1:1/geoserver"
+    with FakeGeoServer() as destination:
+        fan_out = GeoServerCloudFanOut(
+            source.url,
+            "admin",
+            "geoserver",
+            [Destination(unreachable), Destination(destination.url)],
+        )
+
+        reports, status_code = fan_out.copy_workspace(WORKSPACE)
+
+        assert status_code == NO_RESPONSE_STATUS
+        assert isinstance(reports, list)
+        assert reports[0].status_code == NO_RESPONSE_STATUS
+        assert reports[1].ok
+        assert destination.catalog.items.keys() == source.catalog.items.keys()
+
+
+def test_copy_missing_workspace(source: FakeGeoServer) -> None:
+    fan_out = GeoServerCloudFanOut(
+        source.url, "admin", "geoserver", [Destination("http://destination")]
+    )
+
+    assert fan_out.copy_workspace("missing")[1] == 404
+
+
+def test_destinations() -> None:
+    with pytest.raises(ValueError):
+        GeoServerCloudFanOut("http://source", "admin", "geoserver", [])
+    with pytest.raises(ValueError):
+        GeoServerCloudFanOut(
+            "http://source",
+            "admin",
+            "geoserver",
+            [Destination("http://destination"), Destination("http://destination/")],
+        )
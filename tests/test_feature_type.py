@@ -298,3 +298,49 @@ def test_delete_feature_type(geoserver: GeoServerCloud) -> None:
 
         assert content == ""
         assert code == 200
+
+
+def test_create_feature_types(geoserver: GeoServerCloud) -> None:
+    base_url = f"{geoserver.url}/rest/workspaces/{WORKSPACE}/datastores/{STORE}"
+    specs = [
+        {"layer_name": name, "workspace_name": WORKSPACE, "datastore_name": STORE}
+        for name in ("featuretype1", "new_layer", "failing_layer")
+    ] + [{"workspace_name": WORKSPACE}, {"layer_name": "unknown", "typo": True}]
+    with responses.RequestsMock() as rsps:
+        listing = rsps.get(
+            url=f"{base_url}/featuretypes.json",
+            status=200,
+            json={
+                "featureTypes": {
+                    "featureType": [{"name": "featuretype1"}, {"name": "other"}]
+                }
+            },
+        )
+        rsps.put(url=f"{base_url}/featuretypes/featuretype1.json", status=200)
+        rsps.post(
+            url=f"{base_url}/featuretypes.json",
+            status=201,
+            body=b"new_layer",
+            match=[
+                responses.matchers.json_params_matcher(
+                    {"featureType": {"name": "new_layer"}}, strict_match=False
+                )
+            ],
+        )
+        rsps.post(
+            url=f"{base_url}/featuretypes.json",
+            status=500,
+            body=b"Error",
+        )
+
+        results = geoserver.create_feature_types(specs, max_workers=3)
+
+    assert listing.call_count == 1
+    assert [(content, status) for content, status, _ in results][:3] == [
+        ("", 200),
+        ("new_layer", 201),
+        ("Error", 500),
+    ]
+    # Invalid specs are not sent
+    assert [status for _, status, _ in results[3:]] == [400, 400]
+    assert all(elapsed >= 0 for _, _, elapsed in results)
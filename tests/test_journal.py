@@ -0,0 +1,188 @@
+import json
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+
+from geoservercloud import GeoServerCloud, GeoServerCloudSync
+from geoservercloud.fakegeoserver import FakeGeoServer
+from geoservercloud.journal import (
+    JsonlJournal,
+    SqliteJournal,
+    fingerprint,
+    open_journal,
+)
+from geoservercloud.models.workspace import Workspace
+
+WORKSPACE = "test_workspace"
+DATASTORE = "test_datastore"
+CONTEXT = {"src_url": "http://src", "dst_url": "http://dst", "workspace": WORKSPACE}
+
+
+@pytest.fixture(params=["journal.jsonl", "journal.sqlite"])
+def journal_path(request, tmp_path: Path) -> Path:
+    return tmp_path / request.param
+
+
+def test_fingerprint() -> None:
+    assert fingerprint(Workspace(WORKSPACE)) == fingerprint(Workspace(WORKSPACE))
+    assert fingerprint(Workspace(WORKSPACE)) != fingerprint(
+        Workspace(WORKSPACE, isolated=True)
+    )
+    assert fingerprint({"style": {"name": "a", "dateModified": "2026-01-01"}}) == (
+        fingerprint({"style": {"name": "a", "dateModified": "2026-02-01"}})
+    )
+    assert fingerprint(b"a", b"b") == fingerprint(b"ab")
+
+
+def test_open_journal(tmp_path: Path) -> None:
+    with open_journal(tmp_path / "journal.jsonl") as journal:
+        assert isinstance(journal, JsonlJournal)
+    with open_journal(tmp_path / "journal.db") as journal:
+        assert isinstance(journal, SqliteJournal)
+
+
+def test_resume(journal_path: Path) -> None:
+    with open_journal(journal_path, CONTEXT) as journal:
+        journal.record("workspace", WORKSPACE, "a")
+        journal.record("datastore", f"{WORKSPACE}:{DATASTORE}", "b")
+        journal.record("datastore", f"{WORKSPACE}:{DATASTORE}", "c")
+
+    with open_journal(journal_path, CONTEXT, resume=True) as journal:
+        assert journal.entries == {
+            ("workspace", WORKSPACE): "a",
+            ("datastore", f"{WORKSPACE}:{DATASTORE}"): "c",
+        }
+        assert journal.confirmed("workspace", WORKSPACE, "a")
+        assert not journal.confirmed("datastore", f"{WORKSPACE}:{DATASTORE}", "b")
+        assert journal.skipped == 1
+
+    with open_journal(journal_path, CONTEXT) as journal:
+        assert len(journal) == 0
+    with open_journal(journal_path, CONTEXT, resume=True) as journal:
+        assert len(journal) == 0
+
+
+def test_resume_other_context(journal_path: Path) -> None:
+    with open_journal(journal_path, CONTEXT) as journal:
+        journal.record("workspace", WORKSPACE, "a")
+
+    with pytest.raises(ValueError):
+        open_journal(journal_path, {**CONTEXT, "dst_url": "http://other"}, resume=True)
+
+
+def test_resume_missing_jsonl_journal(tmp_path: Path) -> None:
+    path = tmp_path / "journal.jsonl"
+    with open_journal(path, CONTEXT, resume=True) as journal:
+        journal.record("workspace", WORKSPACE, "a")
+    path.write_text("")
+    with open_journal(path, CONTEXT, resume=True) as journal:
+        journal.record("workspace", WORKSPACE, "a")
+
+    assert path.read_text().splitlines() == [
+        json.dumps({"context": CONTEXT}),
+        json.dumps({"type": "workspace", "name": WORKSPACE, "fingerprint": "a"}),
+    ]
+    with pytest.raises(ValueError):
+        open_journal(path, {**CONTEXT, "dst_url": "http://other"}, resume=True)
+
+
+def test_truncated_jsonl_journal(tmp_path: Path) -> None:
+    path = tmp_path / "journal.jsonl"
+    with open_journal(path, CONTEXT) as journal:
+        journal.record("workspace", WORKSPACE, "a")
+    with open(path, "a") as file:
+        file.write('{"type": "datastore", "na')
+
+    with open_journal(path, CONTEXT, resume=True) as journal:
+        assert journal.entries == {("workspace", WORKSPACE): "a"}
+
+
+@pytest.fixture
+def servers() -> Iterator[tuple[FakeGeoServer, FakeGeoServer]]:
+    with FakeGeoServer() as source, FakeGeoServer() as destination:
+        geoserver = GeoServerCloud(source.url)
+        geoserver.create_workspace(WORKSPACE)
+        geoserver.create_pg_datastore(
+            WORKSPACE, DATASTORE, "localhost", 5432, "db", "user", "password"
+        )
+        for i in range(5):
+            geoserver.create_feature_type(f"layer{i}", WORKSPACE, DATASTORE)
+        geoserver.create_style_definition("style", "style.sld", WORKSPACE)
+        geoserver.rest_service.create_style("style", b"<sld/>", WORKSPACE)
+        geoserver.rest_service.put_resource(
+            "styles", "icon.png", "image/png", b"\x89PNG", WORKSPACE
+        )
+        yield source, destination
+
+
+def copy(
+    source: FakeGeoServer, destination: FakeGeoServer, path: Path, resume: bool
+) -> tuple[str, int]:
+    with open_journal(path, CONTEXT, resume=resume) as journal:
+        sync = GeoServerCloudSync(
+            source.url,
+            "admin",
+            "geoserver",
+            destination.url,
+            "admin",
+            "geoserver",
+            max_workers=2,
+            journal=journal,
+        )
+        return sync.copy_workspace(WORKSPACE, deep_copy=True)
+
+
+def test_resume_copy_workspace(
+    servers: tuple[FakeGeoServer, FakeGeoServer], tmp_path: Path
+) -> None:
+    source, destination = servers
+    path = tmp_path / "journal.jsonl"
+    assert copy(source, destination, path, resume=False)[1] < 400
+    assert destination.catalog.items.keys() == source.catalog.items.keys()
+    lines = path.read_text().splitlines()
+    assert json.loads(lines[0]) == {"context": CONTEXT}
+    # Workspace, datastore, 5 feature types and layers, style, image
+    assert len(lines) == 1 + 14
+
+    # Interrupted copy: the last feature types and their layers were not recorded. The copy is
+    # concurrent, so the lines are dropped by resource rather than by position
+    interrupted = {
+        ("featuretype", f"{WORKSPACE}:{DATASTORE}:layer3"),
+        ("featuretype", f"{WORKSPACE}:{DATASTORE}:layer4"),
+        ("layer", f"{WORKSPACE}:layer3"),
+        ("layer", f"{WORKSPACE}:layer4"),
+    }
+    kept = [
+        line
+        for line in lines
+        if (json.loads(line).get("type"), json.loads(line).get("name"))
+        not in interrupted
+    ]
+    assert len(kept) == len(lines) - 4
+    path.write_text("\n".join(kept) + "\n")
+    # The source of a recorded feature type changed since
+    GeoServerCloud(source.url).rest_client.put(
+        f"/rest/workspaces/{WORKSPACE}/datastores/{DATASTORE}/featuretypes/layer0.json",
+        json={"featureType": {"title": "changed"}},
+    )
+    destination.request_count = 0
+
+    content, status_code = copy(source, destination, path, resume=True)
+
+    assert status_code < 400, content
+    assert (
+        destination.catalog.items[
+            f"workspaces/{WORKSPACE}/datastores/{DATASTORE}/featuretypes/layer0"
+        ][1]["title"]
+        == "changed"
+    )
+    copied_again = {
+        (entry["type"], entry["name"])
+        for entry in map(json.loads, path.read_text().splitlines()[len(kept) :])
+    }
+    assert copied_again == interrupted | {
+        ("featuretype", f"{WORKSPACE}:{DATASTORE}:layer0")
+    }
+    # At most a read and a write per resource copied again, none for the skipped ones
+    assert destination.request_count <= 2 * len(copied_again)
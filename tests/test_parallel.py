@@ -0,0 +1,66 @@
+import threading
+
+import pytest
+
+from geoservercloud.parallel import map_concurrently
+
+
+def test_map_concurrently_sequential():
+    assert list(map_concurrently(lambda x: x * 2, [1, 2, 3])) == [
+        (1, 2),
+        (2, 4),
+        (3, 6),
+    ]
+
+
+def test_map_concurrently_bounds_in_flight_calls():
+    lock = threading.Lock()
+    in_flight = 0
+    max_in_flight = 0
+    barrier = threading.Barrier(3)
+
+    def func(item: int) -> int:
+        nonlocal in_flight, max_in_flight
+        with lock:
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+        if item < 3:
+            barrier.wait(timeout=5)
+        with lock:
+            in_flight -= 1
+        return item
+
+    results = dict(map_concurrently(func, iter(range(10)), max_workers=3))
+
+    assert results == {item: item for item in range(10)}
+    assert max_in_flight == 3
+
+
+def test_map_concurrently_raises():
+    def func(item: int) -> int:
+        if item == 2:
+            raise ValueError("error")
+        return item
+
+    with pytest.raises(ValueError):
+        list(map_concurrently(func, range(5), max_workers=2))
+
+
+def test_map_concurrently_follows_limit():
+    lock = threading.Lock()
+    in_flight = 0
+    max_in_flight = 0
+
+    def func(item: int) -> int:
+        nonlocal in_flight, max_in_flight
+        with lock:
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+        with lock:
+            in_flight -= 1
+        return item
+
+    results = dict(map_concurrently(func, range(20), max_workers=8, limit=lambda: 1))
+
+    assert results == {item: item for item in range(20)}
+    assert max_in_flight == 1
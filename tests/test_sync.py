@@ -1,8 +1,16 @@
+import json
+import sys
+from time import sleep
+
 import pytest
+import requests
 import responses
 from responses import matchers
 
-from geoservercloud import GeoServerCloudSync
+from geoservercloud import GeoServerCloud, GeoServerCloudSync
+from geoservercloud.fakegeoserver import FakeGeoServer
+from geoservercloud.geoservercloudsync import main
+from geoservercloud.journal import fingerprint, open_journal
 
 GEOSERVER_SRC_URL = "http://source-geoserver"
 GEOSERVER_DST_URL = "http://destination-geoserver"
@@ -39,3 +47,550 @@ def test_copy_workspace(geoserver_sync):
         )
 
         assert geoserver_sync.copy_workspace(workspace_name) == (workspace_name, 201)
+
+
+def test_copy_style_images_concurrently():
+    workspace_name = "test_workspace"
+    images = [f"image_{i}.png" for i in range(6)]
+    geoserver_sync = GeoServerCloudSync(
+        GEOSERVER_SRC_URL,
+        "admin",
+        "geoserver",
+        GEOSERVER_DST_URL,
+        "admin",
+        "geoserver",
+        max_workers=4,
+    )
+    resource_dir = {
+        "ResourceDirectory": {
+            "name": "styles",
+            "parent": {
+                "path": f"/workspaces/{workspace_name}",
+                "link": {"href": "http://parent", "type": "application/json"},
+            },
+            "children": {
+                "child": [
+                    {"name": image, "link": {"href": image, "type": "image/png"}}
+                    for image in images
+                ]
+            },
+        }
+    }
+
+    with responses.RequestsMock() as rsps:
+        rsps.get(
+            url=f"{GEOSERVER_SRC_URL}/rest/resource/workspaces/{workspace_name}/styles",
+            status=200,
+            json=resource_dir,
+        )
+        for image in images:
+            rsps.head(
+                url=f"{GEOSERVER_DST_URL}/rest/resource/workspaces/{workspace_name}/styles/{image}",
+                status=404,
+            )
+            rsps.get(
+                url=f"{GEOSERVER_SRC_URL}/rest/resource/workspaces/{workspace_name}/styles/{image}",
+                status=200,
+                body=image.encode(),
+            )
+            rsps.put(
+                url=f"{GEOSERVER_DST_URL}/rest/resource/workspaces/{workspace_name}/styles/{image}",
+                status=201,
+                match=[matchers.header_matcher({"Content-Type": "image/png"})],
+            )
+
+        content, status_code = geoserver_sync.copy_style_images(workspace_name)
+
+    assert status_code == 201
+
+
+def test_copy_style_images_reports_first_error():
+    workspace_name = "test_workspace"
+    images = [f"image_{i}.png" for i in range(6)]
+    geoserver_sync = GeoServerCloudSync(
+        GEOSERVER_SRC_URL,
+        "admin",
+        "geoserver",
+        GEOSERVER_DST_URL,
+        "admin",
+        "geoserver",
+        max_workers=4,
+    )
+    resource_dir = {
+        "ResourceDirectory": {
+            "name": "styles",
+            "parent": {
+                "path": f"/workspaces/{workspace_name}",
+                "link": {"href": "http://parent", "type": "application/json"},
+            },
+            "children": {
+                "child": [
+                    {"name": image, "link": {"href": image, "type": "image/png"}}
+                    for image in images
+                ]
+            },
+        }
+    }
+
+    with responses.RequestsMock() as rsps:
+        rsps.get(
+            url=f"{GEOSERVER_SRC_URL}/rest/resource/workspaces/{workspace_name}/styles",
+            status=200,
+            json=resource_dir,
+        )
+        for index, image in enumerate(images):
+            rsps.head(
+                url=f"{GEOSERVER_DST_URL}/rest/resource/workspaces/{workspace_name}/styles/{image}",
+                status=404,
+            )
+            if index in (1, 4):
+                rsps.get(
+                    url=f"{GEOSERVER_SRC_URL}/rest/resource/workspaces/{workspace_name}/styles/{image}",
+                    status=404,
+                    body=f"No such resource {image}",
+                )
+                continue
+            rsps.get(
+                url=f"{GEOSERVER_SRC_URL}/rest/resource/workspaces/{workspace_name}/styles/{image}",
+                status=200,
+                body=image.encode(),
+            )
+            rsps.put(
+                url=f"{GEOSERVER_DST_URL}/rest/resource/workspaces/{workspace_name}/styles/{image}",
+                status=201,
+            )
+
+        # All images are copied despite the errors
+        content, status_code = geoserver_sync.copy_style_images(workspace_name)
+
+    assert (content, status_code) == ("No such resource image_1.png", 404)
+
+
+def datastore_payload(name: str, description: str) -> dict:
+    return {
+        "dataStore": {
+            "name": name,
+            "type": "PostGIS",
+            "description": description,
+            "workspace": {"name": "test_workspace"},
+            "connectionParameters": {"entry": [{"@key": "host", "$": "db"}]},
+        }
+    }
+
+
+def mock_sync_reads(rsps: responses.RequestsMock) -> None:
+    workspace_name = "test_workspace"
+    workspace = {"workspace": {"name": workspace_name, "isolated": False}}
+    for url in (GEOSERVER_SRC_URL, GEOSERVER_DST_URL):
+        rsps.get(
+            url=f"{url}/rest/workspaces/{workspace_name}.json",
+            status=200,
+            json=workspace,
+        )
+        rsps.get(
+            url=f"{url}/rest/workspaces/{workspace_name}/styles.json",
+            status=200,
+            json={"styles": ""},
+        )
+        rsps.get(
+            url=f"{url}/rest/workspaces/{workspace_name}/layergroups.json",
+            status=200,
+            json={"layerGroups": ""},
+        )
+        rsps.get(
+            url=f"{url}/rest/workspaces/{workspace_name}/datastores/ds1/featuretypes.json",
+            status=200,
+            json={"featureTypes": ""},
+        )
+    rsps.get(
+        url=f"{GEOSERVER_SRC_URL}/rest/workspaces/{workspace_name}/datastores.json",
+        status=200,
+        json={"dataStores": {"dataStore": [{"name": "ds1"}]}},
+    )
+    rsps.get(
+        url=f"{GEOSERVER_DST_URL}/rest/workspaces/{workspace_name}/datastores.json",
+        status=200,
+        json={"dataStores": {"dataStore": [{"name": "ds1"}, {"name": "ds2"}]}},
+    )
+    rsps.get(
+        url=f"{GEOSERVER_SRC_URL}/rest/workspaces/{workspace_name}/datastores/ds1.json",
+        status=200,
+        json=datastore_payload("ds1", "new description"),
+    )
+    rsps.get(
+        url=f"{GEOSERVER_DST_URL}/rest/workspaces/{workspace_name}/datastores/ds1.json",
+        status=200,
+        json=datastore_payload("ds1", "old description"),
+    )
+
+
+def test_sync_workspace_dry_run(geoserver_sync):
+    with responses.RequestsMock() as rsps:
+        mock_sync_reads(rsps)
+
+        plan, status_code = geoserver_sync.sync_workspace(
+            "test_workspace", dry_run=True
+        )
+
+    assert status_code == 200
+    assert plan.aslist() == [
+        {"resource_type": "workspace", "name": "test_workspace", "action": "unchanged"},
+        {
+            "resource_type": "datastore",
+            "name": "ds1",
+            "action": "update",
+            "changed_keys": ["description"],
+        },
+        {"resource_type": "datastore", "name": "ds2", "action": "delete"},
+    ]
+    assert plan.summary() == {"create": 0, "update": 1, "delete": 1, "unchanged": 1}
+
+
+def test_sync_workspace_creates_missing_resources(geoserver_sync):
+    with responses.RequestsMock() as rsps:
+        mock_sync_reads(rsps)
+        rsps.replace(
+            responses.GET,
+            f"{GEOSERVER_DST_URL}/rest/workspaces/test_workspace/datastores/ds1.json",
+            status=404,
+            body="No such datastore: test_workspace,ds1",
+        )
+
+        plan, status_code = geoserver_sync.sync_workspace(
+            "test_workspace", dry_run=True
+        )
+
+    assert status_code == 200
+    assert plan.summary() == {"create": 1, "update": 0, "delete": 1, "unchanged": 1}
+
+
+@pytest.mark.parametrize(
+    "status, body, expected_status",
+    [
+        (401, "Unauthorized", 401),
+        (503, "Service Unavailable", 503),
+        (200, "<html>Login</html>", 502),
+        (requests.Timeout("timed out"), "", 599),
+    ],
+)
+def test_sync_workspace_aborts_on_destination_error(
+    geoserver_sync, status, body, expected_status
+):
+    url = f"{GEOSERVER_DST_URL}/rest/workspaces/test_workspace/datastores/ds1.json"
+    with responses.RequestsMock(assert_all_requests_are_fired=False) as rsps:
+        mock_sync_reads(rsps)
+        if isinstance(status, Exception):
+            rsps.replace(responses.GET, url, body=status)
+        else:
+            rsps.replace(responses.GET, url, status=status, body=body)
+
+        content, status_code = geoserver_sync.sync_workspace("test_workspace")
+
+    assert status_code == expected_status
+    # Nothing is written
+    assert [call.request.method for call in rsps.calls] == ["GET"] * len(rsps.calls)
+
+
+def test_sync_workspace_prune(geoserver_sync):
+    with responses.RequestsMock() as rsps:
+        mock_sync_reads(rsps)
+        rsps.put(
+            url=f"{GEOSERVER_DST_URL}/rest/workspaces/test_workspace/datastores/ds1.json",
+            status=200,
+            match=[
+                matchers.json_params_matcher(
+                    {
+                        "dataStore": {
+                            "name": "ds1",
+                            "type": "PostGIS",
+                            "description": "new description",
+                            "enabled": True,
+                            "workspace": {"name": "test_workspace"},
+                            "connectionParameters": {
+                                "entry": [{"@key": "host", "$": "db"}]
+                            },
+                        }
+                    }
+                )
+            ],
+        )
+        rsps.delete(
+            url=f"{GEOSERVER_DST_URL}/rest/workspaces/test_workspace/datastores/ds2.json",
+            status=200,
+            match=[matchers.query_param_matcher({"recurse": "true"})],
+        )
+
+        plan, status_code = geoserver_sync.sync_workspace("test_workspace", prune=True)
+
+    assert status_code == 200
+    assert plan.summary()["update"] == 1
+
+
+@pytest.mark.parametrize("etag_is_digest", [False, True])
+def test_copy_style_images_skips_unchanged(etag_is_digest):
+    workspace_name = "test_workspace"
+    with FakeGeoServer() as source, FakeGeoServer() as destination:
+        geoserver = GeoServerCloud(source.url)
+        geoserver.create_workspace(workspace_name)
+        for i in range(4):
+            geoserver.rest_service.put_resource(
+                "styles",
+                f"icon{i}.png",
+                "image/png",
+                f"PNG{i}".encode(),
+                workspace_name,
+            )
+        geoserver_sync = GeoServerCloudSync(
+            source.url,
+            "admin",
+            "geoserver",
+            destination.url,
+            "admin",
+            "geoserver",
+            max_workers=4,
+            etag_is_digest=etag_is_digest,
+        )
+        assert geoserver_sync.copy_workspace(workspace_name)[1] < 400
+        assert geoserver_sync.copy_style_images(workspace_name)[1] < 400
+        geoserver.rest_service.put_resource(
+            "styles", "icon0.png", "image/png", b"changed", workspace_name
+        )
+        source.request_count = 0
+        destination.request_count = 0
+
+        assert geoserver_sync.copy_style_images(workspace_name)[1] < 400
+
+        assert destination.catalog.resources == source.catalog.resources
+        # Unless the ETags are digests, the images of the same size are streamed and hashed
+        hashed = 0 if etag_is_digest else 3
+        # Listing, then HEAD of each image and GET of the changed one
+        assert source.request_count == 1 + 4 + hashed + 1
+        # HEAD of each image and PUT of the changed one
+        assert destination.request_count == 4 + hashed + 1
+
+
+def test_copy_resource_ignores_equal_etags(geoserver_sync):
+    src_url = f"{GEOSERVER_SRC_URL}/rest/resource/styles/image.png"
+    dst_url = f"{GEOSERVER_DST_URL}/rest/resource/styles/image.png"
+    headers = {"ETag": '"1700000000000"', "Content-Length": "5"}
+
+    with responses.RequestsMock() as rsps:
+        rsps.head(dst_url, status=200, headers=headers)
+        rsps.head(src_url, status=200, headers=headers)
+        rsps.get(src_url, status=200, body=b"image")
+        rsps.get(src_url, status=200, body=b"image")
+        rsps.get(dst_url, status=200, body=b"IMAGE")
+        put = rsps.put(dst_url, status=200)
+
+        assert (
+            geoserver_sync.copy_resource("styles", "image.png", "image/png")[1] == 200
+        )
+
+    assert put.call_count == 1
+
+
+@pytest.mark.parametrize(
+    "dst_content,copied", [(b"image", False), (b"IMAGE", True), (b"images", True)]
+)
+def test_copy_resource_without_etag(geoserver_sync, dst_content, copied):
+    src_url = f"{GEOSERVER_SRC_URL}/rest/resource/styles/image.png"
+    dst_url = f"{GEOSERVER_DST_URL}/rest/resource/styles/image.png"
+
+    with responses.RequestsMock(assert_all_requests_are_fired=False) as rsps:
+        rsps.head(
+            dst_url, status=200, headers={"Content-Length": str(len(dst_content))}
+        )
+        rsps.head(src_url, status=200, headers={"Content-Length": "5"})
+        rsps.get(src_url, status=200, body=b"image")
+        dst_get = rsps.get(dst_url, status=200, body=dst_content)
+        put = rsps.put(dst_url, status=200)
+
+        assert (
+            geoserver_sync.copy_resource("styles", "image.png", "image/png")[1] == 200
+        )
+
+    assert put.call_count == copied
+    # Resources of different sizes are not downloaded from the destination
+    assert dst_get.call_count == (len(dst_content) == 5)
+
+
+def test_copy_resource_streamed(tmp_path):
+    content = bytes(range(256)) * 4096
+    with FakeGeoServer() as source, FakeGeoServer() as destination:
+        source.catalog.resources["styles/image.png"] = ("image/png", content)
+        with open_journal(tmp_path / "journal.jsonl") as journal:
+            geoserver_sync = GeoServerCloudSync(
+                source.url,
+                "admin",
+                "geoserver",
+                destination.url,
+                "admin",
+                "geoserver",
+                journal=journal,
+                compare_resources=False,
+            )
+
+            assert geoserver_sync.copy_resource("styles", "image.png", "image/png") == (
+                "",
+                201,
+            )
+
+            assert destination.catalog.resources == source.catalog.resources
+            assert journal.entries == {
+                ("resource", "styles/image.png"): fingerprint(content)
+            }
+
+        destination.request_count = 0
+        with open_journal(tmp_path / "journal.jsonl", resume=True) as journal:
+            geoserver_sync.journal = journal
+
+            assert geoserver_sync.copy_resource("styles", "image.png", "image/png") == (
+                "",
+                200,
+            )
+            assert journal.skipped == 1
+            assert destination.request_count == 0
+
+            # Changed at the source since the interrupted copy
+            source.catalog.resources["styles/image.png"] = ("image/png", b"changed")
+            assert (
+                geoserver_sync.copy_resource("styles", "image.png", "image/png")[1]
+                < 400
+            )
+            assert destination.catalog.resources == source.catalog.resources
+
+
+def copy_workspace_args(
+    source: FakeGeoServer, destination: FakeGeoServer, *args: str
+) -> list[str]:
+    return [
+        "copy-workspace",
+        "--src_url",
+        source.url,
+        "--src_user",
+        "admin",
+        "--src_password",
+        "geoserver",
+        "--dst_url",
+        destination.url,
+        "--dst_user",
+        "admin",
+        "--dst_password",
+        "geoserver",
+        "--workspace",
+        "test_workspace",
+        *args,
+    ]
+
+
+def test_main_journal_is_opt_in(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    with FakeGeoServer() as source, FakeGeoServer() as destination:
+        GeoServerCloud(source.url).create_workspace("test_workspace")
+
+        monkeypatch.setattr(sys, "argv", copy_workspace_args(source, destination))
+        main()
+        assert list(tmp_path.iterdir()) == []
+
+        monkeypatch.setattr(
+            sys,
+            "argv",
+            copy_workspace_args(source, destination, "--journal", "copy.jsonl"),
+        )
+        main()
+        journal = (tmp_path / "copy.jsonl").read_text()
+
+        # An existing journal is only reused with --resume
+        with pytest.raises(SystemExit, match="--resume"):
+            main()
+        assert (tmp_path / "copy.jsonl").read_text() == journal
+
+        monkeypatch.setattr(
+            sys,
+            "argv",
+            copy_workspace_args(
+                source, destination, "--journal", "copy.jsonl", "--resume"
+            ),
+        )
+        main()
+        assert (tmp_path / "copy.jsonl").read_text().startswith(journal)
+
+        # A journal written by another copy cannot be resumed
+        (tmp_path / "copy.jsonl").write_text(
+            json.dumps({"context": {"src_url": "http://other"}}) + "\n"
+        )
+        with pytest.raises(SystemExit, match="another copy"):
+            main()
+
+
+def test_main_several_destinations(monkeypatch, capsys):
+    with (
+        FakeGeoServer() as source,
+        FakeGeoServer() as first,
+        FakeGeoServer() as second,
+    ):
+        GeoServerCloud(source.url).create_workspace("test_workspace")
+        args = copy_workspace_args(source, first, "--dst_url", second.url)
+
+        monkeypatch.setattr(sys, "argv", args)
+        main()
+        output = capsys.readouterr().out.splitlines()
+        assert [line.split()[0] for line in output[:-1]] == [first.url, second.url]
+        assert output[-1] == "200"
+        for destination in (first, second):
+            assert destination.catalog.items.keys() == source.catalog.items.keys()
+
+        monkeypatch.setattr(sys, "argv", [*args, "--sync"])
+        with pytest.raises(SystemExit, match="--sync"):
+            main()
+        monkeypatch.setattr(
+            sys, "argv", [*args, "--dst_user", "admin", "--dst_user", "admin"]
+        )
+        with pytest.raises(SystemExit, match="--dst_user"):
+            main()
+
+
+def test_sync_workspace_nested_layer_groups():
+    workspace_name = "test_workspace"
+    with FakeGeoServer() as source, FakeGeoServer() as destination:
+        geoserver = GeoServerCloud(source.url)
+        geoserver.create_workspace(workspace_name)
+        # Each group contains the previous one
+        for i in range(4):
+            geoserver.create_layer_group(
+                f"group{i}",
+                workspace_name,
+                layers=[f"{workspace_name}:group{i - 1}" if i else "layer"],
+            )
+        geoserver_sync = GeoServerCloudSync(
+            source.url,
+            "admin",
+            "geoserver",
+            destination.url,
+            "admin",
+            "geoserver",
+            max_workers=4,
+        )
+        create_layer_group = geoserver_sync.dst_instance.create_layer_group
+        created: list[str] = []
+        calls: list[str] = []
+
+        def create_after_contained_groups(name, workspace, layer_group):
+            calls.append(name)
+            index = int(name[len("group") :])
+            if index and f"group{index - 1}" not in created:
+                return f"No such layer group group{index - 1}", 400
+            # Leave time to other changes sent concurrently
+            sleep(0.05)
+            result = create_layer_group(name, workspace, layer_group)
+            created.append(name)
+            return result
+
+        geoserver_sync.dst_instance.create_layer_group = (  # type: ignore[method-assign]
+            create_after_contained_groups
+        )
+
+        plan, status_code = geoserver_sync.sync_workspace(workspace_name)
+
+    assert status_code == 200
+    assert calls == created == [f"group{i}" for i in range(4)]
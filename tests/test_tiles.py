@@ -0,0 +1,120 @@
+import sqlite3
+
+import pytest
+import responses
+
+from geoservercloud import GeoServerCloud
+from tests.conftest import GEOSERVER_URL
+
+WMTS_URL = f"{GEOSERVER_URL}/gwc/service/wmts"
+ORIGIN = 20037508.342789244
+CAPABILITIES = f"""<?xml version="1.0" encoding="UTF-8"?>
+<Capabilities xmlns="http://www.opengis.net/wmts/1.0" xmlns:ows="http://www.opengis.net/ows/1.1"
+    xmlns:xlink="http://www.w3.org/1999/xlink" version="1.0.0">
+  <ows:ServiceIdentification><ows:Title>WMTS</ows:Title></ows:ServiceIdentification>
+  <Contents>
+    <Layer>
+      <ows:Identifier>ws:layer</ows:Identifier>
+      <Style isDefault="true"><ows:Identifier>default</ows:Identifier></Style>
+      <Format>image/png</Format>
+      <TileMatrixSetLink><TileMatrixSet>EPSG:3857</TileMatrixSet></TileMatrixSetLink>
+    </Layer>
+    <TileMatrixSet>
+      <ows:Identifier>EPSG:3857</ows:Identifier>
+      <ows:SupportedCRS>urn:ogc:def:crs:EPSG::3857</ows:SupportedCRS>
+      <TileMatrix>
+        <ows:Identifier>EPSG:3857:0</ows:Identifier>
+        <ScaleDenominator>559082264.0287178</ScaleDenominator>
+        <TopLeftCorner>-{ORIGIN} {ORIGIN}</TopLeftCorner>
+        <TileWidth>256</TileWidth><TileHeight>256</TileHeight>
+        <MatrixWidth>1</MatrixWidth><MatrixHeight>1</MatrixHeight>
+      </TileMatrix>
+      <TileMatrix>
+        <ows:Identifier>EPSG:3857:1</ows:Identifier>
+        <ScaleDenominator>279541132.0143589</ScaleDenominator>
+        <TopLeftCorner>-{ORIGIN} {ORIGIN}</TopLeftCorner>
+        <TileWidth>256</TileWidth><TileHeight>256</TileHeight>
+        <MatrixWidth>2</MatrixWidth><MatrixHeight>2</MatrixHeight>
+      </TileMatrix>
+    </TileMatrixSet>
+  </Contents>
+</Capabilities>
+"""
+
+
+def mock_wmts(rsps: responses.RequestsMock) -> None:
+    rsps.get(
+        WMTS_URL,
+        match=[
+            responses.matchers.query_param_matcher(
+                {"service": "WMTS", "request": "GetCapabilities", "version": "1.0.0"}
+            )
+        ],
+        status=200,
+        body=CAPABILITIES,
+    )
+    for tile_matrix, row, column, status in (
+        ("EPSG:3857:0", 0, 0, 200),
+        ("EPSG:3857:1", 0, 1, 200),
+        ("EPSG:3857:1", 1, 1, 404),
+    ):
+        rsps.get(
+            WMTS_URL,
+            match=[
+                responses.matchers.query_param_matcher(
+                    {
+                        "service": "WMTS",
+                        "version": "1.0.0",
+                        "request": "GetTile",
+                        "layer": "ws:layer",
+                        "style": "",
+                        "format": "image/png",
+                        "tilematrixset": "EPSG:3857",
+                        "tilematrix": tile_matrix,
+                        "tilerow": str(row),
+                        "tilecol": str(column),
+                    }
+                )
+            ],
+            status=status,
+            body=f"{tile_matrix}/{row}/{column}".encode(),
+        )
+
+
+@pytest.mark.parametrize("max_workers", [1, 4])
+def test_download_tiles_to_directory(
+    geoserver: GeoServerCloud, tmp_path, max_workers: int
+) -> None:
+    with responses.RequestsMock() as rsps:
+        mock_wmts(rsps)
+
+        results = geoserver.download_tiles(
+            "ws:layer",
+            "EPSG:3857",
+            (1, -ORIGIN / 2, ORIGIN, ORIGIN),
+            tmp_path,
+            max_workers=max_workers,
+        )
+
+    assert sorted((r.tile_matrix, r.row, r.column, r.status_code) for r in results) == [
+        ("EPSG:3857:0", 0, 0, 200),
+        ("EPSG:3857:1", 0, 1, 200),
+        ("EPSG:3857:1", 1, 1, 404),
+    ]
+    assert (tmp_path / "EPSG_3857_1" / "1" / "0.png").read_bytes() == b"EPSG:3857:1/0/1"
+    assert not (tmp_path / "EPSG_3857_1" / "1" / "1.png").exists()
+
+
+def test_download_tiles_to_mbtiles(geoserver: GeoServerCloud, tmp_path) -> None:
+    path = tmp_path / "layer.mbtiles"
+    with responses.RequestsMock() as rsps:
+        mock_wmts(rsps)
+
+        geoserver.download_tiles(
+            "ws:layer", "EPSG:3857", (1, -ORIGIN / 2, ORIGIN, ORIGIN), path
+        )
+
+    with sqlite3.connect(path) as connection:
+        assert connection.execute(
+            "SELECT zoom_level, tile_column, tile_row FROM tiles ORDER BY zoom_level"
+        ).fetchall() == [(0, 0, 0), (1, 1, 1)]
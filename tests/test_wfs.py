@@ -1,3 +1,4 @@
+import pytest
 import responses
 
 from geoservercloud import GeoServerCloud
@@ -189,3 +190,114 @@ def test_get_property_value_no_feature(geoserver: GeoServerCloud) -> None:
         )
 
         assert property == {}
+
+
+def feature_page(start: int, count: int) -> dict:
+    return {
+        "type": "FeatureCollection",
+        "features": [
+            {"type": "Feature", "id": f"test_layer.{i}", "properties": {}}
+            for i in range(start, start + count)
+        ],
+    }
+
+
+def wfs2_params(start_index: int, **extra: str) -> dict[str, str]:
+    return {
+        "service": "WFS",
+        "version": "2.0.0",
+        "request": "GetFeature",
+        "typeNames": "test_layer",
+        "outputFormat": "application/json",
+        "count": "2",
+        "startIndex": str(start_index),
+        **extra,
+    }
+
+
+@pytest.mark.parametrize("prefetch", [0, 2])
+def test_iter_features(geoserver: GeoServerCloud, prefetch: int) -> None:
+    with responses.RequestsMock(assert_all_requests_are_fired=False) as rsps:
+        for start, count in ((0, 2), (2, 2), (4, 1), (5, 0)):
+            rsps.get(
+                url=WFS_URL,
+                match=[
+                    responses.matchers.query_param_matcher(
+                        wfs2_params(
+                            start,
+                            sortBy="name",
+                            bbox="1,2,3,4,EPSG:2056",
+                        )
+                    )
+                ],
+                status=200,
+                json=feature_page(start, count),
+            )
+
+        features = geoserver.iter_features(
+            WORKSPACE,
+            "test_layer",
+            page_size=2,
+            bbox=(1, 2, 3, 4),
+            bbox_crs="EPSG:2056",
+            sort_by="name",
+            prefetch=prefetch,
+        )
+
+        assert [feature["id"] for feature in features] == [
+            f"test_layer.{i}" for i in range(5)
+        ]
+        # Prefetched pages beyond the last one are requested, but not consumed
+        assert len(rsps.calls) <= 4 + prefetch
+
+
+@pytest.mark.parametrize("prefetch", [0, 2])
+def test_iter_features_capped_pages(geoserver: GeoServerCloud, prefetch: int) -> None:
+    # maxFeatures of the layer is 1, below the requested page size
+    with responses.RequestsMock(assert_all_requests_are_fired=False) as rsps:
+        for start in range(5):
+            rsps.get(
+                url=WFS_URL,
+                match=[responses.matchers.query_param_matcher(wfs2_params(start))],
+                status=200,
+                json=feature_page(start, 1 if start < 4 else 0),
+            )
+
+        features = list(
+            geoserver.iter_features(
+                WORKSPACE, "test_layer", page_size=2, prefetch=prefetch
+            )
+        )
+
+    assert [feature["id"] for feature in features] == [
+        f"test_layer.{i}" for i in range(4)
+    ]
+
+
+def test_iter_features_exact_last_page(geoserver: GeoServerCloud) -> None:
+    with responses.RequestsMock() as rsps:
+        rsps.get(
+            url=WFS_URL,
+            match=[responses.matchers.query_param_matcher(wfs2_params(0))],
+            status=200,
+            json=feature_page(0, 2),
+        )
+        rsps.get(
+            url=WFS_URL,
+            match=[responses.matchers.query_param_matcher(wfs2_params(2))],
+            status=200,
+            json=feature_page(2, 0),
+        )
+
+        features = list(geoserver.iter_features(WORKSPACE, "test_layer", page_size=2))
+
+    assert len(features) == 2
+
+
+def test_iter_features_bbox_and_cql_filter(geoserver: GeoServerCloud) -> None:
+    with pytest.raises(ValueError):
+        next(
+            geoserver.iter_features(
+                WORKSPACE, "test_layer", bbox=(1, 2, 3, 4), cql_filter="a=1"
+            )
+        )
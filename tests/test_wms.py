@@ -1,6 +1,14 @@
+from io import BytesIO
+from pathlib import Path
+from time import sleep
+
+import pytest
 import responses
 
 from geoservercloud import GeoServerCloud
+from geoservercloud.services.capabilities import LayerRecord
+from geoservercloud.services.maps import MapRequest
+from geoservercloud.services.png import PngImage, PngWriter
 from tests.conftest import GEOSERVER_URL
 
 WORKSPACE = "test_workspace"
@@ -232,3 +240,255 @@ def test_set_default_locale_for_service(geoserver: GeoServerCloud) -> None:
         content, code = geoserver.set_default_locale_for_service(WORKSPACE, "en")
         assert content == ""
         assert code == 200
+
+
+def test_get_layers_streaming(geoserver: GeoServerCloud) -> None:
+    with responses.RequestsMock() as rsps:
+        rsps.get(
+            f"{geoserver.url}/{WORKSPACE}/wms",
+            status=200,
+            headers={"Content-Type": "text/xml"},
+            body=CAPABILITIES,
+        )
+
+        layers = geoserver.get_wms_layers(WORKSPACE, streaming=True)
+        assert layers == [LayerRecord("test_layer", None, None, [], {})]
+        assert list(geoserver.iter_wms_layers(WORKSPACE)) == layers
+
+
+def test_get_maps(geoserver: GeoServerCloud) -> None:
+    requests = [
+        {
+            "layers": [LAYER],
+            "bbox": BBOX,
+            "size": (WIDTH, HEIGHT),
+            "format": FORMAT,
+            "srs": "EPSG:4326",
+            "time": time,
+        }
+        for time in ("2026-01-01", "2026-01-02", "2026-01-03")
+    ]
+    with responses.RequestsMock() as rsps:
+        for time, status in (
+            ("2026-01-01", 200),
+            ("2026-01-02", 200),
+            ("2026-01-03", 500),
+        ):
+            rsps.get(
+                f"{geoserver.url}/wms",
+                match=[
+                    responses.matchers.query_param_matcher(
+                        {
+                            "service": "WMS",
+                            "request": "GetMap",
+                            "version": "1.3.0",
+                            "bbox": f"{BBOX[1]},{BBOX[0]},{BBOX[3]},{BBOX[2]}",
+                            "layers": LAYER,
+                            "styles": "",
+                            "width": WIDTH,
+                            "height": HEIGHT,
+                            "format": FORMAT,
+                            "transparent": "TRUE",
+                            "crs": "EPSG:4326",
+                            "exceptions": "XML",
+                            "bgcolor": "0xFFFFFF",
+                            "time": time,
+                        }
+                    )
+                ],
+                status=status,
+                content_type=FORMAT,
+                body=time.encode(),
+            )
+
+        results = list(geoserver.get_maps(requests, max_workers=3))
+
+    assert sorted(
+        (
+            MapRequest.create(result.request).time,
+            result.status_code,
+            result.content_type,
+            result.size,
+        )
+        for result in results
+    ) == [
+        ("2026-01-01", 200, FORMAT, 10),
+        ("2026-01-02", 200, FORMAT, 10),
+        ("2026-01-03", 500, FORMAT, 10),
+    ]
+    assert all(result.elapsed >= 0 for result in results)
+
+
+def test_get_maps_invalid_request(geoserver: GeoServerCloud) -> None:
+    requests = [
+        {"layers": [LAYER], "bbox": BBOX, "size": (WIDTH, HEIGHT)},
+        {"layers": [LAYER], "size": (WIDTH, HEIGHT)},
+        {
+            "layers": [LAYER],
+            "bbox": BBOX,
+            "size": (WIDTH, HEIGHT),
+            "styles": ["a", "b"],
+        },
+    ]
+    with responses.RequestsMock() as rsps:
+        rsps.get(f"{geoserver.url}/{WORKSPACE}/wms", status=200, body=b"map")
+
+        geoserver.default_workspace = WORKSPACE
+        try:
+            results = list(geoserver.get_maps(requests, max_workers=3))
+        finally:
+            geoserver.default_workspace = None
+
+        assert len(rsps.calls) == 1
+
+    assert sorted((result.status_code, result.content[:22]) for result in results) == [
+        (200, b"map"),
+        (400, b"Invalid GetMap request"),
+        (400, b"Invalid GetMap request"),
+    ]
+    assert {id(result.request) for result in results if result.status_code == 400} == {
+        id(requests[1]),
+        id(requests[2]),
+    }
+
+
+def pixel(x: int, y: int) -> bytes:
+    return bytes([x % 256, y % 256, (x * y) % 256, 255])
+
+
+def render(request, map_height: int = 50) -> tuple[int, dict, bytes]:
+    params = request.params
+    width, height = int(params["width"]), int(params["height"])
+    # One map unit per pixel, map origin at the top left corner of the full image
+    min_x, _, _, max_y = (float(value) for value in params["bbox"].split(","))
+    left, top = round(min_x), round(map_height - max_y)
+    output = BytesIO()
+    writer = PngWriter(output, width, height)
+    for y in range(top, top + height):
+        writer.write_row(b"".join(pixel(x, y) for x in range(left, left + width)))
+    writer.close()
+    return 200, {}, output.getvalue()
+
+
+def test_get_tiled_map(geoserver: GeoServerCloud) -> None:
+    with responses.RequestsMock() as rsps:
+        rsps.add_callback(
+            responses.GET,
+            f"{geoserver.url}/wms",
+            callback=render,
+            content_type="image/png",
+        )
+
+        content, status_code = geoserver.get_tiled_map(
+            layers=[LAYER],
+            bbox=(0, 0, 100, 50),
+            size=(100, 50),
+            tile_size=30,
+            gutter=3,
+            max_workers=3,
+        )
+
+        assert len(rsps.calls) == 8
+
+    assert status_code == 200
+    assert isinstance(content, bytes)
+    image = PngImage.decode(content)
+    assert (image.width, image.height) == (100, 50)
+    assert image.rows == [b"".join(pixel(x, y) for x in range(100)) for y in range(50)]
+
+
+def test_get_tiled_map_slow_tile(geoserver: GeoServerCloud) -> None:
+    started: list[str] = []
+    started_before_first_tile: list[int] = []
+
+    def render_slowly(request) -> tuple[int, dict, bytes]:
+        started.append(request.params["bbox"])
+        if len(started) == 1:
+            # The other tiles complete meanwhile and wait for the first band
+            sleep(0.3)
+            started_before_first_tile.append(len(started))
+        return render(request, map_height=150)
+
+    with responses.RequestsMock() as rsps:
+        rsps.add_callback(
+            responses.GET,
+            f"{geoserver.url}/wms",
+            callback=render_slowly,
+            content_type="image/png",
+        )
+
+        content, status_code = geoserver.get_tiled_map(
+            layers=[LAYER],
+            bbox=(0, 0, 100, 150),
+            size=(100, 150),
+            tile_size=30,
+            gutter=3,
+            max_workers=2,
+        )
+
+    # 5 bands of 4 tiles, at most a band and 2 tiles in flight (plus the one just received)
+    assert len(started) == 20
+    assert started_before_first_tile[0] <= 7
+    assert status_code == 200
+    assert isinstance(content, bytes)
+    image = PngImage.decode(content)
+    assert image.rows == [b"".join(pixel(x, y) for x in range(100)) for y in range(150)]
+
+
+def test_get_tiled_map_error(geoserver: GeoServerCloud) -> None:
+    with responses.RequestsMock() as rsps:
+        rsps.get(
+            f"{geoserver.url}/wms",
+            status=200,
+            content_type="application/vnd.ogc.se_xml",
+            body="<ServiceExceptionReport/>",
+        )
+
+        content, status_code = geoserver.get_tiled_map(
+            layers=[LAYER], bbox=(0, 0, 100, 50), size=(100, 50), tile_size=60
+        )
+
+    assert status_code == 502
+    assert isinstance(content, str)
+    assert "ServiceExceptionReport" in content
+
+
+@pytest.mark.parametrize("to_path", [True, False])
+def test_get_tiled_map_error_leaves_output_untouched(
+    geoserver: GeoServerCloud, tmp_path: Path, to_path: bool
+) -> None:
+    rendered: list[str] = []
+
+    def render_but_last(request) -> tuple[int, dict, bytes]:
+        rendered.append(request.params["bbox"])
+        # The tiles are rendered in order, the first bands are already stitched
+        if len(rendered) == 8:
+            return 500, {}, b"Out of memory"
+        return render(request)
+
+    path = tmp_path / "map.png"
+    path.write_bytes(b"previous map")
+    with responses.RequestsMock() as rsps:
+        rsps.add_callback(
+            responses.GET,
+            f"{geoserver.url}/wms",
+            callback=render_but_last,
+            content_type="image/png",
+        )
+
+        with open(path, "ab") as file:
+            content, status_code = geoserver.get_tiled_map(
+                layers=[LAYER],
+                bbox=(0, 0, 100, 50),
+                size=(100, 50),
+                tile_size=30,
+                gutter=3,
+                max_workers=1,
+                output=path if to_path else file,
+            )
+
+    assert status_code == 500
+    assert isinstance(content, str)
+    assert "Out of memory" in content
+    assert path.read_bytes() == b"previous map"
+    assert list(tmp_path.iterdir()) == [path]
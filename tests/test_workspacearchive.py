@@ -0,0 +1,110 @@
+import json
+import zipfile
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+
+from geoservercloud import GeoServerCloud
+from geoservercloud.fakegeoserver import FakeGeoServer
+from geoservercloud.workspacearchive import MANIFEST
+
+WORKSPACE = "test_workspace"
+DATASTORE = "test_datastore"
+
+
+@pytest.fixture
+def source() -> Iterator[FakeGeoServer]:
+    with FakeGeoServer() as server:
+        geoserver = GeoServerCloud(server.url)
+        geoserver.create_workspace(WORKSPACE)
+        geoserver.create_pg_datastore(
+            WORKSPACE, DATASTORE, "localhost", 5432, "db", "user", "password"
+        )
+        for i in range(4):
+            geoserver.create_feature_type(f"layer{i}", WORKSPACE, DATASTORE)
+        geoserver.create_style_definition("style", "style.sld", WORKSPACE)
+        geoserver.rest_service.create_style("style", b"<sld/>", WORKSPACE)
+        geoserver.rest_service.put_resource(
+            "styles", "icon.png", "image/png", b"\x89PNG", WORKSPACE
+        )
+        geoserver.create_layer_group("group", WORKSPACE, ["layer0", "layer1"])
+        geoserver.create_layer_group("groups", WORKSPACE, ["group", "layer2"])
+        yield server
+
+
+def test_export_import_workspace(source: FakeGeoServer, tmp_path: Path) -> None:
+    path = tmp_path / "workspace.zip"
+
+    entries, status_code = GeoServerCloud(source.url).export_workspace(
+        WORKSPACE, path, max_workers=4
+    )
+
+    assert status_code == 200
+    assert isinstance(entries, list)
+    with zipfile.ZipFile(path) as archive:
+        manifest = json.loads(archive.read(MANIFEST))
+        assert manifest["workspace"] == WORKSPACE
+        assert set(archive.namelist()) == {MANIFEST} | {
+            entry["path"] for entry in manifest["entries"]
+        }
+        assert archive.read("styles/style.sld") == b"<sld/>"
+    types = [entry["resource_type"] for entry in manifest["entries"]]
+    assert types == (
+        ["workspace", "style", "stylefile", "datastore", "resource"]
+        + ["featuretype"] * 4
+        + ["layer"] * 4
+        + ["layergroup"] * 2
+    )
+    assert [entry["name"] for entry in manifest["entries"][-2:]] == ["group", "groups"]
+
+    with FakeGeoServer() as destination:
+        content, status_code = GeoServerCloud(destination.url).import_workspace(
+            path, max_workers=4
+        )
+
+        assert status_code < 400, content
+        assert destination.catalog.items.keys() == source.catalog.items.keys()
+        assert destination.catalog.style_files == source.catalog.style_files
+        assert destination.catalog.resources == source.catalog.resources
+
+
+def test_export_missing_workspace(tmp_path: Path) -> None:
+    with FakeGeoServer() as server:
+        content, status_code = GeoServerCloud(server.url).export_workspace(
+            "missing", tmp_path / "workspace.zip"
+        )
+
+    assert status_code == 404
+    assert isinstance(content, str)
+
+
+def test_export_failure_leaves_no_archive(
+    source: FakeGeoServer, tmp_path: Path
+) -> None:
+    path = tmp_path / "workspace.zip"
+    path.write_bytes(b"previous archive")
+    # The layer of a feature type cannot be read
+    del source.catalog.items[f"layers/{WORKSPACE}:layer3"]
+
+    content, status_code = GeoServerCloud(source.url).export_workspace(
+        WORKSPACE, path, max_workers=4
+    )
+
+    assert status_code == 404
+    assert isinstance(content, str)
+    assert path.read_bytes() == b"previous archive"
+    assert list(tmp_path.iterdir()) == [path]
+
+
+def test_import_corrupted_archive(source: FakeGeoServer, tmp_path: Path) -> None:
+    path = tmp_path / "workspace.zip"
+    GeoServerCloud(source.url).export_workspace(WORKSPACE, path)
+    corrupted = tmp_path / "corrupted.zip"
+    with zipfile.ZipFile(path) as archive, zipfile.ZipFile(corrupted, "w") as copy:
+        for name in archive.namelist():
+            data = archive.read(name)
+            copy.writestr(name, b"<tampered/>" if name.endswith(".sld") else data)
+
+    with FakeGeoServer() as destination, pytest.raises(ValueError):
+        GeoServerCloud(destination.url).import_workspace(corrupted)